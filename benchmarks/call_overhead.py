@@ -0,0 +1,154 @@
+"""----------------------------------------------------------------------------
+Host-side cost of the DobotDllType wrappers for the calls made per motion.
+
+    python -m benchmarks.call_overhead
+    python -m benchmarks.call_overhead --calls 200000
+
+Builds a stub libDobotDll with the system C compiler (CC, default gcc) whose
+entry points return immediately, then times each wrapper two ways:
+
+  legacy    the wrapper body as it was before DobotConnection: name lookup on the
+            CDLL and fresh c_int / c_uint64 / Structure / byref objects
+  prebound  the current dType wrapper on the DobotConnection returned by load()
+
+The difference is pure Python/ctypes overhead per call; the serial link to a
+real arm adds milliseconds on top of either. The last column is the current
+wrapper on a connection with DobotCallStats on, i.e. the cost of timing
+every call into its histograms.
+----------------------------------------------------------------------------"""
+import argparse
+import ctypes
+import os
+import subprocess
+import tempfile
+import timeit
+
+from dobot_api import DobotCallStats
+from dobot_api import DobotDllType as dType
+
+STUB_SOURCE = r"""
+#include <stdint.h>
+#include <stdbool.h>
+
+typedef struct { uint8_t ptpMode; float x, y, z, rHead; } __attribute__((packed)) PTPCmd;
+typedef struct { uint8_t cpMode; float x, y, z, velocity; } __attribute__((packed)) CPCmd;
+typedef struct { float x, y, z, rHead, joint[4]; } __attribute__((packed)) Pose;
+
+static uint64_t lastIndex;
+
+int SetPTPCmd(int masterId, int slaveId, PTPCmd *cmd, bool isQueued, uint64_t *queuedCmdIndex)
+{ *queuedCmdIndex = ++lastIndex; return 0; }
+int SetCPCmd(int masterId, int slaveId, CPCmd *cmd, bool isQueued, uint64_t *queuedCmdIndex)
+{ *queuedCmdIndex = ++lastIndex; return 0; }
+int SetEndEffectorSuctionCup(int masterId, int slaveId, bool enableCtrl, bool on, bool isQueued, uint64_t *queuedCmdIndex)
+{ *queuedCmdIndex = ++lastIndex; return 0; }
+int SetEndEffectorGripper(int masterId, int slaveId, bool enableCtrl, bool on, bool isQueued, uint64_t *queuedCmdIndex)
+{ *queuedCmdIndex = ++lastIndex; return 0; }
+int GetQueuedCmdCurrentIndex(int masterId, int slaveId, uint64_t *queuedCmdIndex)
+{ *queuedCmdIndex = lastIndex; return 0; }
+int GetPose(int masterId, int slaveId, Pose *pose)
+{ pose->x = 200.0f; pose->y = 0.0f; pose->z = 0.0f; return 0; }
+"""
+
+
+def buildStub(directory):
+    source = os.path.join(directory, "stub.c")
+    library = os.path.join(directory, "libDobotDllStub.so")
+    with open(source, "w") as f:
+        f.write(STUB_SOURCE)
+    subprocess.check_call([os.environ.get("CC", "gcc"), "-O2", "-shared", "-fPIC", "-o", library, source])
+    return library
+
+
+# ------------------------------------------------------ wrappers before DobotConnection
+# Same bodies as the dType wrappers had, minus the queued-command hooks, reading the
+# device ids from module globals as DobotDllType did.
+
+masterId = 0
+slaveId = 0
+
+
+def legacySetPTPCmd(api, ptpMode, x, y, z, rHead, isQueued=0):
+    cmd = dType.PTPCmd()
+    cmd.ptpMode = ptpMode
+    cmd.x = x
+    cmd.y = y
+    cmd.z = z
+    cmd.rHead = rHead
+    queuedCmdIndex = ctypes.c_uint64(0)
+    result = dType.callDobot(api, "SetPTPCmd", ctypes.c_int(masterId), ctypes.c_int(slaveId), ctypes.byref(cmd), isQueued, ctypes.byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def legacySetCPCmd(api, cpMode, x, y, z, velocity, isQueued=0):
+    cmd = dType.CPCmd()
+    cmd.cpMode = cpMode
+    cmd.x = x
+    cmd.y = y
+    cmd.z = z
+    cmd.velocity = velocity
+    queuedCmdIndex = ctypes.c_uint64(0)
+    result = dType.callDobot(api, "SetCPCmd", ctypes.c_int(masterId), ctypes.c_int(slaveId), ctypes.byref(cmd), isQueued, ctypes.byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def legacySetEndEffectorSuctionCup(api, enableCtrl, on, isQueued=0):
+    queuedCmdIndex = ctypes.c_uint64(0)
+    result = dType.callDobot(api, "SetEndEffectorSuctionCup", ctypes.c_int(masterId), ctypes.c_int(slaveId), enableCtrl, on, isQueued, ctypes.byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def legacyGetQueuedCmdCurrentIndex(api):
+    queuedCmdIndex = ctypes.c_uint64(0)
+    queuedCmdIndex1 = ctypes.c_uint64(0)
+    result = dType.callDobot(api, "GetQueuedCmdCurrentIndex", ctypes.c_int(masterId), ctypes.c_int(slaveId), ctypes.byref(queuedCmdIndex))
+    return [queuedCmdIndex.value, queuedCmdIndex1.value]
+
+
+def legacyGetPose(api):
+    pose = dType.Pose()
+    result = dType.callDobot(api, "GetPose", ctypes.c_int(masterId), ctypes.c_int(slaveId), ctypes.byref(pose))
+    return [pose.x, pose.y, pose.z, pose.rHead, pose.joint1Angle, pose.joint2Angle, pose.joint3Angle, pose.joint4Angle]
+
+
+CASES = (
+    ("SetPTPCmd", legacySetPTPCmd, dType.SetPTPCmd, (dType.PTPMode.PTPMOVLXYZMode, 200.0, 50.0, -30.0, 0.0, 1)),
+    ("SetCPCmd", legacySetCPCmd, dType.SetCPCmd, (dType.ContinuousPathMode.CPAbsoluteMode, 200.0, 50.0, -30.0, 100.0, 1)),
+    ("SetEndEffectorSuctionCup", legacySetEndEffectorSuctionCup, dType.SetEndEffectorSuctionCup, (1, 1, 1)),
+    ("GetQueuedCmdCurrentIndex", legacyGetQueuedCmdCurrentIndex, dType.GetQueuedCmdCurrentIndex, ()),
+    ("GetPose", legacyGetPose, dType.GetPose, ()),
+)
+
+
+def perCall(runs, calls, repeat):
+    # The versions are timed alternately so load on the host hits them alike; the best run of
+    # each is reported, in microseconds per call.
+    best = [float("inf")] * len(runs)
+    for _ in range(repeat):
+        for i, (func, funcArgs) in enumerate(runs):
+            best[i] = min(best[i], timeit.timeit(lambda: func(*funcArgs), number=calls))
+    return [t / calls * 1e6 for t in best]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50000, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per case; the best is reported")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        library = buildStub(directory)
+        raw = ctypes.CDLL(library)
+        api = dType.DobotConnection(ctypes.CDLL(library))
+        timed = dType.DobotConnection(ctypes.CDLL(library))
+        DobotCallStats.enable(timed)
+
+        print(f"{'call':<28}{'legacy us':>11}{'prebound us':>13}{'speedup':>9}{'call stats us':>15}")
+        for name, legacy, wrapper, callArgs in CASES:
+            before, after, withStats = perCall([(legacy, (raw,) + callArgs), (wrapper, (api,) + callArgs),
+                                                (wrapper, (timed,) + callArgs)], args.calls, args.repeat)
+            print(f"{name:<28}{before:>11.2f}{after:>13.2f}{before / after:>8.2f}x{withStats:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""----------------------------------------------------------------------------
+Cycle time of waypoint paths sent as PTP moves vs blended CP segments.
+
+    python -m benchmarks.cp_blending
+    python -m benchmarks.cp_blending --scale 100 --deviation 1
+
+Each path from prompt.txt's paper area is built with DobotPath.buildPath,
+then both the blended commands and plain PTP MOVL moves are run on a
+simulated arm. Predicted and simulated seconds are reported for both.
+----------------------------------------------------------------------------"""
+import argparse
+import math
+import os
+import time
+
+START = (200.0, 0.0, 0.0, 0.0)
+
+
+def paths():
+    circle = [(227.5 + 60 * math.cos(a / 12 * math.pi), 60 * math.sin(a / 12 * math.pi), -50) for a in range(25)]
+    return {
+        "trace paper": [(300, 100, -50), (300, -100, -50), (155, -100, -50), (155, 100, -50), (300, 100, -50)],
+        "circle": circle,
+        "transport": [(250, 50, 0), (250, 50, -50), ("SetEndEffectorSuctionCup", 1, 1), (250, 50, 0),
+                      (225, -15, 20), (200, -80, 0), (200, -80, -50), ("SetEndEffectorSuctionCup", 1, 0),
+                      (200, -80, 0)],
+    }
+
+
+def simulate(dType, DobotCompletion, api, commands, scale):
+    """Simulated seconds to execute `commands` from START, all queued before execution starts."""
+    dType.SetQueuedCmdStopExec(api)
+    dType.SetQueuedCmdClear(api)
+    dType.SetPTPCmd(api, dType.PTPMode.PTPMOVJXYZMode, *START, isQueued=0)
+    last = 0
+    for name, args in commands:
+        last = getattr(dType, name)(api, *args, isQueued=1)[0]
+    start = time.perf_counter()
+    dType.SetQueuedCmdStartExec(api)
+    DobotCompletion.getQueueWatcher(api).wait(last)
+    return (time.perf_counter() - start) * scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=50.0, help="simulated seconds per wall-clock second")
+    parser.add_argument("--deviation", type=float, default=0.5, help="allowed corner deviation in mm")
+    args = parser.parse_args()
+
+    os.environ["DOBOT_SIMULATE"] = "1"
+    os.environ["DOBOT_SIM_SCALE"] = str(args.scale)
+    from dobot_api import DobotDllType as dType
+    from dobot_api import DobotCompletion
+    from dobot_api import DobotPath
+
+    api = dType.load()
+    dType.ConnectDobot(api, "", 115200)
+
+    print(f"{'path':<13}{'CP':>4}{'PTP':>5}{'predicted PTP':>15}{'blended':>9}{'simulated PTP':>15}{'blended':>9}")
+    for name, waypoints in paths().items():
+        path = DobotPath.buildPath(waypoints, start=START, deviation=args.deviation)
+        report = path.report()
+        ptp = simulate(dType, DobotCompletion, api, path.ptpCommands, args.scale)
+        blended = simulate(dType, DobotCompletion, api, path.commands, args.scale)
+        print(f"{name:<13}{report['cpSegments']:>4}{report['ptpSegments']:>5}"
+              f"{report['ptp']:>15.2f}{report['blended']:>9.2f}{ptp:>15.2f}{blended:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
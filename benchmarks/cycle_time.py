@@ -0,0 +1,43 @@
+"""----------------------------------------------------------------------------
+Run a Dobot program against the simulated arm and report its cycle time.
+
+    python -m benchmarks.cycle_time four_corners.py --scale 50
+    python -m benchmarks.cycle_time code_by_gemini.py
+
+Simulated seconds are what the program would take on a Magician with the same
+motion parameters; wall seconds include host-side overhead and wait loops.
+----------------------------------------------------------------------------"""
+import argparse
+import os
+import runpy
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("program", help="path of the script to run, e.g. four_corners.py")
+    parser.add_argument("--scale", type=float, default=20.0, help="simulated seconds per wall-clock second")
+    parser.add_argument("--arms", type=int, default=1, help="number of virtual arms")
+    args = parser.parse_args()
+
+    os.environ["DOBOT_SIMULATE"] = str(args.arms)
+    os.environ["DOBOT_SIM_SCALE"] = str(args.scale)
+    from dobot_api import DobotDllType as dType
+
+    sim = dType.load()
+    start = time.perf_counter()
+    runpy.run_path(args.program, run_name="__main__")
+    wall = time.perf_counter() - start
+    simulated = wall * sim.timeScale
+
+    print(f"\n=== {args.program} ===")
+    print(f"wall time:       {wall:.3f} s")
+    print(f"simulated time:  {simulated:.3f} s (x{sim.timeScale:g})")
+    for port, stats in sim.report().items():
+        print(f"{port}: {stats['commandsExecuted']} commands, "
+              f"cycle {stats['cycleTime']:.3f} s, motion {stats['motionTime']:.3f} s, "
+              f"idle {stats['idleTime']:.3f} s, {stats['throughput']:.2f} cmd/s")
+
+
+if __name__ == "__main__":
+    main()
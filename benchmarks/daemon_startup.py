@@ -0,0 +1,78 @@
+"""----------------------------------------------------------------------------
+Wall time of short scripts run one after another, each connecting on its own
+vs as thin clients of a running DobotDaemon.
+
+    python -m benchmarks.daemon_startup --runs 5
+    python -m benchmarks.daemon_startup --connect-time 2 --latency 0.02
+
+Every run is a fresh Python process executing the script (suction_off.py by
+default) against a simulated arm. DOBOT_SIM_CONNECT_TIME and
+DOBOT_SIM_LATENCY give the simulator the wall time of opening the serial port
+and of one serial round trip, which the daemon pays only once.
+----------------------------------------------------------------------------"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def runScripts(program, runs, env):
+    """Wall seconds of each of `runs` sequential runs of the script."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, program], cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def waitForSocket(path, process, timeout=30.0):
+    from dobot_api import DobotDaemon
+    deadline = time.monotonic() + timeout
+    while not DobotDaemon.ping(path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("the daemon did not start")
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("program", nargs="?", default="suction_off.py", help="script to run, relative to the repo")
+    parser.add_argument("--runs", type=int, default=5, help="sequential runs per mode")
+    parser.add_argument("--connect-time", type=float, default=1.0, help="wall seconds ConnectDobot takes")
+    parser.add_argument("--latency", type=float, default=0.01, help="wall seconds of every DLL call")
+    parser.add_argument("--scale", type=float, default=50.0, help="simulated seconds per wall-clock second")
+    args = parser.parse_args()
+
+    socketPath = os.path.join(tempfile.mkdtemp(prefix="dobot-bench-"), "daemon.sock")
+    env = dict(os.environ, PYTHONPATH=ROOT, DOBOT_SIMULATE="1", DOBOT_SIM_SCALE=str(args.scale),
+               DOBOT_SIM_CONNECT_TIME=str(args.connect_time), DOBOT_SIM_LATENCY=str(args.latency),
+               DOBOT_DAEMON_SOCKET=socketPath)
+
+    # No daemon listens on the socket yet, so every run connects on its own.
+    local = runScripts(args.program, args.runs, env)
+
+    start = time.perf_counter()
+    daemon = subprocess.Popen([sys.executable, "-m", "dobot_api.DobotDaemon", "--simulate", "1"],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    try:
+        waitForSocket(socketPath, daemon)
+        startup = time.perf_counter() - start
+        viaDaemon = runScripts(args.program, args.runs, env)
+    finally:
+        subprocess.run([sys.executable, "-m", "dobot_api.DobotDaemon", "--stop"], cwd=ROOT, env=env)
+        daemon.wait(timeout=30)
+
+    print(f"{args.program}, {args.runs} runs, connect {args.connect_time:g} s, call latency {args.latency:g} s")
+    print(f"{'mode':<10}{'first s':>9}{'mean s':>9}{'total s':>9}")
+    for name, times in (("local", local), ("daemon", viaDaemon)):
+        print(f"{name:<10}{times[0]:>9.3f}{sum(times) / len(times):>9.3f}{sum(times):>9.3f}")
+    print(f"daemon startup (once): {startup:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
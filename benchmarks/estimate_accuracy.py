@@ -0,0 +1,106 @@
+"""----------------------------------------------------------------------------
+Estimates of queued command lists from the arm's parameters vs the defaults,
+and how late QueueWatcher.wait returns.
+
+    python -m benchmarks.estimate_accuracy
+    python -m benchmarks.estimate_accuracy --moves 40 --scale 20
+
+Each list is estimated with DobotEstimate, starting from the parameters the
+arm really has (activeModel) and from the MotionModel defaults, then queued on
+a simulated arm. Reported are both predictions, the simulator's motion time
+and the time until QueueWatcher.wait returned, all in simulated seconds.
+"preset" runs after a previous program slowed the arm down and sets no
+parameters itself, which is where starting from the defaults goes wrong.
+
+DobotSim times commands with the same MotionModel the estimate uses, so the
+simulated time only checks that activeModel picks up the arm's state; it
+says nothing about how close the model is to a real Magician. "defaults off"
+is the error of starting from the defaults instead, and "wait late" how long
+after the simulated finish the wait returned.
+----------------------------------------------------------------------------"""
+import argparse
+import math
+import os
+import random
+import time
+
+X_RANGE = (155.0, 300.0)
+Y_RANGE = (-100.0, 100.0)
+Z_RANGE = (-50.0, 20.0)
+
+
+def randomMoves(dType, rng, count, setters=True):
+    modes = (dType.PTPMode.PTPMOVJXYZMode, dType.PTPMode.PTPMOVLXYZMode, dType.PTPMode.PTPJUMPXYZMode)
+    commands = []
+    for i in range(count):
+        if setters and i % 5 == 0:
+            commands.append(rng.choice((
+                ("SetPTPCommonParams", (rng.uniform(20, 100), rng.uniform(20, 100))),
+                ("SetPTPJumpParams", (rng.uniform(10, 40), 40.0)),
+                ("SetPTPCoordinateParams", (rng.uniform(50, 200), rng.uniform(50, 200), 100.0, 100.0)),
+                ("SetPTPJointParams", tuple(rng.uniform(50, 200) for _ in range(8))))))
+        target = (rng.uniform(*X_RANGE), rng.uniform(*Y_RANGE), rng.uniform(*Z_RANGE), 0.0)
+        commands.append(("SetPTPCmd", (rng.choice(modes),) + target))
+    return commands
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--moves", type=int, default=20, help="moves per random list")
+    parser.add_argument("--scale", type=float, default=20.0, help="simulated seconds per wall-clock second")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ["DOBOT_SIMULATE"] = "1"
+    os.environ["DOBOT_SIM_SCALE"] = str(args.scale)
+    from dobot_api import DobotDllType as dType
+    from dobot_api import DobotCompletion
+    from dobot_api import DobotEstimate
+    from dobot_api import DobotPath
+    from dobot_api.DobotMotionModel import MotionModel
+
+    rng = random.Random(args.seed)
+    circle = [(227.5 + 60 * math.cos(a / 12 * math.pi), 60 * math.sin(a / 12 * math.pi), -50) for a in range(25)]
+    slow = [("SetPTPCommonParams", (30, 30)), ("SetPTPJumpParams", (35, 10)),
+            ("SetPTPJointParams", (80, 80, 80, 80, 80, 80, 80, 80))]
+    cases = [
+        ("four corners", [("SetPTPJointParams", (200,) * 8), ("SetPTPCommonParams", (100, 100)),
+                          ("SetHOMECmd", (0,))] +
+         [("SetPTPCmd", (dType.PTPMode.PTPMOVLXYZMode, x, y, -50, 50)) for x, y in
+          ((155, 0), (300, 0), (155, -100), (155, 100), (300, -100), (300, 100))]),
+        ("moves", randomMoves(dType, rng, args.moves)),
+        ("cp circle", list(DobotPath.buildPath(circle, start=(200.0, 0.0, 0.0, 0.0)))),
+        ("preset", randomMoves(dType, rng, args.moves, setters=False)),
+    ]
+
+    api = dType.load()
+    dType.ConnectDobot(api, "", 115200)
+    device = api.lib.device(api.masterId)
+    watcher = DobotCompletion.getQueueWatcher(api)
+
+    print(f"{'list':<14}{'cmds':>5}{'active':>9}{'defaults':>10}{'simulated':>11}{'waited':>9}{'defaults off':>14}"
+          f"{'wait late':>11}")
+    for name, commands in cases:
+        if name == "preset":
+            # An earlier program left the arm slower than the defaults.
+            for setter, setterArgs in slow:
+                getattr(dType, setter)(api, *setterArgs, isQueued=0)
+        active = DobotEstimate.estimate(commands, DobotEstimate.activeModel(api)).total
+        defaults = DobotEstimate.estimate(commands, MotionModel(dType.GetPose(api)[:4])).total
+        motionBefore = device.stats()["motionTime"]
+        dType.SetQueuedCmdStopExec(api)
+        dType.SetQueuedCmdClear(api)
+        for command, commandArgs in commands:
+            last = getattr(dType, command)(api, *commandArgs, isQueued=1)[0]
+        start = time.perf_counter()
+        dType.SetQueuedCmdStartExec(api)
+        watcher.wait(last, timeout=DobotCompletion.AUTO)
+        waited = (time.perf_counter() - start) * args.scale
+        simulated = device.stats()["motionTime"] - motionBefore
+        off = (defaults - simulated) / simulated if simulated else 0.0
+        print(f"{name:<14}{len(commands):>5}{active:>9.2f}{defaults:>10.2f}{simulated:>11.2f}{waited:>9.2f}"
+              f"{off:>14.1%}{waited - simulated:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
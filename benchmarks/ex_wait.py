@@ -0,0 +1,94 @@
+"""----------------------------------------------------------------------------
+CPU cost of the blocking *Ex helpers, polling loops vs the shared wait engine.
+
+    python -m benchmarks.ex_wait
+    python -m benchmarks.ex_wait --arms 8 --moves 10 --scale 10
+
+Each of N simulated arms runs the same sequence in its own thread: JUMP
+moves with SetPTPCmdEx, the suction cup with SetEndEffectorSuctionCupEx and
+a pause with SetWAITCmdEx. It runs two ways:
+
+  polling   the helper bodies as they were: SetWAITCmdEx spins on
+            GetQueuedCmdCurrentIndex with no sleep, the others poll every 5 ms
+  engine    the current dType helpers, which sleep in DobotCompletion.waitQueued
+            while the connection's QueueWatcher polls
+
+Reported are the simulated seconds the sequences took, the CPU seconds the
+process used meanwhile (all threads), and the DLL calls made per arm.
+----------------------------------------------------------------------------"""
+import argparse
+import os
+import threading
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--arms", type=int, default=4, help="simulated arms, one waiting thread each")
+    parser.add_argument("--moves", type=int, default=6, help="moves per arm")
+    parser.add_argument("--scale", type=float, default=20.0, help="simulated seconds per wall-clock second")
+    args = parser.parse_args()
+
+    os.environ["DOBOT_SIMULATE"] = str(args.arms)
+    os.environ["DOBOT_SIM_SCALE"] = str(args.scale)
+    from dobot_api import DobotDllType as dType
+
+    def pollingWait(api, index):
+        while True:
+            if index <= dType.GetQueuedCmdCurrentIndex(api)[0]:
+                break
+            dType.dSleep(5)
+
+    def pollingPTP(api, *moveArgs):
+        pollingWait(api, dType.SetPTPCmd(api, *moveArgs, isQueued=1)[0])
+
+    def pollingSuction(api, on):
+        pollingWait(api, dType.SetEndEffectorSuctionCup(api, 1, on, isQueued=1)[0])
+
+    def pollingWAIT(api, ms):
+        index = dType.SetWAITCmd(api, ms, isQueued=1)[0]
+        while True:
+            if not dType.QuitDobotApiFlag:
+                break
+            if index <= dType.GetQueuedCmdCurrentIndex(api)[0]:
+                break
+
+    helpers = {
+        "polling": (pollingPTP, pollingSuction, pollingWAIT),
+        "engine": (lambda api, *moveArgs: dType.SetPTPCmdEx(api, *moveArgs, isQueued=1),
+                   lambda api, on: dType.SetEndEffectorSuctionCupEx(api, 1, on, isQueued=1),
+                   lambda api, ms: dType.SetWAITCmdEx(api, ms, isQueued=1)),
+    }
+
+    arms = []
+    for port in dType.SearchDobot(dType.load()):
+        api = dType.load()
+        dType.ConnectDobot(api, port, 115200)
+        dType.SetQueuedCmdClear(api)
+        dType.SetQueuedCmdStartExec(api)
+        arms.append(api)
+
+    def sequence(api, ptp, suction, pause):
+        jump = dType.PTPMode.PTPJUMPXYZMode
+        for i in range(args.moves):
+            ptp(api, jump, 250.0, -60.0 + 120.0 * (i % 2), -50.0, 0.0)
+            suction(api, i % 2)
+            pause(api, 200)
+
+    print(f"{args.arms} arms x {args.moves} moves")
+    print(f"{'helpers':<10}{'simulated s':>12}{'CPU s':>8}{'CPU/wall':>10}{'DLL calls/arm':>15}")
+    for name, (ptp, suction, pause) in helpers.items():
+        callsBefore = [api.flowControl.calls for api in arms]
+        threads = [threading.Thread(target=sequence, args=(api, ptp, suction, pause)) for api in arms]
+        wall, cpu = time.perf_counter(), time.process_time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        calls = sum(api.flowControl.calls - before for api, before in zip(arms, callsBefore)) / len(arms)
+        print(f"{name:<10}{wall * args.scale:>12.1f}{cpu:>8.2f}{cpu / wall:>10.0%}{calls:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
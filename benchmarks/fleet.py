@@ -0,0 +1,55 @@
+"""----------------------------------------------------------------------------
+Pick-and-place throughput of a fleet of simulated arms.
+
+    python -m benchmarks.fleet --arms 4 --jobs 40
+    python -m benchmarks.fleet --arms 1 --jobs 10 --scale 100
+
+Discovers N virtual arms through SearchDobot, dispatches random block moves
+inside the paper area from prompt.txt and reports the makespan, per-arm
+utilization and how many jobs were rebalanced between arms.
+----------------------------------------------------------------------------"""
+import argparse
+import os
+import random
+import time
+
+# Paper corners from prompt.txt: top left (300, 100), bottom right (155, -100).
+X_RANGE = (155.0, 300.0)
+Y_RANGE = (-100.0, 100.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--arms", type=int, default=4, help="number of virtual arms")
+    parser.add_argument("--jobs", type=int, default=40, help="pick-and-place jobs to dispatch")
+    parser.add_argument("--scale", type=float, default=50.0, help="simulated seconds per wall-clock second")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ["DOBOT_SIMULATE"] = str(args.arms)
+    os.environ["DOBOT_SIM_SCALE"] = str(args.scale)
+    from dobot_api import DobotFleet
+
+    rng = random.Random(args.seed)
+
+    def point():
+        return (rng.uniform(*X_RANGE), rng.uniform(*Y_RANGE))
+
+    start = time.perf_counter()
+    with DobotFleet.Fleet.discover() as fleet:
+        futures = [fleet.pickAndPlace(point(), point()) for _ in range(args.jobs)]
+        for future in futures:
+            future.result()
+        wall = time.perf_counter() - start
+        stats = fleet.stats()
+
+    print(f"{args.jobs} jobs on {len(stats)} arms")
+    print(f"makespan:  {wall * args.scale:.2f} s simulated ({wall:.3f} s wall, x{args.scale:g})")
+    print(f"rate:      {args.jobs / (wall * args.scale) * 60:.1f} jobs/min")
+    for port, arm in stats.items():
+        print(f"{port}: {arm['jobsDone']} done, {arm['jobsFailed']} failed, {arm['jobsStolen']} stolen, "
+              f"utilization {arm['utilization']:.0%}, mean wait {arm['meanWait'] * args.scale:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""----------------------------------------------------------------------------
+Cycle time of a script run repeatedly on one arm, homing every run vs
+replacing homes the arm does not need (DobotHome).
+
+    python -m benchmarks.home_state four_corners.py --runs 3
+
+The script is run `runs` times back to back on the same simulated arm under
+each DOBOT_HOME_POLICY: "always" homes every run, "move" replaces a
+redundant home with a joint move to the home point and "skip" drops it.
+----------------------------------------------------------------------------"""
+import argparse
+import os
+import runpy
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("program", nargs="?", default="four_corners.py", help="script that homes the arm")
+    parser.add_argument("--runs", type=int, default=3, help="runs per policy")
+    parser.add_argument("--scale", type=float, default=50.0, help="simulated seconds per wall-clock second")
+    args = parser.parse_args()
+
+    os.environ["DOBOT_SIMULATE"] = "1"
+    os.environ["DOBOT_SIM_SCALE"] = str(args.scale)
+    # Run the script in this process even if a daemon is listening.
+    os.environ["DOBOT_DAEMON_SOCKET"] = os.devnull
+    from dobot_api import DobotDllType as dType
+    from dobot_api import DobotHome
+
+    print(f"{args.program}, {args.runs} runs")
+    print(f"{'policy':<8}{'first s':>9}{'later s':>9}{'total s':>9}{'homes':>7}{'replaced':>10}")
+    for policy in ("always", "move", "skip"):
+        os.environ["DOBOT_HOME_POLICY"] = policy
+        # Every policy starts from an arm that was just powered up.
+        DobotHome.memoryStore.entries.clear()
+        times = []
+        homes = replaced = 0
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            runpy.run_path(args.program, run_name="__main__")
+            times.append((time.perf_counter() - start) * args.scale)
+            stats = DobotHome.stats(dType.defaultConnection)
+            homes += stats["homes"]
+            replaced += stats["replaced"]
+        later = sum(times[1:]) / max(1, len(times) - 1)
+        if policy == "always":
+            # Not tracked: every SetHOMECmd homes.
+            homes = replaced = "-"
+        print(f"{policy:<8}{times[0]:>9.2f}{later:>9.2f}{sum(times):>9.2f}{homes:>7}{replaced:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""----------------------------------------------------------------------------
+Time it takes a fresh interpreter to import DobotDllType.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 50
+
+Each run starts a new Python process and times the case's code there with
+perf_counter, after the interpreter and ctypes are already loaded. Three cases
+are compared:
+
+  core         what every generated program pays: the core wrappers only
+  peripherals  core plus every lazily loaded peripheral group, which is about
+               what the single module used to cost
+  first use    core, then one peripheral wrapper looked up (dType.SetIODO)
+----------------------------------------------------------------------------"""
+import argparse
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = (
+    ("core", "from dobot_api import DobotDllType"),
+    ("peripherals", "from dobot_api import DobotDllType as dType\n"
+                    "for name in dType.peripheralModules: dType.loadPeripheral(name)"),
+    ("first use", "from dobot_api import DobotDllType as dType\ndType.SetIODO"),
+)
+
+
+TIMER = """
+import ctypes, time
+start = time.perf_counter()
+%s
+print(time.perf_counter() - start)
+"""
+
+
+def importTime(code):
+    """Seconds `code` takes in a fresh interpreter."""
+    output = subprocess.run([sys.executable, "-c", TIMER % code], cwd=REPO,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="interpreters started per case")
+    args = parser.parse_args()
+
+    # Time loading from .pyc files, as an installed copy would, even when PYTHONDONTWRITEBYTECODE is set.
+    compileall.compile_dir(os.path.join(REPO, "dobot_api"), quiet=1, force=True)
+    print(f"{'case':<14}{'median ms':>10}{'min ms':>9}")
+    for name, code in CASES:
+        times = [importTime(code) * 1000 for _ in range(args.runs)]
+        print(f"{name:<14}{statistics.median(times):>10.2f}{min(times):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""----------------------------------------------------------------------------
+Cycle time of back-to-back jobs, one at a time vs through a DobotPipeline.
+
+    python -m benchmarks.job_pipeline
+    python -m benchmarks.job_pipeline --jobs 10 --plan 3 --transfers 2
+
+Each job moves a few blocks with JUMP moves, and planning it takes `--plan`
+simulated seconds on the host (a vision or language model call). "one at a
+time" does what a main.py run does: plan, queue, start the queue, wait for
+the last index, stop the queue. "pipeline" submits the planners to a
+Pipeline, which plans each job while the arm runs the previous one. Reported
+are the simulated seconds for all jobs, the seconds the arm had work, and
+the seconds it stood idle in between.
+----------------------------------------------------------------------------"""
+import argparse
+import os
+import random
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=6)
+    parser.add_argument("--transfers", type=int, default=3, help="blocks moved per job")
+    parser.add_argument("--plan", type=float, default=2.0, help="simulated seconds to plan a job")
+    parser.add_argument("--scale", type=float, default=50.0, help="simulated seconds per wall-clock second")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ["DOBOT_SIMULATE"] = "1"
+    os.environ["DOBOT_SIM_SCALE"] = str(args.scale)
+    from dobot_api import DobotDllType as dType
+    from dobot_api import DobotCompletion
+    from dobot_api import DobotPickPlace
+    from dobot_api import DobotPipeline
+
+    api = dType.load()
+    dType.ConnectDobot(api, "", 115200)
+    dType.SetPTPJumpParams(api, *DobotPickPlace.jumpParamsFor(), isQueued=0)
+    watcher = DobotCompletion.getQueueWatcher(api)
+    jump = dType.PTPMode.PTPJUMPXYZMode
+    rng = random.Random(args.seed)
+    jobs = []
+    for _ in range(args.jobs):
+        commands = []
+        for _ in range(args.transfers):
+            for suction in (1, 0):
+                spot = (rng.uniform(180.0, 280.0), rng.uniform(-100.0, 100.0))
+                commands += [("SetPTPCmd", (jump,) + spot + (DobotPickPlace.PICK_Z, 0.0)),
+                             ("SetEndEffectorSuctionCup", (1, suction))]
+        jobs.append(commands)
+
+    def planner(commands):
+        def plan(model):
+            time.sleep(args.plan / args.scale)
+            return commands
+        return plan
+
+    def reset():
+        dType.SetQueuedCmdStopExec(api)
+        dType.SetQueuedCmdClear(api)
+        dType.SetPTPCmd(api, dType.PTPMode.PTPMOVJXYZMode, 200.0, 0.0, 0.0, 0.0, isQueued=0)
+
+    def oneAtATime():
+        for commands in jobs:
+            planner(commands)(None)
+            for name, commandArgs in commands:
+                last = getattr(dType, name)(api, *commandArgs, isQueued=1)[0]
+            dType.SetQueuedCmdStartExec(api)
+            watcher.wait(last)
+            dType.SetQueuedCmdStopExec(api)
+
+    def pipelined():
+        with DobotPipeline.Pipeline(api) as pipeline:
+            for i, commands in enumerate(jobs):
+                pipeline.submit(planner(commands), name="job%d" % (i + 1))
+
+    device = api.lib.device(api.masterId)
+    print(f"{args.jobs} jobs of {args.transfers} transfers, {args.plan:g} s to plan each")
+    print(f"{'runner':<14}{'simulated s':>12}{'arm busy s':>12}{'arm idle s':>12}")
+    for name, run in (("one at a time", oneAtATime), ("pipeline", pipelined)):
+        reset()
+        motionBefore = device.stats()["motionTime"]
+        began = time.perf_counter()
+        run()
+        elapsed = (time.perf_counter() - began) * args.scale
+        busy = device.stats()["motionTime"] - motionBefore
+        print(f"{name:<14}{elapsed:>12.1f}{busy:>12.1f}{elapsed - busy:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
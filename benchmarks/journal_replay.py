@@ -0,0 +1,102 @@
+"""----------------------------------------------------------------------------
+Cost of journaling queued commands, and replay of the journal at the
+recorded pace vs as fast as the queue takes it.
+
+    python -m benchmarks.journal_replay
+    python -m benchmarks.journal_replay --moves 400 --pause 50
+
+A script queues `--moves` pick-and-place style commands (MOVL moves with the
+suction cup toggled every few moves), pausing `--pause` simulated ms before
+each one as a generated script does between its steps, with DobotJournal
+recording. Reported are the journal's size per command, the host time
+FlowControl spends writing a record, the rate JournalReader decodes records
+from the mapped file, and for the live run and both replays the simulated
+seconds until the last command was executed and whether the arm ends in the
+same pose.
+----------------------------------------------------------------------------"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--moves", type=int, default=200)
+    parser.add_argument("--pause", type=float, default=1000.0, help="simulated ms the script takes per command")
+    parser.add_argument("--scale", type=float, default=50.0, help="simulated seconds per wall-clock second")
+    parser.add_argument("--repeat", type=int, default=20000, help="records written to time the journal")
+    args = parser.parse_args()
+
+    os.environ["DOBOT_SIMULATE"] = "1"
+    os.environ["DOBOT_SIM_SCALE"] = str(args.scale)
+    from dobot_api import DobotDllType as dType
+    from dobot_api import DobotCompletion
+    from dobot_api import DobotJournal
+
+    api = dType.load()
+    dType.ConnectDobot(api, "", 115200)
+    watcher = DobotCompletion.getQueueWatcher(api)
+    path = os.path.join(tempfile.mkdtemp(), "run.djl")
+    movl = dType.PTPMode.PTPMOVLXYZMode
+    pause = args.pause / 1000.0 / args.scale
+
+    def reset():
+        dType.SetQueuedCmdStopExec(api)
+        dType.SetQueuedCmdClear(api)
+        dType.SetPTPCmd(api, dType.PTPMode.PTPMOVJXYZMode, 200.0, 0.0, 0.0, 0.0, isQueued=0)
+
+    def live():
+        dType.SetQueuedCmdStartExec(api)
+        for i in range(args.moves):
+            time.sleep(pause)
+            if i % 4 == 3:
+                last = dType.SetEndEffectorSuctionCup(api, 1, i % 8 == 3, isQueued=1)[0]
+            else:
+                last = dType.SetPTPCmd(api, movl, 180.0 + 3.0 * (i % 30), -90.0 + 6.0 * (i % 31),
+                                       -30.0 + (i % 3) * 10.0, 0.0, isQueued=1)[0]
+        watcher.wait(last)
+
+    def timed(run):
+        reset()
+        began = time.perf_counter()
+        run()
+        return (time.perf_counter() - began) * args.scale, dType.GetPose(api)[:4]
+
+    journal = DobotJournal.record(api, path)
+    liveTime, livePose = timed(live)
+    DobotJournal.stop(api)
+
+    # Host cost of one record, measured on the queued-call arguments FlowControl hands the journal.
+    scratch = DobotJournal.Journal(path + ".scratch", api)
+    cmd = dType.PTPCmd(movl, 200.0, 0.0, 0.0, 0.0)
+    callArgs = (api.masterId, api.slaveId, dType.byref(cmd), 1, dType.byref(dType.c_uint64()))
+    began = time.perf_counter()
+    for i in range(args.repeat):
+        scratch.write("SetPTPCmd", callArgs, i)
+    writeTime = (time.perf_counter() - began) / args.repeat
+    scratch.close()
+
+    with DobotJournal.JournalReader(path + ".scratch") as reader:
+        began = time.perf_counter()
+        decoded = sum(1 for entry in reader if entry.arguments())
+        readRate = decoded / (time.perf_counter() - began)
+        began = time.perf_counter()
+        headers = reader.array()
+        arrayRate = len(headers) / (time.perf_counter() - began)
+
+    size = os.path.getsize(path)
+    print(f"{journal.commands} commands, {args.pause:g} ms between them")
+    print(f"journal {size} bytes, {size / journal.commands:.1f} bytes per command")
+    print(f"write {writeTime * 1e6:.2f} us per record, read {readRate / 1e3:.0f}k records/s decoded, "
+          f"{arrayRate / 1e6:.1f}M headers/s as an array")
+    print(f"{'run':<16}{'simulated s':>12}{'same pose':>11}")
+    print(f"{'live':<16}{liveTime:>12.1f}{'-':>11}")
+    for name, speed in (("replay 1x", 1.0), ("replay max", None)):
+        elapsed, pose = timed(lambda: DobotJournal.replay(api, path, speed=speed))
+        same = all(abs(a - b) < 1e-3 for a, b in zip(pose, livePose))
+        print(f"{name:<16}{elapsed:>12.1f}{'yes' if same else 'no':>11}")
+
+
+if __name__ == "__main__":
+    main()
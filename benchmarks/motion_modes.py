@@ -0,0 +1,88 @@
+"""----------------------------------------------------------------------------
+Cycle time of waypoint tours with every move MOVL vs the mode DobotMoves picks.
+
+    python -m benchmarks.motion_modes --waypoints 12
+    python -m benchmarks.motion_modes --waypoints 20 --blocks 8 --scale 100
+
+The tour visits random spots over the paper at the pick Z and just above
+it. "open" has no obstacles; "blocks" has blocks standing on the paper;
+"linear near" also rules out MOVJ within 30 mm of a block. Reported are the
+modes chosen, the predicted seconds of all-MOVL and planned moves, and the
+simulated seconds to run both on a virtual arm. The all-MOVL tour ignores
+the blocks, so where a block stands in its way the planned one can be
+slower.
+----------------------------------------------------------------------------"""
+import argparse
+import math
+import os
+import random
+import time
+
+X_RANGE = (160.0, 300.0)
+Y_RANGE = (-100.0, 100.0)
+Z_CHOICES = (-50.0, -30.0, 0.0)
+
+
+def spread(rng, count, apart, avoid=()):
+    """`count` random (x, y) spots over the paper, each at least `apart` mm from the others and `avoid`."""
+    spots = []
+    while len(spots) < count:
+        spot = (rng.uniform(*X_RANGE), rng.uniform(*Y_RANGE))
+        if all(math.dist(spot, other[:2]) >= apart for other in spots + list(avoid)):
+            spots.append(spot)
+    return spots
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--waypoints", type=int, default=12, help="waypoints per tour")
+    parser.add_argument("--blocks", type=int, default=5, help="blocks standing on the paper")
+    parser.add_argument("--scale", type=float, default=50.0, help="simulated seconds per wall-clock second")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ["DOBOT_SIMULATE"] = "1"
+    os.environ["DOBOT_SIM_SCALE"] = str(args.scale)
+    from dobot_api import DobotDllType as dType
+    from dobot_api import DobotCompletion
+    from dobot_api import DobotEstimate
+    from dobot_api import DobotMoves
+
+    api = dType.load()
+    dType.ConnectDobot(api, "", 115200)
+    dType.SetPTPJumpParams(api, 40.0, 20.0, isQueued=0)
+    watcher = DobotCompletion.getQueueWatcher(api)
+    start = (200.0, 0.0, 0.0, 0.0)
+
+    def simulate(commands):
+        dType.SetQueuedCmdStopExec(api)
+        dType.SetQueuedCmdClear(api)
+        dType.SetPTPCmd(api, dType.PTPMode.PTPMOVJXYZMode, *start, isQueued=0)
+        began = time.perf_counter()
+        dType.SetQueuedCmdStartExec(api)
+        for name, commandArgs in commands:
+            last = getattr(dType, name)(api, *commandArgs, isQueued=1)[0]
+        watcher.wait(last)
+        return (time.perf_counter() - began) * args.scale
+
+    rng = random.Random(args.seed)
+    blocks = spread(rng, args.blocks, 60.0)
+    waypoints = [spot + (rng.choice(Z_CHOICES), 0.0)
+                 for spot in spread(rng, args.waypoints, 20.0, [b + (0.0,) for b in blocks])]
+    cases = [("open", (), None), ("blocks", blocks, None), ("linear near", blocks, 30.0)]
+
+    print(f"{args.waypoints} waypoints, {args.blocks} blocks")
+    print(f"{'case':<13}{'MOVL':>5}{'MOVJ':>5}{'JUMP':>5}{'predicted MOVL':>16}{'planned':>9}{'saving':>8}"
+          f"{'simulated MOVL':>16}{'planned':>9}")
+    for name, obstacles, linearNear in cases:
+        moves = DobotMoves.planMoves(waypoints, start=start, model=DobotEstimate.activeModel(api),
+                                     obstacles=obstacles, linearNear=linearNear)
+        report = moves.report()
+        linear, planned = simulate(moves.linearCommands), simulate(moves.commands)
+        counts = report["modes"]
+        print(f"{name:<13}{counts['MOVL']:>5}{counts['MOVJ']:>5}{counts['JUMP']:>5}{report['movl']:>16.1f}"
+              f"{report['planned']:>9.1f}{report['saving']:>8.1%}{linear:>16.1f}{planned:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
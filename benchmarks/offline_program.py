@@ -0,0 +1,82 @@
+"""----------------------------------------------------------------------------
+Host traffic of a repeated sorting job: streamed live vs downloaded once.
+
+    python -m benchmarks.offline_program --loops 20
+    python -m benchmarks.offline_program --loops 5 --scale 200
+
+The job moves a block between two spots in the paper area from prompt.txt.
+"live" sends every command of every loop over the link and waits for the
+queue; "download" stores the job on the simulated arm with DobotProgram and
+starts it offline, as the arm's key would; "cached" downloads the same
+program again, which the ProgramCache turns into a serial number read.
+Reported are DLL calls, queued commands sent and simulated seconds.
+----------------------------------------------------------------------------"""
+import argparse
+import os
+import time
+
+
+def sortingJob(dType):
+    movj, movl = dType.PTPMode.PTPMOVJXYZMode, dType.PTPMode.PTPMOVLXYZMode
+    motions = []
+    for (x, y), suction in (((250, 50), 1), ((200, -80), 0)):
+        motions += [("SetPTPCmd", movj, x, y, 0, 0),
+                    ("SetPTPCmd", movl, x, y, -50, 0),
+                    ("SetEndEffectorSuctionCup", 1, suction),
+                    ("SetPTPCmd", movl, x, y, 0, 0)]
+    return motions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loops", type=int, default=20, help="times the job is repeated")
+    parser.add_argument("--scale", type=float, default=100.0, help="simulated seconds per wall-clock second")
+    args = parser.parse_args()
+
+    os.environ["DOBOT_SIMULATE"] = "2"
+    os.environ["DOBOT_SIM_SCALE"] = str(args.scale)
+    from dobot_api import DobotDllType as dType
+    from dobot_api import DobotCompletion
+    from dobot_api import DobotProgram
+
+    motions = sortingJob(dType)
+    program = DobotProgram.compileProgram(motions)
+    live, offline = dType.load(), dType.load()
+    for api in (live, offline):
+        dType.ConnectDobot(api, "", 115200)
+        dType.SetQueuedCmdClear(api)
+        api.flowControl.resetMetrics()
+    sim = live.lib
+
+    print(f"{len(program)} commands per loop, {args.loops} loops, "
+          f"estimated {program.estimate() * args.loops:.1f} s of motion\n")
+    print(f"{'mode':<10}{'DLL calls':>10}{'queued sent':>13}{'simulated s':>13}")
+
+    start = time.perf_counter()
+    dType.SetQueuedCmdStartExec(live)
+    last = 0
+    for _ in range(args.loops):
+        for name, motionArgs in program:
+            last = getattr(dType, name)(live, *motionArgs, isQueued=1)[0]
+    DobotCompletion.getQueueWatcher(live).wait(last)
+    elapsed = (time.perf_counter() - start) * args.scale
+    print(f"{'live':<10}{live.flowControl.calls:>10}{len(program) * args.loops:>13}{elapsed:>13.1f}")
+
+    start = time.perf_counter()
+    DobotProgram.download(offline, program, loops=args.loops)
+    calls = offline.flowControl.calls
+    sim.runOfflineProgram(offline.masterId)
+    # The host only watches here; on hardware it could be unplugged.
+    port = sim.device(offline.masterId).portName
+    while sim.report()[port]["pending"]:
+        time.sleep(0.05)
+    elapsed = (time.perf_counter() - start) * args.scale
+    print(f"{'download':<10}{calls:>10}{len(program):>13}{elapsed:>13.1f}")
+
+    offline.flowControl.resetMetrics()
+    downloaded = DobotProgram.download(offline, program, loops=args.loops)
+    print(f"{'cached':<10}{offline.flowControl.calls:>10}{0 if not downloaded else len(program):>13}{'-':>13}")
+
+
+if __name__ == "__main__":
+    main()
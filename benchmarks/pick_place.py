@@ -0,0 +1,74 @@
+"""----------------------------------------------------------------------------
+Queue and serial traffic of block transfers: lift-move-lower vs JUMP.
+
+    python -m benchmarks.pick_place --blocks 10
+
+"triplets" moves each block the way generated programs do, with separate
+PTP moves up to the safe Z, across and down for every pick and place.
+"jump" uses DobotPickPlace.pick / place, one PTPJUMPXYZMode move each.
+Reported are queued commands, DLL calls (including queue polling) and
+simulated seconds on a virtual arm.
+----------------------------------------------------------------------------"""
+import argparse
+import os
+import random
+import time
+
+X_RANGE = (155.0, 300.0)
+Y_RANGE = (-100.0, 100.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=10, help="blocks to move")
+    parser.add_argument("--scale", type=float, default=50.0, help="simulated seconds per wall-clock second")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ["DOBOT_SIMULATE"] = "2"
+    os.environ["DOBOT_SIM_SCALE"] = str(args.scale)
+    from dobot_api import DobotDllType as dType
+    from dobot_api import DobotCompletion
+    from dobot_api import DobotPickPlace
+
+    rng = random.Random(args.seed)
+    moves = [((rng.uniform(*X_RANGE), rng.uniform(*Y_RANGE)), (rng.uniform(*X_RANGE), rng.uniform(*Y_RANGE)))
+             for _ in range(args.blocks)]
+    movl = dType.PTPMode.PTPMOVLXYZMode
+    safeZ, pickZ = DobotPickPlace.SAFE_Z, DobotPickPlace.PICK_Z
+
+    def triplet(api, x, y, on):
+        dType.SetPTPCmd(api, movl, x, y, safeZ, 0, isQueued=1)
+        dType.SetPTPCmd(api, movl, x, y, pickZ, 0, isQueued=1)
+        dType.SetEndEffectorSuctionCup(api, 1, on, isQueued=1)
+        return dType.SetPTPCmd(api, movl, x, y, safeZ, 0, isQueued=1)[0]
+
+    def triplets(api):
+        for pick, place in moves:
+            triplet(api, *pick, 1)
+            last = triplet(api, *place, 0)
+        return last
+
+    def jump(api):
+        for pick, place in moves:
+            DobotPickPlace.pick(api, *pick)
+            last = DobotPickPlace.place(api, *place)
+        return last
+
+    print(f"{args.blocks} blocks")
+    print(f"{'mode':<10}{'queued':>8}{'DLL calls':>11}{'simulated s':>13}")
+    for name, run in (("triplets", triplets), ("jump", jump)):
+        api = dType.load()
+        dType.ConnectDobot(api, "", 115200)
+        dType.SetQueuedCmdClear(api)
+        api.flowControl.resetMetrics()
+        start = time.perf_counter()
+        dType.SetQueuedCmdStartExec(api)
+        last = run(api)
+        DobotCompletion.getQueueWatcher(api).wait(last)
+        elapsed = (time.perf_counter() - start) * args.scale
+        print(f"{name:<10}{api.flowControl.issuedIndex:>8}{api.flowControl.calls:>11}{elapsed:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
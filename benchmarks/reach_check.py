@@ -0,0 +1,85 @@
+"""----------------------------------------------------------------------------
+Cost of checking motion targets against the reach grid vs inverse kinematics.
+
+    python -m benchmarks.reach_check
+    python -m benchmarks.reach_check --points 1000000 --moves 2000
+
+Reported are the time to build the grid and to load it from the cache, the
+microseconds per point of a single lookup, a batch check and
+DobotKinematics.inverse, how often the grid disagrees with inverse on random
+points, and the time to check a whole program of random moves (with its JUMP
+apexes and straight lines) with checkProgram vs one inverse call per point.
+----------------------------------------------------------------------------"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+X_RANGE = (-50.0, 380.0)
+Y_RANGE = (-380.0, 380.0)
+Z_RANGE = (-170.0, 200.0)
+R_RANGE = (-120.0, 120.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=200000, help="random points to look up")
+    parser.add_argument("--moves", type=int, default=500, help="moves in the random program")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ["DOBOT_REACH_CACHE"] = tempfile.mkdtemp(prefix="reach-")
+    import numpy as np
+    from dobot_api import DobotDllType as dType
+    from dobot_api import DobotKinematics as kinematics
+    from dobot_api import DobotReach
+
+    start = time.perf_counter()
+    DobotReach.ReachGrid.load()
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    grid = DobotReach.ReachGrid.load()
+    loaded = time.perf_counter() - start
+    print(f"grid {grid.shape}: built in {built * 1000:.0f} ms, loaded from the cache in {loaded * 1000:.1f} ms")
+
+    rng = random.Random(args.seed)
+    points = [(rng.uniform(*X_RANGE), rng.uniform(*Y_RANGE), rng.uniform(*Z_RANGE), rng.uniform(*R_RANGE))
+              for _ in range(args.points)]
+    array = np.array(points)
+
+    def perPoint(func):
+        start = time.perf_counter()
+        for point in points:
+            func(*point)
+        return (time.perf_counter() - start) / len(points) * 1e6
+
+    lookup, inverse = perPoint(grid.contains), perPoint(kinematics.inverse)
+    start = time.perf_counter()
+    batch = grid.check(array)
+    batchTime = (time.perf_counter() - start) / len(points) * 1e6
+    exact = np.array([kinematics.inverse(*point) is not None for point in points])
+    print(f"{'per point':<12}{'lookup us':>10}{'batch us':>10}{'inverse us':>12}{'reachable':>11}{'mismatches':>12}")
+    print(f"{'':<12}{lookup:>10.2f}{batchTime:>10.3f}{inverse:>12.2f}{exact.mean():>11.1%}{int((batch != exact).sum()):>12}")
+
+    modes = (dType.PTPMode.PTPMOVJXYZMode, dType.PTPMode.PTPMOVLXYZMode, dType.PTPMode.PTPJUMPXYZMode)
+    program = [("SetPTPCmd", (rng.choice(modes), rng.uniform(150, 300), rng.uniform(-150, 150),
+                              rng.uniform(-60, 40), rng.uniform(-30, 30))) for _ in range(args.moves)]
+    pathPoints, _, _ = DobotReach.programPoints(program, start=(200.0, 0.0, 0.0, 0.0))
+
+    def best(func):
+        times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            result = func()
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    checked, problems = best(lambda: DobotReach.checkProgram(program, start=(200.0, 0.0, 0.0, 0.0)))
+    scalar, _ = best(lambda: [kinematics.inverse(x, y, z, r) for x, y, z, r in pathPoints])
+    print(f"program of {args.moves} moves, {len(pathPoints)} points on its path, {len(problems)} out of reach: "
+          f"checkProgram {checked * 1000:.1f} ms, inverse per point {scalar * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""----------------------------------------------------------------------------
+Cycle time of multi-block pick and place in the given vs the planned order.
+
+    python -m benchmarks.route_order --blocks 12
+    python -m benchmarks.route_order --blocks 20 --scale 100
+
+"scatter" moves blocks spread over the paper to random spots, as in
+test_images/many_blocks.png; "sort" lines them up along the edge; "stack"
+builds towers of three, so the planner has to respect the stacking order.
+The given order is the one the transfers are listed in. Reported are the
+predicted seconds of both orders (DobotRoute.report) and the simulated
+seconds to run them on a virtual arm.
+----------------------------------------------------------------------------"""
+import argparse
+import os
+import random
+import time
+
+X_RANGE = (155.0, 300.0)
+Y_RANGE = (-100.0, 100.0)
+BLOCK = 25.0        # block height in mm
+
+
+def scenes(rng, blocks):
+    def spot():
+        return (rng.uniform(*X_RANGE), rng.uniform(*Y_RANGE))
+
+    picks = [spot() for _ in range(blocks)]
+    towers = [spot() for _ in range((blocks + 2) // 3)]
+    return {
+        "scatter": [(pick, spot()) for pick in picks],
+        "sort": [(pick, (160.0, -90.0 + 180.0 * i / max(1, blocks - 1))) for i, pick in enumerate(picks)],
+        "stack": [(pick, towers[i % len(towers)] + (-50.0 + BLOCK * (i // len(towers)),))
+                  for i, pick in enumerate(picks)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=12, help="blocks to move")
+    parser.add_argument("--scale", type=float, default=50.0, help="simulated seconds per wall-clock second")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ["DOBOT_SIMULATE"] = "1"
+    os.environ["DOBOT_SIM_SCALE"] = str(args.scale)
+    from dobot_api import DobotDllType as dType
+    from dobot_api import DobotCompletion
+    from dobot_api import DobotEstimate
+    from dobot_api import DobotRoute
+
+    api = dType.load()
+    dType.ConnectDobot(api, "", 115200)
+    watcher = DobotCompletion.getQueueWatcher(api)
+    start = (200.0, 0.0, 0.0, 0.0)
+
+    def simulate(route, order):
+        dType.SetQueuedCmdStopExec(api)
+        dType.SetQueuedCmdClear(api)
+        dType.SetPTPCmd(api, dType.PTPMode.PTPMOVJXYZMode, *start, isQueued=0)
+        began = time.perf_counter()
+        dType.SetQueuedCmdStartExec(api)
+        for name, commandArgs in route.commands(order):
+            last = getattr(dType, name)(api, *commandArgs, isQueued=1)[0]
+        watcher.wait(last)
+        return (time.perf_counter() - began) * args.scale
+
+    print(f"{args.blocks} blocks")
+    print(f"{'scene':<9}{'predicted given':>16}{'planned':>9}{'saving':>8}{'simulated given':>17}{'planned':>9}")
+    for name, transfers in scenes(random.Random(args.seed), args.blocks).items():
+        route = DobotRoute.planRoute(transfers, start=start, model=DobotEstimate.activeModel(api))
+        report = route.report()
+        given = simulate(route, list(range(len(transfers))))
+        planned = simulate(route, route.order)
+        print(f"{name:<9}{report['given']:>16.1f}{report['planned']:>9.1f}{report['saving']:>8.1%}"
+              f"{given:>17.1f}{planned:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
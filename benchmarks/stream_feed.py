@@ -0,0 +1,85 @@
+"""----------------------------------------------------------------------------
+Long generated programs: built and pushed up front vs streamed by DobotStream.
+
+    python -m benchmarks.stream_feed
+    python -m benchmarks.stream_feed --moves 600 --cost 40 --depth 8
+
+The program draws a zigzag over the paper with short MOVL moves, each point
+taking `--cost` simulated ms to generate (tracing an image, planning a
+sort). "up front" generates the whole list, starts the queue and sends it
+from the main thread, blocking in FlowControl whenever the controller queue
+is full. "stream" hands the generator to a Feeder, which keeps `--depth`
+commands queued and starts the arm after the first one. Reported are the
+simulated seconds until the first command was queued and until the last one
+was executed, the time the sender spent blocked or stalled, the time the arm
+sat starved, and the DLL calls made.
+----------------------------------------------------------------------------"""
+import argparse
+import os
+import time
+
+
+def zigzag(dType, moves, cost):
+    movl = dType.PTPMode.PTPMOVLXYZMode
+    for i in range(moves):
+        time.sleep(cost)
+        row, column = divmod(i, 20)
+        y = -95.0 + 10.0 * (column if row % 2 == 0 else 19 - column)
+        yield ("SetPTPCmd", (movl, 180.0 + 4.0 * (row % 30), y, -40.0, 0.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--moves", type=int, default=300, help="moves in the program")
+    parser.add_argument("--cost", type=float, default=20.0, help="simulated ms to generate each move")
+    parser.add_argument("--depth", type=int, default=16, help="commands the feeder keeps queued")
+    parser.add_argument("--scale", type=float, default=50.0, help="simulated seconds per wall-clock second")
+    args = parser.parse_args()
+
+    os.environ["DOBOT_SIMULATE"] = "1"
+    os.environ["DOBOT_SIM_SCALE"] = str(args.scale)
+    from dobot_api import DobotDllType as dType
+    from dobot_api import DobotCompletion
+    from dobot_api import DobotStream
+
+    api = dType.load()
+    dType.ConnectDobot(api, "", 115200)
+    watcher = DobotCompletion.getQueueWatcher(api)
+    cost = args.cost / 1000.0 / args.scale
+
+    def reset():
+        dType.SetQueuedCmdStopExec(api)
+        dType.SetQueuedCmdClear(api)
+        dType.SetPTPCmd(api, dType.PTPMode.PTPMOVJXYZMode, 180.0, -95.0, -40.0, 0.0, isQueued=0)
+        api.flowControl.resetMetrics()
+
+    def upFront():
+        began = time.perf_counter()
+        commands = list(zigzag(dType, args.moves, cost))
+        dType.SetQueuedCmdStartExec(api)
+        first = time.perf_counter() - began
+        for name, commandArgs in commands:
+            last = getattr(dType, name)(api, *commandArgs, isQueued=1)[0]
+        blocked = api.flowControl.blockedTime
+        watcher.wait(last)
+        return first, time.perf_counter() - began, blocked, None
+
+    def streamed():
+        began = time.perf_counter()
+        feeder = DobotStream.stream(api, zigzag(dType, args.moves, cost), depth=args.depth)
+        feeder.wait()
+        metrics = feeder.metrics()
+        return metrics["startLatency"], time.perf_counter() - began, metrics["stallTime"], metrics["starvedTime"]
+
+    print(f"{args.moves} moves, {args.cost:g} ms to generate each, depth {args.depth}")
+    print(f"{'sender':<10}{'first queued s':>15}{'done s':>9}{'blocked s':>11}{'starved s':>11}{'DLL calls':>11}")
+    for name, run in (("up front", upFront), ("stream", streamed)):
+        reset()
+        first, done, blocked, starved = run()
+        starved = "-" if starved is None else f"{starved * args.scale:.1f}"
+        print(f"{name:<10}{first * args.scale:>15.1f}{done * args.scale:>9.1f}{blocked * args.scale:>11.1f}"
+              f"{starved:>11}{api.flowControl.calls:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""----------------------------------------------------------------------------
+Decoding of the Dobot Magician alarm bitset.
+
+    from dobot_api import DobotAlarms
+
+    DobotAlarms.getAlarms(api)      # [(0x12, "PLAN_INV_LIMIT")] or []
+    DobotAlarms.watch(api, autoClear=False, onAlarm=print)
+
+GetAlarmsState returns the controller's alarm register as raw bytes: bit n
+of the register is set while alarm code n is active. decodeAlarms() reads
+only the non-zero bytes and looks their set bits up in a 256-entry table, so
+an idle check costs one scan of the buffer.
+
+watch() configures the connection's QueueWatcher (DobotCompletion), which
+polls the alarms whenever the queue index stops advancing. An alarm raised
+since connecting or the last ClearAllAlarmsState fails every pending wait
+with DobotAlarmError, or with autoClear=True is cleared and the queue
+restarted, the command that raised it being skipped.
+----------------------------------------------------------------------------"""
+try:
+    from . import DobotDllType as dType
+except ImportError:
+    import DobotDllType as dType
+
+ALARM_BYTES = 32        # the Magician alarm register is 256 bits
+
+# Alarm codes from the Dobot Magician alarm list.
+ALARM_NAMES = {
+    0x00: "COMMON_RESETTED",
+    0x01: "COMMON_UNDEFINED_INSTRUCTION",
+    0x02: "COMMON_FILE_SYSTEM",
+    0x03: "COMMON_MCU_FPGA_COMM",
+    0x04: "COMMON_ANGLE_SENSOR",
+    0x10: "PLAN_INV_SINGULARITY",
+    0x11: "PLAN_INV_CALC",
+    0x12: "PLAN_INV_LIMIT",
+    0x13: "PLAN_PUSH_DATA_REPEAT",
+    0x14: "PLAN_ARC_INPUT_PARAM",
+    0x15: "PLAN_JUMP_PARAM",
+    0x20: "MOVE_INV_SINGULARITY",
+    0x21: "MOVE_INV_CALC",
+    0x22: "MOVE_INV_LIMIT",
+    0x30: "OVERSPEED_AXIS1",
+    0x31: "OVERSPEED_AXIS2",
+    0x32: "OVERSPEED_AXIS3",
+    0x33: "OVERSPEED_AXIS4",
+    0x40: "LIMIT_AXIS1_POS",
+    0x41: "LIMIT_AXIS1_NEG",
+    0x42: "LIMIT_AXIS2_POS",
+    0x43: "LIMIT_AXIS2_NEG",
+    0x44: "LIMIT_AXIS3_POS",
+    0x45: "LIMIT_AXIS3_NEG",
+    0x46: "LIMIT_AXIS4_POS",
+    0x47: "LIMIT_AXIS4_NEG",
+    0x48: "LIMIT_AXIS23_POS",
+    0x49: "LIMIT_AXIS23_NEG",
+    0x50: "LOSE_STEP_AXIS1",
+    0x51: "LOSE_STEP_AXIS2",
+    0x52: "LOSE_STEP_AXIS3",
+    0x53: "LOSE_STEP_AXIS4",
+    0x60: "OTHER_AXIS1_DRV_ALARM",
+    0x61: "OTHER_AXIS1_OVERFLOW",
+    0x62: "OTHER_AXIS2_DRV_ALARM",
+    0x63: "OTHER_AXIS2_OVERFLOW",
+    0x64: "OTHER_AXIS3_DRV_ALARM",
+    0x65: "OTHER_AXIS3_OVERFLOW",
+    0x66: "OTHER_AXIS4_DRV_ALARM",
+    0x67: "OTHER_AXIS4_OVERFLOW",
+}
+
+# Motor driver alarms, the same fifteen for each motor.
+for base, motor in ((0x70, "REAR"), (0x80, "FRONT"), (0x90, "Z"), (0xA0, "R"), (0xB0, "L")):
+    for offset, name in enumerate(("ENCODER", "TEMPERATURE_HIGH", "TEMPERATURE_LOW", "LOCK_CURRENT", "BUSV_HIGH",
+                                   "BUSV_LOW", "OVERHEAT", "RUNAWAY", "BATTERY_LOW", "PHASE_SHORT", "PHASE_WRONG",
+                                   "LOST_SPEED", "NOT_STANDARDIZE", "ENCODER_NOT_STANDARDIZE", "CAN_BROKE")):
+        ALARM_NAMES[base + offset] = "MOTOR_%s_%s" % (motor, name)
+
+# Set bit positions of every byte value.
+BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+
+def alarmName(code):
+    return ALARM_NAMES.get(code, "UNKNOWN_0x%02X" % code)
+
+
+def decodeAlarms(raw, length=None):
+    """[(code, name)] of the alarms set in the raw GetAlarmsState buffer."""
+    data = raw[:length] if length is not None else raw
+    alarms = []
+    for i, value in enumerate(data):
+        if value:
+            for bit in BYTE_BITS[value]:
+                code = i * 8 + bit
+                alarms.append((code, alarmName(code)))
+    return alarms
+
+
+def getAlarms(api):
+    """Active alarms of the arm as [(code, name)]; empty when there are none."""
+    raw, length = dType.GetAlarmsState(api, ALARM_BYTES)
+    return decodeAlarms(raw, length)
+
+
+def clearAndResume(api):
+    """Clear every alarm and restart the command queue after the command that raised it."""
+    dType.ClearAllAlarmsState(api)
+    dType.SetQueuedCmdStartExec(api)
+
+
+def watch(api, autoClear=False, onAlarm=None, interval=None):
+    """
+    Set how the connection's QueueWatcher handles alarms and return it. onAlarm(error) is called
+    from the poller thread with a DobotAlarmError; interval is the least time between alarm checks.
+    """
+    try:
+        from . import DobotCompletion
+    except ImportError:
+        import DobotCompletion
+    watcher = DobotCompletion.getQueueWatcher(api)
+    watcher.autoClear = autoClear
+    if onAlarm is not None:
+        watcher.alarmCallbacks.append(onAlarm)
+    if interval is not None:
+        watcher.alarmInterval = interval
+    return watcher
@@ -0,0 +1,116 @@
+"""----------------------------------------------------------------------------
+asyncio interface to one Dobot.
+
+    from dobot_api import DobotAsync
+
+    async def main():
+        arm = await DobotAsync.connect()
+        await arm.home()
+        await arm.move_linear(250, 0, 0)
+        frame, _ = await asyncio.gather(capture(), arm.move_linear(250, 0, -50))
+        await arm.suction(True)
+        await arm.wait_idle()
+        await arm.close()
+
+Every DobotDllType call runs on a single worker thread owned by the arm, so
+the event loop never blocks on the serial link and calls to one arm keep
+their order. Motion methods queue the command and, unless wait=False, resolve
+when the queue index passes it, or raise CancelledError if stop() drops it
+first. The completion comes from the arm's
+QueueWatcher, so no coroutine polls.
+----------------------------------------------------------------------------"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+
+try:
+    from . import DobotDllType as dType
+    from . import DobotCompletion
+except ImportError:
+    import DobotDllType as dType
+    import DobotCompletion
+
+
+class AsyncArm:
+    def __init__(self, api):
+        self.api = api
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DobotAsync")
+        self.watcher = DobotCompletion.getQueueWatcher(api)
+        self.lastIndex = 0
+
+    async def call(self, func, *args, **kwargs):
+        """Run func(api, *args, **kwargs), a DobotDllType wrapper, on the arm's worker thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, self.api, *args, **kwargs))
+
+    async def queue(self, func, *args, wait=True):
+        """Queue a command and, if `wait`, return once it has been executed. Returns its queue index."""
+        index = (await self.call(func, *args, isQueued=1))[0]
+        self.lastIndex = max(self.lastIndex, index)
+        if wait:
+            await self.wait_index(index)
+        return index
+
+    # ---------------------------------------------------------------- motion
+
+    async def move_linear(self, x, y, z, r=0.0, wait=True):
+        return await self.queue(dType.SetPTPCmd, dType.PTPMode.PTPMOVLXYZMode, x, y, z, r, wait=wait)
+
+    async def move_joint(self, x, y, z, r=0.0, wait=True):
+        return await self.queue(dType.SetPTPCmd, dType.PTPMode.PTPMOVJXYZMode, x, y, z, r, wait=wait)
+
+    async def jump(self, x, y, z, r=0.0, wait=True):
+        return await self.queue(dType.SetPTPCmd, dType.PTPMode.PTPJUMPXYZMode, x, y, z, r, wait=wait)
+
+    async def home(self, wait=True):
+        return await self.queue(dType.SetHOMECmd, 0, wait=wait)
+
+    async def suction(self, on, wait=True):
+        return await self.queue(dType.SetEndEffectorSuctionCup, 1, 1 if on else 0, wait=wait)
+
+    async def gripper(self, closed, wait=True):
+        return await self.queue(dType.SetEndEffectorGripper, 1, 1 if closed else 0, wait=wait)
+
+    async def dwell(self, ms, wait=True):
+        return await self.queue(dType.SetWAITCmd, ms, wait=wait)
+
+    # ---------------------------------------------------------------- status
+
+    async def pose(self):
+        """[x, y, z, rHead, joint1..joint4]"""
+        return await self.call(dType.GetPose)
+
+    async def wait_index(self, index, timeout=None):
+        """Return once queued command `index` has been executed."""
+        return await asyncio.wait_for(asyncio.wrap_future(self.watcher.future(index)), timeout)
+
+    async def wait_idle(self, timeout=None):
+        """Return once every command queued through this arm has been executed."""
+        return await self.wait_index(self.lastIndex, timeout)
+
+    async def stop(self):
+        """
+        Stop the arm and drop what is still queued. Waits on the dropped commands raise
+        CancelledError; wait_idle afterwards returns once the arm is still.
+        """
+        await self.call(dType.SetQueuedCmdForceStopExec)
+        await self.call(dType.SetQueuedCmdClear)
+        self.lastIndex = self.watcher.current
+        await self.call(dType.SetQueuedCmdStartExec)
+
+    async def close(self):
+        await self.call(dType.SetQueuedCmdStopExec)
+        await self.call(dType.DisconnectDobot)
+        self.executor.shutdown(wait=True)
+
+
+async def connect(port="", baudrate=115200, api=None):
+    """Connect to the arm on `port` ("" for the first one found) and start its command queue."""
+    arm = AsyncArm(api if api is not None else dType.load())
+    result = (await arm.call(dType.ConnectDobot, port, baudrate))[0]
+    if result != dType.DobotConnect.DobotConnect_NoError:
+        arm.executor.shutdown(wait=False)
+        raise dType.DobotInvalidDeviceError("ConnectDobot", result, "could not connect to %r: %d" % (port, result))
+    await arm.call(dType.SetQueuedCmdClear)
+    await arm.call(dType.SetQueuedCmdStartExec)
+    return arm
@@ -0,0 +1,381 @@
+"""----------------------------------------------------------------------------
+Event-driven completion of queued Dobot commands.
+
+Instead of
+
+    while last_index > dType.GetQueuedCmdCurrentIndex(api)[0]:
+        dType.dSleep(1000)
+
+use
+
+    from dobot_api import DobotCompletion
+    DobotCompletion.getQueueWatcher(api).wait(last_index)
+
+One background thread per arm polls GetQueuedCmdCurrentIndex and resolves
+concurrent.futures.Future objects as the queue index passes them. Every queued
+motion command sent through DobotDllType is fed into a MotionModel, so the
+poller knows when the command a caller waits on should finish: it sleeps until
+shortly before that moment and polls tightly around it, instead of sleeping a
+fixed interval and overshooting.
+
+While the queue index is not advancing the poller also reads the alarm
+state. An alarm stops the queue, so instead of letting the waits hang it
+fails them with DobotAlarmError (see DobotAlarms.watch to clear and resume
+automatically instead). Only alarms raised since the connection was made,
+or since the last ClearAllAlarmsState, count: a latched one such as the
+power-up reset alarm is part of that baseline and does not fail waits
+until a poll sees it gone, after which it counts again when it returns. If
+polling itself fails (a DLL timeout), the pending waits fail with that error
+instead of hanging. SetQueuedCmdClear fails the waits for the commands it
+drops with CancelledError.
+
+wait(index, timeout="auto") sizes the timeout from the prediction
+(DobotEstimate.timeoutFor) and raises DobotTimeoutError when the queue takes
+far longer, e.g. because SetQueuedCmdStartExec was never called.
+
+The *Ex helpers of DobotDllType and its peripheral modules wait through
+waitQueued(), so a helper blocked on the arm sleeps on the same poller
+instead of polling itself, and any number of them can wait at once.
+----------------------------------------------------------------------------"""
+from concurrent.futures import CancelledError, Future, wait as waitFutures, ALL_COMPLETED, FIRST_COMPLETED
+import heapq
+import itertools
+import threading
+import time
+
+try:
+    from . import DobotDllType as dType
+    from . import DobotAlarms
+    from . import DobotEstimate
+except ImportError:
+    import DobotDllType as dType
+    import DobotAlarms
+    import DobotEstimate
+
+MIN_INTERVAL = 0.005        # polling period around the predicted finish time
+MAX_INTERVAL = 0.5          # longest sleep between polls while a wait is pending
+UNPREDICTED_INTERVAL = 0.05 # polling period when nothing is known about the pending commands
+GUARD = 0.05                # start polling tightly this long before the predicted finish
+ALARM_INTERVAL = 0.25       # least time between alarm checks while the queue index is not advancing
+AUTO = "auto"               # wait timeout sized from the predicted execution time
+QUIT_CHECK = 0.25           # seconds between checks of DobotDllType.QuitDobotApiFlag in waitQueued
+
+
+class QueueWatcher:
+    def __init__(self, api, slot=0):
+        # slot: which entry of GetQueuedCmdCurrentIndex to follow (1 for the controller queue).
+        self.api = api
+        self.slot = slot
+        # The simulator runs its clock faster than wall time; predictions are in simulated seconds.
+        self.timeScale = getattr(api, "timeScale", 1.0)
+        self.cond = threading.Condition()
+        self.model = None
+        self.durations = {}     # queued index -> [predicted seconds, issue time]
+        self.pending = []       # heap of (index, seq, future)
+        self.seq = itertools.count()
+        self.current = 0
+        self.lastAdvance = time.monotonic()
+        self.lastPoll = self.lastAdvance
+        self.executing = False
+        self.downloading = False    # commands go to the offline program, not the queue
+        self.thread = None
+        self.closed = False
+        self.polls = 0
+        # Alarm handling, see DobotAlarms.watch.
+        self.alarmInterval = ALARM_INTERVAL     # None disables alarm checks
+        self.autoClear = False
+        self.alarmCallbacks = []
+        self.alarm = None           # DobotAlarmError while an alarm is active and not cleared
+        self.knownAlarms = frozenset()  # codes set at connect or after the last clear and still set since
+        self.alarmLog = []          # alarms cleared automatically
+        self.lastAlarmCheck = 0.0
+
+    # ------------------------------------------------------------- prediction
+
+    def record(self, name, args, queuedCmdIndex):
+        now = time.monotonic()
+        if queuedCmdIndex is not None and self.model is None and not self.downloading:
+            # Reading the arm's parameters takes several DLL round trips, so not under the lock
+            # that update(), future() and every waiter need.
+            model = DobotEstimate.activeModel(self.api)
+            with self.cond:
+                if self.model is None:
+                    self.model = model
+        if name == "ClearAllAlarmsState":
+            with self.cond:
+                self.alarm = None
+            self.readAlarmBaseline()
+            return
+        if name == "SetQueuedCmdClear":
+            self.cleared()
+            return
+        with self.cond:
+            if queuedCmdIndex is None:
+                if name == "SetQueuedCmdStartDownload":
+                    self.downloading = True
+                    return
+                if name == "SetQueuedCmdStopDownload":
+                    # The offline program may be run from the arm at any time, so the pose is unknown.
+                    self.downloading = False
+                    self.model = None
+                    return
+                if name == "SetQueuedCmdStartExec":
+                    if not self.executing:
+                        self.lastAdvance = now
+                    self.executing = True
+                elif name in ("SetQueuedCmdStopExec", "SetQueuedCmdForceStopExec"):
+                    self.executing = False
+                else:
+                    if name == "SetPTPJumpParams" and self.model is not None and not self.downloading:
+                        # Set immediately, so it applies to the jumps still to run.
+                        self.model.execute(name, *args)
+                    return
+                self.cond.notify_all()
+                return
+            if self.downloading or self.model is None:
+                return
+            duration = self.model.execute(name, *args)
+            if duration is not None:
+                self.durations[queuedCmdIndex] = [duration / self.timeScale, now]
+
+    def predictedFinish(self, index):
+        """Monotonic time at which `index` should be done, or None if it cannot be predicted."""
+        if not self.executing:
+            return None
+        t = self.lastAdvance
+        known = False
+        for queued in sorted(i for i in self.durations if self.current < i <= index):
+            duration, issued = self.durations[queued]
+            t = max(t, issued) + duration
+            known = True
+        return t if known else None
+
+    def predictedRemaining(self, index):
+        """Seconds until `index` should be done, or None unless every command up to it was predicted."""
+        with self.cond:
+            queued = [i for i in self.durations if self.current < i <= index]
+            if len(queued) != index - self.current:
+                return None if index > self.current else 0.0
+            if not self.executing:
+                return sum(self.durations[i][0] for i in queued)
+            finish = self.predictedFinish(index)
+        return max(0.0, finish - time.monotonic()) if finish is not None else 0.0
+
+    def interval(self, now):
+        if not self.pending:
+            return None
+        finish = self.predictedFinish(self.pending[0][0])
+        if finish is None:
+            return UNPREDICTED_INTERVAL
+        return min(MAX_INTERVAL, max(MIN_INTERVAL, finish - GUARD - now))
+
+    # ---------------------------------------------------------------- waiting
+
+    def future(self, index):
+        """Future resolved with the queue index once command `index` has been executed."""
+        future = Future()
+        with self.cond:
+            if index <= self.current:
+                future.set_result(self.current)
+                return future
+            if self.alarm is not None:
+                future.set_exception(self.alarm)
+                return future
+            heapq.heappush(self.pending, (index, next(self.seq), future))
+            self.start()
+            self.cond.notify_all()
+        return future
+
+    def onComplete(self, index, callback):
+        """Call callback(index) from the poller thread once `index` has been executed."""
+        future = self.future(index)
+        future.add_done_callback(lambda f: None if f.cancelled() else callback(index))
+        return future
+
+    def wait(self, index, timeout=None):
+        """
+        Block until `index` has been executed. Raises TimeoutError after `timeout` seconds; with
+        timeout=AUTO, DobotTimeoutError once it is well past the predicted time (no limit if unknown).
+        """
+        if timeout != AUTO:
+            return self.future(index).result(timeout)
+        remaining = self.predictedRemaining(index)
+        timeout = DobotEstimate.timeoutFor(remaining)
+        try:
+            return self.future(index).result(timeout)
+        except TimeoutError:
+            raise dType.DobotTimeoutError("wait", dType.DobotCommunicate.DobotCommunicate_Timeout,
+                                          "queued command %d not done after %.1f s, predicted %.1f s "
+                                          "(queue at %d)" % (index, timeout, remaining, self.current)) from None
+
+    def waitAll(self, indexes, timeout=None):
+        done, notDone = waitFutures([self.future(i) for i in indexes], timeout, ALL_COMPLETED)
+        if notDone:
+            raise TimeoutError("%d queued commands still pending" % len(notDone))
+        return self.current
+
+    def waitAny(self, indexes, timeout=None):
+        """Wait until the first of `indexes` completes and return that index."""
+        futures = {self.future(i): i for i in indexes}
+        done, notDone = waitFutures(futures, timeout, FIRST_COMPLETED)
+        if not done:
+            raise TimeoutError("none of the queued commands completed")
+        return min(futures[f] for f in done)
+
+    # ----------------------------------------------------------------- poller
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.run, name="DobotQueueWatcher", daemon=True)
+            self.thread.start()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                if self.closed:
+                    return
+                self.cond.wait(self.interval(time.monotonic()))
+                if self.closed:
+                    return
+            try:
+                advanced = self.update(dType.GetQueuedCmdCurrentIndex(self.api)[self.slot])
+                if (not advanced and self.alarmInterval is not None
+                        and time.monotonic() - self.lastAlarmCheck >= self.alarmInterval):
+                    self.checkAlarms()
+            except Exception as e:
+                self.failPending(e)
+
+    def update(self, current):
+        now = time.monotonic()
+        done = []
+        advanced = False
+        with self.cond:
+            self.polls += 1
+            lastPoll, self.lastPoll = self.lastPoll, now
+            if current > self.current:
+                advanced = True
+                # The index moved at some point since the last poll: when predicted, if that falls in between.
+                finish = self.predictedFinish(current)
+                self.lastAdvance = finish if finish is not None and lastPoll <= finish <= now else now
+                self.current = current
+                for index in [i for i in self.durations if i <= current]:
+                    del self.durations[index]
+            while self.pending and self.pending[0][0] <= current:
+                done.append(heapq.heappop(self.pending)[2])
+            self.pending = [entry for entry in self.pending if not entry[2].cancelled()]
+            heapq.heapify(self.pending)
+        for future in done:
+            if future.set_running_or_notify_cancel():
+                future.set_result(current)
+        return advanced
+
+    def cleared(self):
+        """
+        The queue was cleared: commands executed before that are done, the rest never will be, so
+        their waits fail with CancelledError, and the pose the model reached is no longer where the
+        arm goes.
+        """
+        self.update(dType.GetQueuedCmdCurrentIndex(self.api)[self.slot])
+        with self.cond:
+            self.durations.clear()
+            self.model = None
+            self.cond.notify_all()
+        self.failPending(CancelledError("the command queue was cleared before command %d ran" % (self.current + 1)))
+
+    def failPending(self, error):
+        with self.cond:
+            failed = [entry[2] for entry in self.pending]
+            self.pending = []
+        for future in failed:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def readAlarmBaseline(self):
+        """Take the alarms set now as latched, so that only alarms raised later fail the waits."""
+        if self.alarmInterval is None:
+            return
+        alarms = DobotAlarms.getAlarms(self.api)
+        with self.cond:
+            self.knownAlarms = frozenset(code for code, _ in alarms)
+
+    def checkAlarms(self):
+        self.lastAlarmCheck = time.monotonic()
+        alarms = DobotAlarms.getAlarms(self.api)
+        with self.cond:
+            # A latched code the arm no longer reports is re-armed, so its next occurrence counts.
+            self.knownAlarms = self.knownAlarms.intersection(code for code, _ in alarms)
+        alarms = [alarm for alarm in alarms if alarm[0] not in self.knownAlarms]
+        if not alarms:
+            return
+        error = dType.DobotAlarmError(alarms, self.current + 1)
+        for callback in list(self.alarmCallbacks):
+            callback(error)
+        if self.autoClear:
+            with self.cond:
+                self.alarmLog.append(error)
+            DobotAlarms.clearAndResume(self.api)
+            return
+        with self.cond:
+            self.alarm = error
+        self.failPending(error)
+
+
+watchers = {}
+watchersLock = threading.Lock()
+
+
+def getQueueWatcher(api, slot=0):
+    """The QueueWatcher shared by everything that uses the connection `api`."""
+    api = dType.connection(api)
+    key = (id(api), slot)
+    with watchersLock:
+        watcher = watchers.get(key)
+        if watcher is None:
+            watcher = watchers[key] = QueueWatcher(api, slot)
+    return watcher
+
+
+def waitForIndex(api, index, timeout=None):
+    return getQueueWatcher(api).wait(index, timeout)
+
+
+def waitQueued(api, index, slot=0, timeout=None):
+    """
+    Block until `index` has been executed on queue `slot` (see Topology.indexSlots), as the *Ex
+    helpers do. Raises DobotTimeoutError after `timeout` seconds, or with timeout=AUTO once it is well
+    past the predicted time. Returns early when DobotDllType.QuitDobotApiFlag is cleared.
+    """
+    watcher = getQueueWatcher(api, slot)
+    remaining = None
+    if timeout == AUTO:
+        remaining = watcher.predictedRemaining(index)
+        timeout = DobotEstimate.timeoutFor(remaining)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    future = watcher.future(index)
+    while dType.QuitDobotApiFlag:
+        left = QUIT_CHECK if deadline is None else min(QUIT_CHECK, deadline - time.monotonic())
+        try:
+            return future.result(max(0.0, left))
+        except TimeoutError:
+            if deadline is not None and time.monotonic() >= deadline:
+                future.cancel()
+                predicted = "" if remaining is None else ", predicted %.1f s" % remaining
+                raise dType.DobotTimeoutError("wait", dType.DobotCommunicate.DobotCommunicate_Timeout,
+                                              "queued command %d not done after %.1f s%s (queue at %d)"
+                                              % (index, timeout, predicted, watcher.current)) from None
+    future.cancel()
+    return watcher.current
+
+
+def _recordQueuedCmd(api, name, args, queuedCmdIndex):
+    getQueueWatcher(api).record(name, args, queuedCmdIndex)
+
+
+dType.queuedCmdHooks.append(_recordQueuedCmd)
@@ -0,0 +1,324 @@
+"""----------------------------------------------------------------------------
+Long-lived process that owns the arm, and the thin client scripts use.
+
+    python -m dobot_api.DobotDaemon                 # connect and serve until stopped
+    python -m dobot_api.DobotDaemon --simulate 1    # same, on a virtual arm
+    python -m dobot_api.DobotDaemon --stop
+
+    from dobot_api import DobotDaemon
+    dType = DobotDaemon.client(fallback=True)       # the daemon if it runs, else the DLL
+    api = dType.load()
+    dType.ConnectDobot(api, "", 115200)
+    last = dType.SetPTPCmd(api, dType.PTPMode.PTPMOVLXYZMode, 250, 0, 0, 0, isQueued=1)[0]
+    dType.SetQueuedCmdStartExec(api)
+    dType.waitForIndex(api, last)
+
+The daemon loads the library, connects once and listens on a Unix socket
+(DOBOT_DAEMON_SOCKET, by default dobot-<uid>.sock in the temp directory).
+A client looks like the DobotDllType module: enums and constants are the
+module's own, and every wrapper is sent to the daemon as one JSON line,
+{"call": name, "args": [...], "kwargs": {...}}, and runs there on the warm
+connection. The api argument is ignored, so scripts keep their calls.
+
+The helper modules take a connection, not the client, so their calls go
+through helper() and run whole in the daemon:
+
+    last = dType.helper(api, "DobotPickPlace", "pick", 250, 50)
+    last = dType.helper(api, "DobotMoves", "moveThrough", [(250, 0, 0), (200, 80, -20)])
+
+Only functions of the modules in HELPER_MODULES whose first argument is
+the api can be called, and their results must be JSON. Helpers that hand back objects (DobotStream.stream,
+DobotEstimate.activeModel) need the library in the script's own process;
+passing a DaemonClient to them raises TypeError.
+
+So that back-to-back runs start moving at once, the daemon answers
+ConnectDobot with the result of its own connection and ignores
+DisconnectDobot. Every other call, parameter setters included, is executed:
+the arm's parameters can change behind the daemon's back (the *Ex helpers,
+another client, DobotStudio), so repeating a setter is never skipped.
+----------------------------------------------------------------------------"""
+import argparse
+import builtins
+import importlib
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+
+try:
+    from . import DobotDllType as dType
+    from . import DobotCompletion
+except ImportError:
+    import DobotDllType as dType
+    import DobotCompletion
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "dobot-%s.sock" % (os.getuid() if hasattr(os, "getuid") else "user"))
+
+# Calls the daemon answers itself instead of forwarding to the wrapper of the same name.
+DAEMON_CALLS = ("ConnectDobot", "DisconnectDobot", "waitForIndex", "helper", "status", "shutdown")
+
+# dobot_api modules whose functions helper() runs with the daemon's connection as their api argument.
+HELPER_MODULES = ("DobotPickPlace", "DobotRoute", "DobotMoves", "DobotHome", "DobotReach")
+
+
+def socketPath(path=None):
+    return path or os.environ.get("DOBOT_DAEMON_SOCKET") or DEFAULT_SOCKET
+
+
+def helperFunction(module, func):
+    """dobot_api.<module>.<func>, if helper() may call it."""
+    if module not in HELPER_MODULES:
+        raise AttributeError("%r is not a helper module, only %s are" % (module, ", ".join(HELPER_MODULES)))
+    if __package__:
+        found = getattr(importlib.import_module("." + module, __package__), func, None)
+    else:
+        found = getattr(importlib.import_module(module), func, None)
+    code = getattr(found, "__code__", None)
+    if func.startswith("_") or code is None or code.co_varnames[:1] != ("api",):
+        raise AttributeError("%s has no helper %r taking an api" % (module, func))
+    return found
+
+
+def encode(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {"bytes": bytes(value).hex()}
+    if isinstance(value, (list, tuple)):
+        return [encode(v) for v in value]
+    return value
+
+
+def decode(value):
+    if isinstance(value, dict) and "bytes" in value:
+        return bytes.fromhex(value["bytes"])
+    if isinstance(value, list):
+        return [decode(v) for v in value]
+    return value
+
+
+# ------------------------------------------------------------------ daemon
+
+class ArmDaemon:
+    def __init__(self, api, connectResult):
+        self.api = api
+        self.connectResult = connectResult
+        self.calls = 0
+        self.server = None
+        self.stopping = False
+
+    @classmethod
+    def connect(cls, port="", baudrate=115200, simulate=None):
+        api = dType.load(simulate)
+        result = dType.ConnectDobot(api, port, baudrate)
+        if result[0] != dType.DobotConnect.DobotConnect_NoError:
+            raise dType.DobotInvalidDeviceError("ConnectDobot", dType.DobotCommunicate.DobotCommunicate_InvalidDevice,
+                                                "could not connect to %r: %d" % (port, result[0]))
+        dType.SetQueuedCmdClear(api)
+        return cls(api, result)
+
+    def handle(self, request):
+        name = request["call"]
+        args = decode(request.get("args", []))
+        kwargs = request.get("kwargs", {})
+        self.calls += 1
+        if name in DAEMON_CALLS:
+            return getattr(self, "call" + name[0].upper() + name[1:])(*args, **kwargs)
+        func = getattr(dType, name, None)
+        if name.startswith("_") or not callable(func) or isinstance(func, type) or name in ("load", "loadSim"):
+            raise AttributeError("DobotDllType has no wrapper %r" % name)
+        return func(self.api, *args, **kwargs)
+
+    def callConnectDobot(self, portName="", baudrate=115200):
+        return self.connectResult
+
+    def callDisconnectDobot(self):
+        return None
+
+    def callWaitForIndex(self, index, timeout=None):
+        return DobotCompletion.getQueueWatcher(self.api).wait(index, timeout)
+
+    def callHelper(self, module, func, *args, **kwargs):
+        return helperFunction(module, func)(self.api, *args, **kwargs)
+
+    def callStatus(self):
+        return {"masterId": self.api.masterId, "calls": self.calls,
+                "queue": self.api.flowControl.metrics()}
+
+    def callShutdown(self):
+        # The server is stopped once the reply is written.
+        self.stopping = True
+        return None
+
+    def serve(self, path=None):
+        path = socketPath(path)
+        if os.path.exists(path):
+            if ping(path):
+                raise RuntimeError("a Dobot daemon is already listening on %s" % path)
+            os.unlink(path)
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        response = json.dumps({"result": encode(daemon.handle(json.loads(line)))})
+                    except dType.DobotError as e:
+                        response = json.dumps({"error": e.__class__.__name__, "message": str(e), "func": e.func,
+                                               "code": e.result, "alarms": getattr(e, "alarms", None)})
+                    except Exception as e:
+                        response = json.dumps({"error": e.__class__.__name__, "message": str(e)})
+                    self.wfile.write(response.encode("utf-8") + b"\n")
+                    if daemon.stopping:
+                        threading.Thread(target=daemon.server.shutdown, daemon=True).start()
+                        return
+
+        self.server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        self.server.daemon_threads = True
+        os.chmod(path, 0o600)
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(path):
+                os.unlink(path)
+            dType.SetQueuedCmdStopExec(self.api)
+            dType.DisconnectDobot(self.api)
+
+
+# ------------------------------------------------------------------ client
+
+class DaemonClient:
+    """Stands in for the DobotDllType module, running every wrapper in the daemon."""
+
+    # Checked by DobotDllType.connection, which cannot drive the arm through a client.
+    isDaemonClient = True
+
+    def __init__(self, path=None):
+        self.path = socketPath(path)
+        self.lock = threading.Lock()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+        self.file = self.sock.makefile("rwb")
+
+    def call(self, name, *args, **kwargs):
+        request = json.dumps({"call": name, "args": encode(list(args)), "kwargs": kwargs}).encode("utf-8")
+        with self.lock:
+            self.file.write(request + b"\n")
+            self.file.flush()
+            line = self.file.readline()
+        if not line:
+            raise ConnectionError("Dobot daemon on %s closed the connection" % self.path)
+        response = json.loads(line)
+        if "error" in response:
+            raise remoteError(response)
+        return decode(response["result"])
+
+    def load(self, *args, **kwargs):
+        return self
+
+    def waitForIndex(self, api, index, timeout=None):
+        return self.call("waitForIndex", index, timeout)
+
+    def helper(self, api, module, func, *args, **kwargs):
+        """Run dobot_api.<module>.<func>(api, *args, **kwargs) in the daemon."""
+        return self.call("helper", module, func, *args, **kwargs)
+
+    def status(self):
+        return self.call("status")
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __getattr__(self, name):
+        value = getattr(dType, name)
+        if callable(value) and not isinstance(value, type) and not name.startswith("_"):
+            def remote(api, *args, **kwargs):
+                return self.call(name, *args, **kwargs)
+            remote.__name__ = name
+            return remote
+        return value
+
+
+class LocalClient:
+    """The same interface as DaemonClient, calling the library in this process."""
+
+    def waitForIndex(self, api, index, timeout=None):
+        return DobotCompletion.getQueueWatcher(api).wait(index, timeout)
+
+    def helper(self, api, module, func, *args, **kwargs):
+        return helperFunction(module, func)(api, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(dType, name)
+
+
+def remoteError(response):
+    cls = getattr(dType, response["error"], None)
+    if isinstance(cls, type) and issubclass(cls, dType.DobotError):
+        error = cls.__new__(cls)
+        dType.DobotError.__init__(error, response.get("func"), response.get("code"), response["message"])
+        if response.get("alarms") is not None:
+            error.alarms = [tuple(alarm) for alarm in response["alarms"]]
+        return error
+    cls = getattr(builtins, response["error"], None)
+    if not (isinstance(cls, type) and issubclass(cls, Exception)):
+        cls = RuntimeError
+    return cls(response["message"])
+
+
+def ping(path=None):
+    """True if a daemon answers on the socket."""
+    try:
+        client = DaemonClient(path)
+    except OSError:
+        return False
+    try:
+        client.status()
+        return True
+    except (OSError, ValueError):
+        return False
+    finally:
+        client.close()
+
+
+def client(path=None, fallback=False):
+    """
+    DaemonClient for the running daemon. With fallback=True, a LocalClient driving the library in
+    this process is returned when no daemon is listening (or Unix sockets are unavailable).
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        if fallback:
+            return LocalClient()
+        raise OSError("Unix sockets are not available on this platform")
+    try:
+        return DaemonClient(path)
+    except OSError:
+        if fallback:
+            return LocalClient()
+        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", help="socket path (default: DOBOT_DAEMON_SOCKET or %s)" % DEFAULT_SOCKET)
+    parser.add_argument("--port", default="", help="serial port of the arm, empty for the first one found")
+    parser.add_argument("--baudrate", type=int, default=115200)
+    parser.add_argument("--simulate", type=int, default=None, help="number of virtual arms instead of the DLL")
+    parser.add_argument("--stop", action="store_true", help="stop the daemon listening on the socket")
+    args = parser.parse_args()
+
+    if args.stop:
+        DaemonClient(args.socket).call("shutdown")
+        return
+    daemon = ArmDaemon.connect(args.port, args.baudrate, args.simulate)
+    print("Connected to Dobot %d, listening on %s" % (daemon.api.masterId, socketPath(args.socket)))
+    try:
+        daemon.serve(args.socket)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""------------------------------------------------------------------------------
+I/O, trigger and stepper motor (EMotor) wrappers, split out of DobotDllType.
+
+DobotDllType imports this module the first time one of these names is used,
+so dType.SetEMotorSExtEx(api, ...) keeps working and pick-and-place programs
+that never touch them do not pay for defining them.
+------------------------------------------------------------------------------"""
+from ctypes import *
+
+try:
+    from . import DobotDllType
+    from .DobotDllType import *
+except ImportError:
+    import DobotDllType
+    from DobotDllType import *
+
+
+        
+class EMotor(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("index", c_byte), 
+        ("isEnabled", c_byte), 
+        ("speed", c_int32)
+        ]
+        
+class EMotorS(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("index", c_byte), 
+        ("isEnabled", c_byte), 
+        ("speed", c_int32), 
+        ("distance", c_uint32)
+        ]
+
+InputPin = enum( InputPinNone=0,
+    InputPin1=1,
+    InputPin2=2,
+    InputPin3=3,
+    InputPin4=4,
+    InputPin5=5,
+    InputPin6=6,
+    InputPin7=7,
+    InputPin8=8)
+
+InputLevel = enum(InputLevelBoth=0,
+    InputLevelLow=1,
+    InputLevelHigh=2)
+
+OutputPin = enum(
+    SIGNALS_O1=1,
+    SIGNALS_O2=2,
+    SIGNALS_O3=3,
+    SIGNALS_O4=4,
+    SIGNALS_O5=5,
+    SIGNALS_O6=6,
+    SIGNALS_O7=7,
+    SIGNALS_O8=8)
+
+TRIGMode = enum(
+    TRIGInputIOMode = 0,
+    TRIGADCMode=1)
+    
+TRIGInputIOCondition = enum(
+    TRIGInputIOEqual = 0,
+    TRIGInputIONotEqual=1)
+    
+TRIGADCCondition = enum(
+    TRIGADCLT = 0,
+    TRIGADCLE=1, 
+    TRIGADCGE = 2,
+    TRIGADCGT=3)
+    
+class TRIGCmd(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("address", c_byte), 
+        ("mode", c_byte), 
+        ("condition",  c_byte), 
+        ("threshold", c_uint16)
+        ]
+
+GPIOType = enum(
+    GPIOTypeDummy = 0, 
+    GPIOTypeDO = 1,
+    GPIOTypePWM=2,
+    GPIOTypeDI=3, 
+    GPIOTypeADC=4, 
+    GPIOTypeDIPU=5, 
+    GPIOTypeDIPD=6)
+    
+class IOMultiplexing(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("address", c_byte), 
+        ("multiplex", c_byte)
+        ]
+        
+class IODO(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("address", c_byte), 
+        ("level", c_byte)
+        ]
+        
+class IOPWM(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("address", c_byte), 
+        ("frequency", c_float), 
+        ("dutyCycle", c_float)
+        ]
+        
+class IODI(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("address", c_byte), 
+        ("level", c_byte)
+        ]
+        
+class IOADC(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("address", c_byte), 
+        ("value", c_int)
+        ]
+
+
+def SetTRIGCmd(api, address, mode,  condition,  threshold,  isQueued=0):
+    api = connection(api)
+    param = TRIGCmd()
+    param.address = address
+    param.mode = mode
+    param.condition = condition
+    param.threshold = threshold
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetTRIGCmd", c_int(api.masterId), c_int(api.slaveId), byref(param), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def SetIOMultiplexing(api, address, multiplex, isQueued=0):
+    api = connection(api)
+    param = IOMultiplexing()
+    param.address = address
+    param.multiplex = multiplex
+    queuedCmdIndex = c_uint64(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "SetIOMultiplexing", c_int(api.masterId), c_int(tempSlaveId), byref(param), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetIOMultiplexing(api,  addr):
+    api = connection(api)
+    param = IOMultiplexing()
+    param.address = addr
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "GetIOMultiplexing", c_int(api.masterId), c_int(tempSlaveId), byref(param))
+    return [param.multiplex]
+
+
+def SetIODO(api, address, level, isQueued=0):
+    api = connection(api)
+    param = IODO()
+    param.address = address
+    param.level = level
+    queuedCmdIndex = c_uint64(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "SetIODO", c_int(api.masterId), c_int(tempSlaveId), byref(param), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetIODO(api,  addr):
+    api = connection(api)
+    param = IODO()
+    param.address = addr
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "GetIODO", c_int(api.masterId), c_int(tempSlaveId), byref(param))
+    return [param.level]
+
+
+def SetIOPWM(api, address, frequency, dutyCycle,  isQueued=0):
+    api = connection(api)
+    param = IOPWM()
+    param.address = address
+    param.frequency = frequency
+    param.dutyCycle = dutyCycle
+    queuedCmdIndex = c_uint64(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "SetIOPWM", c_int(api.masterId), c_int(tempSlaveId), byref(param), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetIOPWM(api,  addr):
+    api = connection(api)
+    param = IOPWM()
+    param.address = addr
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "GetIOPWM", c_int(api.masterId), c_int(tempSlaveId), byref(param))
+    return [param.frequency,  param.dutyCycle]
+
+
+def GetIODI(api, addr):
+    api = connection(api)
+    param = IODI()
+    param.address = addr
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "GetIODI", c_int(api.masterId), c_int(tempSlaveId), byref(param))
+    return [param.level]
+    
+
+def SetEMotor(api, index, isEnabled, speed,  isQueued=0):
+    api = connection(api)
+    emotor = EMotor()
+    emotor.index = index
+    emotor.isEnabled = isEnabled
+    emotor.speed = speed
+    queuedCmdIndex = c_uint64(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "SetEMotor", c_int(api.masterId), c_int(tempSlaveId), byref(emotor), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+    
+
+def SetEMotorS(api, index, isEnabled, speed, distance,  isQueued=0):
+    api = connection(api)
+    emotorS = EMotorS()
+    emotorS.index = index
+    emotorS.isEnabled = isEnabled
+    emotorS.speed = speed
+    emotorS.distance = distance
+    queuedCmdIndex = c_uint64(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "SetEMotorS", c_int(api.masterId), c_int(tempSlaveId), byref(emotorS), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetIOADC(api, addr):
+    api = connection(api)
+    param = IOADC()
+    param.address = addr
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "GetIOADC", c_int(api.masterId), c_int(tempSlaveId), byref(param))
+    return [param.value]
+    
+def SetIOMultiplexingEx(api, address, multiplex, isQueued=0):
+    api = connection(api)
+    ret = SetIOMultiplexing(api, address, multiplex, isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+
+def SetIODOEx(api, address, level, isQueued=0):
+    api = connection(api)
+    ret = SetIODO(api, address, level, isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+        
+def SetEMotorEx(api, index, isEnabled, speed,  isQueued=0):
+    api = connection(api)
+    ret = SetEMotor(api, index, isEnabled, speed,  isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+    
+def SetEMotorSEx(api, index, isEnabled, speed, distance,  isQueued=0):
+    api = connection(api)
+    ret = SetEMotorS(api, index, isEnabled, speed, distance,   isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+    
+def SetIOPWMEx(api, address, frequency, dutyCycle,  isQueued=0):
+    api = connection(api)
+    ret = SetIOPWM(api, address, frequency, dutyCycle,  isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+
+
+
+
+
+
+# jomar, 2019年5月9日 10:10:50
+
+
+def SetTRIGCmdEx(api, address, mode,  condition,  threshold,  isQueued=1):
+    api = connection(api)
+    ret = SetTRIGCmd(api, address, mode, condition, threshold, isQueued)
+    waitQueued(api, ret[0])
+
+
+
+#BLOCKLY 2019-04-29 控制盒IO
+
+def SetIOMultiplexingExt(api, address, multiplex, isQueued=0):
+    api = connection(api)
+    param = IOMultiplexing()
+    param.address = address
+    param.multiplex = multiplex
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetIOMultiplexing", c_int(api.masterId), c_int(-1), byref(param), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetIOMultiplexingExt(api, addr):
+    api = connection(api)
+    param = IOMultiplexing()
+    param.address = addr
+    result = callDobot(api, "GetIOMultiplexing", c_int(api.masterId), c_int(-1), byref(param))
+    return [param.multiplex]
+
+
+def GetIOADCExt(api, addr):
+    api = connection(api)
+    param = IOADC()
+    param.address = addr
+    result = callDobot(api, "GetIOADC", c_int(api.masterId), c_int(-1), byref(param))
+    return [param.value]
+
+
+def SetIOPWMExt(api, address, frequency, dutyCycle,  isQueued=0):
+    api = connection(api)
+    param = IOPWM()
+    param.address = address
+    param.frequency = frequency
+    param.dutyCycle = dutyCycle
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetIOPWM", c_int(api.masterId), c_int(-1), byref(param), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetIOPWMExt(api, addr):
+    api = connection(api)
+    param = IOPWM()
+    param.address = addr
+    result = callDobot(api, "GetIOPWM", c_int(api.masterId), c_int(-1), byref(param))
+    return [param.frequency,  param.dutyCycle]
+
+
+def GetIODIExt(api, addr):
+    api = connection(api)
+    param = IODI()
+    param.address = addr
+    result = callDobot(api, "GetIODI", c_int(api.masterId), c_int(-1), byref(param))
+    return [param.level]
+
+
+def SetIODOExt(api, address, level, isQueued=0):
+    api = connection(api)
+    param = IODO()
+    param.address = address
+    param.level = level
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetIODO", c_int(api.masterId), c_int(-1), byref(param), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetIODOExt(api, addr):
+    api = connection(api)
+    param = IODO()
+    param.address = addr
+    result = callDobot(api, "GetIODO", c_int(api.masterId), c_int(-1), byref(param))
+    return [param.level]
+
+
+def SetEMotorExt(api, index, isEnabled, speed, isQueued=0):
+    api = connection(api)
+    emotor = EMotor()
+    emotor.index = index
+    emotor.isEnabled = isEnabled
+    emotor.speed = speed
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetEMotor", c_int(api.masterId), c_int(-1), byref(emotor), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def SetEMotorSExt(api, index, isEnabled, speed, distance, isQueued=0):
+    api = connection(api)
+    emotorS = EMotorS()
+    emotorS.index = index
+    emotorS.isEnabled = isEnabled
+    emotorS.speed = speed
+    emotorS.distance = distance
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetEMotorS", c_int(api.masterId), c_int(-1), byref(emotorS), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+# 控制盒IO同步
+
+def SetIOMultiplexingExtEx(api, address, multiplex, isQueued=0):
+    api = connection(api)
+    ret = SetIOMultiplexingExt(api, address, multiplex, isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+
+def SetIOPWMExtEx(api, address, frequency, dutyCycle,  isQueued=0):
+    api = connection(api)
+    ret = SetIOPWMExt(api, address, frequency, dutyCycle,  isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+
+
+def SetIODOExtEx(api, address, level, isQueued=0):
+    api = connection(api)
+    ret = SetIODOExt(api, address, level, isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+
+
+def SetEMotorExtEx(api, index, isEnabled, speed, isQueued=0):
+    api = connection(api)
+    ret = SetEMotorExt(api, index, isEnabled, speed, isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+
+
+def SetEMotorSExtEx(api, index, isEnabled, speed, distance, isQueued=0):
+    api = connection(api)
+    ret = SetEMotorSExt(api, index, isEnabled, speed, distance, isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
@@ -0,0 +1,132 @@
+"""------------------------------------------------------------------------------
+Magician Lite / Magic Box specific wrappers, split out of DobotDllType.
+
+DobotDllType imports this module the first time one of these names is used,
+so dType.SetLSpeedRatioEx(api, ...) keeps working and pick-and-place programs
+that never touch them do not pay for defining them.
+------------------------------------------------------------------------------"""
+from ctypes import *
+
+try:
+    from . import DobotDllType
+    from .DobotDllType import *
+except ImportError:
+    import DobotDllType
+    from DobotDllType import *
+
+
+ParamsMode = enum(JOG=0,
+                other=1)
+
+
+#Magician Lite 2019-11-05 Magician Lite单独的API
+
+
+def SetLostStepEnableAndParamsCmd(api, enable, threshlod, isQueued=0):
+    api = connection(api)
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetLostStepEnableAndParamsCmd", c_int(api.masterId), c_int(api.slaveId), c_uint8(enable), c_float(threshlod), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetLostStepEnableAndParamsCmd(api):
+    api = connection(api)
+    enable = c_uint8(0)
+    threshlod = c_float(0)
+    result = callDobot(api, "GetLostStepEnableAndParamsCmd", c_int(api.masterId), c_int(api.slaveId), byref(enable), byref(threshlod))
+    return [enable.value, threshlod.value]
+
+
+
+def SetEndEffectorType(api, endType=0, isQueued=0):
+    api = connection(api)
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetEndEffectorType", c_int(api.masterId), c_int(api.slaveId), isQueued, c_uint8(endType), byref(queuedCmdIndex))
+    return[queuedCmdIndex.value]
+
+
+def GetEndEffectorType(api):
+    api = connection(api)
+    endType = c_uint8(0)
+    result = callDobot(api, "GetEndEffectorType", c_int(api.masterId), c_int(api.slaveId), byref(endType))
+    return [endType.value]
+
+
+def SetServoAngle(api, servoId, angle, isQueued=0):
+    api = connection(api)
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetServoAngle", c_int(api.masterId), c_int(-1), isQueued, c_uint8(servoId), c_float(angle), byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetServoAngle(api, servoId):
+    api = connection(api)
+    angle = c_float(0)
+    result = callDobot(api, "GetServoAngle", c_int(api.masterId), c_int(-1),  c_uint8(servoId) ,byref(angle))
+    return [angle.value]
+
+
+def SetArmSpeedRatio(api, paramsMode, speedRatio, isQueued=0):
+    api = connection(api)
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetArmSpeedRatio", c_int(api.masterId), c_int(api.slaveId), isQueued, c_uint8(paramsMode), c_uint8(speedRatio),  byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetArmSpeedRatio(api, paramsMode=0):
+    api = connection(api)
+    speedRatio = c_uint8(0)
+    # paramsMode = c_uint8(0)
+    result = callDobot(api, "GetArmSpeedRatio", c_int(api.masterId), c_int(api.slaveId),  c_uint8(paramsMode), byref(speedRatio))
+    return[speedRatio.value]
+
+
+def SetLSpeedRatio(api, paramsMode, speedRatio, isQueued=0):
+    api = connection(api)
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetLSpeedRatio", c_int(api.masterId), c_int(-1), isQueued, c_uint8(paramsMode), c_uint8(speedRatio), byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetLSpeedRatio(api, paramsMode):
+    api = connection(api)
+    speedRatio = c_uint8(0)
+    result = callDobot(api, "GetLSpeedRatio", c_int(api.masterId), c_int(-1), c_uint8(paramsMode), byref(speedRatio))
+    return[speedRatio.value]
+
+
+def PrintInfo(api, info):
+    api = connection(api)
+    szPara = create_string_buffer(len(info))
+    szPara.raw = info.encode("utf-8")
+    result = callDobot(api, "PrintInfo", c_int(api.masterId), c_int(-1), szPara)
+
+
+def SetProgbar(api, progbar):
+    api = connection(api)
+    result = callDobot(api, "SetProgbar", c_int(api.masterId), c_int(-1), c_uint8(progbar))
+
+#MagicianLite/Magic Box同步等待
+
+def SetEndEffectorTypeEx(api, endType=0, isQueued=1):
+    api = connection(api)
+    ret = SetEndEffectorType(api, endType, isQueued)
+    waitQueued(api, ret[0])
+
+
+def SetServoAngleEx(api, servoId, angle, isQueued=1):
+    api = connection(api)
+    ret = SetServoAngle(api, servoId, angle, isQueued)
+    waitQueued(api, ret[0], 1)
+
+
+def SetArmSpeedRatioEx(api, paramsMode=0, speedRatio=0, isQueued=1):
+    api = connection(api)
+    ret = SetArmSpeedRatio(api,paramsMode, speedRatio, isQueued)
+    waitQueued(api, ret[0])
+
+
+def SetLSpeedRatioEx(api, paramsMode, speedRatio, isQueued=1):
+    api = connection(api)
+    ret = SetLSpeedRatio(api, paramsMode, speedRatio, isQueued)
+    waitQueued(api, ret[0], 1)
@@ -0,0 +1,156 @@
+"""------------------------------------------------------------------------------
+Firmware upgrade, auto leveling, lost step and other maintenance wrappers, split out of DobotDllType.
+
+DobotDllType imports this module the first time one of these names is used,
+so dType.RestartMagicBox(api, ...) keeps working and pick-and-place programs
+that never touch them do not pay for defining them.
+------------------------------------------------------------------------------"""
+from ctypes import *
+
+try:
+    from . import DobotDllType
+    from .DobotDllType import *
+except ImportError:
+    import DobotDllType
+    from DobotDllType import *
+
+
+class UpgradeFWReadyCmd(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("fwSize", c_uint32),
+        ("md5", c_char_p)
+    ]
+        
+class AutoLevelingCmd(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("controlFlag", c_ubyte),
+        ("precision", c_float)
+        ]
+
+ZDFCalibStatus = enum(
+    ZDFCalibNotFinished=0,
+    ZDFCalibFinished=1)
+    
+UART4PeripheralsType = enum(
+    UART4PeripheralsUART = 0,
+    UART4PeripheralsWIFI = 1,
+    UART4PeripheralsBLE = 2,
+    UART4PeripheralsCH375 = 3
+    )
+    
+
+def SetAutoLevelingCmd(api, controlFlag, precision, isQueued=0):
+    api = connection(api)
+    cmd = AutoLevelingCmd()
+    cmd.controlFlag = controlFlag
+    cmd.precision = precision
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetAutoLevelingCmd", c_int(api.masterId), c_int(api.slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetAutoLevelingResult(api):
+    api = connection(api)
+    precision = c_float(0)
+    result = callDobot(api, "GetAutoLevelingResult", c_int(api.masterId), c_int(api.slaveId), byref(precision))
+    return [precision.value]
+
+
+
+
+
+def SetLostStepParams(api, threshold, isQueued=0):
+    api = connection(api)
+    queuedCmdIndex = c_uint64(0)
+    t = c_float(threshold)
+    result = callDobot(api, "SetLostStepParams", c_int(api.masterId), c_int(api.slaveId), t, isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def SetLostStepCmd(api, isQueued=0):
+    api = connection(api)
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetLostStepCmd", c_int(api.masterId), c_int(api.slaveId), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+    
+
+def GetUART4PeripheralsType(api):
+    api = connection(api)
+    type = c_uint8(0)
+    result = callDobot(api, "GetUART4PeripheralsType", c_int(api.masterId), c_int(api.topology.railSlaveId), byref(type))
+    return [type.value]
+
+    
+def SetAutoLevelingCmdEx(api, controlFlag, precision, isQueued=1):
+    api = connection(api)
+    index = SetAutoLevelingCmd(api, controlFlag, precision, isQueued)[0]
+    waitQueued(api, index)
+
+   
+def SetLostStepCmdEx(api, isQueued=1):
+    api = connection(api)
+    ret = SetLostStepCmd(api, isQueued)
+    waitQueued(api, ret[0])
+
+
+def SetUpgradeFWReadyCmd(api,fwSize, md5):
+    api = connection(api)
+    upgradeFWReadyCmd = UpgradeFWReadyCmd()
+    upgradeFWReadyCmd.fwSize = fwSize
+    try:
+        md5Bytes = bytes.fromhex(md5)
+        md5CBuf = create_string_buffer(len(md5Bytes))
+        md5CBuf.raw = md5Bytes
+        upgradeFWReadyCmd.md5 = addressof(md5CBuf)
+    except Exception as e:
+        print(e)
+
+    # # 只发送给主设备
+    # result = api.SetUpgradeFWReadyCmd(c_int(api.masterId), c_int(-1), byref(upgradeFWReadyCmd))
+    # return result
+
+    # 不能去掉等待！！！！！！，jomar 2019年5月7日 09:28:30
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "SetUpgradeFWReadyCmd", c_int(api.masterId), c_int(tempSlaveId), byref(upgradeFWReadyCmd))
+
+
+def GetUpgradeFWReadyCmd(api,fwSize, md5):
+    api = connection(api)
+    upgradeFWReadyCmd = UpgradeFWReadyCmd()
+    upgradeFWReadyCmd.fwSize = fwSize
+    isUpgrade = c_byte(0)
+    try:
+        md5Bytes = bytes.fromhex(md5)
+        md5CBuf = create_string_buffer(len(md5Bytes))
+        md5CBuf.raw = md5Bytes
+        upgradeFWReadyCmd.md5 = addressof(md5CBuf)
+    except Exception as e:
+        print(e)
+
+    # # 只发送给主设备
+    # result = api.SetUpgradeFWReadyCmd(c_int(api.masterId), c_int(-1), byref(upgradeFWReadyCmd))
+    # return result
+
+    # 不能去掉等待！！！！！！，jomar 2019年5月7日 09:28:30
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "GetUpgradeFWReadyCmd", c_int(api.masterId), c_int(tempSlaveId), byref(upgradeFWReadyCmd), byref(isUpgrade))
+    return [isUpgrade.value]
+
+
+def SetMotorMode(api, mode):
+    api = connection(api)
+    result = callDobot(api, "SetMotorMode", c_int(api.masterId), c_int(api.slaveId), c_int(mode))
+
+
+def GetMotorMode(api):
+    api = connection(api)
+    mode = c_int(0)
+    result = callDobot(api, "GetMotorMode", c_int(api.masterId), c_int(api.slaveId), byref(mode))
+    return [mode.value]
+    
+
+def RestartMagicBox(api):
+    api = connection(api)
+    result = callDobot(api, "RestartMagicBox", c_int(api.masterId), c_int(-1))
@@ -0,0 +1,269 @@
+"""------------------------------------------------------------------------------
+Color, infrared, Seeed and angle sensor wrappers, split out of DobotDllType.
+
+DobotDllType imports this module the first time one of these names is used,
+so dType.SetSeeedRgbExtEx(api, ...) keeps working and pick-and-place programs
+that never touch them do not pay for defining them.
+------------------------------------------------------------------------------"""
+from ctypes import *
+
+try:
+    from . import DobotDllType
+    from .DobotDllType import *
+except ImportError:
+    import DobotDllType
+    from DobotDllType import *
+
+
+ColorPort = enum(
+    PORT_GP1 = 0, 
+    PORT_GP2 = 1,
+    PORT_GP4 = 2,
+    PORT_GP5 = 3
+    )
+    
+InfraredPort = enum(
+    PORT_GP1 = 0, 
+    PORT_GP2 = 1,
+    PORT_GP4 = 2,
+    PORT_GP5 = 3
+    )
+
+
+def SetAngleSensorStaticError(api,  rearArmAngleError, frontArmAngleError):
+    api = connection(api)
+    c_rearArmAngleError = c_float(rearArmAngleError)
+    c_frontArmAngleError = c_float(frontArmAngleError)
+    result = callDobot(api, "SetAngleSensorStaticError", c_int(api.masterId), c_int(api.slaveId), c_rearArmAngleError, c_frontArmAngleError)
+        
+
+def GetAngleSensorStaticError(api):
+    api = connection(api)
+    rearArmAngleError = c_float(0)
+    frontArmAngleError = c_float(0)
+    result = callDobot(api, "GetAngleSensorStaticError", c_int(api.masterId), c_int(api.slaveId), byref(rearArmAngleError),  byref(frontArmAngleError))
+    return [rearArmAngleError.value, frontArmAngleError.value]
+    
+
+def SetAngleSensorCoef(api,  rearArmAngleCoef, frontArmAngleCoef):
+    api = connection(api)
+    c_rearArmAngleCoef = c_float(rearArmAngleCoef)
+    c_frontArmAngleCoef = c_float(frontArmAngleCoef)
+    result = callDobot(api, "SetAngleSensorCoef", c_int(api.masterId), c_int(api.slaveId), c_rearArmAngleCoef, c_frontArmAngleCoef)
+        
+
+def GetAngleSensorCoef(api):
+    api = connection(api)
+    rearArmAngleCoef = c_float(0)
+    frontArmAngleCoef = c_float(0)
+    result = callDobot(api, "GetAngleSensorCoef", c_int(api.masterId), c_int(api.slaveId), byref(rearArmAngleCoef),  byref(frontArmAngleCoef))
+    return [rearArmAngleCoef.value, frontArmAngleCoef.value]
+
+
+def SetBaseDecoderStaticError(api,  baseDecoderError):
+    api = connection(api)
+    c_baseDecoderError = c_float(baseDecoderError)
+    result = callDobot(api, "SetBaseDecoderStaticError", c_int(api.masterId), c_int(api.slaveId), c_baseDecoderError)
+    
+
+def GetBaseDecoderStaticError(api):
+    api = connection(api)
+    baseDecoderError = c_float(0)
+    result = callDobot(api, "GetBaseDecoderStaticError", c_int(api.masterId), c_int(api.slaveId), byref(baseDecoderError))
+    return [baseDecoderError.value]
+
+
+def SetColorSensor(api, isEnable, colorPort, version=0):
+    api = connection(api)
+    enable = c_bool(isEnable)
+    port = c_uint8(colorPort)
+    version = c_uint8(version)
+    queuedCmdIndex = c_uint64(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "SetColorSensor", c_int(api.masterId), c_int(tempSlaveId), enable, port, version, 1, byref(queuedCmdIndex))
+    
+
+def GetColorSensor(api):
+    api = connection(api)
+    r = c_ubyte(0)
+    g = c_ubyte(0)
+    b = c_ubyte(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "GetColorSensor", c_int(api.masterId), c_int(tempSlaveId), byref(r),  byref(g),  byref(b))
+    return [r.value, g.value, b.value]
+    
+
+def SetInfraredSensor(api,  isEnable, infraredPort, version=0):
+    api = connection(api)
+    enable = c_bool(isEnable)
+    port = c_uint8(infraredPort)
+    queuedCmdIndex = c_uint64(0)
+    version = c_uint8(version)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "SetInfraredSensor", c_int(api.masterId), c_int(tempSlaveId), enable, port, version, 1, byref(queuedCmdIndex))
+    
+
+def GetInfraredSensor(api, infraredPort):
+    api = connection(api)
+    port = c_uint8(infraredPort)
+    value = c_ubyte(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "GetInfraredSensor", c_int(api.masterId), c_int(tempSlaveId), port,  byref(value))
+    return [value.value]
+
+
+def GetColorSensorEx(api,  index):
+    api = connection(api)
+    result = GetColorSensor(api)
+    return result[index]
+
+
+def SetColorSensorExt(api, isEnable, colorPort, version=0, isQueued=0):
+    api = connection(api)
+    enable = c_bool(isEnable)
+    port = c_uint8(colorPort)
+    version = c_uint8(version)
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetColorSensor", c_int(api.masterId), c_int(-1), enable, port, version, isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def SetInfraredSensorExt(api,  isEnable, infraredPort, version=0, isQueued=0):
+    api = connection(api)
+    enable = c_bool(isEnable)
+    port = c_uint8(infraredPort)
+    version = c_uint8(version)
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetInfraredSensor", c_int(api.masterId), c_int(-1), enable, port, version, isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetInfraredSensorExt(api, infraredPort):
+    api = connection(api)
+    port = c_uint8(infraredPort)
+    value = c_ubyte(0)
+    
+    result = callDobot(api, "GetInfraredSensor", c_int(api.masterId), c_int(-1), port,  byref(value))
+    return [value.value]
+
+
+def GetColorSensorExt(api, index):
+    api = connection(api)
+    r = c_ubyte(0)
+    g = c_ubyte(0)
+    b = c_ubyte(0)
+    result = callDobot(api, "GetColorSensor", c_int(api.masterId), c_int(-1), byref(r),  byref(g),  byref(b))
+    return [r.value, g.value, b.value][index]
+
+
+def SetColorSensorExtEx(api, isEnable, colorPort, version=0, isQueued=0):
+    api = connection(api)
+    ret = SetColorSensorExt(api, isEnable, colorPort, version, isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+
+
+def SetInfraredSensorExtEx(api,  isEnable, infraredPort, version=0, isQueued=0):
+    api = connection(api)
+    ret = SetInfraredSensorExt(api,  isEnable, infraredPort, version, isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+
+
+#2019.08.21 by song add Seeed Sensor API    
+
+def GetSeeedColorSensorExt(api):
+    api = connection(api)
+    r = c_ushort(0)
+    g = c_ushort(0)
+    b = c_ushort(0)
+    Cct = c_ushort(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "GetSeeedColorSensor", c_int(api.masterId), c_int(tempSlaveId), byref(r),  byref(g),  byref(b), byref(Cct))
+    return [r.value, g.value, b.value, Cct.value]
+
+
+def SetSeeedColorSensorExt(api, SeeedPort,isQueued=0):
+    api = connection(api)
+    queuedCmdIndex = c_uint64(0)
+    port = c_uint8(SeeedPort)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "SetSeeedColorSensor", c_int(api.masterId), c_int(tempSlaveId), port, isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetSeeedDistanceSensorExt(api, SeeedPort):
+    api = connection(api)
+    port = c_uint8(SeeedPort)
+    distance = c_ubyte(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "GetSeeedDistanceSensor", c_int(api.masterId), c_int(tempSlaveId), port, byref(distance))
+    return [distance.value]
+
+
+def SetSeeedTempSensorExt(api, SeeedPort, isQueued=0):
+    api = connection(api)
+    port = c_uint8(SeeedPort)
+    queuedCmdIndex = c_uint64(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "SetSeeedTempSensor", c_int(api.masterId), c_int(tempSlaveId), port, isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetSeeedTempSensorExt(api):
+    api = connection(api)
+    tem = c_ushort(0)
+    hum = c_ushort(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "GetSeeedTempSensor", c_int(api.masterId), c_int(tempSlaveId), byref(tem),  byref(hum))
+    return [tem.value, hum.value]
+
+
+def SetSeeedLightSensorExt(api, SeeedPort, isQueued=0):
+    api = connection(api)
+    port = c_uint8(SeeedPort)
+    queuedCmdIndex = c_uint64(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "SetSeeedLightSensor", c_int(api.masterId), c_int(tempSlaveId), port, isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetSeeedLightSensorExt(api):
+    api = connection(api)
+    lux = c_ushort(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "GetSeeedLightSensor", c_int(api.masterId), c_int(tempSlaveId), byref(lux))
+    return [lux.value]
+
+
+def SetSeeedRgbExt(api, SeeedPort, Rgb, isQueued=0):
+    api = connection(api)
+    port = c_ubyte(SeeedPort)
+    rgb = c_float(Rgb)
+    queuedCmdIndex = c_uint64(0)
+    tempSlaveId = api.topology.railSlaveId
+    result = callDobot(api, "SetSeeedRgb", c_int(api.masterId), c_int(tempSlaveId), port, rgb, isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+# seeed传感器同步指令
+
+def SetSeeedColorSensorExtEx(api, SeeedPort,isQueued=0):
+    api = connection(api)
+    ret = SetSeeedColorSensorExt(api, SeeedPort, isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+
+
+def SetSeeedTempSensorExtEx(api, SeeedPort, isQueued=0):
+    api = connection(api)
+    ret = SetSeeedTempSensorExt(api, SeeedPort, isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+
+
+def SetSeeedLightSensorExtEx(api, SeeedPort, isQueued=0):
+    api = connection(api)
+    ret = SetSeeedLightSensorExt(api, SeeedPort, isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
+
+
+def SetSeeedRgbExtEx(api, SeeedPort, Rgb, isQueued=0):
+    api = connection(api)
+    ret = SetSeeedRgbExt(api, SeeedPort, Rgb, isQueued)
+    waitQueued(api, ret[0], api.topology.railSlot)
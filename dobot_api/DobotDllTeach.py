@@ -0,0 +1,223 @@
+"""------------------------------------------------------------------------------
+JOG (jogging) and hand-hold teaching wrappers, split out of DobotDllType.
+
+DobotDllType imports this module the first time one of these names is used,
+so dType.SetJOGCmd(api, ...) keeps working and pick-and-place programs
+that never touch them do not pay for defining them.
+------------------------------------------------------------------------------"""
+from ctypes import *
+
+try:
+    from . import DobotDllType
+    from .DobotDllType import *
+except ImportError:
+    import DobotDllType
+    from DobotDllType import *
+
+
+    
+##################  点动示教部分   ##################
+
+class JOGJointParams(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("joint1Velocity", c_float), 
+        ("joint2Velocity", c_float), 
+        ("joint3Velocity", c_float), 
+        ("joint4Velocity", c_float), 
+        ("joint1Acceleration", c_float),
+        ("joint2Acceleration", c_float),
+        ("joint3Acceleration", c_float),
+        ("joint4Acceleration", c_float)
+        ]
+
+class JOGCoordinateParams(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("xVelocity", c_float), 
+        ("yVelocity", c_float), 
+        ("zVelocity", c_float), 
+        ("rVelocity", c_float), 
+        ("xAcceleration", c_float),
+        ("yAcceleration", c_float),
+        ("zAcceleration", c_float),
+        ("rAcceleration", c_float)
+        ]
+
+class JOGCommonParams(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("velocityRatio", c_float), 
+        ("accelerationRatio", c_float)
+        ]
+
+class JOGLParams(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("velocity",  c_float), 
+        ("acceleration",  c_float)
+    ]
+
+
+JC = enum(JogIdle=0, 
+    JogAPPressed=1, 
+    JogANPressed=2, 
+    JogBPPressed=3, 
+    JogBNPressed=4,
+    JogCPPressed=5,
+    JogCNPressed=6,
+    JogDPPressed=7,
+    JogDNPressed=8,
+    JogEPPressed=9,
+    JogENPressed=10)
+
+class JOGCmd(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("isJoint", c_byte), 
+        ("cmd", c_byte)
+        ]
+    
+
+def SetHHTTrigMode(api, hhtTrigMode):
+    api = connection(api)
+    result = callDobot(api, "SetHHTTrigMode", c_int(api.masterId), c_int(api.slaveId), hhtTrigMode)
+        
+
+def GetHHTTrigMode(api):
+    api = connection(api)
+    hhtTrigMode = c_int(0)
+    result = callDobot(api, "GetHHTTrigMode", c_int(api.masterId), c_int(api.slaveId), byref(hhtTrigMode))
+    return [hhtTrigMode.value]
+
+
+def SetHHTTrigOutputEnabled(api, isEnabled):
+    api = connection(api)
+    result = callDobot(api, "SetHHTTrigOutputEnabled", c_int(api.masterId), c_int(api.slaveId), isEnabled)
+
+
+def GetHHTTrigOutputEnabled(api):
+    api = connection(api)
+    isEnabled = c_int32(0)
+    result = callDobot(api, "GetHHTTrigOutputEnabled", c_int(api.masterId), c_int(api.slaveId), byref(isEnabled))
+    return [isEnabled.value]
+
+
+def GetHHTTrigOutput(api):
+    api = connection(api)
+    isAvailable = c_int32(0)
+    result = api.flowControl.callOnce(api, "GetHHTTrigOutput", c_int(api.masterId), c_int(api.slaveId), byref(isAvailable))
+    if result != DobotCommunicate.DobotCommunicate_NoError or isAvailable.value == 0:
+        return [False]
+    return [True]
+
+
+def SetJOGJointParams(api, j1Velocity, j1Acceleration, j2Velocity, j2Acceleration, j3Velocity, j3Acceleration, j4Velocity, j4Acceleration, isQueued=0):
+    api = connection(api)
+    jogParam = JOGJointParams()
+    jogParam.joint1Velocity = j1Velocity
+    jogParam.joint1Acceleration = j1Acceleration
+    jogParam.joint2Velocity = j2Velocity
+    jogParam.joint2Acceleration = j2Acceleration
+    jogParam.joint3Velocity = j3Velocity
+    jogParam.joint3Acceleration = j3Acceleration
+    jogParam.joint4Velocity = j4Velocity
+    jogParam.joint4Acceleration = j4Acceleration
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetJOGJointParams", c_int(api.masterId), c_int(api.slaveId), byref(jogParam), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetJOGJointParams(api):
+    api = connection(api)
+    param = JOGJointParams()
+    result = callDobot(api, "GetJOGJointParams", c_int(api.masterId), c_int(api.slaveId), byref(param))
+    return [param.joint1Velocity, param.joint1Acceleration, param.joint2Velocity, param.joint2Acceleration, param.joint3Velocity, param.joint3Acceleration, param.joint4Velocity, param.joint4Acceleration]
+
+
+def SetJOGCoordinateParams(api, xVelocity, xAcceleration, yVelocity, yAcceleration, zVelocity, zAcceleration, rVelocity, rAcceleration, isQueued=0):
+    api = connection(api)
+    param = JOGCoordinateParams()
+    param.xVelocity = xVelocity
+    param.xAcceleration = xAcceleration
+    param.yVelocity = yVelocity
+    param.yAcceleration = yAcceleration
+    param.zVelocity = zVelocity
+    param.zAcceleration = zAcceleration
+    param.rVelocity = rVelocity
+    param.rAcceleration = rAcceleration
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetJOGCoordinateParams", c_int(api.masterId), c_int(api.slaveId), byref(param), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+
+
+def GetJOGCoordinateParams(api):
+    api = connection(api)
+    param = JOGCoordinateParams()
+    result = callDobot(api, "GetJOGCoordinateParams", c_int(api.masterId), c_int(api.slaveId), byref(param))
+    return [param.xVelocity, param.xAcceleration, param.yVelocity, param.yVelocity, param.zVelocity, param.zAcceleration, param.rVelocity, param.rAcceleration]
+
+
+def SetJOGLParams(api, velocity, acceleration, isQueued=0):
+    api = connection(api)
+    # 滑轨的特殊处理
+    tempSlaveId = api.topology.railSlaveId
+
+    param = JOGLParams()
+    param.velocity = velocity
+    param.acceleration = acceleration
+    queuedCmdIndex = c_uint64(0)
+    result = callDobot(api, "SetJOGLParams", c_int(api.masterId), c_int(tempSlaveId), byref(param), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
+    
+
+def GetJOGLParams(api):
+    api = connection(api)
+    # 滑轨的特殊处理
+    tempSlaveId = api.topology.railSlaveId
+
+    param = JOGLParams()
+    result = callDobot(api, "GetJOGLParams", c_int(api.masterId), c_int(tempSlaveId), byref(param))
+    return [param.velocity,  param.acceleration]
+
+
+def SetJOGCommonParams(api, value_velocityratio, value_accelerationratio, isQueued=0):
+    api = connection(api)
+    param = JOGCommonParams()
+    param.velocityRatio = value_velocityratio
+    param.accelerationRatio = value_accelerationratio
+    queuedCmdIndex = c_uint64(0)
+
+    # 滑轨的特殊处理
+    for slaveId in api.topology.queueSlaveIds:
+        result = callDobot(api, "SetJOGCommonParams", c_int(api.masterId), c_int(slaveId), byref(param), isQueued, byref(queuedCmdIndex))
+
+    return [queuedCmdIndex.value]
+
+
+def GetJOGCommonParams(api):
+    api = connection(api)
+    param = JOGCommonParams()
+    result = callDobot(api, "GetJOGCommonParams", c_int(api.masterId), c_int(api.slaveId), byref(param))
+    return [param.velocityRatio, param.accelerationRatio]
+
+
+def SetJOGCmd(api, isJoint, cmd, isQueued=0):
+    api = connection(api)
+    # 滑轨的特殊处理: the rail jog commands (9, 10) go to the controller
+    if api.topology.splitRail and (cmd == 9 or cmd == 10):
+        tempSlaveId = api.topology.railSlaveId
+    else:
+        tempSlaveId = api.topology.armSlaveId
+
+    cmdParam = JOGCmd()
+    cmdParam.isJoint = isJoint
+    cmdParam.cmd = cmd
+    queuedCmdIndex = c_uint64(0)
+
+    if cmd == 0:
+        result = callDobot(api, "SetJOGCmd", c_int(api.masterId), c_int(-1), byref(cmdParam), isQueued, byref(queuedCmdIndex))
+        result = callDobot(api, "SetJOGCmd", c_int(api.masterId), c_int(api.slaveId), byref(cmdParam), isQueued, byref(queuedCmdIndex))
+    else:
+        result = callDobot(api, "SetJOGCmd", c_int(api.masterId), c_int(tempSlaveId), byref(cmdParam), isQueued, byref(queuedCmdIndex))
+    return [queuedCmdIndex.value]
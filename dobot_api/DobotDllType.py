@@ -1,6 +1,8 @@
 from ctypes import *
-import time,  platform
+import time
 import os
+import threading
+import importlib
 
 def enum(**enums):
     return type("Enum", (), enums)
@@ -18,9 +20,6 @@ DevType = enum(Idle=0,
                MagicianLite=3
                )
 
-ParamsMode = enum(JOG=0,
-                other=1)
-
 
 
 class DevInfo(Structure):
@@ -41,13 +40,6 @@ class ConnectInfo(Structure):
         ("slaveDevInfo2", DevInfo)
     ]
 
-class UpgradeFWReadyCmd(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("fwSize", c_uint32),
-        ("md5", c_char_p)
-    ]
-
 class DeviceID(Structure):
     _pack_ = 1
     _fields_ = [
@@ -56,9 +48,6 @@ class DeviceID(Structure):
         ("deviceID3", c_uint32)
     ]
 
-masterId = 0
-slaveId = 0
-
 class DeviceVersion(Structure):
     _pack_ = 1
     _fields_ = [
@@ -122,96 +111,10 @@ class HOMECmd(Structure):
         ("temp", c_float)
         ]
         
-class AutoLevelingCmd(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("controlFlag", c_ubyte),
-        ("precision", c_float)
-        ]
-        
-class EMotor(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("index", c_byte), 
-        ("isEnabled", c_byte), 
-        ("speed", c_int32)
-        ]
-        
-class EMotorS(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("index", c_byte), 
-        ("isEnabled", c_byte), 
-        ("speed", c_int32), 
-        ("distance", c_uint32)
-        ]
-        
 ##################  Arm orientation定义   ##################
 ArmOrientation = enum(
     LeftyArmOrientation=0, 
     RightyArmOrientation=1)
-    
-##################  点动示教部分   ##################
-
-class JOGJointParams(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("joint1Velocity", c_float), 
-        ("joint2Velocity", c_float), 
-        ("joint3Velocity", c_float), 
-        ("joint4Velocity", c_float), 
-        ("joint1Acceleration", c_float),
-        ("joint2Acceleration", c_float),
-        ("joint3Acceleration", c_float),
-        ("joint4Acceleration", c_float)
-        ]
-
-class JOGCoordinateParams(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("xVelocity", c_float), 
-        ("yVelocity", c_float), 
-        ("zVelocity", c_float), 
-        ("rVelocity", c_float), 
-        ("xAcceleration", c_float),
-        ("yAcceleration", c_float),
-        ("zAcceleration", c_float),
-        ("rAcceleration", c_float)
-        ]
-
-class JOGCommonParams(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("velocityRatio", c_float), 
-        ("accelerationRatio", c_float)
-        ]
-
-class JOGLParams(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("velocity",  c_float), 
-        ("acceleration",  c_float)
-    ]
-
-
-JC = enum(JogIdle=0, 
-    JogAPPressed=1, 
-    JogANPressed=2, 
-    JogBPPressed=3, 
-    JogBNPressed=4,
-    JogCPPressed=5,
-    JogCNPressed=6,
-    JogDPPressed=7,
-    JogDNPressed=8,
-    JogEPPressed=9,
-    JogENPressed=10)
-
-class JOGCmd(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("isJoint", c_byte), 
-        ("cmd", c_byte)
-        ]
 
 ##################  再现运动部分   ##################
 
@@ -271,30 +174,6 @@ PTPMode = enum(
     
     PTPJUMPMOVLXYZMode=9)
 
-InputPin = enum( InputPinNone=0,
-    InputPin1=1,
-    InputPin2=2,
-    InputPin3=3,
-    InputPin4=4,
-    InputPin5=5,
-    InputPin6=6,
-    InputPin7=7,
-    InputPin8=8)
-
-InputLevel = enum(InputLevelBoth=0,
-    InputLevelLow=1,
-    InputLevelHigh=2)
-
-OutputPin = enum(
-    SIGNALS_O1=1,
-    SIGNALS_O2=2,
-    SIGNALS_O3=3,
-    SIGNALS_O4=4,
-    SIGNALS_O5=5,
-    SIGNALS_O6=6,
-    SIGNALS_O7=7,
-    SIGNALS_O8=8)
-
 class PTPCmd(Structure):
     _pack_ = 1
     _fields_ = [
@@ -420,74 +299,6 @@ class WAITCmd(Structure):
         ("waitTime", c_uint32)
         ]
 
-TRIGMode = enum(
-    TRIGInputIOMode = 0,
-    TRIGADCMode=1)
-    
-TRIGInputIOCondition = enum(
-    TRIGInputIOEqual = 0,
-    TRIGInputIONotEqual=1)
-    
-TRIGADCCondition = enum(
-    TRIGADCLT = 0,
-    TRIGADCLE=1, 
-    TRIGADCGE = 2,
-    TRIGADCGT=3)
-    
-class TRIGCmd(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("address", c_byte), 
-        ("mode", c_byte), 
-        ("condition",  c_byte), 
-        ("threshold", c_uint16)
-        ]
-
-GPIOType = enum(
-    GPIOTypeDummy = 0, 
-    GPIOTypeDO = 1,
-    GPIOTypePWM=2,
-    GPIOTypeDI=3, 
-    GPIOTypeADC=4, 
-    GPIOTypeDIPU=5, 
-    GPIOTypeDIPD=6)
-    
-class IOMultiplexing(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("address", c_byte), 
-        ("multiplex", c_byte)
-        ]
-        
-class IODO(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("address", c_byte), 
-        ("level", c_byte)
-        ]
-        
-class IOPWM(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("address", c_byte), 
-        ("frequency", c_float), 
-        ("dutyCycle", c_float)
-        ]
-        
-class IODI(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("address", c_byte), 
-        ("level", c_byte)
-        ]
-        
-class IOADC(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("address", c_byte), 
-        ("value", c_int)
-        ]
-
 class UserParams(Structure):
     _pack_ = 1
     _fields_ = [
@@ -500,69 +311,6 @@ class UserParams(Structure):
         ("params7", c_float),
         ("params8", c_float)
         ]
-
-ZDFCalibStatus = enum(
-    ZDFCalibNotFinished=0,
-    ZDFCalibFinished=1)
-    
-
-class WIFIIPAddress(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("dhcp", c_byte),
-        ("addr1", c_byte),
-        ("addr2", c_byte),
-        ("addr3", c_byte),
-        ("addr4", c_byte),
-        ]
-        
-class WIFINetmask(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("addr1", c_byte),
-        ("addr2", c_byte),
-        ("addr3", c_byte),
-        ("addr4", c_byte),
-        ]
-        
-class WIFIGateway(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("addr1", c_byte),
-        ("addr2", c_byte),
-        ("addr3", c_byte),
-        ("addr4", c_byte),
-        ]
-        
-class WIFIDNS(Structure):
-    _pack_ = 1
-    _fields_ = [
-        ("addr1", c_byte),
-        ("addr2", c_byte),
-        ("addr3", c_byte),
-        ("addr4", c_byte),
-        ]
-
-ColorPort = enum(
-    PORT_GP1 = 0, 
-    PORT_GP2 = 1,
-    PORT_GP4 = 2,
-    PORT_GP5 = 3
-    )
-    
-InfraredPort = enum(
-    PORT_GP1 = 0, 
-    PORT_GP2 = 1,
-    PORT_GP4 = 2,
-    PORT_GP5 = 3
-    )
-    
-UART4PeripheralsType = enum(
-    UART4PeripheralsUART = 0,
-    UART4PeripheralsWIFI = 1,
-    UART4PeripheralsBLE = 2,
-    UART4PeripheralsCH375 = 3
-    )
 ##################  API result   ##################
 
 DobotConnect = enum(
@@ -579,20 +327,615 @@ DobotCommunicate = enum(
     )
 
 isUsingLinearRail = False
+
+
+class DobotError(Exception):
+    """A DLL call returned an error that retrying cannot fix."""
+
+    def __init__(self, func, result, message=None):
+        self.func = func
+        self.result = result
+        if message is None:
+            message = "%s failed: %s" % (func, DobotCommunicateNames.get(result, result))
+        super().__init__(message)
+
+
+class DobotBufferFullError(DobotError):
+    """The controller queue stayed full and stopped advancing."""
+
+
+class DobotTimeoutError(DobotError):
+    """The controller did not answer, even after retrying."""
+
+
+class DobotInvalidParamsError(DobotError):
+    pass
+
+
+class DobotInvalidDeviceError(DobotError):
+    pass
+
+
+class DobotAlarmError(DobotError):
+    """The arm raised alarms, which stopped its command queue."""
+
+    def __init__(self, alarms, index=None):
+        self.alarms = alarms    # [(code, name)]
+        self.index = index      # first queued command that did not run, if known
+        message = "arm alarm: " + ", ".join("%s (0x%02X)" % (name, code) for code, name in alarms)
+        if index is not None:
+            message += "; queue stopped before command %d" % index
+        super().__init__("GetAlarmsState", DobotCommunicate.DobotCommunicate_NoError, message)
+
+
+DobotCommunicateNames = {
+    DobotCommunicate.DobotCommunicate_NoError: "NoError",
+    DobotCommunicate.DobotCommunicate_BufferFull: "BufferFull",
+    DobotCommunicate.DobotCommunicate_Timeout: "Timeout",
+    DobotCommunicate.DobotCommunicate_InvalidParams: "InvalidParams",
+    DobotCommunicate.DobotCommunicate_InvalidDevice: "InvalidDevice"}
+
+DobotErrors = {
+    DobotCommunicate.DobotCommunicate_BufferFull: DobotBufferFullError,
+    DobotCommunicate.DobotCommunicate_Timeout: DobotTimeoutError,
+    DobotCommunicate.DobotCommunicate_InvalidParams: DobotInvalidParamsError,
+    DobotCommunicate.DobotCommunicate_InvalidDevice: DobotInvalidDeviceError}
+
+CArgObject = type(byref(c_int()))
+
+# Creates the CallStats of each new connection's FlowControl while call stats are on; set by
+# DobotCallStats.enable(), which load() imports when DOBOT_CALL_STATS is set.
+newCallStats = None
+
+
+class FlowControl:
+    """
+    Retry policy and backpressure for DLL calls.
+
+    BufferFull blocks the caller until the controller queue index advances (the queue has room again),
+    Timeout is retried with exponential backoff up to maxTimeoutRetries times, and InvalidParams /
+    InvalidDevice raise immediately. Occupancy is the last issued queued index minus the last
+    index reported by GetQueuedCmdCurrentIndex.
+    """
+
+    def __init__(self):
+        self.queueCapacity = None   # set to block before sending instead of waiting for BufferFull
+        self.maxTimeoutRetries = 5
+        self.stallTimeout = 60.0    # seconds a full queue may go without advancing before giving up
+        self.retryDelay = 0.005
+        self.maxRetryDelay = 0.1
+        # DobotCallStats.CallStats timing every call per function, or None (the default) to skip that.
+        self.callStats = newCallStats() if newCallStats is not None else None
+        # DobotJournal.Journal recording every queued command sent, or None; see DobotJournal.record().
+        self.journal = None
+        self.resetMetrics()
+
+    def resetMetrics(self):
+        self.calls = 0
+        self.bufferFullRetries = 0
+        self.timeoutRetries = 0
+        self.errors = 0
+        self.blockedCount = 0
+        self.blockedTime = 0.0
+        self.issuedIndex = 0
+        self.executedIndex = 0
+        self.maxOccupancy = 0
+
+    def occupancy(self):
+        return max(0, self.issuedIndex - self.executedIndex)
+
+    def metrics(self):
+        return {
+            "calls": self.calls,
+            "bufferFullRetries": self.bufferFullRetries,
+            "timeoutRetries": self.timeoutRetries,
+            "errors": self.errors,
+            "blockedCount": self.blockedCount,
+            "blockedTime": self.blockedTime,
+            "issuedIndex": self.issuedIndex,
+            "executedIndex": self.executedIndex,
+            "occupancy": self.occupancy(),
+            "maxOccupancy": self.maxOccupancy}
+
+    def call(self, api, name, args):
+        # Queued setters end with (..., isQueued, byref(queuedCmdIndex)).
+        queuedIndex = None
+        if len(args) > 1 and args[-2]:
+            last = args[-1]
+            if last.__class__ is CArgObject and last._obj.__class__ is c_uint64:
+                queuedIndex = last._obj
+        return self.callBound(api, name, getattr(api, name), args, queuedIndex)
+
+    def callBound(self, api, name, func, args, queuedIndex=None):
+        """call() for a function already resolved; queuedIndex is the c_uint64 a queued command writes."""
+        stats = self.callStats
+        if stats is not None:
+            began = time.perf_counter()
+            bufferFulls = 0
+        if queuedIndex is not None and self.queueCapacity and self.occupancy() >= self.queueCapacity:
+            self.waitForSpace(api, name, self.executedIndex, untilBelowCapacity=True)
+
+        timeouts = 0
+        try:
+            while True:
+                if stats is None:
+                    with api.lock:
+                        result = func(*args)
+                else:
+                    start = time.perf_counter()
+                    with api.lock:
+                        result = func(*args)
+                    stats.attempt(name, time.perf_counter() - start)
+                self.calls += 1
+                if result == 0:     # DobotCommunicate_NoError
+                    if queuedIndex is not None:
+                        issued = queuedIndex.value
+                        if issued > self.issuedIndex:
+                            self.issuedIndex = issued
+                            if issued - self.executedIndex > self.maxOccupancy:
+                                self.maxOccupancy = issued - self.executedIndex
+                        if self.journal is not None:
+                            self.journal.write(name, args, issued)
+                    if stats is not None:
+                        stats.call(name, time.perf_counter() - began, bufferFulls, timeouts)
+                    return result
+                if result == DobotCommunicate.DobotCommunicate_BufferFull:
+                    self.bufferFullRetries += 1
+                    if stats is not None:
+                        bufferFulls += 1
+                    self.waitForSpace(api, name, self.executedIndex)
+                elif result == DobotCommunicate.DobotCommunicate_Timeout and timeouts < self.maxTimeoutRetries:
+                    self.timeoutRetries += 1
+                    time.sleep(min(self.retryDelay * 2 ** timeouts, self.maxRetryDelay))
+                    timeouts += 1
+                else:
+                    self.errors += 1
+                    raise DobotErrors.get(result, DobotError)(name, result)
+        except BaseException:
+            if stats is not None:
+                stats.call(name, time.perf_counter() - began, bufferFulls, timeouts, failed=True)
+            raise
+
+    def callOnce(self, api, name, *args):
+        """api.<name>(*args) with no retry or error check, timed in callStats if there is one."""
+        func = getattr(api, name)
+        if self.callStats is None:
+            return func(*args)
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.callStats.attempt(name, elapsed)
+            self.callStats.call(name, elapsed)
+
+    def waitForSpace(self, api, name, baseline, untilBelowCapacity=False):
+        start = lastProgress = time.monotonic()
+        delay = self.retryDelay
+        try:
+            while True:
+                current = max(GetQueuedCmdCurrentIndex(api))
+                now = time.monotonic()
+                if current > self.executedIndex:
+                    self.executedIndex = current
+                    lastProgress = now
+                if untilBelowCapacity:
+                    if self.occupancy() < self.queueCapacity:
+                        return
+                elif current > baseline:
+                    return
+                if now - lastProgress > self.stallTimeout:
+                    self.errors += 1
+                    raise DobotBufferFullError(
+                        name, DobotCommunicate.DobotCommunicate_BufferFull,
+                        "%s: command queue full and not advancing for %g s "
+                        "(was SetQueuedCmdStartExec called?)" % (name, self.stallTimeout))
+                time.sleep(delay)
+                delay = min(delay * 2, self.maxRetryDelay)
+        finally:
+            self.blockedCount += 1
+            self.blockedTime += time.monotonic() - start
+            if self.callStats is not None:
+                self.callStats.blocked(name, time.monotonic() - start)
+
+
+def callDobot(api, name, *args):
+    """api.<name>(*args), retried and throttled by the connection's flowControl. Raises DobotError on failure."""
+    api = connection(api)
+    return api.flowControl.call(api, name, args)
+
+
 ##################  API func   ##################
 
 #parker add 2018 8 29 添加Wifi设置模块退出标志位
 QuitDobotApiFlag = True
 
-def load():
+# Shared simulated library, so every load() in one process sees the same virtual arms.
+simLib = None
+
+# Calls made for every motion command or queue poll. DobotConnection resolves these once instead of looking
+# them up by name on every call. The argument types are only declared when checkArgs is set: ctypes
+# then runs from_param on every argument, which measured about three times slower than passing
+# plain ints and byref() objects unchecked (benchmarks/call_overhead.py).
+hotPrototypes = {
+    "SetPTPCmd": (c_int, c_int, POINTER(PTPCmd), c_bool, POINTER(c_uint64)),
+    "SetCPCmd": (c_int, c_int, POINTER(CPCmd), c_bool, POINTER(c_uint64)),
+    "GetPose": (c_int, c_int, POINTER(Pose)),
+    "GetQueuedCmdCurrentIndex": (c_int, c_int, POINTER(c_uint64)),
+    "SetEndEffectorSuctionCup": (c_int, c_int, c_bool, c_bool, c_bool, POINTER(c_uint64)),
+    "SetEndEffectorGripper": (c_int, c_int, c_bool, c_bool, c_bool, POINTER(c_uint64))}
+
+
+class Topology:
+    """
+    How one connection addresses its devices: which slave id each kind of call goes to.
+
+    ConnectDobot picks the topology once from the device types it found, so the wrappers loop over
+    these precomputed ids instead of re-testing masterDevType / slaveDevType on every call. The base
+    class is a single device, e.g. a MagicianLite on its own; a new setup is supported by subclassing
+    it and adding the class to topologyClasses.
+    """
+    # Rail and arm have separate command queues, so rail moves are sent to the controller and mirrored.
+    splitRail = False
+    # GetDeviceVersion also reports the hardware version.
+    hardwareVersion = True
+
+    def __init__(self, slaveId):
+        self.armSlaveId = slaveId
+        # Linear rail (L axis) and other settings that belong to the controller.
+        self.railSlaveId = slaveId
+        # Slot of GetQueuedCmdCurrentIndex that tracks commands sent to railSlaveId.
+        self.railSlot = 0
+        # Every command queue: queue start / stop / clear and common parameters go to each of them.
+        self.queueSlaveIds = (slaveId,)
+        # (slaveId, slot): where GetQueuedCmdCurrentIndex and SetHOMECmd read each queue's index;
+        # slot 0 is the arm, slot 1 the controller.
+        self.indexSlots = ((slaveId, 0),)
+
+    @classmethod
+    def matches(cls, masterDevType, slaveDevType):
+        return True
+
+    def homeWaitSlots(self, withRail):
+        """Queues SetHOMECmdEx waits on."""
+        return self.indexSlots
+
+    def __repr__(self):
+        return "<%s armSlaveId=%d>" % (self.__class__.__name__, self.armSlaveId)
+
+
+class MagicianTopology(Topology):
+    """A Magician connected directly."""
+    hardwareVersion = False
+
+    @classmethod
+    def matches(cls, masterDevType, slaveDevType):
+        return masterDevType == DevType.Magician
+
+
+class ControllerLiteTopology(Topology):
+    """A MagicianLite behind a controller box, which drives the linear rail."""
+    splitRail = True
+
+    def __init__(self, slaveId):
+        Topology.__init__(self, slaveId)
+        self.railSlaveId = -1
+        self.railSlot = 1
+        self.queueSlaveIds = (-1, slaveId)
+        self.indexSlots = ((-1, 1), (slaveId, 0))
+
+    @classmethod
+    def matches(cls, masterDevType, slaveDevType):
+        return masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite
+
+    def homeWaitSlots(self, withRail):
+        return self.indexSlots if withRail else self.indexSlots[1:]
+
+
+class ControllerTopology(Topology):
+    """A controller box with no arm attached."""
+
+    def __init__(self, slaveId):
+        Topology.__init__(self, -1)
+        self.railSlot = 1
+        self.indexSlots = ((-1, 1),)
+
+    @classmethod
+    def matches(cls, masterDevType, slaveDevType):
+        return masterDevType == DevType.Conntroller and slaveDevType == DevType.Idle
+
+
+# Checked in order by selectTopology; Topology itself is the fallback.
+topologyClasses = [MagicianTopology, ControllerLiteTopology, ControllerTopology]
+
+
+def selectTopology(masterDevType, slaveDevType, slaveId):
+    for cls in topologyClasses:
+        if cls.matches(masterDevType, slaveDevType):
+            return cls(slaveId)
+    return Topology(slaveId)
+
+
+class DobotConnection:
+    """
+    One connected arm: what load() returns and what every wrapper takes as `api`.
+
+    It holds the device ids and types ConnectDobot found, its own FlowControl and a lock taken around
+    every DLL call, so several arms can be driven from one process with a thread per arm:
+
+        arms = [dType.load() for port in ports]
+        for arm, port in zip(arms, ports):
+            dType.ConnectDobot(arm, port, 115200)
+
+    The hot calls are resolved once, and their wrappers reuse the command structures and output
+    buffers below instead of allocating them per call; each group of buffers has its own lock. Every
+    other attribute falls through to the library, so a connection works wherever the CDLL object did.
+    """
+
+    def __init__(self, lib, checkArgs=False):
+        self.lib = lib
+        self.masterId = 0
+        self.slaveId = 0
+        self.masterDevType = 0
+        self.slaveDevType = 0
+        self.lock = threading.RLock()
+        self.flowControl = FlowControl()
+        # Called as targetCheck(api, name, mode, x, y, z, rHead) before a motion command is sent; raises
+        # DobotInvalidParamsError if the target is out of reach. Set by DobotReach.install().
+        self.targetCheck = None
+        self.endEffectorBias = None     # (xBias, yBias, zBias) last set, None for the default tool
+        for name, argtypes in hotPrototypes.items():
+            if isinstance(lib, CDLL):
+                # lib[name] is a new function object, so the prototype does not leak into lib.<name>.
+                func = lib[name]
+                func.restype = c_int
+                if checkArgs:
+                    func.argtypes = argtypes
+            else:
+                func = getattr(lib, name)
+            setattr(self, name, func)
+
+        # SetPTPCmd / SetCPCmd / end effector setters
+        self.cmdLock = threading.Lock()
+        self.ptpCmd = PTPCmd()
+        self.ptpCmdRef = byref(self.ptpCmd)
+        self.cpCmd = CPCmd()
+        self.cpCmdRef = byref(self.cpCmd)
+        self.cmdIndex = c_uint64(0)
+        self.cmdIndexRef = byref(self.cmdIndex)
+
+        # GetQueuedCmdCurrentIndex
+        self.indexLock = threading.Lock()
+        self.currentIndex = c_uint64(0)
+        self.currentIndexRef = byref(self.currentIndex)
+        self.currentIndex1 = c_uint64(0)
+        self.currentIndex1Ref = byref(self.currentIndex1)
+
+        # GetPose
+        self.poseLock = threading.Lock()
+        self.pose = Pose()
+        self.poseRef = byref(self.pose)
+
+        self.setTopology(Topology(self.slaveId))
+
+    def setTopology(self, topology):
+        """Use `topology` for this connection; called by ConnectDobot once the ids are known."""
+        self.topology = topology
+        # GetQueuedCmdCurrentIndex arguments for each queue, written into currentIndex / currentIndex1.
+        self.indexArgs = tuple((self.masterId, slaveId, self.currentIndex1Ref if slot else self.currentIndexRef)
+                               for slaveId, slot in topology.indexSlots)
+
+    def __getattr__(self, name):
+        if name == "lib":
+            raise AttributeError(name)
+        return getattr(self.lib, name)
+
+    def __repr__(self):
+        return "<DobotConnection masterId=%d slaveId=%d>" % (self.masterId, self.slaveId)
+
+
+# Connection for a bare library object passed in by older code, keyed by id(lib).
+libraryConnections = {}
+
+# Connection the module-level masterId / slaveId / masterDevType / slaveDevType / flowControl refer to:
+# the one most recently connected by ConnectDobot, as the old module globals did.
+defaultConnection = None
+
+
+def connection(api):
+    """The DobotConnection for `api`, which is either a connection or a bare library object."""
+    if api.__class__ is DobotConnection:
+        return api
+    conn = libraryConnections.get(id(api))
+    if conn is None or conn.lib is not api:
+        if getattr(api.__class__, "isDaemonClient", False):
+            raise TypeError("a DobotDaemon client is not a connection: call this helper through "
+                            "dType.helper(api, module, func, ...) or use the library in this process")
+        conn = libraryConnections[id(api)] = DobotConnection(api)
+    return conn
+
+
+# Peripheral groups live in their own modules and are imported on first use of one of their names.
+peripheralModules = {
+    "DobotDllTeach": (
+        "JOGJointParams", "JOGCoordinateParams", "JOGCommonParams", "JOGLParams", "JC", "JOGCmd",
+        "SetHHTTrigMode", "GetHHTTrigMode", "SetHHTTrigOutputEnabled", "GetHHTTrigOutputEnabled",
+        "GetHHTTrigOutput", "SetJOGJointParams", "GetJOGJointParams", "SetJOGCoordinateParams",
+        "GetJOGCoordinateParams", "SetJOGLParams", "GetJOGLParams", "SetJOGCommonParams", "GetJOGCommonParams",
+        "SetJOGCmd"),
+    "DobotDllIO": (
+        "EMotor", "EMotorS", "InputPin", "InputLevel", "OutputPin", "TRIGMode", "TRIGInputIOCondition",
+        "TRIGADCCondition", "TRIGCmd", "GPIOType", "IOMultiplexing", "IODO", "IOPWM", "IODI", "IOADC",
+        "SetTRIGCmd", "SetIOMultiplexing", "GetIOMultiplexing", "SetIODO", "GetIODO", "SetIOPWM", "GetIOPWM",
+        "GetIODI", "SetEMotor", "SetEMotorS", "GetIOADC", "SetIOMultiplexingEx", "SetIODOEx", "SetEMotorEx",
+        "SetEMotorSEx", "SetIOPWMEx", "SetTRIGCmdEx", "SetIOMultiplexingExt", "GetIOMultiplexingExt",
+        "GetIOADCExt", "SetIOPWMExt", "GetIOPWMExt", "GetIODIExt", "SetIODOExt", "GetIODOExt", "SetEMotorExt",
+        "SetEMotorSExt", "SetIOMultiplexingExtEx", "SetIOPWMExtEx", "SetIODOExtEx", "SetEMotorExtEx",
+        "SetEMotorSExtEx"),
+    "DobotDllSensors": (
+        "ColorPort", "InfraredPort", "SetAngleSensorStaticError", "GetAngleSensorStaticError",
+        "SetAngleSensorCoef", "GetAngleSensorCoef", "SetBaseDecoderStaticError", "GetBaseDecoderStaticError",
+        "SetColorSensor", "GetColorSensor", "SetInfraredSensor", "GetInfraredSensor", "GetColorSensorEx",
+        "SetColorSensorExt", "SetInfraredSensorExt", "GetInfraredSensorExt", "GetColorSensorExt",
+        "SetColorSensorExtEx", "SetInfraredSensorExtEx", "GetSeeedColorSensorExt", "SetSeeedColorSensorExt",
+        "GetSeeedDistanceSensorExt", "SetSeeedTempSensorExt", "GetSeeedTempSensorExt",
+        "SetSeeedLightSensorExt", "GetSeeedLightSensorExt", "SetSeeedRgbExt", "SetSeeedColorSensorExtEx",
+        "SetSeeedTempSensorExtEx", "SetSeeedLightSensorExtEx", "SetSeeedRgbExtEx"),
+    "DobotDllWifi": (
+        "WIFIIPAddress", "WIFINetmask", "WIFIGateway", "WIFIDNS", "GetWIFIConnectStatus", "SetWIFIConfigMode",
+        "GetWIFIConfigMode", "SetWIFISSID", "GetWIFISSID", "SetWIFIPassword", "GetWIFIPassword",
+        "SetWIFIIPAddress", "GetWIFIIPAddress", "SetWIFINetmask", "GetWIFINetmask", "SetWIFIGateway",
+        "GetWIFIGateway", "SetWIFIDNS", "GetWIFIDNS"),
+    "DobotDllMaintenance": (
+        "UpgradeFWReadyCmd", "AutoLevelingCmd", "ZDFCalibStatus", "UART4PeripheralsType", "SetAutoLevelingCmd",
+        "GetAutoLevelingResult", "SetLostStepParams", "SetLostStepCmd", "GetUART4PeripheralsType",
+        "SetAutoLevelingCmdEx", "SetLostStepCmdEx", "SetUpgradeFWReadyCmd", "GetUpgradeFWReadyCmd",
+        "SetMotorMode", "GetMotorMode", "RestartMagicBox"),
+    "DobotDllLite": (
+        "ParamsMode", "SetLostStepEnableAndParamsCmd", "GetLostStepEnableAndParamsCmd", "SetEndEffectorType",
+        "GetEndEffectorType", "SetServoAngle", "GetServoAngle", "SetArmSpeedRatio", "GetArmSpeedRatio",
+        "SetLSpeedRatio", "GetLSpeedRatio", "PrintInfo", "SetProgbar", "SetEndEffectorTypeEx",
+        "SetServoAngleEx", "SetArmSpeedRatioEx", "SetLSpeedRatioEx")}
+
+peripheralNames = {name: module for module, names in peripheralModules.items() for name in names}
+
+
+def loadPeripheral(moduleName):
+    """Import a peripheral group and copy its names into this module."""
+    if __package__:
+        module = importlib.import_module("." + moduleName, __package__)
+    else:
+        module = importlib.import_module(moduleName)
+    for name in peripheralModules[moduleName]:
+        globals()[name] = getattr(module, name)
+    return module
+
+
+def __getattr__(name):
+    if name in ("masterId", "slaveId", "masterDevType", "slaveDevType"):
+        return getattr(defaultConnection, name) if defaultConnection is not None else 0
+    if name == "flowControl":
+        if defaultConnection is None:
+            raise AttributeError("flowControl: no Dobot connected yet")
+        return defaultConnection.flowControl
+    moduleName = peripheralNames.get(name)
+    if moduleName is not None:
+        return getattr(loadPeripheral(moduleName), name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(peripheralNames))
+
+
+def collectCallStats():
+    if __package__:
+        module = importlib.import_module(".DobotCallStats", __package__)
+    else:
+        module = importlib.import_module("DobotCallStats")
+    module.enableFromEnvironment()
+
+
+def load(simulate=None):
+    # simulate: number of virtual arms to drive instead of the vendor library.
+    # Defaults to the DOBOT_SIMULATE environment variable; DOBOT_SIM_SCALE speeds up simulated time,
+    # DOBOT_SIM_LATENCY and DOBOT_SIM_CONNECT_TIME add the wall seconds a serial call / ConnectDobot take.
+    if newCallStats is None and os.environ.get("DOBOT_CALL_STATS", "0") not in ("", "0"):
+        collectCallStats()
+    if simulate is None:
+        simulate = int(os.environ.get("DOBOT_SIMULATE", "0") or 0)
+    if simulate:
+        return loadSim(arms=int(simulate), timeScale=float(os.environ.get("DOBOT_SIM_SCALE", "1")),
+                       callLatency=float(os.environ.get("DOBOT_SIM_LATENCY", "0")),
+                       connectTime=float(os.environ.get("DOBOT_SIM_CONNECT_TIME", "0")))
+
+    import platform
     if platform.system() == "Windows":
         print("您用的dll是64位，为了顺利运行，请保证您的python环境也是64位")
         print("python环境是：",platform.architecture())
-        return CDLL("./dobot_api/DobotDll.dll",  RTLD_GLOBAL)
+        return DobotConnection(CDLL("./dobot_api/DobotDll.dll",  RTLD_GLOBAL))
     elif platform.system() == "Darwin":
-        return CDLL("./libDobotDll.dylib",  RTLD_GLOBAL)
+        return DobotConnection(CDLL("./libDobotDll.dylib",  RTLD_GLOBAL))
     elif platform.system() == "Linux":
-        return cdll.loadLibrary("libDobotDll.so")
+        return DobotConnection(CDLL("libDobotDll.so",  RTLD_GLOBAL))
+
+
+def loadSim(arms=1, timeScale=1.0, **kwargs):
+    global simLib
+    if simLib is None:
+        try:
+            from .DobotSim import SimDobotDll
+        except ImportError:
+            from DobotSim import SimDobotDll
+        simLib = SimDobotDll(arms=arms, timeScale=timeScale, **kwargs)
+    return DobotConnection(simLib)
+
+
+# Each hook is called as hook(api, name, args, queuedCmdIndex) after a queued motion command
+# (name and args of the wrapper) has been sent, and with queuedCmdIndex None after a queue control
+# call, ConnectDobot or a SetPTPJumpParams that took effect immediately.
+queuedCmdHooks = []
+
+
+def notifyQueuedCmd(api, name, args, queuedCmdIndex=None):
+    for hook in queuedCmdHooks:
+        hook(api, name, args, queuedCmdIndex)
+
+
+# Called as homeFilter(api, temp, isQueued) before SetHOMECmd is sent: queue indexes it returns are
+# returned instead of homing, None sends the command. Set by DobotHome, which ConnectDobot imports.
+homeFilter = None
+
+
+def trackHome(api, runTime):
+    if __package__:
+        module = importlib.import_module(".DobotHome", __package__)
+    else:
+        module = importlib.import_module("DobotHome")
+    module.connected(api, runTime)
+
+
+def checkReach(api):
+    if __package__:
+        module = importlib.import_module(".DobotReach", __package__)
+    else:
+        module = importlib.import_module("DobotReach")
+    module.install(api)
+
+
+# Deadline of the waits in the *Ex helpers: None waits as long as it takes, "auto" fails well past the
+# predicted time, a number is seconds. DOBOT_EX_TIMEOUT sets it; a timed out wait raises DobotTimeoutError.
+exTimeout = os.environ.get("DOBOT_EX_TIMEOUT") or None
+if exTimeout not in (None, "auto"):
+    exTimeout = float(exTimeout)
+
+
+def watchQueue(api):
+    # Import DobotCompletion so its queuedCmdHooks entry sees every command from the connection on,
+    # including SetQueuedCmdStartExec, which the poller needs to predict when commands finish. The
+    # alarms already set now (the power-up reset alarm, one left from an earlier session) are latched.
+    if __package__:
+        module = importlib.import_module(".DobotCompletion", __package__)
+    else:
+        module = importlib.import_module("DobotCompletion")
+    module.getQueueWatcher(api).readAlarmBaseline()
+
+
+def recordJournal(api):
+    if __package__:
+        module = importlib.import_module(".DobotJournal", __package__)
+    else:
+        module = importlib.import_module("DobotJournal")
+    module.recordFromEnvironment(api)
+
+
+def waitQueued(api, index, slot=0):
+    """Block until queued command `index` has been executed on queue `slot`, with no polling of its own."""
+    if __package__:
+        module = importlib.import_module(".DobotCompletion", __package__)
+    else:
+        module = importlib.import_module("DobotCompletion")
+    return module.waitQueued(api, index, slot, exTimeout)
 
 
 def dSleep(ms):
@@ -603,12 +946,14 @@ def gettime():
 
 
 def SetDebugEnable(api, flag=False):
-    result = api.SetDebugEnable(flag)
+    api = connection(api)
+    result = api.flowControl.callOnce(api, "SetDebugEnable", flag)
 
 
 def SearchDobot(api,  maxLen=1000):
+    api = connection(api)
     szPara = create_string_buffer(1000) #((len(str(maxLen)) + 4) * maxLen + 10)
-    l = api.SearchDobot(szPara,  maxLen)
+    l = api.flowControl.callOnce(api, "SearchDobot", szPara,  maxLen)
     if l == 0:
         return []
     ret = szPara.value.decode("utf-8") 
@@ -625,115 +970,100 @@ def SearchDobot(api,  maxLen=1000):
         
     return list(fix(ret.split(" ")))
     
-masterId = 0
-slaveId = 0
-masterDevType = 0
-slaveDevType = 0
-
-
 def ConnectDobot(api, portName, baudrate):
-    global masterId, slaveId, masterDevType, slaveDevType
+    global defaultConnection
+    api = connection(api)
 
     szPara = create_string_buffer(100)
     szPara.raw = portName.encode("utf-8") 
     connectInfo = ConnectInfo()
 
-    result = api.ConnectDobot(szPara, baudrate, byref(connectInfo))
+    result = api.flowControl.callOnce(api, "ConnectDobot", szPara, baudrate, byref(connectInfo))
     if result != DobotConnect.DobotConnect_NoError:
         return [result, 0, 0, 0, 0, 0, 0, 0]
-    masterId = connectInfo.masterDevInfo.devId
-    masterDevType = connectInfo.masterDevInfo.type
+    api.masterId = connectInfo.masterDevInfo.devId
+    api.masterDevType = connectInfo.masterDevInfo.type
+    defaultConnection = api
     try:
-        if masterDevType == DevType.Conntroller:
+        if api.masterDevType == DevType.Conntroller:
             if connectInfo.slaveDevInfo1.type == 0 and connectInfo.slaveDevInfo2.type == 0:
-                slaveId = -1
-                slaveDevType = 0
+                api.slaveId = -1
+                api.slaveDevType = 0
                 try:
                     fwName = str(connectInfo.masterDevInfo.firmwareName, encoding="utf-8").strip(b'\x00'.decode())
                     fwVer = str(connectInfo.masterDevInfo.firwareVersion, encoding="utf-8").strip(b'\x00'.decode())
-                    # print("masterId: ", masterId, connectInfo.slaveDevInfo1.devId, connectInfo.slaveDevInfo2.devId, fwName, fwVer)
+                    # print("masterId: ", api.masterId, connectInfo.slaveDevInfo1.devId, connectInfo.slaveDevInfo2.devId, fwName, fwVer)
                 except Exception as e:
                     print(e)
             else:
-                slaveId = connectInfo.slaveDevInfo1.devId if connectInfo.slaveDevInfo1.type != DevType.Idle else connectInfo.slaveDevInfo2.devId
+                api.slaveId = connectInfo.slaveDevInfo1.devId if connectInfo.slaveDevInfo1.type != DevType.Idle else connectInfo.slaveDevInfo2.devId
                 fwName = str(connectInfo.slaveDevInfo1.firmwareName, encoding="utf-8").strip(b'\x00'.decode()) if connectInfo.slaveDevInfo1.type != DevType.Idle else str(connectInfo.slaveDevInfo2.firmwareName, encoding="utf-8").strip(b'\x00'.decode())
                 fwVer = str(connectInfo.slaveDevInfo1.firwareVersion, encoding="utf-8").strip(b'\x00'.decode()) if connectInfo.slaveDevInfo1.type != DevType.Idle else str(connectInfo.slaveDevInfo2.firwareVersion, encoding="utf-8").strip(b'\x00'.decode())
-                slaveDevType = connectInfo.slaveDevInfo1.type if connectInfo.slaveDevInfo1.type != DevType.Idle else connectInfo.slaveDevInfo2.type
-                # slaveDevType = dType.DevType.MagicianLite  # for test
+                api.slaveDevType = connectInfo.slaveDevInfo1.type if connectInfo.slaveDevInfo1.type != DevType.Idle else connectInfo.slaveDevInfo2.type
+                # api.slaveDevType = dType.DevType.MagicianLite  # for test
         else:
-            slaveId = 0
-            slaveDevType = 0
+            api.slaveId = 0
+            api.slaveDevType = 0
             fwName = str(connectInfo.masterDevInfo.firmwareName, encoding="utf-8").strip(b'\x00'.decode())
             fwVer = str(connectInfo.masterDevInfo.firwareVersion, encoding="utf-8").strip(b'\x00'.decode())
 
     except Exception as e:
         print(e)
-    return [result, masterDevType, slaveDevType, fwName, fwVer, masterId, slaveId, connectInfo.masterDevInfo.runTime]
+    api.setTopology(selectTopology(api.masterDevType, api.slaveDevType, api.slaveId))
+    notifyQueuedCmd(api, "ConnectDobot", ())
+    trackHome(api, connectInfo.masterDevInfo.runTime)
+    if os.environ.get("DOBOT_REACH_CHECK", "0") not in ("", "0"):
+        checkReach(api)
+    watchQueue(api)
+    if os.environ.get("DOBOT_JOURNAL"):
+        recordJournal(api)
+    return [result, api.masterDevType, api.slaveDevType, fwName, fwVer, api.masterId, api.slaveId, connectInfo.masterDevInfo.runTime]
 
 
 def DisconnectDobot(api):
-    api.DisconnectDobot(c_int(masterId))
+    api = connection(api)
+    if api.flowControl.journal is not None:
+        api.flowControl.journal.flush()
+    api.flowControl.callOnce(api, "DisconnectDobot", c_int(api.masterId))
 
 
 def GetMarlinVersion(api):
-    api.GetMarlinVersion(c_int(masterId), c_int(slaveId))
+    api = connection(api)
+    api.flowControl.callOnce(api, "GetMarlinVersion", c_int(api.masterId), c_int(api.slaveId))
 
 
 def PeriodicTask(api):
-    api.PeriodicTask()
+    api = connection(api)
+    api.flowControl.callOnce(api, "PeriodicTask")
 
 
 def SetCmdTimeout(api, times):
-    api.SetCmdTimeout(c_int(masterId), times)
+    api = connection(api)
+    api.flowControl.callOnce(api, "SetCmdTimeout", c_int(api.masterId), times)
 
 
 
 def DobotExec(api):
-    return [api.DobotExec()]
+    api = connection(api)
+    return [api.flowControl.callOnce(api, "DobotExec")]
 
 
 def GetQueuedCmdCurrentIndex(api):
-    queuedCmdIndex = c_uint64(0)
-    queuedCmdIndex1 = c_uint64(0)
-    if masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite:
-        # if isUsingLinearRail:
-        while(True):
-            result = api.GetQueuedCmdCurrentIndex(c_int(masterId), c_int(-1), byref(queuedCmdIndex1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(2)
-                continue
-            break
-        while(True):
-            result = api.GetQueuedCmdCurrentIndex(c_int(masterId), c_int(slaveId), byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(2)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.Idle: 
-        while(True):
-            result = api.GetQueuedCmdCurrentIndex(c_int(masterId), c_int(-1), byref(queuedCmdIndex1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(2)
-                continue
-            break
-    else:
-        while(True):
-            result = api.GetQueuedCmdCurrentIndex(c_int(masterId), c_int(slaveId), byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(2)
-                continue
-            break
-    return [queuedCmdIndex.value, queuedCmdIndex1.value]
+    api = connection(api)
+    with api.indexLock:
+        queuedCmdIndex = api.currentIndex
+        queuedCmdIndex1 = api.currentIndex1
+        queuedCmdIndex.value = 0
+        queuedCmdIndex1.value = 0
+        for args in api.indexArgs:
+            result = api.flowControl.callBound(api, "GetQueuedCmdCurrentIndex", api.GetQueuedCmdCurrentIndex, args)
+        return [queuedCmdIndex.value, queuedCmdIndex1.value]
 
 
 def GetQueuedCmdMotionFinish(api):
+    api = connection(api)
     isFinish = c_bool(False)
-    while(True):
-        result = api.GetQueuedCmdMotionFinish(c_int(masterId), c_int(slaveId),byref(isFinish))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(2)
-            continue
-        break
+    result = callDobot(api, "GetQueuedCmdMotionFinish", c_int(api.masterId), c_int(api.slaveId),byref(isFinish))
 
     if isFinish.value != None:
         return [isFinish.value]
@@ -741,389 +1071,155 @@ def GetQueuedCmdMotionFinish(api):
         return [False]
 
 
-def SetQueuedCmdStartExec(api):
-    # 特殊处理
-    if slaveDevType == DevType.Magician:
-        while (True):
-            result = api.SetQueuedCmdStartExec(c_int(masterId), c_int(slaveId))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite:
-        while (True):
-            result = api.SetQueuedCmdStartExec(c_int(masterId), c_int(-1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-        while (True):
-            result = api.SetQueuedCmdStartExec(c_int(masterId), c_int(slaveId))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.Idle:
-        while(True):
-            result = api.SetQueuedCmdStartExec(c_int(masterId), c_int(-1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    else:
-        while (True):
-            result = api.SetQueuedCmdStartExec(c_int(masterId), c_int(slaveId))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
+def queueControl(api, name):
+    # Queue start / stop / clear go to every command queue of the topology.
+    api = connection(api)
+    for slaveId in api.topology.queueSlaveIds:
+        result = callDobot(api, name, c_int(api.masterId), c_int(slaveId))
+    notifyQueuedCmd(api, name, ())
+    return result
 
 
+def SetQueuedCmdStartExec(api):
+    queueControl(api, "SetQueuedCmdStartExec")
+
 
 def SetQueuedCmdStopExec(api):
-    # 滑轨特殊处理
-    if slaveDevType == DevType.Magician:
-        while (True):
-            result = api.SetQueuedCmdStopExec(c_int(masterId), c_int(slaveId))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite:
-        while (True):
-            result = api.SetQueuedCmdStopExec(c_int(masterId), c_int(-1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-        while (True):
-            result = api.SetQueuedCmdStopExec(c_int(masterId), c_int(slaveId))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.Idle:
-        while(True):
-            result = api.SetQueuedCmdStartExec(c_int(masterId), c_int(-1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    else:
-        while (True):
-            result = api.SetQueuedCmdStopExec(c_int(masterId), c_int(slaveId))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-
-       
- 
+    queueControl(api, "SetQueuedCmdStopExec")
+
+
 def SetQueuedCmdForceStopExec(api):
-    # 滑轨特殊处理
-    if slaveDevType == DevType.Magician:
-        while (True):
-            result = api.SetQueuedCmdForceStopExec(c_int(masterId), c_int(slaveId))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite:
-        while (True):
-            result = api.SetQueuedCmdForceStopExec(c_int(masterId), c_int(-1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-        while (True):
-            result = api.SetQueuedCmdForceStopExec(c_int(masterId), c_int(slaveId))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.Idle:
-        while(True):
-            result = api.SetQueuedCmdForceStopExec(c_int(masterId), c_int(-1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    else:
-        while (True):
-            result = api.SetQueuedCmdForceStopExec(c_int(masterId), c_int(slaveId))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
+    queueControl(api, "SetQueuedCmdForceStopExec")
 
-    
 
 def SetQueuedCmdStartDownload(api,  totalLoop, linePerLoop):
-    while(True):
-        result = api.SetQueuedCmdStartDownload(c_int(masterId), c_int(slaveId), totalLoop, linePerLoop)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    api = connection(api)
+    result = callDobot(api, "SetQueuedCmdStartDownload", c_int(api.masterId), c_int(api.slaveId), totalLoop, linePerLoop)
+    notifyQueuedCmd(api, "SetQueuedCmdStartDownload", (totalLoop, linePerLoop))
         
 
 def SetQueuedCmdStopDownload(api):
-    while(True):
-        result = api.SetQueuedCmdStopDownload(c_int(masterId), c_int(slaveId))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    api = connection(api)
+    result = callDobot(api, "SetQueuedCmdStopDownload", c_int(api.masterId), c_int(api.slaveId))
+    notifyQueuedCmd(api, "SetQueuedCmdStopDownload", ())
     
 
 def SetQueuedCmdClear(api):
-    # 滑轨特殊处理
-    # return [api.SetQueuedCmdClear(c_int(masterId), c_int(slaveId))]
-    if slaveDevType == DevType.Magician:
-        while(True):
-            result = api.SetQueuedCmdClear(c_int(masterId), c_int(slaveId))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite:
-        while (True):
-            result = api.SetQueuedCmdClear(c_int(masterId), c_int(-1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-        while (True):
-            result = api.SetQueuedCmdClear(c_int(masterId), c_int(slaveId))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.Idle:
-        while(True):
-            result = api.SetQueuedCmdClear(c_int(masterId), c_int(-1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    else:
-        while (True):
-            result = api.SetQueuedCmdClear(c_int(masterId), c_int(slaveId))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    return [result]
+    return [queueControl(api, "SetQueuedCmdClear")]
 
 
 def SetDeviceSN(api, str): 
+    api = connection(api)
     szPara = create_string_buffer(25)
     szPara.raw = str.encode("utf-8")
-    while(True):
-        result = api.SetDeviceSN(c_int(masterId), c_int(slaveId), szPara)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetDeviceSN", c_int(api.masterId), c_int(api.slaveId), szPara)
 
 
 def GetDeviceSN(api): 
+    api = connection(api)
     szPara = create_string_buffer(25)
-    while(True):
-        result = api.GetDeviceSN(c_int(masterId), c_int(slaveId), szPara,  25)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetDeviceSN", c_int(api.masterId), c_int(api.slaveId), szPara,  25)
     ret = szPara.value.decode("utf-8") 
     return [ret]
 
 
 def SetDeviceName(api, str):
+    api = connection(api)
     szPara = create_string_buffer(len(str) * 4)
     szPara.raw = str.encode("utf-8")
-    while(True):
-        result = api.SetDeviceName(c_int(masterId), c_int(slaveId), szPara)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetDeviceName", c_int(api.masterId), c_int(api.slaveId), szPara)
         
 
 def SetDeviceNumName(api, num): 
+    api = connection(api)
     cNum = c_int(num)
-    while(True):
-        result = api.SetDeviceName(c_int(masterId), c_int(slaveId), cNum)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetDeviceName", c_int(api.masterId), c_int(api.slaveId), cNum)
 
 
 def GetDeviceName(api): 
+    api = connection(api)
     szPara = create_string_buffer(66)
-    while(True):
-        result = api.GetDeviceName(c_int(masterId), c_int(slaveId), szPara,  100)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetDeviceName", c_int(api.masterId), c_int(api.slaveId), szPara,  100)
     ret = szPara.value.decode("utf-8")
     return [ret]
     
 
 def GetDeviceVersion(api):
+    api = connection(api)
     deviceVersion = DeviceVersion()
-    if (masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle)):
-        while(True):
-            result = api.GetDeviceVersion(c_int(masterId), c_int(-1), byref(deviceVersion))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-        return [deviceVersion.fw_majorVersion, deviceVersion.fw_minorVersion, deviceVersion.fw_revision, deviceVersion.fw_alphaVersion,
-            deviceVersion.hw_majorVersion, deviceVersion.hw_minorVersion, deviceVersion.hw_revision, deviceVersion.hw_alphaVersion]
-    elif masterDevType == DevType.MagicianLite:
-        while(True):
-            result = api.GetDeviceVersion(c_int(masterId), c_int(slaveId), byref(deviceVersion))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-        return [deviceVersion.fw_majorVersion, deviceVersion.fw_minorVersion, deviceVersion.fw_revision, deviceVersion.fw_alphaVersion,
-            deviceVersion.hw_majorVersion, deviceVersion.hw_minorVersion, deviceVersion.hw_revision, deviceVersion.hw_alphaVersion]
-
-    elif masterDevType == DevType.Magician:
-        while(True):
-            result = api.GetDeviceVersion(c_int(masterId), c_int(slaveId), byref(deviceVersion))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
+    result = callDobot(api, "GetDeviceVersion", c_int(api.masterId), c_int(api.topology.railSlaveId), byref(deviceVersion))
+    if not api.topology.hardwareVersion:
         return [deviceVersion.fw_majorVersion, deviceVersion.fw_minorVersion, deviceVersion.fw_revision, deviceVersion.fw_alphaVersion]
+    return [deviceVersion.fw_majorVersion, deviceVersion.fw_minorVersion, deviceVersion.fw_revision, deviceVersion.fw_alphaVersion,
+        deviceVersion.hw_majorVersion, deviceVersion.hw_minorVersion, deviceVersion.hw_revision, deviceVersion.hw_alphaVersion]
 
 
 def SetDeviceWithL(api, isWithL, version=0, isQueued=0):
+    api = connection(api)
     # 滑轨的特殊处理
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
+    tempSlaveId = api.topology.railSlaveId
 
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        print(tempSlaveId)
-        result = api.SetDeviceWithL(c_int(masterId), c_int(tempSlaveId), c_bool(isWithL), c_uint8(version), c_bool(isQueued), byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetDeviceWithL", c_int(api.masterId), c_int(tempSlaveId), c_bool(isWithL), c_uint8(version), c_bool(isQueued), byref(queuedCmdIndex))
     return [queuedCmdIndex.value]
 
 
 def GetDeviceWithL(api):
+    api = connection(api)
     # 滑轨的特殊处理
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
+    tempSlaveId = api.topology.railSlaveId
 
     isWithL = c_bool(False)
-    while(True):
-        result = api.GetDeviceWithL(c_int(masterId), c_int(tempSlaveId), byref(isWithL))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetDeviceWithL", c_int(api.masterId), c_int(tempSlaveId), byref(isWithL))
     return [isWithL.value]
 
 
 def GetDeviceTime(api):
+    api = connection(api)
     time = c_uint32(0)
-    while(True):
-        result = api.GetDeviceTime(c_int(masterId), c_int(slaveId), byref(time))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetDeviceTime", c_int(api.masterId), c_int(api.slaveId), byref(time))
     return [time.value]
 
 
 def GetDeviceID(api):
+    api = connection(api)
     deviceID = DeviceID()
-    CommunicateCount = 0
-    timeout = False
-    while(True):
-        result = api.GetDeviceID(c_int(masterId), c_int(-1), byref(deviceID))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            if CommunicateCount > 3:
-                timeout = True
-                break
-            else:
-                CommunicateCount += 1
-                dSleep(5)
-                continue
-        timeout = False
-        break
-    if timeout:
-        return [result, 0, 0, 0]
-    else:
-        return [result, deviceID.deviceID1, deviceID.deviceID2, deviceID.deviceID3]
+    try:
+        result = callDobot(api, "GetDeviceID", c_int(api.masterId), c_int(-1), byref(deviceID))
+    except DobotError as e:
+        return [e.result, 0, 0, 0]
+    return [result, deviceID.deviceID1, deviceID.deviceID2, deviceID.deviceID3]
 
 
 def GetDeviceInfo(api):
+    api = connection(api)
     info = DeviceCountInfo()
-    while(True):
-        result = api.GetDeviceInfo(c_int(masterId), c_int(slaveId), byref(info))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetDeviceInfo", c_int(api.masterId), c_int(api.slaveId), byref(info))
     return [info.deviceRunTime, info.devicePowerOn, info.devicePowerOff]
 
 
 def ResetPose(api, manual, rearArmAngle, frontArmAngle):
+    api = connection(api)
     c_rearArmAngle = c_float(rearArmAngle)
     c_frontArmAngle = c_float(frontArmAngle)
-    while(True):
-        result = api.ResetPose(c_int(masterId), c_int(slaveId), manual, c_rearArmAngle, c_frontArmAngle)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "ResetPose", c_int(api.masterId), c_int(api.slaveId), manual, c_rearArmAngle, c_frontArmAngle)
 
 
 def GetPose(api):
-    pose = Pose()
-    while(True):
-        result = api.GetPose(c_int(masterId), c_int(slaveId), byref(pose))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [pose.x, pose.y, pose.z,pose.rHead, pose.joint1Angle, pose.joint2Angle, pose.joint3Angle, pose.joint4Angle]
+    api = connection(api)
+    with api.poseLock:
+        pose = api.pose
+        result = api.flowControl.callBound(api, "GetPose", api.GetPose, (api.masterId, api.slaveId, api.poseRef))
+        return [pose.x, pose.y, pose.z,pose.rHead, pose.joint1Angle, pose.joint2Angle, pose.joint3Angle, pose.joint4Angle]
 
 
 def GetPoseL(api):
+    api = connection(api)
     # 滑轨的特殊处理
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
+    tempSlaveId = api.topology.railSlaveId
 
     l = c_float(0)
-    while(True):
-        result = api.GetPoseL(c_int(masterId), c_int(tempSlaveId), byref(l))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetPoseL", c_int(api.masterId), c_int(tempSlaveId), byref(l))
     #parker add 20190524  判断返回的值是否为空
     if not math.isnan(l.value):
         return [l.value]
@@ -1132,517 +1228,168 @@ def GetPoseL(api):
 
 
 def GetKinematics(api):
+    api = connection(api)
     kinematics = Kinematics()
-    while(True):
-        result = api.GetKinematics(c_int(masterId), c_int(slaveId), byref(kinematics))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetKinematics", c_int(api.masterId), c_int(api.slaveId), byref(kinematics))
     return [kinematics.velocity, kinematics.acceleration]
 
 
 def GetAlarmsState(api,  maxLen=1000):
+    api = connection(api)
     alarmsState = create_string_buffer(maxLen) 
     #alarmsState = c_byte(0)
     len = c_int(0)
-    while(True):
-        result = api.GetAlarmsState(c_int(masterId), c_int(slaveId), alarmsState, byref(len),  maxLen)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetAlarmsState", c_int(api.masterId), c_int(api.slaveId), alarmsState, byref(len),  maxLen)
     return [alarmsState.raw, len.value]
     
 
 def ClearAllAlarmsState(api):
-    while(True):
-        result = api.ClearAllAlarmsState(c_int(masterId), c_int(slaveId))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    api = connection(api)
+    result = callDobot(api, "ClearAllAlarmsState", c_int(api.masterId), c_int(api.slaveId))
+    notifyQueuedCmd(api, "ClearAllAlarmsState", ())
 
 
 def GetUserParams(api):
+    api = connection(api)
     param = UserParams()
-    while(True):
-        result = api.GetUserParams(c_int(masterId), c_int(slaveId), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetUserParams", c_int(api.masterId), c_int(api.slaveId), byref(param))
     return [param.params1,param.params2,param.params3,param.params4,param.params5,param.params6,param.params7,param.params8]
 
 
 def SetHOMEParams(api,  x,  y,  z,  r,  isQueued=0):
+    api = connection(api)
     param = HOMEParams()
     param.x = x
     param.y = y
     param.z = z
     param.r = r
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetHOMEParams(c_int(masterId), c_int(slaveId), byref(param),  isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetHOMEParams", c_int(api.masterId), c_int(api.slaveId), byref(param),  isQueued, byref(queuedCmdIndex))
+    if isQueued:
+        notifyQueuedCmd(api, "SetHOMEParams", (x, y, z, r), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
 
 
 def GetHOMEParams(api):
+    api = connection(api)
     param = HOMEParams()
-    while(True):
-        result = api.GetHOMEParams(c_int(masterId), c_int(slaveId), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetHOMEParams", c_int(api.masterId), c_int(api.slaveId), byref(param))
     return [param.x, param.y, param.z, param.r]
 
 
 def SetHOMECmd(api, temp, isQueued=0):
+    api = connection(api)
+    if homeFilter is not None:
+        indexes = homeFilter(api, temp, isQueued)
+        if indexes is not None:
+            return indexes
     cmd = HOMECmd()
     cmd.temp = temp
-    queuedCmdIndex = c_uint64(0)
-    queuedCmdIndex1 = c_uint64(0)
-    # 滑轨的特殊处理
-    if masterDevType == DevType.Magician:
-        # 只有Magician
-        while(True):
-            result = api.SetHOMECmd(c_int(masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite:
-        # 外部控制器加MagicianLite
-        # if isUsingLinearRail:#如果使用了滑轨，发给控制盒
-        while(True):
-            result = api.SetHOMECmd(c_int(masterId), c_int(-1), byref(cmd), isQueued, byref(queuedCmdIndex1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-        while(True):
-            result = api.SetHOMECmd(c_int(masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.Idle:
-        # 外部控制器
-        # if isUsingLinearRail:
-        while(True):
-            result = api.SetHOMECmd(c_int(masterId), c_int(-1), byref(cmd), isQueued, byref(queuedCmdIndex1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    else:
-        # 其他情况
-        while(True):
-            result = api.SetHOMECmd(c_int(masterId), c_int(slaveDevType), byref(cmd), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-
-    return [queuedCmdIndex.value, queuedCmdIndex1.value]
-    
-
-def SetAutoLevelingCmd(api, controlFlag, precision, isQueued=0):
-    cmd = AutoLevelingCmd()
-    cmd.controlFlag = controlFlag
-    cmd.precision = precision
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetAutoLevelingCmd(c_int(masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
+    # [arm queue index, controller queue index]
+    indexes = [0, 0]
+    for slaveId, slot in api.topology.indexSlots:
+        queuedCmdIndex = c_uint64(0)
+        result = callDobot(api, "SetHOMECmd", c_int(api.masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
+        indexes[slot] = queuedCmdIndex.value
 
-
-def GetAutoLevelingResult(api):
-    precision = c_float(0)
-    while(True):
-        result = api.GetAutoLevelingResult(c_int(masterId), c_int(slaveId), byref(precision))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [precision.value]
+    if isQueued:
+        notifyQueuedCmd(api, "SetHOMECmd", (temp,), indexes[0] or indexes[1])
+    return indexes
 
 
 def SetArmOrientation(api,  armOrientation, isQueued=0):
+    api = connection(api)
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetArmOrientation(c_int(masterId), c_int(slaveId), armOrientation, isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetArmOrientation", c_int(api.masterId), c_int(api.slaveId), armOrientation, isQueued, byref(queuedCmdIndex))
     return [queuedCmdIndex.value]
     
 
 def GetArmOrientation(api):
+    api = connection(api)
     armOrientation = c_int32(0)
-    while(True):
-        result = api.GetArmOrientation(c_int(masterId), c_int(slaveId), byref(armOrientation))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetArmOrientation", c_int(api.masterId), c_int(api.slaveId), byref(armOrientation))
     return [armOrientation.value]
-    
-
-def SetHHTTrigMode(api, hhtTrigMode):
-    while(True):
-        result = api.SetHHTTrigMode(c_int(masterId), c_int(slaveId), hhtTrigMode)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-        
-
-def GetHHTTrigMode(api):
-    hhtTrigMode = c_int(0)
-    while(True):
-        result = api.GetHHTTrigMode(c_int(masterId), c_int(slaveId), byref(hhtTrigMode))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [hhtTrigMode.value]
-
-
-def SetHHTTrigOutputEnabled(api, isEnabled):
-    while(True):
-        result = api.SetHHTTrigOutputEnabled(c_int(masterId), c_int(slaveId), isEnabled)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-
-
-def GetHHTTrigOutputEnabled(api):
-    isEnabled = c_int32(0)
-    while(True):
-        result = api.GetHHTTrigOutputEnabled(c_int(masterId), c_int(slaveId), byref(isEnabled))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [isEnabled.value]
-
-
-def GetHHTTrigOutput(api):
-    isAvailable = c_int32(0)
-    result = api.GetHHTTrigOutput(c_int(masterId), c_int(slaveId), byref(isAvailable))
-    if result != DobotCommunicate.DobotCommunicate_NoError or isAvailable.value == 0:
-        return [False]
-    return [True]
 
    
 
 def SetEndEffectorParams(api, xBias, yBias, zBias, isQueued=0):
+    api = connection(api)
     param = EndTypeParams()
     param.xBias = xBias
     param.yBias = yBias
     param.zBias = zBias
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetEndEffectorParams(c_int(masterId), c_int(slaveId), byref(param),  isQueued,  byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetEndEffectorParams", c_int(api.masterId), c_int(api.slaveId), byref(param),  isQueued,  byref(queuedCmdIndex))
+    api.endEffectorBias = (xBias, yBias, zBias)
+    if isQueued:
+        notifyQueuedCmd(api, "SetEndEffectorParams", (xBias, yBias, zBias), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
         
 
 def GetEndEffectorParams(api):
+    api = connection(api)
     param = EndTypeParams()
-    while(True):
-        result = api.GetEndEffectorParams(c_int(masterId), c_int(slaveId), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetEndEffectorParams", c_int(api.masterId), c_int(api.slaveId), byref(param))
     return [param.xBias, param.yBias, param.zBias]
     
 
 def SetEndEffectorLaser(api, enableCtrl,  on, isQueued=0):
+    api = connection(api)
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetEndEffectorLaser(c_int(masterId), c_int(slaveId), enableCtrl,  on,  isQueued,  byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetEndEffectorLaser", c_int(api.masterId), c_int(api.slaveId), enableCtrl,  on,  isQueued,  byref(queuedCmdIndex))
+    if isQueued:
+        notifyQueuedCmd(api, "SetEndEffectorLaser", (enableCtrl, on), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
         
 
 def GetEndEffectorLaser(api):
+    api = connection(api)
     isCtrlEnabled = c_int(0)
     isOn = c_int(0)
-    while(True):
-        result = api.GetEndEffectorLaser(c_int(masterId), c_int(slaveId), byref(isCtrlEnabled),  byref(isOn))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetEndEffectorLaser", c_int(api.masterId), c_int(api.slaveId), byref(isCtrlEnabled),  byref(isOn))
     return [isCtrlEnabled.value, isOn.value]
     
 
 def SetEndEffectorSuctionCup(api, enableCtrl,  on, isQueued=0):
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetEndEffectorSuctionCup(c_int(masterId), c_int(slaveId), enableCtrl,  on,  isQueued,  byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
+    api = connection(api)
+    with api.cmdLock:
+        api.cmdIndex.value = 0
+        result = api.flowControl.callBound(api, "SetEndEffectorSuctionCup", api.SetEndEffectorSuctionCup, (api.masterId, api.slaveId, enableCtrl,  on,  isQueued,  api.cmdIndexRef), api.cmdIndex if isQueued else None)
+        index = api.cmdIndex.value
+    if isQueued:
+        notifyQueuedCmd(api, "SetEndEffectorSuctionCup", (enableCtrl, on), index)
+    return [index]
         
 
 def GetEndEffectorSuctionCup(api):
+    api = connection(api)
     enableCtrl = c_int(0)
     isOn = c_int(0)
-    while(True):
-        result = api.GetEndEffectorSuctionCup(c_int(masterId), c_int(slaveId), byref(enableCtrl),  byref(isOn))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetEndEffectorSuctionCup", c_int(api.masterId), c_int(api.slaveId), byref(enableCtrl),  byref(isOn))
     return [isOn.value]
     
 
 def SetEndEffectorGripper(api, enableCtrl,  on, isQueued=0):
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetEndEffectorGripper(c_int(masterId), c_int(slaveId), enableCtrl,  on,  isQueued,  byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
+    api = connection(api)
+    with api.cmdLock:
+        api.cmdIndex.value = 0
+        result = api.flowControl.callBound(api, "SetEndEffectorGripper", api.SetEndEffectorGripper, (api.masterId, api.slaveId, enableCtrl,  on,  isQueued,  api.cmdIndexRef), api.cmdIndex if isQueued else None)
+        index = api.cmdIndex.value
+    if isQueued:
+        notifyQueuedCmd(api, "SetEndEffectorGripper", (enableCtrl, on), index)
+    return [index]
         
 
 def GetEndEffectorGripper(api):
+    api = connection(api)
     enableCtrl = c_int(0)
     isOn = c_int(0)
-    while(True):
-        result = api.GetEndEffectorGripper(c_int(masterId), c_int(slaveId), byref(enableCtrl),  byref(isOn))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetEndEffectorGripper", c_int(api.masterId), c_int(api.slaveId), byref(enableCtrl),  byref(isOn))
     return [isOn.value]
 
 
-def SetJOGJointParams(api, j1Velocity, j1Acceleration, j2Velocity, j2Acceleration, j3Velocity, j3Acceleration, j4Velocity, j4Acceleration, isQueued=0):
-    jogParam = JOGJointParams()
-    jogParam.joint1Velocity = j1Velocity
-    jogParam.joint1Acceleration = j1Acceleration
-    jogParam.joint2Velocity = j2Velocity
-    jogParam.joint2Acceleration = j2Acceleration
-    jogParam.joint3Velocity = j3Velocity
-    jogParam.joint3Acceleration = j3Acceleration
-    jogParam.joint4Velocity = j4Velocity
-    jogParam.joint4Acceleration = j4Acceleration
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetJOGJointParams(c_int(masterId), c_int(slaveId), byref(jogParam), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetJOGJointParams(api):
-    param = JOGJointParams()
-    while(True):
-        result = api.GetJOGJointParams(c_int(masterId), c_int(slaveId), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.joint1Velocity, param.joint1Acceleration, param.joint2Velocity, param.joint2Acceleration, param.joint3Velocity, param.joint3Acceleration, param.joint4Velocity, param.joint4Acceleration]
-
-
-def SetJOGCoordinateParams(api, xVelocity, xAcceleration, yVelocity, yAcceleration, zVelocity, zAcceleration, rVelocity, rAcceleration, isQueued=0):
-    param = JOGCoordinateParams()
-    param.xVelocity = xVelocity
-    param.xAcceleration = xAcceleration
-    param.yVelocity = yVelocity
-    param.yAcceleration = yAcceleration
-    param.zVelocity = zVelocity
-    param.zAcceleration = zAcceleration
-    param.rVelocity = rVelocity
-    param.rAcceleration = rAcceleration
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetJOGCoordinateParams(c_int(masterId), c_int(slaveId), byref(param), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetJOGCoordinateParams(api):
-    param = JOGCoordinateParams()
-    while(True):
-        result = api.GetJOGCoordinateParams(c_int(masterId), c_int(slaveId), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.xVelocity, param.xAcceleration, param.yVelocity, param.yVelocity, param.zVelocity, param.zAcceleration, param.rVelocity, param.rAcceleration]
-
-
-def SetJOGLParams(api, velocity, acceleration, isQueued=0):
-    # 滑轨的特殊处理
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-
-    param = JOGLParams()
-    param.velocity = velocity
-    param.acceleration = acceleration
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetJOGLParams(c_int(masterId), c_int(tempSlaveId), byref(param), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-    
-
-def GetJOGLParams(api):
-    # 滑轨的特殊处理
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-
-    param = JOGLParams()
-    while(True):
-        result = api.GetJOGLParams(c_int(masterId), c_int(tempSlaveId), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.velocity,  param.acceleration]
-
-
-def SetJOGCommonParams(api, value_velocityratio, value_accelerationratio, isQueued=0):
-    param = JOGCommonParams()
-    param.velocityRatio = value_velocityratio
-    param.accelerationRatio = value_accelerationratio
-    queuedCmdIndex = c_uint64(0)
-
-    # 滑轨的特殊处理
-    if slaveDevType == DevType.Magician:
-        while(True):
-            result = api.SetJOGCommonParams(c_int(masterId), c_int(slaveId), byref(param), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite:
-        while(True):
-            result = api.SetJOGCommonParams(c_int(masterId), c_int(-1), byref(param), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-        while(True):
-            result = api.SetJOGCommonParams(c_int(masterId), c_int(slaveId), byref(param), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.Idle:
-        while(True):
-            result = api.SetJOGCommonParams(c_int(masterId), c_int(-1), byref(param), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    else:
-        while(True):
-            result = api.SetJOGCommonParams(c_int(masterId), c_int(slaveId), byref(param), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-
-    return [queuedCmdIndex.value]
-
-
-def GetJOGCommonParams(api):
-    param = JOGCommonParams()
-    while(True):
-        result = api.GetJOGCommonParams(c_int(masterId), c_int(slaveId), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.velocityRatio, param.accelerationRatio]
-
-
-def SetJOGCmd(api, isJoint, cmd, isQueued=0):
-    # 滑轨的特殊处理
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite:
-        if cmd == 9 or cmd == 10:
-            tempSlaveId = -1
-        else:
-            tempSlaveId = slaveId
-    else:
-        tempSlaveId = slaveId
-
-    cmdParam = JOGCmd()
-    cmdParam.isJoint = isJoint
-    cmdParam.cmd = cmd
-    queuedCmdIndex = c_uint64(0)
-
-    if cmd == 0:
-        while(True):
-            result = api.SetJOGCmd(c_int(masterId), c_int(-1), byref(cmdParam), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-        while(True):
-            result = api.SetJOGCmd(c_int(masterId), c_int(slaveId), byref(cmdParam), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    else:
-        while(True):
-            result = api.SetJOGCmd(c_int(masterId), c_int(tempSlaveId), byref(cmdParam), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    return [queuedCmdIndex.value]
-
-
 def SetPTPJointParams(api, j1Velocity, j1Acceleration, j2Velocity, j2Acceleration, j3Velocity, j3Acceleration, j4Velocity, j4Acceleration, isQueued=0):
+    api = connection(api)
     pbParam = PTPJointParams()
     pbParam.joint1Velocity = j1Velocity
     pbParam.joint1Acceleration = j1Acceleration
@@ -1653,186 +1400,127 @@ def SetPTPJointParams(api, j1Velocity, j1Acceleration, j2Velocity, j2Acceleratio
     pbParam.joint4Velocity = j4Velocity
     pbParam.joint4Acceleration = j4Acceleration
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetPTPJointParams(c_int(masterId), c_int(slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetPTPJointParams", c_int(api.masterId), c_int(api.slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
+    if isQueued:
+        notifyQueuedCmd(api, "SetPTPJointParams", (j1Velocity, j1Acceleration, j2Velocity, j2Acceleration, j3Velocity, j3Acceleration, j4Velocity, j4Acceleration), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
 
 
 def GetPTPJointParams(api):
+    api = connection(api)
     pbParam = PTPJointParams()
-    while(True):
-        result = api.GetPTPJointParams(c_int(masterId), c_int(slaveId), byref(pbParam))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetPTPJointParams", c_int(api.masterId), c_int(api.slaveId), byref(pbParam))
     return [pbParam.joint1Velocity,pbParam.joint1Acceleration,pbParam.joint2Velocity,pbParam.joint2Acceleration,pbParam.joint3Velocity,pbParam.joint3Acceleration,pbParam.joint4Velocity,pbParam.joint4Acceleration]
 
 
 def SetPTPCoordinateParams(api, xyzVelocity, xyzAcceleration, rVelocity,  rAcceleration,  isQueued=0):
+    api = connection(api)
     pbParam = PTPCoordinateParams()
     pbParam.xyzVelocity = xyzVelocity
     pbParam.rVelocity = rVelocity
     pbParam.xyzAcceleration = xyzAcceleration
     pbParam.rAcceleration = rAcceleration
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetPTPCoordinateParams(c_int(masterId), c_int(slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetPTPCoordinateParams", c_int(api.masterId), c_int(api.slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
+    if isQueued:
+        notifyQueuedCmd(api, "SetPTPCoordinateParams", (xyzVelocity, xyzAcceleration, rVelocity, rAcceleration), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
 
 
 def GetPTPCoordinateParams(api):
+    api = connection(api)
     pbParam = PTPCoordinateParams()
-    while(True):
-        result = api.GetPTPCoordinateParams(c_int(masterId), c_int(slaveId), byref(pbParam))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetPTPCoordinateParams", c_int(api.masterId), c_int(api.slaveId), byref(pbParam))
     return [pbParam.xyzVelocity, pbParam.rVelocity, pbParam.xyzAcceleration, pbParam.rAcceleration]
     
 
 def SetPTPLParams(api, velocity, acceleration, isQueued=0):
+    api = connection(api)
     # 滑轨的特殊处理
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
+    tempSlaveId = api.topology.railSlaveId
 
     param = PTPLParams()
     param.velocity = velocity
     param.acceleration = acceleration
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetPTPLParams(c_int(masterId), c_int(tempSlaveId), byref(param), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetPTPLParams", c_int(api.masterId), c_int(tempSlaveId), byref(param), isQueued, byref(queuedCmdIndex))
     return [queuedCmdIndex.value]
     
 
 def GetPTPLParams(api):
+    api = connection(api)
     # 滑轨的特殊处理
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
+    tempSlaveId = api.topology.railSlaveId
     param = PTPLParams()
-    while(True):
-        result = api.GetPTPLParams(c_int(masterId), c_int(tempSlaveId), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetPTPLParams", c_int(api.masterId), c_int(tempSlaveId), byref(param))
     return [param.velocity,  param.acceleration]
     
 
 def SetPTPJumpParams(api, jumpHeight, zLimit, isQueued=0):
+    api = connection(api)
     pbParam = PTPJumpParams()
     pbParam.jumpHeight = jumpHeight
     pbParam.zLimit = zLimit
     queuedCmdIndex = c_uint64(0)
         
-    while(True):
-        result = api.SetPTPJumpParams(c_int(masterId), c_int(slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetPTPJumpParams", c_int(api.masterId), c_int(api.slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
+    notifyQueuedCmd(api, "SetPTPJumpParams", (jumpHeight, zLimit), queuedCmdIndex.value if isQueued else None)
     return [queuedCmdIndex.value]
 
 
 def GetPTPJumpParams(api):
+    api = connection(api)
     pbParam = PTPJumpParams()
-    while(True):
-        result = api.GetPTPJumpParams(c_int(masterId), c_int(slaveId), byref(pbParam))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetPTPJumpParams", c_int(api.masterId), c_int(api.slaveId), byref(pbParam))
     return [pbParam.jumpHeight, pbParam.zLimit]
 
 
 def SetPTPCommonParams(api, velocityRatio, accelerationRatio, isQueued=0):
+    api = connection(api)
     pbParam = PTPCommonParams()
     pbParam.velocityRatio = velocityRatio
     pbParam.accelerationRatio = accelerationRatio
     queuedCmdIndex = c_uint64(0)
-    
+
     # 滑轨的特殊处理
-    if slaveDevType == DevType.Magician:
-        while(True):
-            result = api.SetPTPCommonParams(c_int(masterId), c_int(slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite:
-        while(True):
-            result = api.SetPTPCommonParams(c_int(masterId), c_int(-1), byref(pbParam), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-        while(True):
-            result = api.SetPTPCommonParams(c_int(masterId), c_int(slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    else:
-        while(True):
-            result = api.SetPTPCommonParams(c_int(masterId), c_int(slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
+    for slaveId in api.topology.queueSlaveIds:
+        result = callDobot(api, "SetPTPCommonParams", c_int(api.masterId), c_int(slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
 
+    if isQueued:
+        notifyQueuedCmd(api, "SetPTPCommonParams", (velocityRatio, accelerationRatio), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
 
 
 def GetPTPCommonParams(api):
+    api = connection(api)
     pbParam = PTPCommonParams()
-    while(True):
-        result = api.GetPTPCommonParams(c_int(masterId), c_int(slaveId), byref(pbParam ))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetPTPCommonParams", c_int(api.masterId), c_int(api.slaveId), byref(pbParam ))
     return [pbParam.velocityRatio, pbParam.accelerationRatio]
     
 
 def SetPTPCmd(api, ptpMode, x, y, z, rHead, isQueued=0):
-    cmd = PTPCmd()
-    cmd.ptpMode=ptpMode
-    cmd.x=x
-    cmd.y=y
-    cmd.z=z
-    cmd.rHead=rHead
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetPTPCmd(c_int(masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(2)
-            continue
-        break
-    return [queuedCmdIndex.value]
+    api = connection(api)
+    if api.targetCheck is not None:
+        api.targetCheck(api, "SetPTPCmd", ptpMode, x, y, z, rHead)
+    with api.cmdLock:
+        cmd = api.ptpCmd
+        cmd.ptpMode=ptpMode
+        cmd.x=x
+        cmd.y=y
+        cmd.z=z
+        cmd.rHead=rHead
+        api.cmdIndex.value = 0
+        result = api.flowControl.callBound(api, "SetPTPCmd", api.SetPTPCmd, (api.masterId, api.slaveId, api.ptpCmdRef, isQueued, api.cmdIndexRef), api.cmdIndex if isQueued else None)
+        index = api.cmdIndex.value
+    if isQueued:
+        notifyQueuedCmd(api, "SetPTPCmd", (ptpMode, x, y, z, rHead), index)
+    return [index]
     
 
 def SetPTPWithLCmd(api, ptpMode, x, y, z, rHead, l, isQueued=0):
+    api = connection(api)
+    if api.targetCheck is not None:
+        api.targetCheck(api, "SetPTPWithLCmd", ptpMode, x, y, z, rHead)
     cmd = PTPWithLCmd()
     cmd.ptpMode=ptpMode
     cmd.x=x
@@ -1843,14 +1531,7 @@ def SetPTPWithLCmd(api, ptpMode, x, y, z, rHead, l, isQueued=0):
     queuedCmdIndex = c_uint64(0)
 
     # 滑轨的特殊处理
-    if slaveDevType == DevType.Magician:
-        while(True):
-            result = api.SetPTPWithLCmd(c_int(masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(2)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite:
+    if api.topology.splitRail:
         cmd1 = PTPCmd()
         cmd1.ptpMode = ptpMode
         cmd1.x = x
@@ -1858,94 +1539,71 @@ def SetPTPWithLCmd(api, ptpMode, x, y, z, rHead, l, isQueued=0):
         cmd1.z = z
         cmd1.rHead = rHead
         queuedCmdIndex1 = c_uint64(0)
-        while(True):
-            result = api.SetPTPWithLCmd(c_int(masterId), c_int(-1), byref(cmd), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(2)
-                continue
-            break
-        while(True):
-            result = api.SetPTPCmd(c_int(masterId), c_int(slaveId), byref(cmd1), isQueued, byref(queuedCmdIndex1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(2)
-                continue
-            break
+        result = callDobot(api, "SetPTPWithLCmd", c_int(api.masterId), c_int(api.topology.railSlaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
+        result = callDobot(api, "SetPTPCmd", c_int(api.masterId), c_int(api.topology.armSlaveId), byref(cmd1), isQueued, byref(queuedCmdIndex1))
     else:
-        while(True):
-            result = api.SetPTPWithLCmd(c_int(masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(2)
-                continue
-            break
+        result = callDobot(api, "SetPTPWithLCmd", c_int(api.masterId), c_int(api.topology.armSlaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
+    if isQueued:
+        notifyQueuedCmd(api, "SetPTPWithLCmd", (ptpMode, x, y, z, rHead, l), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
-    
+
 
 def SetCPRHoldEnable(api, isEnable):
-    while(True):
-        result = api.SetCPRHoldEnable(c_int(masterId), c_int(slaveId), c_bool(isEnable))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    api = connection(api)
+    result = callDobot(api, "SetCPRHoldEnable", c_int(api.masterId), c_int(api.slaveId), c_bool(isEnable))
 
 
 def GetCPRHoldEnable(api):
+    api = connection(api)
     isEnable = c_bool(False)
-    while(True):
-        result = api.GetCPRHoldEnable(c_int(masterId), c_int(slaveId), byref(isEnable))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetCPRHoldEnable", c_int(api.masterId), c_int(api.slaveId), byref(isEnable))
     return [isEnable.value]
     
 
 def SetCPParams(api, planAcc, juncitionVel, acc, realTimeTrack = 0,  isQueued=0):
+    api = connection(api)
     parm = CPParams()
     parm.planAcc = planAcc
     parm.juncitionVel = juncitionVel
     parm.acc = acc
     parm.realTimeTrack = realTimeTrack
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetCPParams(c_int(masterId), c_int(slaveId), byref(parm), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetCPParams", c_int(api.masterId), c_int(api.slaveId), byref(parm), isQueued, byref(queuedCmdIndex))
+    if isQueued:
+        notifyQueuedCmd(api, "SetCPParams", (planAcc, juncitionVel, acc, realTimeTrack), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
 
 
 def GetCPParams(api):
+    api = connection(api)
     parm = CPParams()
-    while(True):
-        result = api.GetCPParams(c_int(masterId), c_int(slaveId), byref(parm))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetCPParams", c_int(api.masterId), c_int(api.slaveId), byref(parm))
     return [parm.planAcc, parm.juncitionVel, parm.acc, parm.realTimeTrack]
 
 
 def SetCPCmd(api, cpMode, x, y, z, velocity, isQueued=0):
-    cmd = CPCmd()
-    cmd.cpMode = cpMode
-    cmd.x = x
-    cmd.y = y
-    cmd.z = z
-    cmd.velocity = velocity
-    queuedCmdIndex = c_uint64(0)
-
-    while(True):
-        result = api.SetCPCmd(c_int(masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(2)
-            continue
-        break
-    return [queuedCmdIndex.value]
+    api = connection(api)
+    if api.targetCheck is not None:
+        api.targetCheck(api, "SetCPCmd", cpMode, x, y, z, None)
+    with api.cmdLock:
+        cmd = api.cpCmd
+        cmd.cpMode = cpMode
+        cmd.x = x
+        cmd.y = y
+        cmd.z = z
+        cmd.velocity = velocity
+        api.cmdIndex.value = 0
+        result = api.flowControl.callBound(api, "SetCPCmd", api.SetCPCmd, (api.masterId, api.slaveId, api.cpCmdRef, isQueued, api.cmdIndexRef), api.cmdIndex if isQueued else None)
+        index = api.cmdIndex.value
+    if isQueued:
+        notifyQueuedCmd(api, "SetCPCmd", (cpMode, x, y, z, velocity), index)
+    return [index]
 
 
 def SetCP2Cmd(api, cpMode, x, y, z, isQueued=0):
+    api = connection(api)
+    if api.targetCheck is not None:
+        api.targetCheck(api, "SetCP2Cmd", cpMode, x, y, z, None)
     cmd = CP2Cmd()
     cmd.cpMode = cpMode
     cmd.x = x
@@ -1954,41 +1612,35 @@ def SetCP2Cmd(api, cpMode, x, y, z, isQueued=0):
     cmd.velocity = c_float(100)
     queuedCmdIndex = c_uint64(0)
 
-    while(True):
-        result = api.SetCP2Cmd(c_int(masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(2)
-            continue
-        break
+    result = callDobot(api, "SetCP2Cmd", c_int(api.masterId), c_int(api.slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
+    if isQueued:
+        notifyQueuedCmd(api, "SetCP2Cmd", (cpMode, x, y, z), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
     
 
 def SetCPCommonParams(api, velocityRatio, accelerationRatio, isQueued=0):
+    api = connection(api)
     pbParam = CPCommonParams()
     pbParam.velocityRatio = velocityRatio
     pbParam.accelerationRatio = accelerationRatio
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetCPCommonParams(c_int(masterId), c_int(slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetCPCommonParams", c_int(api.masterId), c_int(api.slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
+    if isQueued:
+        notifyQueuedCmd(api, "SetCPCommonParams", (velocityRatio, accelerationRatio), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
 
 
 def GetCPCommonParams(api):
+    api = connection(api)
     pbParam = CPCommonParams()
-    while(True):
-        result = api.GetCPCommonParams(c_int(masterId), c_int(slaveId), byref(pbParam ))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetCPCommonParams", c_int(api.masterId), c_int(api.slaveId), byref(pbParam ))
     return [pbParam.velocityRatio, pbParam.accelerationRatio]
     
 
 def SetCPLECmd(api, cpMode, x, y, z, power, isQueued=0):
+    api = connection(api)
+    if api.targetCheck is not None:
+        api.targetCheck(api, "SetCPLECmd", cpMode, x, y, z, None)
     cmd = CPCmd()
     cmd.cpMode = cpMode
     cmd.x = x
@@ -1996,743 +1648,108 @@ def SetCPLECmd(api, cpMode, x, y, z, power, isQueued=0):
     cmd.z = z
     cmd.velocity = power
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetCPLECmd(c_int(masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(2)
-            continue
-        break
+    result = callDobot(api, "SetCPLECmd", c_int(api.masterId), c_int(api.slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
+    if isQueued:
+        notifyQueuedCmd(api, "SetCPLECmd", (cpMode, x, y, z, power), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
     
 
 def SetARCParams(api,  xyzVelocity, rVelocity, xyzAcceleration, rAcceleration,  isQueued=0):
+    api = connection(api)
     param = ARCParams()
     param.xyzVelocity = xyzVelocity
     param.rVelocity = rVelocity
     param.xyzAcceleration = xyzAcceleration
     param.rAcceleration = rAcceleration
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetARCParams(c_int(masterId), c_int(slaveId), byref(param), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetARCParams", c_int(api.masterId), c_int(api.slaveId), byref(param), isQueued, byref(queuedCmdIndex))
+    if isQueued:
+        notifyQueuedCmd(api, "SetARCParams", (xyzVelocity, rVelocity, xyzAcceleration, rAcceleration), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
 
 def GetARCParams(api):
+    api = connection(api)
     parm = ARCParams()
-    while(True):
-        result = api.GetARCParams(c_int(masterId), c_int(slaveId), byref(parm))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetARCParams", c_int(api.masterId), c_int(api.slaveId), byref(parm))
     return [parm.xyzVelocity, parm.rVelocity, parm.xyzAcceleration, parm.rAcceleration]
     
 
 def SetARCCmd(api, cirPoint, toPoint,  isQueued=0):
+    api = connection(api)
+    if api.targetCheck is not None:
+        api.targetCheck(api, "SetARCCmd", None, *cirPoint[:4])
+        api.targetCheck(api, "SetARCCmd", None, *toPoint[:4])
     cmd = ARCCmd()
     cmd.cirPoint.x = cirPoint[0];cmd.cirPoint.y = cirPoint[1];cmd.cirPoint.z = cirPoint[2];cmd.cirPoint.rHead = cirPoint[3]
     cmd.toPoint.x = toPoint[0];cmd.toPoint.y = toPoint[1];cmd.toPoint.z = toPoint[2];cmd.toPoint.rHead = toPoint[3]
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetARCCmd(c_int(masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetARCCmd", c_int(api.masterId), c_int(api.slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
+    if isQueued:
+        notifyQueuedCmd(api, "SetARCCmd", (cirPoint, toPoint), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
     
 
 def SetCircleCmd(api, cirPoint, toPoint,  isQueued=0):
+    api = connection(api)
+    if api.targetCheck is not None:
+        api.targetCheck(api, "SetCircleCmd", None, *cirPoint[:4])
+        api.targetCheck(api, "SetCircleCmd", None, *toPoint[:4])
     cmd = CircleCmd()
     cmd.cirPoint.x = cirPoint[0];cmd.cirPoint.y = cirPoint[1];cmd.cirPoint.z = cirPoint[2];cmd.cirPoint.rHead = cirPoint[3]
     cmd.toPoint.x = toPoint[0];cmd.toPoint.y = toPoint[1];cmd.toPoint.z = toPoint[2];cmd.toPoint.rHead = toPoint[3]
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetCircleCmd(c_int(masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetCircleCmd", c_int(api.masterId), c_int(api.slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
+    if isQueued:
+        notifyQueuedCmd(api, "SetCircleCmd", (cirPoint, toPoint), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
     
 
 def SetARCCommonParams(api, velocityRatio, accelerationRatio, isQueued=0):
+    api = connection(api)
     pbParam = ARCCommonParams()
     pbParam.velocityRatio = velocityRatio
     pbParam.accelerationRatio = accelerationRatio
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetARCCommonParams(c_int(masterId), c_int(slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetARCCommonParams", c_int(api.masterId), c_int(api.slaveId), byref(pbParam), isQueued, byref(queuedCmdIndex))
     return [queuedCmdIndex.value]
 
 
 def GetARCCommonParams(api):
+    api = connection(api)
     pbParam = ARCCommonParams()
-    while(True):
-        result = api.GetARCCommonParams(c_int(masterId), c_int(slaveId), byref(pbParam ))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "GetARCCommonParams", c_int(api.masterId), c_int(api.slaveId), byref(pbParam ))
     return [pbParam.velocityRatio, pbParam.accelerationRatio]
 
 
 def SetWAITCmd(api, waitTime, isQueued=0):
+    api = connection(api)
     param = WAITCmd()
     param.waitTime = int(waitTime)
     queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetWAITCmd(c_int(masterId), c_int(slaveId), byref(param), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def SetTRIGCmd(api, address, mode,  condition,  threshold,  isQueued=0):
-    param = TRIGCmd()
-    param.address = address
-    param.mode = mode
-    param.condition = condition
-    param.threshold = threshold
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetTRIGCmd(c_int(masterId), c_int(slaveId), byref(param), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def SetIOMultiplexing(api, address, multiplex, isQueued=0):
-    param = IOMultiplexing()
-    param.address = address
-    param.multiplex = multiplex
-    queuedCmdIndex = c_uint64(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.SetIOMultiplexing(c_int(masterId), c_int(tempSlaveId), byref(param), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetIOMultiplexing(api,  addr):
-    param = IOMultiplexing()
-    param.address = addr
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.GetIOMultiplexing(c_int(masterId), c_int(tempSlaveId), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.multiplex]
-
-
-def SetIODO(api, address, level, isQueued=0):
-    param = IODO()
-    param.address = address
-    param.level = level
-    queuedCmdIndex = c_uint64(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.SetIODO(c_int(masterId), c_int(tempSlaveId), byref(param), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetIODO(api,  addr):
-    param = IODO()
-    param.address = addr
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.GetIODO(c_int(masterId), c_int(tempSlaveId), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.level]
-
-
-def SetIOPWM(api, address, frequency, dutyCycle,  isQueued=0):
-    param = IOPWM()
-    param.address = address
-    param.frequency = frequency
-    param.dutyCycle = dutyCycle
-    queuedCmdIndex = c_uint64(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.SetIOPWM(c_int(masterId), c_int(tempSlaveId), byref(param), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetIOPWM(api,  addr):
-    param = IOPWM()
-    param.address = addr
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.GetIOPWM(c_int(masterId), c_int(tempSlaveId), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.frequency,  param.dutyCycle]
-
-
-def GetIODI(api, addr):
-    param = IODI()
-    param.address = addr
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.GetIODI(c_int(masterId), c_int(tempSlaveId), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.level]
-    
-
-def SetEMotor(api, index, isEnabled, speed,  isQueued=0):
-    emotor = EMotor()
-    emotor.index = index
-    emotor.isEnabled = isEnabled
-    emotor.speed = speed
-    queuedCmdIndex = c_uint64(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.SetEMotor(c_int(masterId), c_int(tempSlaveId), byref(emotor), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-    
-
-def SetEMotorS(api, index, isEnabled, speed, distance,  isQueued=0):
-    emotorS = EMotorS()
-    emotorS.index = index
-    emotorS.isEnabled = isEnabled
-    emotorS.speed = speed
-    emotorS.distance = distance
-    queuedCmdIndex = c_uint64(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.SetEMotorS(c_int(masterId), c_int(tempSlaveId), byref(emotorS), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
+    result = callDobot(api, "SetWAITCmd", c_int(api.masterId), c_int(api.slaveId), byref(param), isQueued, byref(queuedCmdIndex))
+    if isQueued:
+        notifyQueuedCmd(api, "SetWAITCmd", (waitTime,), queuedCmdIndex.value)
     return [queuedCmdIndex.value]
-
-
-def GetIOADC(api, addr):
-    param = IOADC()
-    param.address = addr
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.GetIOADC(c_int(masterId), c_int(tempSlaveId), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.value]
-
-
-def SetAngleSensorStaticError(api,  rearArmAngleError, frontArmAngleError):
-    c_rearArmAngleError = c_float(rearArmAngleError)
-    c_frontArmAngleError = c_float(frontArmAngleError)
-    while(True):
-        result = api.SetAngleSensorStaticError(c_int(masterId), c_int(slaveId), c_rearArmAngleError, c_frontArmAngleError)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-        
-
-def GetAngleSensorStaticError(api):
-    rearArmAngleError = c_float(0)
-    frontArmAngleError = c_float(0)
-    while(True):
-        result = api.GetAngleSensorStaticError(c_int(masterId), c_int(slaveId), byref(rearArmAngleError),  byref(frontArmAngleError))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [rearArmAngleError.value, frontArmAngleError.value]
-    
-
-def SetAngleSensorCoef(api,  rearArmAngleCoef, frontArmAngleCoef):
-    c_rearArmAngleCoef = c_float(rearArmAngleCoef)
-    c_frontArmAngleCoef = c_float(frontArmAngleCoef)
-    while(True):
-        result = api.SetAngleSensorCoef(c_int(masterId), c_int(slaveId), c_rearArmAngleCoef, c_frontArmAngleCoef)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-        
-
-def GetAngleSensorCoef(api):
-    rearArmAngleCoef = c_float(0)
-    frontArmAngleCoef = c_float(0)
-    while(True):
-        result = api.GetAngleSensorCoef(c_int(masterId), c_int(slaveId), byref(rearArmAngleCoef),  byref(frontArmAngleCoef))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [rearArmAngleCoef.value, frontArmAngleCoef.value]
-
-
-def SetBaseDecoderStaticError(api,  baseDecoderError):
-    c_baseDecoderError = c_float(baseDecoderError)
-    while(True):
-        result = api.SetBaseDecoderStaticError(c_int(masterId), c_int(slaveId), c_baseDecoderError)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    
-
-def GetBaseDecoderStaticError(api):
-    baseDecoderError = c_float(0)
-    while(True):
-        result = api.GetBaseDecoderStaticError(c_int(masterId), c_int(slaveId), byref(baseDecoderError))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [baseDecoderError.value]
-
-
-
-def GetWIFIConnectStatus(api):
-    isConnected = c_bool(0)
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.GetWIFIConnectStatus(c_int(masterId), c_int(slaveId), byref(isConnected))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [isConnected.value]
-
-def SetWIFIConfigMode(api,  enable):
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.SetWIFIConfigMode(c_int(masterId), c_int(slaveId), enable)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    
-
-def GetWIFIConfigMode(api):
-    isEnabled = c_bool(0)
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.GetWIFIConfigMode(c_int(masterId), c_int(slaveId), byref(isEnabled))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [isEnabled.value]
-    
-
-def SetWIFISSID(api,  ssid):
-    szPara = create_string_buffer(len(ssid))
-    szPara.raw = ssid.encode("utf-8")
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.SetWIFISSID(c_int(masterId), c_int(slaveId), szPara)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    
-
-def GetWIFISSID(api):
-    szPara = create_string_buffer(100)
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.GetWIFISSID(c_int(masterId), c_int(slaveId), szPara,  25)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    ssid = szPara.value.decode("utf-8") 
-    return [ssid]
-    
-
-def SetWIFIPassword(api,  password):
-    szPara = create_string_buffer(25)
-    szPara.raw = password.encode("utf-8")
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.SetWIFIPassword(c_int(masterId), c_int(slaveId), szPara)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-        
-
-def GetWIFIPassword(api):
-    szPara = create_string_buffer(25)  
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.GetWIFIPassword(c_int(masterId), c_int(slaveId), szPara,  25)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    password = szPara.value.decode("utf-8") 
-    return [password]
-    
-
-def SetWIFIIPAddress(api,  dhcp,  addr1,  addr2,  addr3,  addr4):
-    wifiIPAddress = WIFIIPAddress()
-    wifiIPAddress.dhcp = dhcp
-    wifiIPAddress.addr1 = addr1
-    wifiIPAddress.addr2 = addr2
-    wifiIPAddress.addr3 = addr3
-    wifiIPAddress.addr4 = addr4
-
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.SetWIFIIPAddress(c_int(masterId), c_int(slaveId), byref(wifiIPAddress))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-        
-
-def GetWIFIIPAddress(api):
-    wifiIPAddress = WIFIIPAddress()
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.GetWIFIIPAddress(c_int(masterId), c_int(slaveId), byref(wifiIPAddress))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [c_uint8(wifiIPAddress.dhcp).value,  c_uint8(wifiIPAddress.addr1).value,  c_uint8(wifiIPAddress.addr2).value,   c_uint8(wifiIPAddress.addr3).value,  c_uint8(wifiIPAddress.addr4).value]
-    
-
-def SetWIFINetmask(api, addr1,  addr2,  addr3,  addr4):
-    wifiNetmask = WIFINetmask()
-    wifiNetmask.addr1 = addr1
-    wifiNetmask.addr2 = addr2
-    wifiNetmask.addr3 = addr3
-    wifiNetmask.addr4 = addr4
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.SetWIFINetmask(c_int(masterId), c_int(slaveId), byref(wifiNetmask))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-        
-
-def GetWIFINetmask(api):
-    wifiNetmask = WIFINetmask()
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.GetWIFINetmask(c_int(masterId), c_int(slaveId), byref(wifiNetmask))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [c_uint8(wifiNetmask.addr1).value,  c_uint8(wifiNetmask.addr2).value,  c_uint8(wifiNetmask.addr3).value,  c_uint8(wifiNetmask.addr4).value]
-    
-
-def SetWIFIGateway(api, addr1,  addr2,  addr3,  addr4):
-    wifiGateway = WIFIGateway()
-    wifiGateway.addr1 = addr1
-    wifiGateway.addr2 = addr2
-    wifiGateway.addr3 = addr3
-    wifiGateway.addr4 = addr4
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.SetWIFIGateway(c_int(masterId), c_int(slaveId), byref(wifiGateway))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-
-
-def GetWIFIGateway(api):
-    wifiGateway = WIFIGateway()
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.GetWIFIGateway(c_int(masterId), c_int(slaveId), byref(wifiGateway))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [c_uint8(wifiGateway.addr1).value,  c_uint8(wifiGateway.addr2).value,  c_uint8(wifiGateway.addr3).value,  c_uint8(wifiGateway.addr4).value]
-    
-
-def SetWIFIDNS(api, addr1,  addr2,  addr3,  addr4):
-    wifiDNS = WIFIDNS()
-    wifiDNS.addr1 = addr1
-    wifiDNS.addr2 = addr2
-    wifiDNS.addr3 = addr3
-    wifiDNS.addr4 = addr4
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.SetWIFIDNS(c_int(masterId), c_int(slaveId), byref(wifiDNS))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-
-
-def GetWIFIDNS(api):
-    wifiDNS = WIFIDNS()
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        result = api.GetWIFIDNS(c_int(masterId), c_int(slaveId), byref(wifiDNS))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [c_uint8(wifiDNS.addr1).value,  c_uint8(wifiDNS.addr2).value,  c_uint8(wifiDNS.addr3).value,  c_uint8(wifiDNS.addr4).value]
-
-
-def SetColorSensor(api, isEnable, colorPort, version=0):
-    enable = c_bool(isEnable)
-    port = c_uint8(colorPort)
-    version = c_uint8(version)
-    queuedCmdIndex = c_uint64(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.SetColorSensor(c_int(masterId), c_int(tempSlaveId), enable, port, version, 1, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    
-
-def GetColorSensor(api):
-    r = c_ubyte(0)
-    g = c_ubyte(0)
-    b = c_ubyte(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.GetColorSensor(c_int(masterId), c_int(tempSlaveId), byref(r),  byref(g),  byref(b))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [r.value, g.value, b.value]
-    
-
-def SetInfraredSensor(api,  isEnable, infraredPort, version=0):
-    enable = c_bool(isEnable)
-    port = c_uint8(infraredPort)
-    queuedCmdIndex = c_uint64(0)
-    version = c_uint8(version)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.SetInfraredSensor(c_int(masterId), c_int(tempSlaveId), enable, port, version, 1, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    
-
-def GetInfraredSensor(api, infraredPort):
-    port = c_uint8(infraredPort)
-    value = c_ubyte(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.GetInfraredSensor(c_int(masterId), c_int(tempSlaveId), port,  byref(value))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [value.value]
-
-
-
-
-
-def SetLostStepParams(api, threshold, isQueued=0):
-    queuedCmdIndex = c_uint64(0)
-    t = c_float(threshold)
-    while(True):
-        result = api.SetLostStepParams(c_int(masterId), c_int(slaveId), t, isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def SetLostStepCmd(api, isQueued=0):
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetLostStepCmd(c_int(masterId), c_int(slaveId), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-    
-
-def GetUART4PeripheralsType(api):
-    type = c_uint8(0)
-    if (masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite) or (masterDevType == DevType.Conntroller and slaveDevType == DevType.Idle):
-        while(True):
-            result = api.GetUART4PeripheralsType(c_int(masterId), c_int(-1), byref(type))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break 
-    elif masterDevType == DevType.Magician:
-        while(True):
-            result = api.GetUART4PeripheralsType(c_int(masterId), c_int(slaveId), byref(type))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-    return [type.value]
     
 
 def GetDeviceVersionEx(api):       #2019.6.25 song 控制盒+Magician Lite时，获取控制盒的版本
-    # majorVersion = c_byte(0)
-    # minorVersion = c_byte(0)
-    # revision     = c_byte(0)
-    # hwVersion    = c_byte(0)
-    deviceVersion1 = DeviceVersion()
-    deviceVersion2 = DeviceVersion()
-    if masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite:
+    api = connection(api)
+    if api.topology.splitRail:
         # 2019.09.03 by song 控制盒+magicianLite 返回两个设备的版本信息
-        while(True):
-            result = api.GetDeviceVersion(c_int(masterId), c_int(-1), byref(deviceVersion1))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-        list_MagicBoxVersion = [deviceVersion1.fw_majorVersion, deviceVersion1.fw_minorVersion, deviceVersion1.fw_revision, deviceVersion1.fw_alphaVersion,
-                                deviceVersion1.hw_majorVersion, deviceVersion1.hw_minorVersion, deviceVersion1.hw_revision, deviceVersion1.hw_alphaVersion]
-        while(True):
-            result = api.GetDeviceVersion(c_int(masterId), c_int(slaveId), byref(deviceVersion2))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(5)
-                continue
-            break
-        list_MagicianLiteVersion = [deviceVersion2.fw_majorVersion, deviceVersion2.fw_minorVersion, deviceVersion2.fw_revision, deviceVersion2.fw_alphaVersion,
-                                    deviceVersion2.hw_majorVersion, deviceVersion2.hw_minorVersion, deviceVersion2.hw_revision, deviceVersion2.hw_alphaVersion]
-        return [list_MagicBoxVersion, list_MagicianLiteVersion]
+        versions = []
+        for slaveId in api.topology.queueSlaveIds:
+            deviceVersion = DeviceVersion()
+            result = callDobot(api, "GetDeviceVersion", c_int(api.masterId), c_int(slaveId), byref(deviceVersion))
+            versions.append([deviceVersion.fw_majorVersion, deviceVersion.fw_minorVersion, deviceVersion.fw_revision, deviceVersion.fw_alphaVersion,
+                             deviceVersion.hw_majorVersion, deviceVersion.hw_minorVersion, deviceVersion.hw_revision, deviceVersion.hw_alphaVersion])
+        return versions
 
         
+
+
 ##################  Ex扩展函数，该套函数会检测每一条指令运行完毕  ##################
 def GetPoseEx(api,  index):
+    api = connection(api)
     if index == 0:
         ret = GetDeviceWithL(api)
         if not ret:
@@ -2746,202 +1763,80 @@ def GetPoseEx(api,  index):
     return round(pos[index-1],  4)
     
 def SetHOMECmdEx(api,  temp,  isQueued=0):
+    api = connection(api)
     ret = SetHOMECmd(api, temp,  isQueued)
-    queuedCmdIndex = c_uint64(0)
-    queuedCmdIndex1 = c_uint64(0)
-    if masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite:
-        if isUsingLinearRail:        
-            while(True):
-                result = api.GetQueuedCmdCurrentIndex(c_int(masterId), c_int(-1), byref(queuedCmdIndex1))
-                if result == DobotCommunicate.DobotCommunicate_NoError and ret[1] <= queuedCmdIndex1.value:
-                    break
-                dSleep(100)
-            while(True):
-                result = api.GetQueuedCmdCurrentIndex(c_int(masterId), c_int(slaveId), byref(queuedCmdIndex))
-                if result == DobotCommunicate.DobotCommunicate_NoError and ret[0] <= queuedCmdIndex.value:
-                    break
-                dSleep(100)
-        else:
-            while(True):
-                result = api.GetQueuedCmdCurrentIndex(c_int(masterId), c_int(slaveId), byref(queuedCmdIndex))
-                if result == DobotCommunicate.DobotCommunicate_NoError and ret[0] <= queuedCmdIndex.value:
-                    break
-                dSleep(100)
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.Idle: 
-        while(True):
-            result = api.GetQueuedCmdCurrentIndex(c_int(masterId), c_int(-1), byref(queuedCmdIndex1))
-            if result == DobotCommunicate.DobotCommunicate_NoError and ret[1] <= queuedCmdIndex1.value:
-                break
-            dSleep(100)
-    else:
-        while(True):
-            result = api.GetQueuedCmdCurrentIndex(c_int(masterId), c_int(slaveId), byref(queuedCmdIndex))
-            if result == DobotCommunicate.DobotCommunicate_NoError and ret[0] <= queuedCmdIndex.value:
-                break
-            dSleep(100)
-        
+    for slaveId, slot in api.topology.homeWaitSlots(isUsingLinearRail):
+        waitQueued(api, ret[slot], slot)
+
+
 def SetWAITCmdEx(api, waitTime, isQueued=0):
+    api = connection(api)
     ret = SetWAITCmd(api, waitTime, isQueued)
-    while(True):
-        if not QuitDobotApiFlag:
-            break
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-           break
-    # dSleep(waitTime * 1000)
+    waitQueued(api, ret[0])
     
 def SetEndEffectorParamsEx(api, xBias, yBias, zBias, isQueued=0):
+    api = connection(api)
     ret = SetEndEffectorParams(api, xBias, yBias, zBias, isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-            break
-        dSleep(5)
+    waitQueued(api, ret[0])
         
 def SetPTPJointParamsEx(api, j1Velocity, j1Acceleration, j2Velocity, j2Acceleration, j3Velocity, j3Acceleration, j4Velocity, j4Acceleration, isQueued=0):
+    api = connection(api)
     ret = SetPTPJointParams(api, j1Velocity, j1Acceleration, j2Velocity, j2Acceleration, j3Velocity, j3Acceleration, j4Velocity, j4Acceleration, isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-            break
-        dSleep(5)
+    waitQueued(api, ret[0])
         
 def SetPTPCoordinateParamsEx(api, xyzVelocity, xyzAcceleration, rVelocity,  rAcceleration,  isQueued=0):
+    api = connection(api)
     ret = SetPTPCoordinateParams(api, xyzVelocity, xyzAcceleration, rVelocity,  rAcceleration,  isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-            break
-        dSleep(5)
+    waitQueued(api, ret[0])
 
 def SetPTPLParamsEx(api, lVelocity, lAcceleration, isQueued=0):
+    api = connection(api)
     ret = GetDeviceWithL(api)
     if not ret:
         print("Dobot is not in L model")
         return
     
     ret = SetPTPLParams(api, lVelocity, lAcceleration, isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-            break
-        dSleep(5)
+    waitQueued(api, ret[0])
         
 def SetPTPCommonParamsEx(api, velocityRatio, accelerationRatio, isQueued=0):
+    api = connection(api)
     ret = SetPTPCommonParams(api, velocityRatio, accelerationRatio, isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-            break
-        dSleep(5)
+    waitQueued(api, ret[0])
         
 def SetPTPJumpParamsEx(api, jumpHeight, maxJumpHeight, isQueued=0):
+    api = connection(api)
     ret = SetPTPJumpParams(api, jumpHeight, maxJumpHeight, isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-            break
-        dSleep(5)
+    waitQueued(api, ret[0])
         
 def SetPTPCmdEx(api, ptpMode, x, y, z, rHead, isQueued=0):
+    api = connection(api)
     ret = SetPTPCmd(api, ptpMode, x, y, z, rHead, isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-            break
-        dSleep(5)
-    
-def SetIOMultiplexingEx(api, address, multiplex, isQueued=0):
-    ret = SetIOMultiplexing(api, address, multiplex, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
+    waitQueued(api, ret[0])
         
 def SetEndEffectorSuctionCupEx(api, enableCtrl,  on, isQueued=0):
+    api = connection(api)
     ret = SetEndEffectorSuctionCup(api, enableCtrl,  on, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
+    waitQueued(api, ret[0])
+
 
 def SetEndEffectorGripperEx(api, enableCtrl,  on, isQueued=0):
+    api = connection(api)
     ret = SetEndEffectorGripper(api, enableCtrl,  on, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-        
+    waitQueued(api, ret[0])
+
+
 def SetEndEffectorLaserEx(api, enableCtrl, power, isQueued=0):
-    SetIOMultiplexingEx(api, 2,  1, isQueued)
-    SetIOMultiplexingEx(api, 4,  2, isQueued)
-    SetIODOEx(api, 2, enableCtrl, isQueued)
-    SetIOPWMEx(api, 4, 10000, power, isQueued)
-
-def SetIODOEx(api, address, level, isQueued=0):
-    ret = SetIODO(api, address, level, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-        
-def SetEMotorEx(api, index, isEnabled, speed,  isQueued=0):
-    ret = SetEMotor(api, index, isEnabled, speed,  isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-    
-def SetEMotorSEx(api, index, isEnabled, speed, distance,  isQueued=0):
-    ret = SetEMotorS(api, index, isEnabled, speed, distance,   isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-    
-def SetIOPWMEx(api, address, frequency, dutyCycle,  isQueued=0):
-    ret = SetIOPWM(api, address, frequency, dutyCycle,  isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
+    api = connection(api)
+    io = loadPeripheral("DobotDllIO")
+    io.SetIOMultiplexingEx(api, 2,  1, isQueued)
+    io.SetIOMultiplexingEx(api, 4,  2, isQueued)
+    io.SetIODOEx(api, 2, enableCtrl, isQueued)
+    io.SetIOPWMEx(api, 4, 10000, power, isQueued)
 
 
 def SetPTPWithLCmdEx(api, ptpMode, x, y, z, rHead,  l, isQueued=0):
+    api = connection(api)
     ret = GetDeviceWithL(api)
     if not ret:
         print("Dobot is not in L model")
@@ -2955,855 +1850,19 @@ def SetPTPWithLCmdEx(api, ptpMode, x, y, z, rHead,  l, isQueued=0):
     cmd.rHead=rHead
     cmd.l = l
     queuedCmdIndex = c_uint64(0)
-    queuedCmdIndex1 = c_uint64(0)
-    queuedCmdIndex2 = c_uint64(0)
     # 滑轨的特殊处理
-    if slaveDevType == DevType.Magician:
-        while(True):
-            result = api.SetPTPWithLCmd(c_int(masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(2)
-                continue
-            break
-        while(True):
-            result = api.GetQueuedCmdCurrentIndex(c_int(masterId), c_int(slaveId), byref(queuedCmdIndex1))
-            if result != DobotCommunicate.DobotCommunicate_NoError or queuedCmdIndex1.value < queuedCmdIndex.value:
-                dSleep(2)
-                continue
-            break
-    elif masterDevType == DevType.Conntroller and slaveDevType == DevType.MagicianLite:
-        while(True):
-            result = api.SetPTPWithLCmd(c_int(masterId), c_int(-1), byref(cmd), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(2)
-                continue
-            queuedCmdIndex2 = queuedCmdIndex
-            break
-        while(True):
-            result = api.GetQueuedCmdCurrentIndex(c_int(masterId), c_int(-1), byref(queuedCmdIndex1))
-            if result != DobotCommunicate.DobotCommunicate_NoError or queuedCmdIndex1.value < queuedCmdIndex2.value:
-                dSleep(2)
-                continue
-            break
-
-        while(True):
-            result = api.SetPTPCmd(c_int(masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(2)
-                continue
-            break
-        while(True):
-            result = api.GetQueuedCmdCurrentIndex(c_int(masterId), c_int(slaveId), byref(queuedCmdIndex1))
-            if result != DobotCommunicate.DobotCommunicate_NoError or queuedCmdIndex1.value < queuedCmdIndex.value:
-                dSleep(2)
-                continue
-            break
-    else:
-        while(True):
-            result = api.SetPTPWithLCmd(c_int(masterId), c_int(-1), byref(cmd), isQueued, byref(queuedCmdIndex))
-            if result != DobotCommunicate.DobotCommunicate_NoError:
-                dSleep(2)
-                continue
-            queuedCmdIndex2 = queuedCmdIndex
-            break
-        while(True):
-            result = api.GetQueuedCmdCurrentIndex(c_int(masterId), c_int(-1), byref(queuedCmdIndex1))
-            if result != DobotCommunicate.DobotCommunicate_NoError or queuedCmdIndex1.value < queuedCmdIndex.value:
-                dSleep(2)
-                continue
-            break
-    return [queuedCmdIndex2.value]
-
-
-def GetColorSensorEx(api,  index):
-    result = GetColorSensor(api)
-    return result[index]
-
-    
-def SetAutoLevelingCmdEx(api, controlFlag, precision, isQueued=1):
-    index = SetAutoLevelingCmd(api, controlFlag, precision, isQueued)[0]
-    while(True):
-        if index <= GetQueuedCmdCurrentIndex(api)[0]:
-            break
-        dSleep(5)
-
-   
-def SetLostStepCmdEx(api, isQueued=1):
-    ret = SetLostStepCmd(api, isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-            break
-        dSleep(5)
-
-
-def SetUpgradeFWReadyCmd(api,fwSize, md5):
-    upgradeFWReadyCmd = UpgradeFWReadyCmd()
-    upgradeFWReadyCmd.fwSize = fwSize
-    try:
-        md5Bytes = bytes.fromhex(md5)
-        md5CBuf = create_string_buffer(len(md5Bytes))
-        md5CBuf.raw = md5Bytes
-        upgradeFWReadyCmd.md5 = addressof(md5CBuf)
-    except Exception as e:
-        print(e)
-
-    # # 只发送给主设备
-    # result = api.SetUpgradeFWReadyCmd(c_int(masterId), c_int(-1), byref(upgradeFWReadyCmd))
-    # return result
-
-    # 不能去掉等待！！！！！！，jomar 2019年5月7日 09:28:30
-    if masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.SetUpgradeFWReadyCmd(c_int(masterId), c_int(tempSlaveId), byref(upgradeFWReadyCmd))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-
-
-def GetUpgradeFWReadyCmd(api,fwSize, md5):
-    upgradeFWReadyCmd = UpgradeFWReadyCmd()
-    upgradeFWReadyCmd.fwSize = fwSize
-    isUpgrade = c_byte(0)
-    try:
-        md5Bytes = bytes.fromhex(md5)
-        md5CBuf = create_string_buffer(len(md5Bytes))
-        md5CBuf.raw = md5Bytes
-        upgradeFWReadyCmd.md5 = addressof(md5CBuf)
-    except Exception as e:
-        print(e)
-
-    # # 只发送给主设备
-    # result = api.SetUpgradeFWReadyCmd(c_int(masterId), c_int(-1), byref(upgradeFWReadyCmd))
-    # return result
-
-    # 不能去掉等待！！！！！！，jomar 2019年5月7日 09:28:30
-    if masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.GetUpgradeFWReadyCmd(c_int(masterId), c_int(tempSlaveId), byref(upgradeFWReadyCmd), byref(isUpgrade))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [isUpgrade.value]
-
-
-
-
-
-
-# jomar, 2019年5月9日 10:10:50
-
-
-def SetTRIGCmdEx(api, address, mode,  condition,  threshold,  isQueued=1):
-    ret = SetTRIGCmd(api, address, mode, condition, threshold, isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-            break
-        dSleep(5)
+    if api.topology.splitRail:
+        # Move the rail through the controller first, then the arm.
+        targets = (("SetPTPWithLCmd", api.topology.railSlaveId), ("SetPTPCmd", api.topology.armSlaveId))
+    else:
+        targets = (("SetPTPWithLCmd", api.topology.railSlaveId),)
+    for name, slaveId in targets:
+        result = callDobot(api, name, c_int(api.masterId), c_int(slaveId), byref(cmd), isQueued, byref(queuedCmdIndex))
+        waitQueued(api, queuedCmdIndex.value, api.topology.railSlot if slaveId == api.topology.railSlaveId else 0)
+    return [queuedCmdIndex.value]
 
 
 def SetARCCmdEx(api, cirPoint, toPoint, isQueued=1):
+    api = connection(api)
     ret = SetARCCmd(api, cirPoint, toPoint, isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-            break
-        dSleep(5)
-
-
-def SetMotorMode(api, mode):
-    while(True):
-        result = api.SetMotorMode(c_int(masterId), c_int(slaveId), c_int(mode))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break 
-
-
-def GetMotorMode(api):
-    mode = c_int(0)
-    while(True):
-        result = api.GetMotorMode(c_int(masterId), c_int(slaveId), byref(mode))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break 
-    return [mode.value]
-
-
-
-#BLOCKLY 2019-04-29 控制盒IO
-
-def SetIOMultiplexingExt(api, address, multiplex, isQueued=0):
-    param = IOMultiplexing()
-    param.address = address
-    param.multiplex = multiplex
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetIOMultiplexing(c_int(masterId), c_int(-1), byref(param), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetIOMultiplexingExt(api, addr):
-    param = IOMultiplexing()
-    param.address = addr
-    while(True):
-        result = api.GetIOMultiplexing(c_int(masterId), c_int(-1), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.multiplex]
-
-
-def GetIOADCExt(api, addr):
-    param = IOADC()
-    param.address = addr
-    while(True):
-        result = api.GetIOADC(c_int(masterId), c_int(-1), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.value]
-
-
-def SetIOPWMExt(api, address, frequency, dutyCycle,  isQueued=0):
-    param = IOPWM()
-    param.address = address
-    param.frequency = frequency
-    param.dutyCycle = dutyCycle
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetIOPWM(c_int(masterId), c_int(-1), byref(param), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetIOPWMExt(api, addr):
-    param = IOPWM()
-    param.address = addr
-    while(True):
-        result = api.GetIOPWM(c_int(masterId), c_int(-1), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.frequency,  param.dutyCycle]
-
-
-def GetIODIExt(api, addr):
-    param = IODI()
-    param.address = addr
-    while(True):
-        result = api.GetIODI(c_int(masterId), c_int(-1), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.level]
-
-
-def SetIODOExt(api, address, level, isQueued=0):
-    param = IODO()
-    param.address = address
-    param.level = level
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetIODO(c_int(masterId), c_int(-1), byref(param), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetIODOExt(api, addr):
-    param = IODO()
-    param.address = addr
-    while(True):
-        result = api.GetIODO(c_int(masterId), c_int(-1), byref(param))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [param.level]
-
-
-def SetEMotorExt(api, index, isEnabled, speed, isQueued=0):
-    emotor = EMotor()
-    emotor.index = index
-    emotor.isEnabled = isEnabled
-    emotor.speed = speed
-    queuedCmdIndex = c_uint64(0)
-    while (True):
-        result = api.SetEMotor(c_int(masterId), c_int(-1), byref(emotor), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def SetEMotorSExt(api, index, isEnabled, speed, distance, isQueued=0):
-    emotorS = EMotorS()
-    emotorS.index = index
-    emotorS.isEnabled = isEnabled
-    emotorS.speed = speed
-    emotorS.distance = distance
-    queuedCmdIndex = c_uint64(0)
-    while (True):
-        result = api.SetEMotorS(c_int(masterId), c_int(-1), byref(emotorS), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def SetColorSensorExt(api, isEnable, colorPort, version=0, isQueued=0):
-    enable = c_bool(isEnable)
-    port = c_uint8(colorPort)
-    version = c_uint8(version)
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetColorSensor(c_int(masterId), c_int(-1), enable, port, version, isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def SetInfraredSensorExt(api,  isEnable, infraredPort, version=0, isQueued=0):
-    enable = c_bool(isEnable)
-    port = c_uint8(infraredPort)
-    version = c_uint8(version)
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetInfraredSensor(c_int(masterId), c_int(-1), enable, port, version, isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetInfraredSensorExt(api, infraredPort):
-    port = c_uint8(infraredPort)
-    value = c_ubyte(0)
-    
-    while(True):
-        result = api.GetInfraredSensor(c_int(masterId), c_int(-1), port,  byref(value))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [value.value]
-
-
-def GetColorSensorExt(api, index):
-    r = c_ubyte(0)
-    g = c_ubyte(0)
-    b = c_ubyte(0)
-    while(True):
-        result = api.GetColorSensor(c_int(masterId), c_int(-1), byref(r),  byref(g),  byref(b))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [r.value, g.value, b.value][index]
-
-# 控制盒IO同步
-
-def SetIOMultiplexingExtEx(api, address, multiplex, isQueued=0):
-    ret = SetIOMultiplexingExt(api, address, multiplex, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-
-def SetIOPWMExtEx(api, address, frequency, dutyCycle,  isQueued=0):
-    ret = SetIOPWMExt(api, address, frequency, dutyCycle,  isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-
-
-def SetIODOExtEx(api, address, level, isQueued=0):
-    ret = SetIODOExt(api, address, level, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-
-
-def SetEMotorExtEx(api, index, isEnabled, speed, isQueued=0):
-    ret = SetEMotorExt(api, index, isEnabled, speed, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-
-
-def SetEMotorSExtEx(api, index, isEnabled, speed, distance, isQueued=0):
-    ret = SetEMotorSExt(api, index, isEnabled, speed, distance, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-
-
-def SetColorSensorExtEx(api, isEnable, colorPort, version=0, isQueued=0):
-    ret = SetColorSensorExt(api, isEnable, colorPort, version, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-
-
-def SetInfraredSensorExtEx(api,  isEnable, infraredPort, version=0, isQueued=0):
-    ret = SetInfraredSensorExt(api,  isEnable, infraredPort, version, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-
-
-#2019.08.21 by song add Seeed Sensor API    
-
-def GetSeeedColorSensorExt(api):
-    r = c_ushort(0)
-    g = c_ushort(0)
-    b = c_ushort(0)
-    Cct = c_ushort(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.GetSeeedColorSensor(c_int(masterId), c_int(tempSlaveId), byref(r),  byref(g),  byref(b), byref(Cct))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [r.value, g.value, b.value, Cct.value]
-
-
-def SetSeeedColorSensorExt(api, SeeedPort,isQueued=0):
-    queuedCmdIndex = c_uint64(0)
-    port = c_uint8(SeeedPort)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.SetSeeedColorSensor(c_int(masterId), c_int(tempSlaveId), port, isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetSeeedDistanceSensorExt(api, SeeedPort):
-    port = c_uint8(SeeedPort)
-    distance = c_ubyte(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.GetSeeedDistanceSensor(c_int(masterId), c_int(tempSlaveId), port, byref(distance))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [distance.value]
-
-
-def SetSeeedTempSensorExt(api, SeeedPort, isQueued=0):
-    port = c_uint8(SeeedPort)
-    queuedCmdIndex = c_uint64(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.SetSeeedTempSensor(c_int(masterId), c_int(tempSlaveId), port, isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetSeeedTempSensorExt(api):
-    tem = c_ushort(0)
-    hum = c_ushort(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.GetSeeedTempSensor(c_int(masterId), c_int(tempSlaveId), byref(tem),  byref(hum))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [tem.value, hum.value]
-
-
-def SetSeeedLightSensorExt(api, SeeedPort, isQueued=0):
-    port = c_uint8(SeeedPort)
-    queuedCmdIndex = c_uint64(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.SetSeeedLightSensor(c_int(masterId), c_int(tempSlaveId), port, isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetSeeedLightSensorExt(api):
-    lux = c_ushort(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.GetSeeedLightSensor(c_int(masterId), c_int(tempSlaveId), byref(lux))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [lux.value]
-
-
-def SetSeeedRgbExt(api, SeeedPort, Rgb, isQueued=0):
-    port = c_ubyte(SeeedPort)
-    rgb = c_float(Rgb)
-    queuedCmdIndex = c_uint64(0)
-    if slaveDevType == DevType.Magician:
-        tempSlaveId = slaveId
-    elif masterDevType == DevType.Conntroller and (slaveDevType == DevType.MagicianLite or slaveDevType == DevType.Idle):
-        tempSlaveId = -1
-    else:
-        tempSlaveId = slaveId
-    while(True):
-        result = api.SetSeeedRgb(c_int(masterId), c_int(tempSlaveId), port, rgb, isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-# seeed传感器同步指令
-
-def SetSeeedColorSensorExtEx(api, SeeedPort,isQueued=0):
-    ret = SetSeeedColorSensorExt(api, SeeedPort, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-
-
-def SetSeeedTempSensorExtEx(api, SeeedPort, isQueued=0):
-    ret = SetSeeedTempSensorExt(api, SeeedPort, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-
-
-def SetSeeedLightSensorExtEx(api, SeeedPort, isQueued=0):
-    ret = SetSeeedLightSensorExt(api, SeeedPort, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-
-
-def SetSeeedRgbExtEx(api, SeeedPort, Rgb, isQueued=0):
-    ret = SetSeeedRgbExt(api, SeeedPort, Rgb, isQueued)
-    if masterDevType == DevType.Magician:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-                break
-            dSleep(5)
-    else:
-        while(True):
-            if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-                break
-            dSleep(5)
-    
-
-def RestartMagicBox(api):
-    while(True):
-        result = api.RestartMagicBox(c_int(masterId), c_int(-1))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-
-
-#Magician Lite 2019-11-05 Magician Lite单独的API
-
-
-def SetLostStepEnableAndParamsCmd(api, enable, threshlod, isQueued=0):
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetLostStepEnableAndParamsCmd(c_int(masterId), c_int(slaveId), c_uint8(enable), c_float(threshlod), isQueued, byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetLostStepEnableAndParamsCmd(api):
-    enable = c_uint8(0)
-    threshlod = c_float(0)
-    while(True):
-        result = api.GetLostStepEnableAndParamsCmd(c_int(masterId), c_int(slaveId), byref(enable), byref(threshlod))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [enable.value, threshlod.value]
-
-
-
-def SetEndEffectorType(api, endType=0, isQueued=0):
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetEndEffectorType(c_int(masterId), c_int(slaveId), isQueued, c_uint8(endType), byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break  
-    return[queuedCmdIndex.value]
-
-
-def GetEndEffectorType(api):
-    endType = c_uint8(0)
-    while(True):
-        result = api.GetEndEffectorType(c_int(masterId), c_int(slaveId), byref(endType))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [endType.value]
-
-
-def SetServoAngle(api, servoId, angle, isQueued=0):
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetServoAngle(c_int(masterId), c_int(-1), isQueued, c_uint8(servoId), c_float(angle), byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break 
-    return [queuedCmdIndex.value]
-
-
-def GetServoAngle(api, servoId):
-    angle = c_float(0)
-    while(True):
-        result = api.GetServoAngle(c_int(masterId), c_int(-1),  c_uint8(servoId) ,byref(angle))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [angle.value]
-
-
-def SetArmSpeedRatio(api, paramsMode, speedRatio, isQueued=0):
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetArmSpeedRatio(c_int(masterId), c_int(slaveId), isQueued, c_uint8(paramsMode), c_uint8(speedRatio),  byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break 
-    return [queuedCmdIndex.value]
-
-
-def GetArmSpeedRatio(api, paramsMode=0):
-    speedRatio = c_uint8(0)
-    # paramsMode = c_uint8(0)
-    while(True):
-        result = api.GetArmSpeedRatio(c_int(masterId), c_int(slaveId),  c_uint8(paramsMode), byref(speedRatio))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return[speedRatio.value]
-
-
-def SetLSpeedRatio(api, paramsMode, speedRatio, isQueued=0):
-    queuedCmdIndex = c_uint64(0)
-    while(True):
-        result = api.SetLSpeedRatio(c_int(masterId), c_int(-1), isQueued, c_uint8(paramsMode), c_uint8(speedRatio), byref(queuedCmdIndex))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return [queuedCmdIndex.value]
-
-
-def GetLSpeedRatio(api, paramsMode):
-    speedRatio = c_uint8(0)
-    while(True):
-        result = api.GetLSpeedRatio(c_int(masterId), c_int(-1), c_uint8(paramsMode), byref(speedRatio))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-    return[speedRatio.value]
-
-
-def PrintInfo(api, info):
-    szPara = create_string_buffer(len(info))
-    szPara.raw = info.encode("utf-8")
-    while(True):
-        result = api.PrintInfo(c_int(masterId), c_int(-1), szPara)
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-
-
-def SetProgbar(api, progbar):
-    while(True):
-        result = api.SetProgbar(c_int(masterId), c_int(-1), c_uint8(progbar))
-        if result != DobotCommunicate.DobotCommunicate_NoError:
-            dSleep(5)
-            continue
-        break
-
-#MagicianLite/Magic Box同步等待
-
-def SetEndEffectorTypeEx(api, endType=0, isQueued=1):
-    ret = SetEndEffectorType(api, endType, isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-            break
-        dSleep(5)
-
-
-def SetServoAngleEx(api, servoId, angle, isQueued=1):
-    ret = SetServoAngle(api, servoId, angle, isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-            break
-        dSleep(5)
-
-
-def SetArmSpeedRatioEx(api, paramsMode=0, speedRatio=0, isQueued=1):
-    ret = SetArmSpeedRatio(api,paramsMode, speedRatio, isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[0]:
-            break
-        dSleep(5)
-
-
-def SetLSpeedRatioEx(api, paramsMode, speedRatio, isQueued=1):
-    ret = SetLSpeedRatio(api, paramsMode, speedRatio, isQueued)
-    while(True):
-        if ret[0] <= GetQueuedCmdCurrentIndex(api)[1]:
-            break
-        dSleep(5)
+    waitQueued(api, ret[0])
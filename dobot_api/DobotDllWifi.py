@@ -0,0 +1,189 @@
+"""------------------------------------------------------------------------------
+WIFI module wrappers, split out of DobotDllType.
+
+DobotDllType imports this module the first time one of these names is used,
+so dType.GetWIFIDNS(api, ...) keeps working and pick-and-place programs
+that never touch them do not pay for defining them.
+------------------------------------------------------------------------------"""
+from ctypes import *
+
+try:
+    from . import DobotDllType
+    from .DobotDllType import *
+except ImportError:
+    import DobotDllType
+    from DobotDllType import *
+
+
+    
+
+class WIFIIPAddress(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("dhcp", c_byte),
+        ("addr1", c_byte),
+        ("addr2", c_byte),
+        ("addr3", c_byte),
+        ("addr4", c_byte),
+        ]
+        
+class WIFINetmask(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("addr1", c_byte),
+        ("addr2", c_byte),
+        ("addr3", c_byte),
+        ("addr4", c_byte),
+        ]
+        
+class WIFIGateway(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("addr1", c_byte),
+        ("addr2", c_byte),
+        ("addr3", c_byte),
+        ("addr4", c_byte),
+        ]
+        
+class WIFIDNS(Structure):
+    _pack_ = 1
+    _fields_ = [
+        ("addr1", c_byte),
+        ("addr2", c_byte),
+        ("addr3", c_byte),
+        ("addr4", c_byte),
+        ]
+
+
+
+def GetWIFIConnectStatus(api):
+    api = connection(api)
+    isConnected = c_bool(0)
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "GetWIFIConnectStatus", c_int(api.masterId), c_int(api.slaveId), byref(isConnected))
+    return [isConnected.value]
+
+def SetWIFIConfigMode(api,  enable):
+    api = connection(api)
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "SetWIFIConfigMode", c_int(api.masterId), c_int(api.slaveId), enable)
+    
+
+def GetWIFIConfigMode(api):
+    api = connection(api)
+    isEnabled = c_bool(0)
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "GetWIFIConfigMode", c_int(api.masterId), c_int(api.slaveId), byref(isEnabled))
+    return [isEnabled.value]
+    
+
+def SetWIFISSID(api,  ssid):
+    api = connection(api)
+    szPara = create_string_buffer(len(ssid))
+    szPara.raw = ssid.encode("utf-8")
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "SetWIFISSID", c_int(api.masterId), c_int(api.slaveId), szPara)
+    
+
+def GetWIFISSID(api):
+    api = connection(api)
+    szPara = create_string_buffer(100)
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "GetWIFISSID", c_int(api.masterId), c_int(api.slaveId), szPara,  25)
+    ssid = szPara.value.decode("utf-8") 
+    return [ssid]
+    
+
+def SetWIFIPassword(api,  password):
+    api = connection(api)
+    szPara = create_string_buffer(25)
+    szPara.raw = password.encode("utf-8")
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "SetWIFIPassword", c_int(api.masterId), c_int(api.slaveId), szPara)
+        
+
+def GetWIFIPassword(api):
+    api = connection(api)
+    szPara = create_string_buffer(25)  
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "GetWIFIPassword", c_int(api.masterId), c_int(api.slaveId), szPara,  25)
+    password = szPara.value.decode("utf-8") 
+    return [password]
+    
+
+def SetWIFIIPAddress(api,  dhcp,  addr1,  addr2,  addr3,  addr4):
+    api = connection(api)
+    wifiIPAddress = WIFIIPAddress()
+    wifiIPAddress.dhcp = dhcp
+    wifiIPAddress.addr1 = addr1
+    wifiIPAddress.addr2 = addr2
+    wifiIPAddress.addr3 = addr3
+    wifiIPAddress.addr4 = addr4
+
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "SetWIFIIPAddress", c_int(api.masterId), c_int(api.slaveId), byref(wifiIPAddress))
+        
+
+def GetWIFIIPAddress(api):
+    api = connection(api)
+    wifiIPAddress = WIFIIPAddress()
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "GetWIFIIPAddress", c_int(api.masterId), c_int(api.slaveId), byref(wifiIPAddress))
+    return [c_uint8(wifiIPAddress.dhcp).value,  c_uint8(wifiIPAddress.addr1).value,  c_uint8(wifiIPAddress.addr2).value,   c_uint8(wifiIPAddress.addr3).value,  c_uint8(wifiIPAddress.addr4).value]
+    
+
+def SetWIFINetmask(api, addr1,  addr2,  addr3,  addr4):
+    api = connection(api)
+    wifiNetmask = WIFINetmask()
+    wifiNetmask.addr1 = addr1
+    wifiNetmask.addr2 = addr2
+    wifiNetmask.addr3 = addr3
+    wifiNetmask.addr4 = addr4
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "SetWIFINetmask", c_int(api.masterId), c_int(api.slaveId), byref(wifiNetmask))
+        
+
+def GetWIFINetmask(api):
+    api = connection(api)
+    wifiNetmask = WIFINetmask()
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "GetWIFINetmask", c_int(api.masterId), c_int(api.slaveId), byref(wifiNetmask))
+    return [c_uint8(wifiNetmask.addr1).value,  c_uint8(wifiNetmask.addr2).value,  c_uint8(wifiNetmask.addr3).value,  c_uint8(wifiNetmask.addr4).value]
+    
+
+def SetWIFIGateway(api, addr1,  addr2,  addr3,  addr4):
+    api = connection(api)
+    wifiGateway = WIFIGateway()
+    wifiGateway.addr1 = addr1
+    wifiGateway.addr2 = addr2
+    wifiGateway.addr3 = addr3
+    wifiGateway.addr4 = addr4
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "SetWIFIGateway", c_int(api.masterId), c_int(api.slaveId), byref(wifiGateway))
+
+
+def GetWIFIGateway(api):
+    api = connection(api)
+    wifiGateway = WIFIGateway()
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "GetWIFIGateway", c_int(api.masterId), c_int(api.slaveId), byref(wifiGateway))
+    return [c_uint8(wifiGateway.addr1).value,  c_uint8(wifiGateway.addr2).value,  c_uint8(wifiGateway.addr3).value,  c_uint8(wifiGateway.addr4).value]
+    
+
+def SetWIFIDNS(api, addr1,  addr2,  addr3,  addr4):
+    api = connection(api)
+    wifiDNS = WIFIDNS()
+    wifiDNS.addr1 = addr1
+    wifiDNS.addr2 = addr2
+    wifiDNS.addr3 = addr3
+    wifiDNS.addr4 = addr4
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "SetWIFIDNS", c_int(api.masterId), c_int(api.slaveId), byref(wifiDNS))
+
+
+def GetWIFIDNS(api):
+    api = connection(api)
+    wifiDNS = WIFIDNS()
+    if DobotDllType.QuitDobotApiFlag:
+        result = callDobot(api, "GetWIFIDNS", c_int(api.masterId), c_int(api.slaveId), byref(wifiDNS))
+    return [c_uint8(wifiDNS.addr1).value,  c_uint8(wifiDNS.addr2).value,  c_uint8(wifiDNS.addr3).value,  c_uint8(wifiDNS.addr4).value]
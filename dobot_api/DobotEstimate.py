@@ -0,0 +1,137 @@
+"""----------------------------------------------------------------------------
+Predicted execution time of queued commands.
+
+    from dobot_api import DobotEstimate
+
+    estimate = DobotEstimate.estimate(commands, DobotEstimate.activeModel(api))
+    estimate.total          # seconds for the whole list
+    estimate.durations      # seconds per command, None where the target is out of reach
+
+    with DobotEstimate.recording(api) as commands:      # what a script queues
+        runTheScript(api)
+    DobotEstimate.estimate(commands).total
+
+Commands are (wrapper name, args) pairs, as in DobotProgram and DobotPath. Each
+one is applied to a MotionModel, which times moves with trapezoidal velocity
+profiles and keeps the parameter setters it sees. activeModel() starts the
+model from the arm's pose and the PTP joint, coordinate, common and jump
+parameters (and home point) it currently has, rather than the defaults.
+
+timeoutFor() turns a prediction into a timeout; QueueWatcher.wait(index,
+timeout="auto") uses it instead of waiting forever.
+----------------------------------------------------------------------------"""
+from contextlib import contextmanager
+import math
+import threading
+
+try:
+    from . import DobotDllType as dType
+    from .DobotMotionModel import MotionModel
+except ImportError:
+    import DobotDllType as dType
+    from DobotMotionModel import MotionModel
+
+CP_COMMANDS = ("SetCPCmd", "SetCP2Cmd", "SetCPLECmd")
+
+# A wait given timeout="auto" fails after TIMEOUT_FACTOR times the predicted time plus TIMEOUT_SLACK
+# seconds, which leaves room for homing and the serial link being slower than modelled.
+TIMEOUT_FACTOR = 2.0
+TIMEOUT_SLACK = 5.0
+
+
+class Estimate:
+    def __init__(self, commands, durations):
+        self.commands = commands        # [(wrapper name, args)]
+        self.durations = durations      # predicted seconds of each command, None if it cannot run
+
+    def __len__(self):
+        return len(self.durations)
+
+    @property
+    def unreachable(self):
+        """Positions of the commands whose target the arm cannot reach."""
+        return [i for i, duration in enumerate(self.durations) if duration is None]
+
+    @property
+    def total(self):
+        """Seconds for every command; inf if one cannot run, as the arm stops there with an alarm."""
+        if self.unreachable:
+            return math.inf
+        return sum(self.durations)
+
+    def finishTimes(self):
+        """Seconds from the start at which each command is done."""
+        t, times = 0.0, []
+        for duration in self.durations:
+            t += duration if duration is not None else math.inf
+            times.append(t)
+        return times
+
+
+def estimate(commands, model=None, pose=None):
+    """
+    Estimate for `commands` (a list of (wrapper name, args) or a DobotProgram.Program) starting
+    from `model`, which is advanced to the end, or from a MotionModel at `pose`.
+    """
+    commands = list(commands)
+    if model is None:
+        model = MotionModel(pose)
+    durations = []
+    for i, (name, args) in enumerate(commands):
+        if name in CP_COMMANDS:
+            # A CP segment only keeps its speed into the next one if that is queued right behind it.
+            endAtRest = i + 1 == len(commands) or commands[i + 1][0] not in CP_COMMANDS
+            durations.append(model.execute(name, *args, endAtRest=endAtRest))
+        else:
+            durations.append(model.execute(name, *args))
+    return Estimate(commands, durations)
+
+
+def activeModel(api):
+    """MotionModel at the arm's pose with the PTP parameters and home point the arm has now."""
+    api = dType.connection(api)
+    model = MotionModel(dType.GetPose(api)[:4])
+    model.execute("SetPTPJointParams", *dType.GetPTPJointParams(api))
+    xyzVelocity, rVelocity, xyzAcceleration, rAcceleration = dType.GetPTPCoordinateParams(api)
+    model.execute("SetPTPCoordinateParams", xyzVelocity, xyzAcceleration, rVelocity, rAcceleration)
+    model.execute("SetPTPCommonParams", *dType.GetPTPCommonParams(api))
+    model.execute("SetPTPJumpParams", *dType.GetPTPJumpParams(api))
+    model.execute("SetHOMEParams", *dType.GetHOMEParams(api))
+    return model
+
+
+def timeoutFor(seconds):
+    """Timeout for a wait predicted to take `seconds`; None when there is no prediction."""
+    if seconds is None or math.isinf(seconds):
+        return None
+    return seconds * TIMEOUT_FACTOR + TIMEOUT_SLACK
+
+
+# Command lists being recorded on each connection, keyed by id(connection).
+recorders = {}
+recordersLock = threading.Lock()
+
+
+@contextmanager
+def recording(api):
+    """Collect the (wrapper name, args) of every command queued on `api` inside the block."""
+    api = dType.connection(api)
+    commands = []
+    with recordersLock:
+        recorders.setdefault(id(api), []).append(commands)
+    try:
+        yield commands
+    finally:
+        with recordersLock:
+            recorders[id(api)].remove(commands)
+
+
+def _recordCommand(api, name, args, queuedCmdIndex):
+    if queuedCmdIndex is None or not recorders.get(id(api)):
+        return
+    with recordersLock:
+        for commands in recorders.get(id(api), ()):
+            commands.append((name, tuple(args)))
+
+
+dType.queuedCmdHooks.append(_recordCommand)
@@ -0,0 +1,290 @@
+"""----------------------------------------------------------------------------
+Drive every Dobot attached to this machine as one pool.
+
+    from dobot_api import DobotFleet
+
+    with DobotFleet.Fleet.discover() as fleet:
+        futures = [fleet.pickAndPlace((250, 50), (200, -80)) for _ in range(10)]
+        for future in futures:
+            future.result()
+        print(fleet.stats())
+
+discover() lists the ports SearchDobot reports and opens one DobotConnection
+per arm. Each arm gets its own job queue and worker thread. submit() puts a
+job on the queue of the arm with the least outstanding work (estimated with
+the MotionModel when the job can tell, otherwise by job count), and an arm
+that runs dry takes the newest job from the most loaded queue. Estimates
+start from where the arm's command queue ends and are rebuilt whenever one
+of its jobs starts or finishes or is taken by another arm.
+
+A job is any callable taking the arm's connection. It runs on that arm's
+worker thread, and its return value or exception is delivered through the
+Future returned by submit().
+
+With DOBOT_SIMULATE=N the fleet runs on N virtual arms.
+----------------------------------------------------------------------------"""
+from collections import deque
+from concurrent.futures import Future
+import threading
+import time
+
+try:
+    from . import DobotDllType as dType
+    from . import DobotCompletion
+    from . import DobotPickPlace
+    from .DobotMotionModel import MotionModel
+    from .DobotPickPlace import SAFE_Z, PICK_Z
+except ImportError:
+    import DobotDllType as dType
+    import DobotCompletion
+    import DobotPickPlace
+    from DobotMotionModel import MotionModel
+    from DobotPickPlace import SAFE_Z, PICK_Z
+
+
+def pickAndPlace(api, pick, place, safeZ=SAFE_Z, pickZ=PICK_Z, placeZ=None, rHead=0.0):
+    """Move the block at pick=(x, y) to place=(x, y) with the suction cup and wait until done."""
+    placeZ = pickZ if placeZ is None else placeZ
+    DobotPickPlace.pick(api, pick[0], pick[1], pickZ, rHead, safeZ)
+    DobotPickPlace.place(api, place[0], place[1], placeZ, rHead, safeZ)
+    # Clear the placed block.
+    lastIndex = dType.SetPTPCmd(api, dType.PTPMode.PTPMOVLXYZMode, place[0], place[1], safeZ, rHead, isQueued=1)[0]
+    DobotCompletion.getQueueWatcher(api).wait(lastIndex)
+
+
+class PickPlaceJob:
+    def __init__(self, pick, place, **kwargs):
+        self.pick = pick
+        self.place = place
+        self.kwargs = kwargs
+
+    def __call__(self, api):
+        pickAndPlace(api, self.pick, self.place, **self.kwargs)
+
+    def estimate(self, model):
+        """Seconds the job takes on an arm whose state is `model`; moves the model to the end pose."""
+        safeZ = self.kwargs.get("safeZ", SAFE_Z)
+        pickZ = self.kwargs.get("pickZ", PICK_Z)
+        placeZ = self.kwargs.get("placeZ", pickZ)
+        rHead = self.kwargs.get("rHead", 0.0)
+        jump, movl = dType.PTPMode.PTPJUMPXYZMode, dType.PTPMode.PTPMOVLXYZMode
+        total = 0.0
+        for (x, y), z, on in ((self.pick, pickZ, 1), (self.place, placeZ, 0)):
+            model.execute("SetPTPJumpParams", *DobotPickPlace.jumpParamsFor(safeZ, z))
+            total += model.execute("SetPTPCmd", jump, x, y, z, rHead) or 0.0
+            total += model.execute("SetEndEffectorSuctionCup", 1, on)
+        return total + (model.execute("SetPTPCmd", movl, self.place[0], self.place[1], safeZ, rHead) or 0.0)
+
+
+class FleetJob:
+    __slots__ = ("func", "future", "estimate", "submitted")
+
+    def __init__(self, func, future, estimate):
+        self.func = func
+        self.future = future
+        self.estimate = estimate
+        self.submitted = time.monotonic()
+
+
+class Arm:
+    def __init__(self, fleet, api, port):
+        self.fleet = fleet
+        self.api = api
+        self.port = port
+        self.queue = deque()
+        self.thread = None
+        self.running = None         # job being executed
+        self.model = None           # where the arm will be once its jobs are done, for estimates; None to rebuild
+        self.plannedTime = 0.0      # estimated seconds of work queued or running
+        self.jobsDone = 0
+        self.jobsFailed = 0
+        self.jobsStolen = 0
+        self.busyTime = 0.0
+        self.waitTime = 0.0         # time jobs spent queued before they started
+
+    def __repr__(self):
+        return "<Arm %s>" % self.port
+
+    def load(self):
+        return (self.plannedTime, len(self.queue) + (self.running is not None))
+
+    def run(self):
+        fleet = self.fleet
+        while True:
+            with fleet.cond:
+                job = None
+                while job is None:
+                    if self.queue:
+                        job = self.queue.popleft()
+                    else:
+                        job = fleet.steal(self)
+                    if job is None:
+                        if fleet.closed:
+                            return
+                        fleet.cond.wait()
+                self.running = job
+            if not job.future.set_running_or_notify_cancel():
+                with fleet.cond:
+                    self.running = None
+                    self.plannedTime -= job.estimate
+                fleet.reseed(self)
+                continue
+            # A stolen job ends where it ends on this arm, not on the one it was queued for.
+            fleet.reseed(self)
+
+            start = time.monotonic()
+            try:
+                result = job.func(self.api)
+            except BaseException as e:
+                failed = True
+                job.future.set_exception(e)
+            else:
+                failed = False
+                job.future.set_result(result)
+            end = time.monotonic()
+
+            with fleet.cond:
+                self.running = None
+                self.plannedTime = max(0.0, self.plannedTime - job.estimate)
+                self.busyTime += end - start
+                self.waitTime += start - job.submitted
+                if failed:
+                    self.jobsFailed += 1
+                else:
+                    self.jobsDone += 1
+                fleet.cond.notify_all()
+            # The estimates assumed where the arm would be; start the next ones from where it is.
+            fleet.reseed(self)
+
+    def stats(self, elapsed):
+        done = self.jobsDone + self.jobsFailed
+        return {
+            "jobsDone": self.jobsDone,
+            "jobsFailed": self.jobsFailed,
+            "jobsStolen": self.jobsStolen,
+            "queued": len(self.queue),
+            "busyTime": self.busyTime,
+            "utilization": self.busyTime / elapsed if elapsed else 0.0,
+            "meanWait": self.waitTime / done if done else 0.0}
+
+
+class Fleet:
+    def __init__(self, arms=()):
+        self.cond = threading.Condition()
+        self.arms = []
+        self.closed = False
+        self.started = time.monotonic()
+        for api, port in arms:
+            self.add(api, port)
+
+    @classmethod
+    def discover(cls, baudrate=115200, simulate=None):
+        """Connect to every arm SearchDobot finds and return a running Fleet."""
+        ports = dType.SearchDobot(dType.load(simulate))
+        fleet = cls()
+        for port in ports:
+            api = dType.load(simulate)
+            result = dType.ConnectDobot(api, port, baudrate)[0]
+            if result != dType.DobotConnect.DobotConnect_NoError:
+                print("Could not connect to %s: %d" % (port, result))
+                continue
+            dType.SetQueuedCmdClear(api)
+            dType.SetQueuedCmdStartExec(api)
+            fleet.add(api, port)
+        if not fleet.arms:
+            raise dType.DobotInvalidDeviceError("ConnectDobot", dType.DobotCommunicate.DobotCommunicate_InvalidDevice,
+                                                "no Dobot found (ports: %s)" % (ports,))
+        return fleet
+
+    def add(self, api, port=None):
+        arm = Arm(self, api, port or repr(api))
+        with self.cond:
+            self.arms.append(arm)
+            arm.thread = threading.Thread(target=arm.run, name="DobotFleet-%s" % arm.port, daemon=True)
+            arm.thread.start()
+        return arm
+
+    # ------------------------------------------------------------- scheduling
+
+    def submit(self, func, arm=None):
+        """Queue func(api) on `arm`, or on the least loaded arm. Returns a Future."""
+        future = Future()
+        while True:
+            with self.cond:
+                if self.closed:
+                    raise RuntimeError("fleet is closed")
+                target = arm
+                if target is None:
+                    target = min(self.arms, key=lambda a: a.load() + (self.arms.index(a),))
+                if not hasattr(func, "estimate") or target.model is not None:
+                    estimate = func.estimate(target.model) if hasattr(func, "estimate") else 0.0
+                    target.queue.append(FleetJob(func, future, estimate))
+                    target.plannedTime += estimate
+                    self.cond.notify_all()
+                    return future
+            # Reading the arm's state takes DLL calls, so not under the lock every worker needs.
+            self.reseed(target)
+
+    def reseed(self, arm):
+        """Set arm.model to where the arm will be: the end of its command queue, then its pending jobs."""
+        watcher = DobotCompletion.getQueueWatcher(arm.api)
+        with watcher.cond:
+            model = watcher.model.copy() if watcher.model is not None else None
+        if model is None:
+            model = MotionModel(dType.GetPose(arm.api)[:4])
+        with self.cond:
+            for job in ([arm.running] if arm.running is not None else []) + list(arm.queue):
+                if hasattr(job.func, "estimate"):
+                    job.func.estimate(model)
+            arm.model = model
+
+    def steal(self, thief):
+        # Called with cond held by an arm with nothing queued.
+        victims = [arm for arm in self.arms if arm is not thief and arm.queue]
+        if not victims:
+            return None
+        victim = max(victims, key=lambda arm: len(arm.queue))
+        job = victim.queue.pop()
+        victim.plannedTime -= job.estimate
+        # Its model still ends where the stolen job would have; rebuilt on the next submit.
+        victim.model = None
+        thief.plannedTime += job.estimate
+        thief.jobsStolen += 1
+        return job
+
+    def pickAndPlace(self, pick, place, **kwargs):
+        return self.submit(PickPlaceJob(pick, place, **kwargs))
+
+    def join(self, timeout=None):
+        """Wait until every queued job has finished."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.cond:
+            while any(arm.queue or arm.running for arm in self.arms):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("fleet jobs still pending")
+                self.cond.wait(remaining)
+
+    # ---------------------------------------------------------------- status
+
+    def stats(self):
+        with self.cond:
+            elapsed = time.monotonic() - self.started
+            return {arm.port: arm.stats(elapsed) for arm in self.arms}
+
+    def close(self, disconnect=True):
+        """Stop the workers once their queues are empty, then disconnect the arms."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        for arm in self.arms:
+            arm.thread.join()
+            if disconnect:
+                dType.SetQueuedCmdStopExec(arm.api)
+                dType.DisconnectDobot(arm.api)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,250 @@
+"""----------------------------------------------------------------------------
+Remembers whether each arm has been homed since it was powered up, so that,
+when asked to, a repeated SetHOMECmd does not sweep the joints again.
+
+    DOBOT_HOME_POLICY=move python four_corners.py
+
+    from dobot_api import DobotHome
+
+    dType.SetHOMECmd(api, temp=0, isQueued=1)   # homes on the first run after power-up
+    dType.SetHOMECmd(api, temp=0, isQueued=1)   # with "move": a joint move to the home point
+    DobotHome.stats(api)    # {"homed": True, "homes": 1, "replaced": 1, "savedTime": 15.0, ...}
+
+Homing drives every joint to its limit switch, which takes tens of seconds,
+and the prompts tell Gemini to start every program with it. ConnectDobot
+imports this module and reports the arm's time since power-up
+(ConnectInfo.masterDevInfo.runTime); the state of each arm, keyed by serial
+number, is kept in ~/.dobot/home.json (DOBOT_HOME_STATE) so it survives the
+script. The arm counts as homed until
+
+  - it reports less time since power-up than has passed since it was last
+    seen, i.e. it was power-cycled,
+  - a queued home is cleared or force-stopped before it finished,
+  - an alarm is cleared, as a lost step or limit alarm leaves the position
+    unknown.
+
+DOBOT_HOME_POLICY decides what a SetHOMECmd does while the arm is homed.
+The default, "always", homes every time. With "move", SetHOMECmd first
+checks the reported pose (joint angles within limits and agreeing with x, y,
+z); if that passes, the home is replaced by a joint move to the home point,
+where homing would have left the arm, or dropped if the point is out of
+reach. "skip" drops it after the same check. Both are opt-in: the unit of
+runTime is not documented, so the power cycle check can miss one, and the
+pose check cannot see lost steps. Under "always" nothing is tracked or
+written, so the state only follows scripts run with "move" or "skip".
+----------------------------------------------------------------------------"""
+from ctypes import CDLL
+import math
+import os
+import threading
+import time
+
+try:
+    from . import DobotDllType as dType
+    from . import DobotKinematics as kinematics
+    from .DobotMotionModel import HOMING_TIME
+    from .DobotStore import JsonStore
+except ImportError:
+    import DobotDllType as dType
+    import DobotKinematics as kinematics
+    from DobotMotionModel import HOMING_TIME
+    from DobotStore import JsonStore
+
+DEFAULT_STATE_PATH = os.path.join(os.path.expanduser("~"), ".dobot", "home.json")
+POLICIES = ("move", "skip", "always")
+
+# Seconds the reported time since power-up may fall behind the wall clock before a power cycle is
+# assumed. A controller that counts faster (e.g. in milliseconds) makes the check more lenient, up to
+# missing a power cycle, which is why replacing homes is not the default.
+RUNTIME_SLACK = 5.0
+POSE_TOLERANCE = 5.0    # mm between the reported pose and the one its joint angles give
+
+
+class HomeStore(JsonStore):
+    """What is known about each arm, keyed by serial number; path=None keeps it in memory."""
+
+    def __init__(self, path=None):
+        super().__init__(path, "home state")
+
+    def get(self, key):
+        with self.lock:
+            return dict(self.entries.get(key, {}))
+
+    def update(self, key, **fields):
+        with self.lock:
+            self.entries.setdefault(key, {}).update(fields)
+            self.save()
+
+
+memoryStore = HomeStore()
+diskStores = {}
+
+
+def defaultStore(api):
+    api = dType.connection(api)
+    if not isinstance(api.lib, CDLL):
+        # Simulated arms start unhomed in every process.
+        return memoryStore
+    path = os.environ.get("DOBOT_HOME_STATE", DEFAULT_STATE_PATH)
+    if path not in diskStores:
+        diskStores[path] = HomeStore(path)
+    return diskStores[path]
+
+
+def policy():
+    value = os.environ.get("DOBOT_HOME_POLICY", "always") or "always"
+    if value not in POLICIES:
+        raise ValueError("DOBOT_HOME_POLICY must be one of %s, not %r" % (", ".join(POLICIES), value))
+    return value
+
+
+class ArmHome:
+    """Home state of one connection and what tracking it has saved."""
+
+    def __init__(self, key, store, homed, homeIndex):
+        self.key = key
+        self.store = store
+        self.homed = homed
+        # Queue index of a home not yet known to have run, 0 once it has.
+        self.homeIndex = homeIndex
+        self.homes = 0
+        self.replaced = 0
+        self.failedChecks = 0
+        self.savedTime = 0.0
+        # Between SetQueuedCmdStartDownload and StopDownload commands go into the offline program.
+        self.downloading = False
+
+    def setHomed(self, homed, homeIndex=0):
+        if homed != self.homed or homeIndex != self.homeIndex:
+            self.homed = homed
+            self.homeIndex = homeIndex
+            self.store.update(self.key, homed=homed, homeIndex=homeIndex)
+
+
+# Per connection, keyed by id(connection).
+arms = {}
+armsLock = threading.Lock()
+
+
+def supported(api):
+    # A single queue with the arm on it; homing a rail behind a controller is always sent.
+    return len(api.topology.indexSlots) == 1 and api.topology.armSlaveId != -1
+
+
+def currentIndex(api):
+    return dType.GetQueuedCmdCurrentIndex(api)[api.topology.indexSlots[0][1]]
+
+
+def powerCycled(entry, runTime, now):
+    if "runTime" not in entry:
+        return True
+    return runTime + RUNTIME_SLACK < entry["runTime"] + (now - entry["seenAt"])
+
+
+def connected(api, runTime):
+    """
+    Look the newly connected arm up and decide whether it is still homed. Called by ConnectDobot.
+    Under the "always" policy nothing is tracked, so connecting costs no calls or file writes.
+    """
+    api = dType.connection(api)
+    with armsLock:
+        arms.pop(id(api), None)
+    if policy() == "always" or not supported(api):
+        return None
+    store = defaultStore(api)
+    try:
+        key = dType.GetDeviceSN(api)[0] or repr(api)
+    except dType.DobotError:
+        key = repr(api)
+    now = time.time()
+    entry = store.get(key)
+    homed = entry.get("homed", False) and not powerCycled(entry, runTime, now)
+    if homed and entry.get("homeIndex", 0) > currentIndex(api):
+        # Queued by the last script, which exited before it ran.
+        homed = False
+    store.update(key, runTime=runTime, seenAt=now, homed=homed, homeIndex=0)
+    arm = ArmHome(key, store, homed, 0)
+    with armsLock:
+        arms[id(api)] = arm
+    return arm
+
+
+def poseConsistent(pose):
+    """True if GetPose's joint angles are within limits and give its x, y, z."""
+    joints = pose[4:8]
+    if not all(math.isfinite(value) for value in pose) or not kinematics.withinLimits(joints):
+        return False
+    return math.dist(kinematics.forward(*joints)[:3], pose[:3]) <= POSE_TOLERANCE
+
+
+def filterHome(api, temp, isQueued):
+    """
+    Queue indexes to return instead of homing an arm that is still homed, or None to send SetHOMECmd.
+    Installed as DobotDllType.homeFilter.
+    """
+    arm = arms.get(id(api))
+    if arm is None or arm.downloading:
+        return None
+    mode = policy()
+    if not arm.homed or mode == "always":
+        if not isQueued:
+            # An immediate home is done when the call returns.
+            arm.setHomed(True)
+        return None
+    if not poseConsistent(dType.GetPose(api)):
+        arm.failedChecks += 1
+        return None
+    home = dType.GetHOMEParams(api) if mode == "move" else None
+    if home is not None and kinematics.reachable(*home):
+        index = dType.SetPTPCmd(api, dType.PTPMode.PTPMOVJXYZMode, *home, isQueued=isQueued)[0]
+    else:
+        # A home point out of reach would raise a planning alarm as a move target.
+        index = api.flowControl.issuedIndex if isQueued else 0
+    arm.replaced += 1
+    arm.savedTime += HOMING_TIME
+    arm.store.update(arm.key, savedTime=arm.store.get(arm.key).get("savedTime", 0.0) + HOMING_TIME)
+    indexes = [0, 0]
+    indexes[api.topology.indexSlots[0][1]] = index
+    return indexes
+
+
+def stats(api):
+    """Homes sent and replaced on this connection, and the homing time saved here and in total."""
+    arm = arms.get(id(dType.connection(api)))
+    if arm is None:
+        return {"homed": False, "homes": 0, "replaced": 0, "failedChecks": 0, "savedTime": 0.0, "totalSavedTime": 0.0}
+    return {"homed": arm.homed, "homes": arm.homes, "replaced": arm.replaced, "failedChecks": arm.failedChecks,
+            "savedTime": arm.savedTime, "totalSavedTime": arm.store.get(arm.key).get("savedTime", 0.0)}
+
+
+def forget(api):
+    """Treat the arm as not homed, e.g. after it was moved by hand with the motors off."""
+    arm = arms.get(id(dType.connection(api)))
+    if arm is not None:
+        arm.setHomed(False)
+
+
+def _recordHome(api, name, args, queuedCmdIndex):
+    arm = arms.get(id(api))
+    if arm is None:
+        return
+    if name in ("SetQueuedCmdStartDownload", "SetQueuedCmdStopDownload"):
+        arm.downloading = name == "SetQueuedCmdStartDownload"
+    elif arm.downloading:
+        return
+    elif name == "SetHOMECmd":
+        arm.homes += 1
+        arm.setHomed(True, queuedCmdIndex)
+    elif name == "ClearAllAlarmsState":
+        arm.setHomed(False)
+    elif name in ("SetQueuedCmdClear", "SetQueuedCmdForceStopExec") and arm.homed and arm.homeIndex:
+        current = currentIndex(api)
+        # A force stop leaves the current index at the interrupted command.
+        if arm.homeIndex > current or (name == "SetQueuedCmdForceStopExec" and arm.homeIndex == current):
+            arm.setHomed(False)
+        elif arm.homeIndex < current:
+            arm.setHomed(True)
+
+
+dType.queuedCmdHooks.append(_recordHome)
+dType.homeFilter = filterHome
@@ -0,0 +1,442 @@
+"""----------------------------------------------------------------------------
+Append-only binary journal of the queued commands sent to the arm, and replay.
+
+    DOBOT_JOURNAL=run.djl python four_corners.py        # record every queued command
+
+    from dobot_api import DobotJournal
+
+    journal = DobotJournal.record(api, "run.djl")       # or for one connection in code
+    ...
+    journal.close()
+
+    with DobotJournal.JournalReader("run.djl") as reader:
+        for entry in reader:
+            print(entry.index, entry.name, entry.values())
+        headers = reader.array()                        # NumPy view of every record header
+
+    DobotJournal.replay(api, "run.djl")                 # at the recorded pace
+    DobotJournal.replay(api, "run.djl", speed=None)     # as fast as the queue takes them
+
+Every queued command that FlowControl sends successfully is written as it
+was passed to the library: the struct and scalar arguments after the device
+ids, byte for byte, with the queue index it got and the wall and monotonic
+time it was issued. The device ids are left out, so a journal replays on any
+arm. Commands that were never queued, such as GetPose or
+SetQueuedCmdStartExec, are not in the journal.
+
+The file starts with MAGIC and a version. Each record is a RECORD header
+followed by its payload:
+
+  SESSION   one per connection: its slave id, device type and simulator time
+            scale, as SESSION_INFO
+  TYPE      defines a command type for the rest of the session: wrapper name
+            and argument types, e.g. "SetPTPCmd:PTPCmd", as UTF-8
+  COMMAND   a command of an earlier TYPE; the payload holds its arguments
+
+A record is written with a single write, and the reader stops at a
+truncated last record, so a journal cut short by a crash is still readable
+up to that point. JournalReader maps the file with mmap and reads records
+in place without copying them.
+
+replay() re-issues the commands of one session through the target
+connection's FlowControl. A command sent to the recorded arm's slave id goes
+to the target's slave id, and other ids (a rail controller) are kept. At a
+speed factor the gaps between the recorded issue times are kept (scaled
+when the recording and the target run at different simulator time scales).
+With speed=None each command is sent as soon as the queue takes it. Every
+re-issued command is passed to dType.queuedCmdHooks with the arguments its
+wrapper would have given them, so the queue watcher, home tracking and
+jump-parameter cache follow a replay as they follow a live run.
+----------------------------------------------------------------------------"""
+import atexit
+import ctypes
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+try:
+    from . import DobotDllType as dType
+except ImportError:
+    import DobotDllType as dType
+
+MAGIC = b"DOBOTJNL"
+VERSION = 1
+FILE_HEADER = struct.Struct("<8sH6x")
+# kind, type id, payload length, queue index, wall time (time.time), monotonic time (time.perf_counter)
+RECORD = struct.Struct("<BxHIQdd")
+RECORD_DTYPE = np.dtype([("kind", "u1"), ("pad", "u1"), ("typeId", "<u2"), ("length", "<u4"),
+                         ("index", "<u8"), ("wallTime", "<f8"), ("monotonic", "<f8")])
+# slave id, slave device type, simulator time scale
+SESSION_INFO = struct.Struct("<iid")
+
+SESSION, TYPE, COMMAND = 1, 2, 3
+
+# Python arguments; ctypes objects are stored with their own size and layout.
+PYTHON_CODES = {int: ("int", struct.Struct("<q")), bool: ("bool", struct.Struct("<?")),
+                float: ("float", struct.Struct("<d"))}
+PYTHON_TYPES = {code: (cls, packer) for cls, (code, packer) in PYTHON_CODES.items()}
+
+CArgObject = dType.CArgObject
+
+
+def argumentCode(arg):
+    if arg.__class__ is CArgObject:
+        return "&" + arg._obj.__class__.__name__
+    if isinstance(arg, ctypes._SimpleCData) or isinstance(arg, ctypes.Structure):
+        return arg.__class__.__name__
+    return PYTHON_CODES[arg.__class__][0]
+
+
+def argumentBytes(arg):
+    if arg.__class__ is CArgObject:
+        return bytes(arg._obj)
+    packer = PYTHON_CODES.get(arg.__class__)
+    if packer is not None:
+        return packer[1].pack(arg)
+    return bytes(arg)
+
+
+def ctypesClass(name):
+    cls = getattr(ctypes, name, None)
+    if cls is None:
+        cls = getattr(dType, name)
+    return cls
+
+
+class CommandType:
+    """How the arguments of one command type are laid out in its payload."""
+
+    def __init__(self, signature):
+        self.signature = signature
+        self.name, _, codes = signature.partition(":")
+        self.codes = codes.split(",") if codes else []
+        self.slaveId = None         # device id the commands of this type went to
+        self.fields = []            # (code, class, offset, size)
+        offset = 0
+        for code in self.codes:
+            if code in PYTHON_TYPES:
+                cls, packer = PYTHON_TYPES[code]
+                size = packer.size
+            else:
+                cls = ctypesClass(code.lstrip("&"))
+                size = ctypes.sizeof(cls)
+            self.fields.append((code, cls, offset, size))
+            offset += size
+        self.size = offset
+
+    def arguments(self, payload):
+        """ctypes arguments as the wrapper passed them, between the device ids and isQueued."""
+        args = []
+        for code, cls, offset, size in self.fields:
+            data = payload[offset:offset + size]
+            if code in PYTHON_TYPES:
+                args.append(PYTHON_TYPES[code][1].unpack(data)[0])
+            elif code.startswith("&"):
+                args.append(ctypes.byref(cls.from_buffer_copy(data)))
+            else:
+                args.append(cls.from_buffer_copy(data))
+        return args
+
+    def values(self, payload):
+        """The arguments as plain Python values: structures as {field: value}."""
+        values = []
+        for arg in self.arguments(payload):
+            obj = getattr(arg, "_obj", arg)
+            if isinstance(obj, ctypes.Structure):
+                values.append({field[0]: getattr(obj, field[0]) for field in obj._fields_})
+            else:
+                values.append(getattr(obj, "value", obj))
+        return values
+
+
+# ----------------------------------------------------------------- writing
+
+class Journal:
+    def __init__(self, path, api):
+        self.path = path
+        self.lock = threading.Lock()
+        self.types = {}             # (name, argument classes) -> type id, for this session
+        self.commands = 0
+        self.skipped = 0            # commands with an argument the journal cannot store
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "ab")
+        if new:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        api = dType.connection(api)
+        self.slaveId = api.slaveId
+        info = SESSION_INFO.pack(api.slaveId, api.slaveDevType, float(getattr(api, "timeScale", 1.0)))
+        self.file.write(RECORD.pack(SESSION, 0, len(info), 0, time.time(), time.perf_counter()) + info)
+
+    def write(self, name, args, index):
+        """Record a queued command called as name(masterId, slaveId, *arguments, isQueued, &index)."""
+        arguments = args[2:-2]
+        slaveId = args[1] if args[1].__class__ is int else args[1].value
+        key = (name, slaveId) + tuple(a._obj.__class__ if a.__class__ is CArgObject else a.__class__
+                                      for a in arguments)
+        try:
+            payload = b"".join([argumentBytes(a) for a in arguments])
+        except TypeError:
+            self.skipped += 1
+            return
+        wallTime, monotonic = time.time(), time.perf_counter()
+        with self.lock:
+            if self.file is None:
+                return
+            typeId = self.types.get(key)
+            if typeId is None:
+                try:
+                    codes = ",".join(argumentCode(a) for a in arguments)
+                except KeyError:
+                    self.skipped += 1
+                    return
+                typeId = self.types[key] = len(self.types) + 1
+                signature = ("%s:%s" % (name, codes)).encode("utf-8")
+                # The slave id the command went to is kept in the TYPE record's index field.
+                self.file.write(RECORD.pack(TYPE, typeId, len(signature), slaveId & 0xFFFFFFFFFFFFFFFF,
+                                            wallTime, monotonic) + signature)
+            self.file.write(RECORD.pack(COMMAND, typeId, len(payload), index, wallTime, monotonic) + payload)
+            self.commands += 1
+
+    def flush(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def record(api, path):
+    """Journal every queued command sent on `api` to `path` (appended to if it exists) and return the Journal."""
+    api = dType.connection(api)
+    if api.flowControl.journal is not None:
+        api.flowControl.journal.close()
+    journal = api.flowControl.journal = Journal(path, api)
+    atexit.register(journal.close)
+    return journal
+
+
+def stop(api):
+    api = dType.connection(api)
+    journal, api.flowControl.journal = api.flowControl.journal, None
+    if journal is not None:
+        journal.close()
+
+
+# Journal paths already in use by this process, so the connections of a fleet get one file each.
+claimedPaths = set()
+
+
+def recordFromEnvironment(api):
+    """Honour DOBOT_JOURNAL for a newly connected `api`; called by ConnectDobot."""
+    path = os.environ.get("DOBOT_JOURNAL")
+    if not path or dType.connection(api).flowControl.journal is not None:
+        return None
+    base, extension = os.path.splitext(path)
+    n = 1
+    while path in claimedPaths:
+        n += 1
+        path = "%s-%d%s" % (base, n, extension)
+    claimedPaths.add(path)
+    return record(api, path)
+
+
+# ----------------------------------------------------------------- reading
+
+class JournalEntry:
+    __slots__ = ("session", "type", "index", "wallTime", "monotonic", "payload")
+
+    def __init__(self, session, commandType, index, wallTime, monotonic, payload):
+        self.session = session
+        self.type = commandType
+        self.index = index
+        self.wallTime = wallTime
+        self.monotonic = monotonic
+        self.payload = payload      # memoryview into the mapped file
+
+    @property
+    def name(self):
+        return self.type.name
+
+    def arguments(self):
+        return self.type.arguments(self.payload)
+
+    def values(self):
+        return self.type.values(self.payload)
+
+    def __repr__(self):
+        return "<JournalEntry %d %s %r>" % (self.index, self.name, self.values())
+
+
+class Session:
+    def __init__(self, number, slaveId, slaveDevType, timeScale, wallTime):
+        self.number = number
+        self.slaveId = slaveId
+        self.slaveDevType = slaveDevType
+        self.timeScale = timeScale
+        self.wallTime = wallTime
+        self.types = {}             # type id -> CommandType
+        self.offsets = []           # file offsets of its COMMAND records
+
+    def __repr__(self):
+        return "<Session %d: %d commands>" % (self.number, len(self.offsets))
+
+
+class JournalReader:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.view = memoryview(self.map)
+        if size < FILE_HEADER.size or FILE_HEADER.unpack_from(self.view)[0] != MAGIC:
+            self.close()
+            raise ValueError("%s is not a Dobot journal" % path)
+        version = FILE_HEADER.unpack_from(self.view)[1]
+        if version != VERSION:
+            self.close()
+            raise ValueError("%s is journal version %d, this reader knows %d" % (path, version, VERSION))
+        self.sessions = []
+        self.offsets = []           # file offset of every record
+        self.end = self.scan()
+
+    def scan(self):
+        offset, size = FILE_HEADER.size, len(self.view)
+        session = None
+        while offset + RECORD.size <= size:
+            kind, typeId, length, index, wallTime, monotonic = RECORD.unpack_from(self.view, offset)
+            body = offset + RECORD.size
+            if body + length > size:
+                break               # truncated by a crash
+            payload = self.view[body:body + length]
+            if kind == SESSION:
+                session = Session(len(self.sessions), *SESSION_INFO.unpack(payload), wallTime)
+                self.sessions.append(session)
+            elif kind == TYPE:
+                commandType = session.types[typeId] = CommandType(bytes(payload).decode("utf-8"))
+                commandType.slaveId = ctypes.c_int32(index).value
+            elif kind == COMMAND:
+                session.offsets.append(offset)
+            else:
+                break
+            self.offsets.append(offset)
+            offset = body + length
+        return offset
+
+    def __len__(self):
+        return sum(len(session.offsets) for session in self.sessions)
+
+    def __iter__(self):
+        for session in self.sessions:
+            yield from self.entries(session)
+
+    def entries(self, session):
+        for offset in session.offsets:
+            kind, typeId, length, index, wallTime, monotonic = RECORD.unpack_from(self.view, offset)
+            body = offset + RECORD.size
+            yield JournalEntry(session, session.types[typeId], index, wallTime, monotonic,
+                               self.view[body:body + length])
+
+    def array(self):
+        """Structured array of every record header (RECORD_DTYPE), read straight from the map."""
+        offsets = np.asarray(self.offsets, dtype=np.int64)
+        if not len(offsets):
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        raw = np.frombuffer(self.map, dtype=np.uint8, count=self.end)
+        rows = raw[offsets[:, None] + np.arange(RECORD.size)]
+        return rows.view(RECORD_DTYPE).ravel()
+
+    def close(self):
+        self.view.release()
+        if isinstance(self.map, mmap.mmap):
+            try:
+                self.map.close()
+            except BufferError:
+                pass                # an entry's payload is still in use; unmapped once it is gone
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ------------------------------------------------------------------ replay
+
+# Where the wrapper's hook arguments are not the structure fields in order: positions into the fields.
+HOOK_ORDER = {"SetPTPJointParams": (0, 4, 1, 5, 2, 6, 3, 7)}
+
+
+def plainValue(arg):
+    obj = getattr(arg, "_obj", arg)
+    if isinstance(obj, ctypes.Structure):
+        return [plainValue(getattr(obj, field[0])) for field in obj._fields_]
+    return getattr(obj, "value", obj)
+
+
+def hookArgs(name, arguments):
+    """The args the wrapper of `name` passes dType.notifyQueuedCmd, from the journaled ctypes arguments."""
+    args = []
+    for arg in arguments:
+        value = plainValue(arg)
+        if isinstance(getattr(arg, "_obj", arg), ctypes.Structure):
+            # A command structure holds the wrapper's arguments; nested ones such as ARCPoint stay lists.
+            args.extend(value)
+        else:
+            args.append(value)
+    order = HOOK_ORDER.get(name)
+    return tuple(args[i] for i in order) if order else tuple(args)
+
+
+def replay(api, path, session=-1, speed=1.0, start=True, wait=True):
+    """
+    Re-issue the commands of `session` (by default the last one) of the journal at `path` on `api`.
+    speed is a factor on the recorded pace, or None to send as fast as the queue takes them. Starts
+    the queue unless start=False, and with wait=True returns once the arm has executed the last
+    command. Returns (commands sent, last queue index).
+    """
+    api = dType.connection(api)
+    with JournalReader(path) as reader:
+        if not reader.sessions:
+            return 0, None
+        recorded = reader.sessions[session]
+        scale = recorded.timeScale / float(getattr(api, "timeScale", 1.0))
+        flowControl = api.flowControl
+        index = ctypes.c_uint64(0)
+        indexRef = ctypes.byref(index)
+        sent, last = 0, None
+        began = first = None
+        for entry in reader.entries(recorded):
+            slaveId = entry.type.slaveId
+            if slaveId == recorded.slaveId:
+                slaveId = api.slaveId
+            if speed is not None:
+                if first is None:
+                    began, first = time.perf_counter(), entry.monotonic
+                delay = began + (entry.monotonic - first) * scale / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            arguments = entry.arguments()
+            args = [api.masterId, slaveId] + arguments + [1, indexRef]
+            index.value = 0
+            flowControl.callBound(api, entry.name, getattr(api, entry.name), tuple(args), index)
+            dType.notifyQueuedCmd(api, entry.name, hookArgs(entry.name, arguments), index.value)
+            last = index.value
+            sent += 1
+            if sent == 1 and start:
+                dType.SetQueuedCmdStartExec(api)
+    if wait and last is not None:
+        if __package__:
+            from . import DobotCompletion
+        else:
+            import DobotCompletion
+        DobotCompletion.getQueueWatcher(api).wait(last)
+    return sent, last
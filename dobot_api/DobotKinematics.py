@@ -0,0 +1,58 @@
+"""----------------------------------------------------------------------------
+Approximate kinematic model of the Dobot Magician.
+
+Angles are in degrees and lengths in millimetres, matching the values returned
+by GetPose. joint2 is the rear arm angle measured from vertical and joint3 the
+forearm angle measured from horizontal, as reported by the controller.
+----------------------------------------------------------------------------"""
+import math
+
+REAR_ARM = 135.0        # shoulder -> elbow
+FOREARM = 147.0         # elbow -> wrist
+END_OFFSET = 59.7       # wrist -> suction cup tip (horizontal)
+
+JOINT_LIMITS = (
+    (-90.0, 90.0),      # joint1, base
+    (0.0, 85.0),        # joint2, rear arm
+    (-10.0, 95.0),      # joint3, forearm
+    (-90.0, 90.0),      # joint4, end effector servo
+)
+
+
+def forward(j1, j2, j3, j4=0.0):
+    """Joint angles -> [x, y, z, rHead]."""
+    t1, t2, t3 = math.radians(j1), math.radians(j2), math.radians(j3)
+    radial = REAR_ARM * math.sin(t2) + FOREARM * math.cos(t3) + END_OFFSET
+    z = REAR_ARM * math.cos(t2) - FOREARM * math.sin(t3)
+    return [radial * math.cos(t1), radial * math.sin(t1), z, j1 + j4]
+
+
+def inverse(x, y, z, rHead=0.0):
+    """[x, y, z, rHead] -> [j1, j2, j3, j4], or None if the point cannot be reached."""
+    j1 = math.degrees(math.atan2(y, x))
+    a = math.hypot(x, y) - END_OFFSET
+    b = z
+    d = math.hypot(a, b)
+    if d > REAR_ARM + FOREARM or d < abs(REAR_ARM - FOREARM) or d == 0:
+        return None
+
+    phi = math.atan2(a, b)
+    alpha = math.acos((REAR_ARM ** 2 + d ** 2 - FOREARM ** 2) / (2 * REAR_ARM * d))
+    for t2 in (phi - alpha, phi + alpha):
+        ex, ez = REAR_ARM * math.sin(t2), REAR_ARM * math.cos(t2)
+        t3 = math.atan2(ez - b, a - ex)
+        joints = [j1, math.degrees(t2), math.degrees(t3), rHead - j1]
+        if withinLimits(joints):
+            return joints
+    return None
+
+
+def withinLimits(joints):
+    for angle, (low, high) in zip(joints, JOINT_LIMITS):
+        if angle < low - 1e-6 or angle > high + 1e-6:
+            return False
+    return True
+
+
+def reachable(x, y, z, rHead=0.0):
+    return inverse(x, y, z, rHead) is not None
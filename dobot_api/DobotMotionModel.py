@@ -0,0 +1,315 @@
+"""----------------------------------------------------------------------------
+Trapezoidal velocity model of the Dobot Magician command queue.
+
+MotionModel keeps the same state the controller does (motion parameters, pose,
+end effector) and predicts how long each queued command takes to execute.
+Commands are described by the name and positional arguments of the matching
+DobotDllType wrapper, e.g. model.execute("SetPTPCmd", mode, x, y, z, rHead).
+----------------------------------------------------------------------------"""
+import math
+
+try:
+    from . import DobotKinematics as kinematics
+except ImportError:
+    import DobotKinematics as kinematics
+
+# Mirrors DobotDllType.PTPMode
+PTP_JUMP_XYZ = 0
+PTP_MOVJ_XYZ = 1
+PTP_MOVL_XYZ = 2
+PTP_JUMP_ANGLE = 3
+PTP_MOVJ_ANGLE = 4
+PTP_MOVL_ANGLE = 5
+PTP_MOVJ_ANGLE_INC = 6
+PTP_MOVL_XYZ_INC = 7
+PTP_MOVJ_XYZ_INC = 8
+PTP_JUMP_MOVL_XYZ = 9
+
+CP_RELATIVE = 0
+
+HOMING_TIME = 15.0          # seconds spent on the limit-switch sweep before moving to the home point
+END_EFFECTOR_TIME = 0.02    # valve/servo switching time for suction cup, gripper and laser
+
+
+def circumcircle(a, b, c):
+    """(center, radius, normal) of the circle through the points a, b and c, or None if they are in line."""
+    ab = [q - p for p, q in zip(a, b)]
+    ac = [q - p for p, q in zip(a, c)]
+    normal = cross(ab, ac)
+    nn = dot(normal, normal)
+    if nn <= 1e-12 * max(dot(ab, ab) * dot(ac, ac), 1e-12):
+        return None
+    # center = a + (|ab|^2 (ac x n) + |ac|^2 (n x ab)) / (2 |n|^2)
+    u, v = cross(ac, normal), cross(normal, ab)
+    center = [p + (dot(ab, ab) * x + dot(ac, ac) * y) / (2 * nn) for p, x, y in zip(a, u, v)]
+    return center, math.dist(center, a), normal
+
+
+def arcLength(a, b, c):
+    """Length of the arc from a through b to c on their circumcircle; the chord if they are in line."""
+    circle = circumcircle(a, b, c)
+    if circle is None:
+        return math.dist(a, c)
+    center, radius, normal = circle
+    # In-plane axes: u towards a, w a quarter turn on in the direction a -> b -> c runs.
+    u = [(p - q) / radius for p, q in zip(a, center)]
+    n = math.sqrt(dot(normal, normal))
+    w = cross([x / n for x in normal], u)
+    end = [p - q for p, q in zip(c, center)]
+    angle = math.atan2(dot(end, w), dot(end, u)) % (2 * math.pi)
+    return radius * angle
+
+
+def dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def cross(a, b):
+    return [a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]]
+
+
+def trapezoidTime(distance, velocity, acceleration, v0=0.0, v1=0.0):
+    """Time to travel `distance` accelerating from v0, cruising at most at `velocity` and ending at v1."""
+    distance = abs(distance)
+    if distance <= 1e-9:
+        return 0.0
+    if velocity <= 0 or acceleration <= 0:
+        return math.inf
+    v0 = min(v0, velocity)
+    v1 = min(v1, velocity)
+    dAcc = (velocity ** 2 - v0 ** 2) / (2 * acceleration)
+    dDec = (velocity ** 2 - v1 ** 2) / (2 * acceleration)
+    if dAcc + dDec <= distance:
+        return (velocity - v0) / acceleration + (velocity - v1) / acceleration + (distance - dAcc - dDec) / velocity
+    peak = math.sqrt((2 * acceleration * distance + v0 ** 2 + v1 ** 2) / 2)
+    if peak < max(v0, v1):
+        return 2 * distance / (v0 + v1)
+    return (peak - v0) / acceleration + (peak - v1) / acceleration
+
+
+class MotionModel:
+    def __init__(self, pose=None):
+        self.jointVelocity = [200.0] * 4
+        self.jointAcceleration = [200.0] * 4
+        self.xyzVelocity = 200.0
+        self.rVelocity = 200.0
+        self.xyzAcceleration = 200.0
+        self.rAcceleration = 200.0
+        self.jumpHeight = 20.0
+        self.zLimit = 200.0
+        self.velocityRatio = 100.0
+        self.accelerationRatio = 100.0
+        self.cpPlanAcc = 100.0
+        self.cpJunctionVel = 50.0
+        self.cpAcc = 100.0
+        self.cpVelocityRatio = 100.0
+        self.cpAccelerationRatio = 100.0
+        self.arcXyzVelocity = 100.0
+        self.arcXyzAcceleration = 100.0
+        self.homePose = [200.0, 0.0, 0.0, 0.0]
+        self.suctionCup = 0
+        self.gripper = 0
+        self.laser = 0
+        self.endEffectorBias = (kinematics.END_OFFSET, 0.0, 0.0)
+        self.lastWasCP = False
+        self.setPose(pose if pose is not None else self.homePose)
+
+    def copy(self):
+        other = MotionModel.__new__(MotionModel)
+        other.__dict__.update(self.__dict__)
+        other.jointVelocity = list(self.jointVelocity)
+        other.jointAcceleration = list(self.jointAcceleration)
+        other.homePose = list(self.homePose)
+        other.pose = list(self.pose)
+        other.joints = list(self.joints)
+        return other
+
+    def setPose(self, pose):
+        self.pose = [float(v) for v in pose[:4]]
+        joints = kinematics.inverse(*self.pose)
+        self.joints = joints if joints is not None else [0.0, 0.0, 0.0, 0.0]
+
+    # ------------------------------------------------------------------ timing
+
+    def jointTime(self, fromJoints, toJoints):
+        vRatio, aRatio = self.velocityRatio / 100, self.accelerationRatio / 100
+        return max(trapezoidTime(b - a, v * vRatio, acc * aRatio)
+                   for a, b, v, acc in zip(fromJoints, toJoints, self.jointVelocity, self.jointAcceleration))
+
+    def linearTime(self, fromPose, toPose):
+        vRatio, aRatio = self.velocityRatio / 100, self.accelerationRatio / 100
+        distance = math.dist(fromPose[:3], toPose[:3])
+        return max(trapezoidTime(distance, self.xyzVelocity * vRatio, self.xyzAcceleration * aRatio),
+                   trapezoidTime(toPose[3] - fromPose[3], self.rVelocity * vRatio, self.rAcceleration * aRatio))
+
+    def jumpTime(self, fromPose, toPose, linear=False):
+        top = max(fromPose[2], toPose[2]) + self.jumpHeight
+        top = max(min(top, self.zLimit), fromPose[2], toPose[2])
+        upFrom, upTo = fromPose, fromPose[:2] + [top, fromPose[3]]
+        downFrom, downTo = toPose[:2] + [top, toPose[3]], toPose
+        if linear:
+            lateral = self.linearTime(upTo, downFrom)
+        else:
+            a, b = kinematics.inverse(*upTo), kinematics.inverse(*downFrom)
+            if a is None or b is None:
+                return None
+            lateral = self.jointTime(a, b)
+        return self.linearTime(upFrom, upTo) + lateral + self.linearTime(downFrom, downTo)
+
+    def resolvePTP(self, ptpMode, x, y, z, rHead):
+        """Target [pose, joints] of a PTP command, or None if it is out of reach."""
+        if ptpMode in (PTP_JUMP_ANGLE, PTP_MOVJ_ANGLE, PTP_MOVL_ANGLE, PTP_MOVJ_ANGLE_INC):
+            joints = [x, y, z, rHead]
+            if ptpMode == PTP_MOVJ_ANGLE_INC:
+                joints = [a + b for a, b in zip(self.joints, joints)]
+            if not kinematics.withinLimits(joints):
+                return None
+            return [kinematics.forward(*joints), joints]
+        pose = [x, y, z, rHead]
+        if ptpMode in (PTP_MOVL_XYZ_INC, PTP_MOVJ_XYZ_INC):
+            pose = [a + b for a, b in zip(self.pose, pose)]
+        joints = kinematics.inverse(*pose)
+        if joints is None:
+            return None
+        return [pose, joints]
+
+    def ptpTime(self, ptpMode, x, y, z, rHead):
+        target = self.resolvePTP(ptpMode, x, y, z, rHead)
+        if target is None:
+            return None
+        pose, joints = target
+        if ptpMode in (PTP_JUMP_XYZ, PTP_JUMP_ANGLE):
+            return self.jumpTime(self.pose, pose)
+        if ptpMode == PTP_JUMP_MOVL_XYZ:
+            return self.jumpTime(self.pose, pose, linear=True)
+        if ptpMode in (PTP_MOVL_XYZ, PTP_MOVL_ANGLE, PTP_MOVL_XYZ_INC):
+            return self.linearTime(self.pose, pose)
+        return self.jointTime(self.joints, joints)
+
+    def cpTime(self, cpMode, x, y, z, velocity, endAtRest=True):
+        target = self.cpTarget(cpMode, x, y, z)
+        vRatio, aRatio = self.cpVelocityRatio / 100, self.cpAccelerationRatio / 100
+        v = velocity * vRatio
+        junction = min(self.cpJunctionVel, v)
+        v0 = junction if self.lastWasCP else 0.0
+        v1 = 0.0 if endAtRest else junction
+        return trapezoidTime(math.dist(self.pose[:3], target[:3]), v, self.cpAcc * aRatio, v0, v1)
+
+    def cpTarget(self, cpMode, x, y, z):
+        if cpMode == CP_RELATIVE:
+            return [self.pose[0] + x, self.pose[1] + y, self.pose[2] + z, self.pose[3]]
+        return [x, y, z, self.pose[3]]
+
+    # --------------------------------------------------------------- execution
+
+    def execute(self, name, *args, **kwargs):
+        """Apply a queued command and return its execution time in seconds (None if unreachable)."""
+        handler = getattr(self, "_" + name, None)
+        wasCP = self.lastWasCP
+        self.lastWasCP = False
+        if handler is None:
+            return 0.0
+        duration = handler(*args, **kwargs)
+        if duration is None:
+            self.lastWasCP = wasCP
+        return duration
+
+    def _SetPTPCmd(self, ptpMode, x, y, z, rHead, **kwargs):
+        duration = self.ptpTime(ptpMode, x, y, z, rHead)
+        if duration is not None:
+            self.pose, self.joints = self.resolvePTP(ptpMode, x, y, z, rHead)
+        return duration
+
+    def _SetPTPWithLCmd(self, ptpMode, x, y, z, rHead, l=0, **kwargs):
+        return self._SetPTPCmd(ptpMode, x, y, z, rHead)
+
+    def _SetCPCmd(self, cpMode, x, y, z, velocity, endAtRest=True, **kwargs):
+        duration = self.cpTime(cpMode, x, y, z, velocity, endAtRest)
+        target = self.cpTarget(cpMode, x, y, z)
+        if kinematics.inverse(*target) is None:
+            return None
+        self.setPose(target)
+        self.lastWasCP = True
+        return duration
+
+    def _SetCP2Cmd(self, cpMode, x, y, z, endAtRest=True, **kwargs):
+        return self._SetCPCmd(cpMode, x, y, z, 100, endAtRest)
+
+    def _SetCPLECmd(self, cpMode, x, y, z, power, endAtRest=True, **kwargs):
+        return self._SetCPCmd(cpMode, x, y, z, 100, endAtRest)
+
+    def _SetARCCmd(self, cirPoint, toPoint, **kwargs):
+        if kinematics.inverse(*toPoint[:4]) is None:
+            return None
+        distance = arcLength(self.pose[:3], cirPoint[:3], toPoint[:3])
+        self.setPose(toPoint)
+        return trapezoidTime(distance, self.arcXyzVelocity, self.arcXyzAcceleration)
+
+    def _SetCircleCmd(self, cirPoint, toPoint, **kwargs):
+        # A full circle through the pose, cirPoint and toPoint, ending where it started.
+        if kinematics.inverse(*cirPoint[:4]) is None or kinematics.inverse(*toPoint[:4]) is None:
+            return None
+        circle = circumcircle(self.pose[:3], cirPoint[:3], toPoint[:3])
+        if circle is None:
+            return 0.0
+        return trapezoidTime(2 * math.pi * circle[1], self.arcXyzVelocity, self.arcXyzAcceleration)
+
+    def _SetHOMECmd(self, temp=0, **kwargs):
+        home = kinematics.inverse(*self.homePose)
+        duration = HOMING_TIME + (self.jointTime(self.joints, home) if home is not None else 0.0)
+        self.setPose(self.homePose)
+        return duration
+
+    def _SetWAITCmd(self, waitTime, **kwargs):
+        return waitTime / 1000
+
+    def _SetEndEffectorSuctionCup(self, enableCtrl, on, **kwargs):
+        self.suctionCup = on if enableCtrl else 0
+        return END_EFFECTOR_TIME
+
+    def _SetEndEffectorGripper(self, enableCtrl, on, **kwargs):
+        self.gripper = on if enableCtrl else 0
+        return END_EFFECTOR_TIME
+
+    def _SetEndEffectorLaser(self, enableCtrl, on, **kwargs):
+        self.laser = on if enableCtrl else 0
+        return END_EFFECTOR_TIME
+
+    def _SetEndEffectorParams(self, xBias, yBias, zBias, **kwargs):
+        self.endEffectorBias = (xBias, yBias, zBias)
+        return 0.0
+
+    def _SetHOMEParams(self, x, y, z, r, **kwargs):
+        self.homePose = [x, y, z, r]
+        return 0.0
+
+    def _SetPTPJointParams(self, j1Velocity, j1Acceleration, j2Velocity, j2Acceleration,
+                           j3Velocity, j3Acceleration, j4Velocity, j4Acceleration, **kwargs):
+        self.jointVelocity = [j1Velocity, j2Velocity, j3Velocity, j4Velocity]
+        self.jointAcceleration = [j1Acceleration, j2Acceleration, j3Acceleration, j4Acceleration]
+        return 0.0
+
+    def _SetPTPCoordinateParams(self, xyzVelocity, xyzAcceleration, rVelocity, rAcceleration, **kwargs):
+        self.xyzVelocity, self.xyzAcceleration = xyzVelocity, xyzAcceleration
+        self.rVelocity, self.rAcceleration = rVelocity, rAcceleration
+        return 0.0
+
+    def _SetPTPJumpParams(self, jumpHeight, zLimit, **kwargs):
+        self.jumpHeight, self.zLimit = jumpHeight, zLimit
+        return 0.0
+
+    def _SetPTPCommonParams(self, velocityRatio, accelerationRatio, **kwargs):
+        self.velocityRatio, self.accelerationRatio = velocityRatio, accelerationRatio
+        return 0.0
+
+    def _SetCPParams(self, planAcc, juncitionVel, acc, realTimeTrack=0, **kwargs):
+        self.cpPlanAcc, self.cpJunctionVel, self.cpAcc = planAcc, juncitionVel, acc
+        return 0.0
+
+    def _SetCPCommonParams(self, velocityRatio, accelerationRatio, **kwargs):
+        self.cpVelocityRatio, self.cpAccelerationRatio = velocityRatio, accelerationRatio
+        return 0.0
+
+    def _SetARCParams(self, xyzVelocity, rVelocity, xyzAcceleration, rAcceleration, **kwargs):
+        self.arcXyzVelocity, self.arcXyzAcceleration = xyzVelocity, xyzAcceleration
+        return 0.0
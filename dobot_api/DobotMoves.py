@@ -0,0 +1,260 @@
+"""----------------------------------------------------------------------------
+Choose joint, linear or jump interpolation for each move of a waypoint list.
+
+    from dobot_api import DobotMoves
+
+    blocks = [(250, 50), (200, -80)]                    # obstacles on the paper, (x, y[, top z[, radius]])
+    moves = DobotMoves.planMoves([(155, 0, -50, 50), (300, 0, -50, 50), (155, -100, -50, 50)],
+                                 start=dType.GetPose(api)[:4], obstacles=blocks)
+    moves.modes                 # ['MOVJ', 'MOVJ', 'JUMP']
+    moves.report()              # predicted seconds as planned and as all MOVL moves
+    last = moves.send(api)
+
+    last = DobotMoves.moveThrough(api, waypoints, obstacles=blocks)    # plan from the queue's end and send
+
+Waypoints are given as in DobotPath: (x, y, z) or (x, y, z, rHead), with
+(wrapper name, *args) tuples passed through unchanged. For each move the
+candidates are PTPMOVJXYZMode, PTPMOVLXYZMode and PTPJUMPXYZMode. A candidate
+is dropped if its path leaves the workspace (checked with DobotReach) or comes
+within CLEARANCE mm of an obstacle. The MotionModel's fastest remaining
+candidate is used. MOVL is kept on a tie because its path is the easiest
+to predict.
+
+The path of each mode is sampled the way the controller moves. MOVL follows
+a straight line. MOVJ interpolates the joints, so its path bends. JUMP
+rises straight up, moves across in joint space at the jump height and drops
+straight down. Because a MOVJ path bends, it can dip below both of its ends,
+so a path may not go below TABLE_Z unless one of its ends already does. An
+obstacle is a vertical cylinder standing on the paper. An obstacle whose
+footprint holds the move's start or end is the block being picked or
+placed, so that move does not check it.
+
+With linearNear=d, a move that starts or ends within d mm of an obstacle
+never uses MOVJ. Only MOVL or JUMP remain, and both stay on straight lines
+near the obstacle.
+----------------------------------------------------------------------------"""
+import math
+
+import numpy as np
+
+try:
+    from . import DobotDllType as dType
+    from . import DobotCompletion
+    from . import DobotEstimate
+    from . import DobotKinematics as kinematics
+    from . import DobotReach
+    from .DobotMotionModel import MotionModel
+    from .DobotPickPlace import PICK_Z
+except ImportError:
+    import DobotDllType as dType
+    import DobotCompletion
+    import DobotEstimate
+    import DobotKinematics as kinematics
+    import DobotReach
+    from DobotMotionModel import MotionModel
+    from DobotPickPlace import PICK_Z
+
+BLOCK_SIZE = 25.0       # mm, the blocks are cubes
+BLOCK_RADIUS = 18.0     # mm, half the diagonal of a block
+TABLE_Z = PICK_Z - BLOCK_SIZE   # the paper the blocks stand on
+CLEARANCE = 10.0        # mm the suction cup keeps from an obstacle
+PATH_STEP = 5.0         # mm between the points checked along a path
+MAX_REACH = kinematics.REAR_ARM + kinematics.FOREARM + kinematics.END_OFFSET
+
+# Candidates in order of preference, which settles ties in predicted time.
+MODES = (
+    ("MOVL", dType.PTPMode.PTPMOVLXYZMode),
+    ("MOVJ", dType.PTPMode.PTPMOVJXYZMode),
+    ("JUMP", dType.PTPMode.PTPJUMPXYZMode),
+)
+MODE_NAMES = {mode: name for name, mode in MODES}
+
+
+class Obstacle:
+    def __init__(self, x, y, top=PICK_Z, radius=BLOCK_RADIUS):
+        self.x, self.y = float(x), float(y)
+        self.top = float(top)           # Z of its top face; it stands on the paper below
+        self.radius = float(radius)
+
+    def __repr__(self):
+        return "Obstacle(%g, %g, top=%g, radius=%g)" % (self.x, self.y, self.top, self.radius)
+
+    def holds(self, pose):
+        """True if `pose` is on or inside the obstacle's footprint."""
+        return math.hypot(pose[0] - self.x, pose[1] - self.y) <= self.radius + CLEARANCE
+
+    def near(self, pose, distance):
+        return (math.hypot(pose[0] - self.x, pose[1] - self.y) <= self.radius + distance
+                and pose[2] <= self.top + distance)
+
+
+def toObstacle(obstacle):
+    if isinstance(obstacle, Obstacle):
+        return obstacle
+    return Obstacle(*obstacle)
+
+
+def movjPoints(a, b):
+    """Points along a joint-interpolated move from pose a to pose b, or None if either is out of reach."""
+    ja, jb = kinematics.inverse(*a[:4]), kinematics.inverse(*b[:4])
+    if ja is None or jb is None:
+        return None
+    turn = max(abs(q - p) for p, q in zip(ja[:3], jb[:3]))
+    steps = max(1, int(math.radians(turn) * MAX_REACH / PATH_STEP))
+    t = np.linspace(0.0, 1.0, steps + 1)[:, None]
+    joints = np.radians(np.asarray(ja[:3]) + (np.asarray(jb[:3]) - np.asarray(ja[:3])) * t)
+    t1, t2, t3 = joints[:, 0], joints[:, 1], joints[:, 2]
+    radial = kinematics.REAR_ARM * np.sin(t2) + kinematics.FOREARM * np.cos(t3) + kinematics.END_OFFSET
+    z = kinematics.REAR_ARM * np.cos(t2) - kinematics.FOREARM * np.sin(t3)
+    return np.column_stack([radial * np.cos(t1), radial * np.sin(t1), z])
+
+
+def movlPoints(a, b):
+    points = DobotReach.linePoints(a, b)
+    if not DobotReach.getGrid().check(points).all():
+        return None
+    return points
+
+
+def jumpPoints(a, b, jumpHeight, zLimit):
+    top = max(min(max(a[2], b[2]) + jumpHeight, zLimit), a[2], b[2])
+    upTo, downFrom = list(a[:2]) + [top, a[3]], list(b[:2]) + [top, b[3]]
+    legs = [movlPoints(a, upTo), movjPoints(upTo, downFrom), movlPoints(downFrom, b)]
+    if any(leg is None for leg in legs):
+        return None
+    return np.vstack(legs)
+
+
+def pathPoints(mode, model, target):
+    """Points the end effector passes through on a `mode` move from the model's pose to `target`."""
+    if mode == dType.PTPMode.PTPMOVLXYZMode:
+        return movlPoints(model.pose, target)
+    if mode == dType.PTPMode.PTPMOVJXYZMode:
+        return movjPoints(model.pose, target)
+    return jumpPoints(model.pose, target, model.jumpHeight, model.zLimit)
+
+
+def collides(points, obstacles):
+    """True if any of `points` comes within CLEARANCE of one of `obstacles`."""
+    if not obstacles:
+        return False
+    centres = np.array([(o.x, o.y) for o in obstacles])
+    reach = np.array([o.radius + CLEARANCE for o in obstacles])
+    tops = np.array([o.top + CLEARANCE for o in obstacles])
+    beside = np.hypot(points[:, 0, None] - centres[:, 0], points[:, 1, None] - centres[:, 1]) < reach
+    below = points[:, 2, None] < tops
+    return bool((beside & below).any())
+
+
+def chooseMode(model, target, obstacles=(), linearNear=None, floor=TABLE_Z):
+    """
+    (PTP mode, predicted seconds) of the fastest clear move from the model's pose to `target`;
+    raises ValueError if no mode is clear.
+    """
+    start = model.pose
+    relevant = [o for o in obstacles if not o.holds(start) and not o.holds(target)]
+    modes = MODES
+    if linearNear is not None and any(o.near(start, linearNear) or o.near(target, linearNear) for o in obstacles):
+        modes = [(name, mode) for name, mode in MODES if mode != dType.PTPMode.PTPMOVJXYZMode]
+    best, reasons = None, []
+    for name, mode in modes:
+        seconds = model.ptpTime(mode, *target)
+        points = pathPoints(mode, model, target) if seconds is not None else None
+        if points is None:
+            reasons.append("%s leaves the workspace" % name)
+        elif points[:, 2].min() < min(floor, start[2], target[2]) - 1e-6:
+            reasons.append("%s dips below the table" % name)
+        elif collides(points, relevant):
+            reasons.append("%s passes an obstacle" % name)
+        elif best is None or seconds < best[1] - 1e-9:
+            best = (mode, seconds)
+    if best is None:
+        raise ValueError("no clear move from (%g, %g, %g) to (%g, %g, %g): %s" %
+                         (start[0], start[1], start[2], target[0], target[1], target[2], ", ".join(reasons)))
+    return best
+
+
+class Moves:
+    def __init__(self, commands, linearCommands, start, model):
+        self.commands = commands                # motion list with the chosen modes
+        self.linearCommands = linearCommands    # the same waypoints as MOVL moves, for comparison
+        self.start = start
+        self.model = model
+
+    def __len__(self):
+        return len(self.commands)
+
+    def __iter__(self):
+        return iter(self.commands)
+
+    @property
+    def modes(self):
+        """Name of the mode chosen for each move, in order."""
+        return [MODE_NAMES.get(args[0], str(args[0])) for name, args in self.commands if name == "SetPTPCmd"]
+
+    def estimate(self):
+        return DobotEstimate.estimate(self.commands, self.model.copy()).total
+
+    def linearEstimate(self):
+        return DobotEstimate.estimate(self.linearCommands, self.model.copy()).total
+
+    def report(self):
+        """Predicted seconds of the planned moves and of MOVL moves through the same waypoints."""
+        planned, linear = self.estimate(), self.linearEstimate()
+        modes = self.modes
+        return {
+            "planned": planned,
+            "movl": linear,
+            "saving": (linear - planned) / linear if linear and not math.isinf(linear) else 0.0,
+            "modes": {name: modes.count(name) for name, _ in MODES}}
+
+    def send(self, api):
+        """Queue the moves on `api` and return the queue index of the last command."""
+        index = 0
+        for name, args in self.commands:
+            index = getattr(dType, name)(api, *args, isQueued=1)[0]
+        return index
+
+
+def planMoves(waypoints, start=None, model=None, obstacles=(), linearNear=None, floor=TABLE_Z):
+    """
+    Moves through `waypoints` from `start` (x, y, z, rHead), or from the pose in `model` (a
+    MotionModel with the arm's parameters, e.g. DobotEstimate.activeModel(api)). Without either,
+    or from a pose out of reach such as some home points, the first waypoint is reached with MOVL.
+    """
+    known = start is not None or model is not None
+    model = MotionModel(start) if model is None else model.copy()
+    if start is not None:
+        model.setPose(start)
+    obstacles = [toObstacle(o) for o in obstacles]
+    planning = model.copy()
+    movl = dType.PTPMode.PTPMOVLXYZMode
+    commands, linearCommands = [], []
+    for item in waypoints:
+        if isinstance(item[0], str):
+            command = (item[0], tuple(item[1:]))
+            commands.append(command)
+            linearCommands.append(command)
+            planning.execute(command[0], *command[1])
+            continue
+        target = [float(v) for v in item[:4]] + [planning.pose[3]] * (4 - len(item[:4]))
+        if known and kinematics.inverse(*planning.pose) is not None:
+            mode, _ = chooseMode(planning, target, obstacles, linearNear, floor)
+        else:
+            mode = movl
+        known = True
+        commands.append(("SetPTPCmd", (mode,) + tuple(target)))
+        linearCommands.append(("SetPTPCmd", (movl,) + tuple(target)))
+        planning.execute("SetPTPCmd", mode, *target)
+    return Moves(commands, linearCommands, list(model.pose), model)
+
+
+def moveThrough(api, waypoints, obstacles=(), linearNear=None, floor=TABLE_Z):
+    """
+    Plan the moves from where the arm will be once its queue is done and queue them. Returns the
+    last queue index.
+    """
+    model = DobotCompletion.getQueueWatcher(api).model
+    if model is None:
+        model = DobotEstimate.activeModel(api)
+    return planMoves(waypoints, model=model, obstacles=obstacles, linearNear=linearNear, floor=floor).send(api)
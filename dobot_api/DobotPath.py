@@ -0,0 +1,186 @@
+"""----------------------------------------------------------------------------
+Continuous-path blending of waypoint lists.
+
+    from dobot_api import DobotPath
+
+    path = DobotPath.buildPath([(155, 100, -50), (300, 100, -50), (300, -100, -50), (155, -100, -50)],
+                               start=dType.GetPose(api)[:4])
+    print(path.report())       # {'blended': 5.1, 'ptp': 6.3, 'saving': 0.19, ...}
+    lastIndex = path.send(api)
+
+A waypoint is (x, y, z) or (x, y, z, rHead). Any (wrapper name, *args)
+tuple in the list, e.g. ("SetEndEffectorSuctionCup", 1, 1), is passed
+through unchanged and ends the blended run before it, so a block transport
+stops where the suction cup switches and nowhere else.
+
+Consecutive straight segments are grouped into runs of SetCPCmd segments
+that the controller blends without stopping. Each run starts with
+SetCPParams, whose junction velocity is the speed at which the sharpest
+corner of the run can be taken while staying within `deviation` mm of the
+corner (the junction deviation rule of CNC planners). A segment is sent as
+PTP instead where blending is unsafe or pointless:
+
+  - rHead changes (CP moves do not rotate the head),
+  - the straight line leaves the reachable workspace (sent as MOVJ),
+  - the corner is so sharp the arm would have to almost stop anyway,
+  - the run is a single segment, or the MotionModel predicts it is no
+    faster than PTP MOVL moves.
+
+The resulting Path is a motion list, so it can also be downloaded with
+DobotProgram.
+----------------------------------------------------------------------------"""
+import math
+
+try:
+    from . import DobotDllType as dType
+    from . import DobotEstimate
+    from . import DobotReach
+    from .DobotEstimate import CP_COMMANDS
+    from .DobotMotionModel import MotionModel
+except ImportError:
+    import DobotDllType as dType
+    import DobotEstimate
+    import DobotReach
+    from DobotEstimate import CP_COMMANDS
+    from DobotMotionModel import MotionModel
+
+
+def estimateCommands(commands, model):
+    """Seconds `commands` take from the state in `model`, which is advanced to the end."""
+    return DobotEstimate.estimate(commands, model).total
+
+
+def junctionVelocity(a, b, c, acceleration, deviation):
+    """Fastest speed through corner b of a -> b -> c that stays within `deviation` mm of b."""
+    u = [q - p for p, q in zip(a[:3], b[:3])]
+    v = [q - p for p, q in zip(b[:3], c[:3])]
+    lu, lv = math.hypot(*u), math.hypot(*v)
+    if lu < 1e-9 or lv < 1e-9:
+        return 0.0
+    cosTheta = -sum(p * q for p, q in zip(u, v)) / (lu * lv)
+    sinHalf = math.sqrt(max(0.0, (1 - cosTheta) / 2))
+    if sinHalf >= 1 - 1e-9:
+        return math.inf
+    return math.sqrt(acceleration * deviation * sinHalf / (1 - sinHalf))
+
+
+class Path:
+    def __init__(self, commands, ptpCommands, start, model):
+        self.commands = commands            # blended motion list of (wrapper name, args)
+        self.ptpCommands = ptpCommands      # the same waypoints as PTP moves, for comparison
+        self.start = start
+        self.model = model
+
+    def __len__(self):
+        return len(self.commands)
+
+    def __iter__(self):
+        return iter(self.commands)
+
+    def estimate(self):
+        return estimateCommands(self.commands, self.model.copy())
+
+    def ptpEstimate(self):
+        return estimateCommands(self.ptpCommands, self.model.copy())
+
+    def report(self):
+        """Predicted seconds of the blended path and of plain PTP moves through the same waypoints."""
+        blended, ptp = self.estimate(), self.ptpEstimate()
+        return {
+            "blended": blended,
+            "ptp": ptp,
+            "saving": (ptp - blended) / ptp if ptp else 0.0,
+            "cpSegments": sum(name in CP_COMMANDS for name, _ in self.commands),
+            "ptpSegments": sum(name == "SetPTPCmd" for name, _ in self.commands)}
+
+    def send(self, api):
+        """Queue the path on `api` and return the queue index of its last command."""
+        index = 0
+        for name, args in self.commands:
+            index = getattr(dType, name)(api, *args, isQueued=1)[0]
+        return index
+
+
+def buildPath(waypoints, start=None, model=None, velocity=None, acceleration=None, deviation=0.5,
+              minJunctionVel=5.0, ptpMode=dType.PTPMode.PTPMOVLXYZMode):
+    """
+    Path through `waypoints` from `start` (x, y, z, rHead), or from the pose in `model`. Without
+    either, the first waypoint is reached with a PTP move and blending starts there.
+
+    velocity and acceleration default to the PTP linear parameters of `model` (or of the MotionModel
+    defaults), so CP and PTP moves are compared at the same speed.
+    """
+    startKnown = start is not None or model is not None
+    if model is None:
+        model = MotionModel(start)
+    elif start is not None:
+        model = model.copy()
+        model.setPose(start)
+    if velocity is None:
+        velocity = model.xyzVelocity * model.velocityRatio / 100
+    if acceleration is None:
+        acceleration = model.xyzAcceleration * model.accelerationRatio / 100
+
+    movj = dType.PTPMode.PTPMOVJXYZMode
+    cpMode = dType.ContinuousPathMode.CPAbsoluteMode
+    commands, ptpCommands = [], []
+    pose = list(model.pose) if startKnown else None
+    run = []                                # poses of the run being built, starting where it starts
+
+    def ptp(mode, target):
+        commands.append(("SetPTPCmd", (mode, target[0], target[1], target[2], target[3])))
+
+    def flush():
+        if len(run) < 2:
+            run.clear()
+            return
+        points = run[:]
+        run.clear()
+        if len(points) == 2:
+            ptp(ptpMode, points[1])
+            return
+        junction = min(velocity, min(junctionVelocity(a, b, c, acceleration, deviation)
+                                     for a, b, c in zip(points, points[1:], points[2:])))
+        blended = [("SetCPParams", (acceleration, round(junction, 2), acceleration, 0))]
+        blended += [("SetCPCmd", (cpMode, p[0], p[1], p[2], velocity)) for p in points[1:]]
+        plain = [("SetPTPCmd", (ptpMode, p[0], p[1], p[2], p[3])) for p in points[1:]]
+        before = model.copy()
+        before.setPose(points[0])
+        if estimateCommands(blended, before.copy()) < estimateCommands(plain, before):
+            commands.extend(blended)
+        else:
+            commands.extend(plain)
+
+    for item in waypoints:
+        if isinstance(item[0], str):
+            flush()
+            commands.append((item[0], tuple(item[1:])))
+            ptpCommands.append((item[0], tuple(item[1:])))
+            if pose is not None:
+                run.append(pose)
+            continue
+
+        target = [float(v) for v in item[:4]] + [pose[3] if pose is not None else 0.0] * (4 - len(item[:4]))
+        ptpCommands.append(("SetPTPCmd", (ptpMode, target[0], target[1], target[2], target[3])))
+        if pose is None:
+            ptp(ptpMode, target)
+        elif target[3] != pose[3]:
+            flush()
+            ptp(ptpMode, target)
+        elif not DobotReach.lineReachable(pose, target):
+            flush()
+            ptp(movj, target)
+        else:
+            if not run:
+                run.append(pose)
+            elif len(run) >= 2 and junctionVelocity(run[-2], run[-1], target, acceleration, deviation) < minJunctionVel:
+                # Too sharp to blend: end the run at the corner and start a new one from there.
+                corner = run[-1]
+                flush()
+                run.append(corner)
+            run.append(target)
+        pose = target
+        if not run:
+            run.append(pose)
+    flush()
+    return Path(commands, ptpCommands, list(model.pose) if startKnown else None, model)
@@ -0,0 +1,76 @@
+"""----------------------------------------------------------------------------
+Pick and place blocks with one JUMP move per transfer.
+
+    from dobot_api import DobotPickPlace
+
+    DobotPickPlace.pick(api, 250, 50)      # lift, move over (250, 50), lower, suction on
+    DobotPickPlace.place(api, 200, -80)    # lift, move over (200, -80), lower, suction off
+
+Instead of three PTP moves per pick (up to the safe Z, across, down to the
+block), each with a full stop, pick() and place() queue a single
+PTPJUMPXYZMode move followed by the suction cup command. The jump height and
+Z limit come from the workspace's safe Z and pick Z in prompt.txt, and are
+sent with SetPTPJumpParams only when they differ from what the arm was last
+given.
+----------------------------------------------------------------------------"""
+import threading
+
+try:
+    from . import DobotDllType as dType
+except ImportError:
+    import DobotDllType as dType
+
+SAFE_Z = 0.0        # clear of the blocks, from prompt.txt
+PICK_Z = -50.0      # suction cup on a block
+
+# Last (jumpHeight, zLimit) queued on each connection, keyed by id(connection). Forgotten when the
+# arm may hold other values: after a reconnect, an immediate SetPTPJumpParams or an offline program.
+jumpParams = {}
+jumpParamsLock = threading.Lock()
+
+
+def jumpParamsFor(safeZ=SAFE_Z, pickZ=PICK_Z):
+    """(jumpHeight, zLimit) that make a JUMP from pickZ rise exactly to safeZ and never above it."""
+    return (max(0.0, safeZ - pickZ), safeZ)
+
+
+def setJumpParams(api, safeZ=SAFE_Z, pickZ=PICK_Z):
+    """Queue SetPTPJumpParams for the workspace unless the arm already has them."""
+    api = dType.connection(api)
+    params = jumpParamsFor(safeZ, pickZ)
+    with jumpParamsLock:
+        if jumpParams.get(id(api)) == params:
+            return None
+    return dType.SetPTPJumpParams(api, *params, isQueued=1)[0]
+
+
+def jumpTo(api, x, y, z=PICK_Z, rHead=0.0, safeZ=SAFE_Z):
+    """Lift to safeZ, move over (x, y) and lower to z in one queued command. Returns its queue index."""
+    setJumpParams(api, safeZ, z)
+    return dType.SetPTPCmd(api, dType.PTPMode.PTPJUMPXYZMode, x, y, z, rHead, isQueued=1)[0]
+
+
+def pick(api, x, y, z=PICK_Z, rHead=0.0, safeZ=SAFE_Z):
+    """Jump onto the block at (x, y) and switch the suction cup on. Returns the last queue index."""
+    jumpTo(api, x, y, z, rHead, safeZ)
+    return dType.SetEndEffectorSuctionCup(api, 1, 1, isQueued=1)[0]
+
+
+def place(api, x, y, z=PICK_Z, rHead=0.0, safeZ=SAFE_Z):
+    """Jump to (x, y), lower the block to z and release it. Returns the last queue index."""
+    jumpTo(api, x, y, z, rHead, safeZ)
+    return dType.SetEndEffectorSuctionCup(api, 1, 0, isQueued=1)[0]
+
+
+def _recordJumpParams(api, name, args, queuedCmdIndex):
+    # Follows every queued SetPTPJumpParams, including ones not sent through this module.
+    if name == "SetPTPJumpParams" and queuedCmdIndex is not None:
+        with jumpParamsLock:
+            jumpParams[id(api)] = (float(args[0]), float(args[1]))
+    elif name in ("SetPTPJumpParams", "ConnectDobot", "SetQueuedCmdStopDownload"):
+        # Set outside the queue, lost with the old connection or changed by the offline program.
+        with jumpParamsLock:
+            jumpParams.pop(id(api), None)
+
+
+dType.queuedCmdHooks.append(_recordJumpParams)
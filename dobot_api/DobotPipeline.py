@@ -0,0 +1,252 @@
+"""----------------------------------------------------------------------------
+Run jobs back to back on one connection, planning the next while the arm
+works through the current one.
+
+    from dobot_api import DobotPipeline
+
+    with DobotPipeline.Pipeline(api) as pipeline:
+        first = pipeline.submit(sortCommands, name="sort")            # a list of (wrapper name, args)
+        second = pipeline.submit(lambda model: DobotMoves.planMoves(waypoints, model=model).commands,
+                                 name="tour")                         # or a planner
+        print(pipeline.status())        # [{'name': 'sort', 'state': 'running', 'done': 3, 'total': 12, ...}, ...]
+        second.cancel()                 # True while its commands have not been sent
+        first.result()                  # its last queue index, once executed
+
+A script that runs one job per connection queues the commands, starts the
+queue, waits for the last index and stops the queue again. The arm stands
+still while the host plans the next job. A Pipeline starts the queue once
+and keeps it running. Each job's commands are appended behind the previous
+job's, through a DobotStream.Feeder, so a long job never overfills the
+controller queue.
+
+A job is a list of (wrapper name, args) pairs, or a planner that takes a
+MotionModel at the pose where the previous job ends and returns such a list.
+Jobs run in submission order, on one worker thread. The worker plans the
+next job as soon as the previous one has been sent. It holds the commands
+back until the previous job has less than `lead` predicted seconds left, so
+a queued job can be cancelled for as long as possible without the arm
+stopping between jobs.
+
+Each submit() returns a Job, a concurrent.futures.Future resolved with the
+job's last queue index once the arm has executed it. The queue index range
+of its commands maps progress and alarms back to it. cancel() succeeds
+until the job's first command is sent. A job whose planner or commands
+fail gets the exception, and the pipeline goes on with the next job.
+----------------------------------------------------------------------------"""
+from collections import deque
+from concurrent.futures import CancelledError, Future
+import threading
+import time
+
+try:
+    from . import DobotDllType as dType
+    from . import DobotCompletion
+    from . import DobotEstimate
+    from . import DobotStream
+except ImportError:
+    import DobotDllType as dType
+    import DobotCompletion
+    import DobotEstimate
+    import DobotStream
+
+LEAD = 1.0          # predicted seconds of the previous job left when the next job's commands are sent
+
+
+class Job(Future):
+    def __init__(self, pipeline, source, name):
+        super().__init__()
+        self.pipeline = pipeline
+        self.source = source        # command list, or planner(model) returning one
+        self.name = name
+        self.feeder = None          # DobotStream.Feeder sending the commands
+        self.submitted = time.monotonic()
+
+    def __repr__(self):
+        return "<Job %s %s>" % (self.name, self.state)
+
+    @property
+    def first(self):
+        """Queue index of the job's first command, None until it is sent."""
+        return None if self.feeder is None else self.feeder.firstIndex
+
+    @property
+    def last(self):
+        """Queue index of the last command sent so far."""
+        return None if self.feeder is None else self.feeder.lastIndex
+
+    def progress(self):
+        """(commands executed, commands sent) of the job."""
+        if self.first is None:
+            return 0, 0
+        sent = self.feeder.sent
+        if self.done() and not self.cancelled() and self.exception() is None:
+            return sent, sent
+        return min(sent, max(0, self.pipeline.watcher.current - self.first + 1)), sent
+
+    @property
+    def state(self):
+        """pending, queued (sent, not reached yet), running, done, cancelled or failed."""
+        if self.cancelled():
+            return "cancelled"
+        if self.done():
+            return "failed" if self.exception() is not None else "done"
+        if self.first is None:
+            return "pending"
+        return "running" if self.pipeline.watcher.current >= self.first else "queued"
+
+
+class Pipeline:
+    def __init__(self, api, depth=DobotStream.DEPTH, lead=LEAD, start=True):
+        self.api = dType.connection(api)
+        self.depth = depth
+        self.lead = lead
+        self.watcher = DobotCompletion.getQueueWatcher(self.api)
+        self.cond = threading.Condition()
+        self.waiting = deque()
+        self.jobs = []              # every job submitted, in order
+        self.previous = None        # last job whose commands were sent
+        self.closed = False
+        if start:
+            dType.SetQueuedCmdStartExec(self.api)
+        self.thread = threading.Thread(target=self.run, name="DobotPipeline", daemon=True)
+        self.thread.start()
+
+    # ------------------------------------------------------------------- jobs
+
+    def submit(self, source, name=None):
+        """Append a job (command list or planner) and return its Job."""
+        with self.cond:
+            if self.closed:
+                raise RuntimeError("pipeline is closed")
+            job = Job(self, source, name if name is not None else "job%d" % (len(self.jobs) + 1))
+            job.add_done_callback(self.wake)
+            self.jobs.append(job)
+            self.waiting.append(job)
+            self.cond.notify_all()
+        return job
+
+    def jobAt(self, index):
+        """The job that queued command `index` belongs to, or None."""
+        with self.cond:
+            for job in self.jobs:
+                if job.first is not None and job.first <= index <= job.last:
+                    return job
+        return None
+
+    def current(self):
+        """The job the arm is executing, or None."""
+        return self.jobAt(self.watcher.current + 1)
+
+    def status(self):
+        """State and progress of every job, from a fresh read of the queue index."""
+        self.watcher.update(dType.GetQueuedCmdCurrentIndex(self.api)[self.watcher.slot])
+        with self.cond:
+            jobs = list(self.jobs)
+        status = []
+        for job in jobs:
+            done, sent = job.progress()
+            status.append({"name": job.name, "state": job.state, "done": done, "total": sent,
+                           "first": job.first, "last": job.last})
+        return status
+
+    def cancelPending(self):
+        """Cancel every job whose commands have not been sent yet; returns how many were cancelled."""
+        with self.cond:
+            jobs = list(self.waiting)
+        return sum(job.cancel() for job in jobs)
+
+    def join(self, timeout=None):
+        """Wait until every job submitted so far has finished."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for job in list(self.jobs):
+            try:
+                job.exception(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except CancelledError:
+                pass
+
+    def close(self, cancel=False):
+        """Stop taking jobs and wait for the submitted ones (cancel=True drops those not yet sent)."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        if cancel:
+            self.cancelPending()
+        self.thread.join()
+        self.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close(cancel=exc[0] is not None)
+
+    # ----------------------------------------------------------------- worker
+
+    def wake(self, job=None):
+        with self.cond:
+            self.cond.notify_all()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while not self.waiting and not self.closed:
+                    self.cond.wait()
+                if not self.waiting:
+                    return
+                job = self.waiting[0]
+            try:
+                commands = self.plan(job)
+                self.holdBack(job)
+            except BaseException as e:
+                commands, error = None, e
+            else:
+                error = None
+            with self.cond:
+                self.waiting.popleft()
+            if not job.set_running_or_notify_cancel():
+                continue
+            if error is not None:
+                job.set_exception(error)
+                continue
+            self.send(job, commands)
+
+    def plan(self, job):
+        if not callable(job.source):
+            return job.source
+        with self.watcher.cond:
+            model = None if self.watcher.model is None else self.watcher.model.copy()
+        if model is None:
+            model = DobotEstimate.activeModel(self.api)
+        return job.source(model)
+
+    def holdBack(self, job):
+        """Wait until the previous job is almost done, or `job` is cancelled."""
+        previous = self.previous
+        if previous is None or previous.last is None:
+            return
+        lead = self.lead / self.watcher.timeScale   # predictions are in wall seconds, lead in arm seconds
+        with self.cond:
+            while not job.cancelled() and not previous.done():
+                remaining = self.watcher.predictedRemaining(previous.last)
+                if remaining is None or remaining <= lead:
+                    return
+                self.cond.wait(min(remaining - lead, DobotCompletion.MAX_INTERVAL))
+
+    def send(self, job, commands):
+        job.feeder = DobotStream.Feeder(self.api, commands, self.depth, start=False)
+        try:
+            last = job.feeder.start().join()
+        except BaseException as e:
+            job.set_exception(e)
+            return
+        if last is None:
+            job.set_result(None)
+            return
+        self.previous = job
+        self.watcher.future(last).add_done_callback(lambda done: self.finish(job, done))
+
+    def finish(self, job, done):
+        if done.exception() is not None:
+            job.set_exception(done.exception())
+        else:
+            job.set_result(job.last)
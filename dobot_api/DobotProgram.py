@@ -0,0 +1,154 @@
+"""----------------------------------------------------------------------------
+Offline programs: download a motion list to the arm once, replay it N times.
+
+    from dobot_api import DobotProgram
+
+    program = DobotProgram.compileProgram([
+        ("SetPTPCmd", dType.PTPMode.PTPMOVJXYZMode, 250, 50, 0, 0),
+        ("SetPTPCmd", dType.PTPMode.PTPMOVLXYZMode, 250, 50, -50, 0),
+        ("SetEndEffectorSuctionCup", 1, 1),
+        ...
+    ])
+    DobotProgram.download(api, program, loops=20)   # no-op if this arm already holds it
+
+A motion list is a sequence of (wrapper name, *args) tuples, the arguments
+being those of the DobotDllType wrapper without api and isQueued.
+compileProgram checks every name and normalizes the arguments, so the same
+motions always give the same Program.digest().
+
+download() sends the program between SetQueuedCmdStartDownload and
+SetQueuedCmdStopDownload, which stores it on the controller with its loop
+count; the arm then runs it from its own memory when started offline, with no
+host attached. The digest of what each arm holds (keyed by its serial number)
+is kept in a ProgramCache, by default ~/.dobot/programs.json, so an unchanged
+program is never downloaded again. Simulated arms forget their program when
+the process exits, so they get an in-memory cache instead.
+----------------------------------------------------------------------------"""
+from ctypes import CDLL
+import hashlib
+import json
+import os
+
+try:
+    from . import DobotDllType as dType
+    from . import DobotEstimate
+    from . import DobotReach
+    from .DobotStore import JsonStore
+except ImportError:
+    import DobotDllType as dType
+    import DobotEstimate
+    import DobotReach
+    from DobotStore import JsonStore
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".dobot", "programs.json")
+
+
+class Program:
+    def __init__(self, commands=()):
+        self.commands = []          # [(wrapper name, args tuple)]
+        for command in commands:
+            self.add(*command)
+
+    def add(self, name, *args):
+        func = getattr(dType, name, None)
+        if not callable(func):
+            raise ValueError("%r is not a DobotDllType wrapper" % (name,))
+        self.commands.append((name, tuple(normalizeArg(arg) for arg in args)))
+        return self
+
+    def __len__(self):
+        return len(self.commands)
+
+    def __iter__(self):
+        return iter(self.commands)
+
+    def digest(self, loops=1):
+        """SHA-256 of the commands and loop count, i.e. of what download() stores on the arm."""
+        text = json.dumps({"loops": loops, "commands": self.commands}, separators=(",", ":"))
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def estimate(self, pose=None):
+        """Predicted seconds for one loop, starting from `pose` (x, y, z, rHead) or the home pose."""
+        return DobotEstimate.estimate(self.commands, pose=pose).total
+
+
+def normalizeArg(arg):
+    if isinstance(arg, bool):
+        return int(arg)
+    if isinstance(arg, float) and arg.is_integer():
+        return int(arg)
+    if isinstance(arg, (int, float)):
+        return arg
+    if isinstance(arg, (list, tuple)):
+        return [normalizeArg(a) for a in arg]
+    raise TypeError("unsupported program argument %r" % (arg,))
+
+
+def compileProgram(motions):
+    """Program from a motion list of (wrapper name, *args) tuples."""
+    if isinstance(motions, Program):
+        return motions
+    return Program(motions)
+
+
+class ProgramCache(JsonStore):
+    """Digest of the program each arm holds, keyed by serial number; path=None keeps it in memory."""
+
+    def __init__(self, path=None):
+        super().__init__(path, "program cache")
+
+
+memoryCache = ProgramCache()
+diskCaches = {}
+
+
+def defaultCache(api):
+    api = dType.connection(api)
+    if not isinstance(api.lib, CDLL):
+        return memoryCache
+    path = os.environ.get("DOBOT_PROGRAM_CACHE", DEFAULT_CACHE_PATH)
+    if path not in diskCaches:
+        diskCaches[path] = ProgramCache(path)
+    return diskCaches[path]
+
+
+def download(api, program, loops=1, cache=None, force=False):
+    """
+    Store `program` on the arm to be run `loops` times offline. Returns False without talking to
+    the arm beyond reading its serial number when the cache says it already holds this program.
+    """
+    api = dType.connection(api)
+    program = compileProgram(program)
+    if not len(program):
+        raise ValueError("empty program")
+    if api.targetCheck is not None:
+        # A move the arm cannot make would fail halfway through the download.
+        problems = DobotReach.checkProgram(program, bias=api.endEffectorBias)
+        if problems:
+            raise ValueError("program leaves the workspace: " + "; ".join(
+                "line %d %s: %s" % (position, name, reason) for position, name, args, reason in problems))
+    cache = defaultCache(api) if cache is None else cache
+    key = dType.GetDeviceSN(api)[0] or repr(api)
+    digest = program.digest(loops)
+    if not force and cache.get(key) == digest:
+        return False
+
+    # Downloaded lines are written to the controller's memory, not its command queue, so queue
+    # backpressure must not hold them back.
+    flowControl = api.flowControl
+    queueCapacity, issuedIndex = flowControl.queueCapacity, flowControl.issuedIndex
+    flowControl.queueCapacity = None
+    # A download that fails halfway leaves the arm with an unknown program.
+    cache.forget(key)
+    try:
+        dType.SetQueuedCmdStartDownload(api, loops, len(program))
+        try:
+            for name, args in program:
+                getattr(dType, name)(api, *args, isQueued=1)
+        finally:
+            dType.SetQueuedCmdStopDownload(api)
+    finally:
+        flowControl.queueCapacity = queueCapacity
+        flowControl.issuedIndex = issuedIndex
+    cache.set(key, digest)
+    return True
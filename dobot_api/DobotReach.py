@@ -0,0 +1,435 @@
+"""----------------------------------------------------------------------------
+Reachability map of the Magician workspace, for checking targets before they
+are queued.
+
+    from dobot_api import DobotReach
+
+    DobotReach.reachable(250, 50, -50, 0)           # True, one table lookup
+    DobotReach.getGrid().check(points)              # bool array for an (N, 3) or (N, 4) array
+    DobotReach.checkProgram(commands)               # [(position, name, args, reason)] of bad commands
+    DobotReach.install(api)                         # check each motion command's target before sending
+
+The x, y, z workspace is divided into RESOLUTION mm cells, each marked inside
+(every corner reachable), outside (no corner reachable) or boundary, using a
+vectorized copy of DobotKinematics.inverse. A lookup inside or outside is
+final; a boundary cell falls back to the exact inverse kinematics. rHead
+only moves joint 4, which must stay within its limits relative to the base
+angle, so it is checked with one subtraction instead of a fourth grid axis.
+
+The grid is built once and saved as ~/.dobot/reach-<hash>.npy (directory
+DOBOT_REACH_CACHE), the hash covering the arm's dimensions, joint limits and
+grid layout, so a change to any of them builds a new one.
+
+The grid is laid out for the default tool, the suction cup END_OFFSET in
+front of the wrist. Checks for another tool take its end effector bias
+(SetEndEffectorParams) and move each point to where the suction cup would be
+for the same wrist position.
+
+install(api), or DOBOT_REACH_CHECK=1 at ConnectDobot, sets checkTarget() as
+the connection's targetCheck on a Magician: SetPTPCmd, the CP moves and
+SetARCCmd / SetCircleCmd then raise DobotInvalidParamsError for a target out
+of reach instead of queuing a command the arm would stop on with a planning
+alarm. It reads the arm's end effector bias once, then follows
+SetEndEffectorParams. A single target is checked with the closed-form
+inverse kinematics, which costs as much as a grid lookup, so installing does
+not load the grid. checkProgram() is where the grid pays off: it follows
+relative moves, JUMP apexes and the straight lines of MOVL and CP moves of a
+whole motion list, and checks all of their points in one batch.
+----------------------------------------------------------------------------"""
+import hashlib
+import math
+import os
+
+import numpy as np
+
+try:
+    from . import DobotDllType as dType
+    from . import DobotKinematics as kinematics
+except ImportError:
+    import DobotDllType as dType
+    import DobotKinematics as kinematics
+
+RESOLUTION = 5.0                # mm per cell
+BOUNDS = ((-10.0, 350.0), (-350.0, 350.0), (-140.0, 165.0))     # x, y, z; the arm reaches at most ~341 mm
+OUTSIDE, BOUNDARY, INSIDE = 0, 1, 2
+GRID_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".dobot")
+SWEEP_STEP = 0.5                # degrees between joint angles swept when building the grid
+LINE_STEP = 5.0                 # mm between the points checked along a straight move
+J4_LOW, J4_HIGH = kinematics.JOINT_LIMITS[3][0] - 1e-6, kinematics.JOINT_LIMITS[3][1] + 1e-6
+
+PTP_ANGLE_MODES = (dType.PTPMode.PTPJUMPANGLEMode, dType.PTPMode.PTPMOVJANGLEMode, dType.PTPMode.PTPMOVLANGLEMode)
+PTP_INC_MODES = (dType.PTPMode.PTPMOVJANGLEINCMode, dType.PTPMode.PTPMOVLXYZINCMode, dType.PTPMode.PTPMOVJXYZINCMode)
+PTP_JUMP_MODES = (dType.PTPMode.PTPJUMPXYZMode, dType.PTPMode.PTPJUMPANGLEMode, dType.PTPMode.PTPJUMPMOVLXYZMode)
+PTP_LINE_MODES = (dType.PTPMode.PTPMOVLXYZMode, dType.PTPMode.PTPMOVLANGLEMode, dType.PTPMode.PTPMOVLXYZINCMode)
+CP_COMMANDS = ("SetCPCmd", "SetCP2Cmd", "SetCPLECmd")
+
+
+def reachableArray(x, y, z, r=None):
+    """Vectorized DobotKinematics.reachable: bool array; joint 4 is not checked where r is None or NaN."""
+    x, y, z = (np.asarray(v, dtype=float) for v in (x, y, z))
+    limits = kinematics.JOINT_LIMITS
+    tolerance = 1e-6
+
+    def within(angle, joint):
+        return (angle >= limits[joint][0] - tolerance) & (angle <= limits[joint][1] + tolerance)
+
+    rear, fore = kinematics.REAR_ARM, kinematics.FOREARM
+    j1 = np.degrees(np.arctan2(y, x))
+    a = np.hypot(x, y) - kinematics.END_OFFSET
+    d = np.hypot(a, z)
+    ok = (d <= rear + fore) & (d >= abs(rear - fore)) & (d != 0) & within(j1, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        phi = np.arctan2(a, z)
+        alpha = np.arccos(np.clip((rear ** 2 + d ** 2 - fore ** 2) / (2 * rear * d), -1.0, 1.0))
+        solution = np.zeros_like(ok)
+        for t2 in (phi - alpha, phi + alpha):
+            t3 = np.arctan2(rear * np.cos(t2) - z, a - rear * np.sin(t2))
+            solution |= within(np.degrees(t2), 1) & within(np.degrees(t3), 2)
+    ok &= solution
+    if r is not None:
+        r = np.asarray(r, dtype=float)
+        ok &= np.isnan(r) | within(r - j1, 3)
+    return ok
+
+
+def gridKey():
+    text = repr((GRID_VERSION, kinematics.REAR_ARM, kinematics.FOREARM, kinematics.END_OFFSET,
+                 kinematics.JOINT_LIMITS, BOUNDS, RESOLUTION, SWEEP_STEP))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def buildCells():
+    """uint8 array of OUTSIDE / BOUNDARY / INSIDE per cell, from reachability at the cell corners."""
+    axes = [np.linspace(low, high, int(round((high - low) / RESOLUTION)) + 1) for low, high in BOUNDS]
+    corners = reachableArray(*np.meshgrid(*axes, indexing="ij"))
+    every = np.ones(tuple(len(axis) - 1 for axis in axes), dtype=bool)
+    some = np.zeros_like(every)
+    for dx in (0, 1):
+        for dy in (0, 1):
+            for dz in (0, 1):
+                corner = corners[dx:dx + every.shape[0], dy:dy + every.shape[1], dz:dz + every.shape[2]]
+                every &= corner
+                some |= corner
+    # Corners can all miss a thin part of the workspace: the folded arm reaches a band under 1 mm
+    # thick around z = -12. Every cell a fine sweep of the joints passes through counts as reached.
+    some |= sweptCells(every.shape)
+    cells = np.full(every.shape, BOUNDARY, dtype=np.uint8)
+    cells[every] = INSIDE
+    cells[~some] = OUTSIDE
+    return cells
+
+
+def sweptCells(shape):
+    """Bool array of the cells that some joint angles within limits put the end effector in."""
+    limits = kinematics.JOINT_LIMITS
+    t2, t3 = np.meshgrid(np.radians(np.arange(limits[1][0], limits[1][1] + SWEEP_STEP, SWEEP_STEP)),
+                         np.radians(np.arange(limits[2][0], limits[2][1] + SWEEP_STEP, SWEEP_STEP)))
+    radial = (kinematics.REAR_ARM * np.sin(t2) + kinematics.FOREARM * np.cos(t3) + kinematics.END_OFFSET).ravel()
+    z = (kinematics.REAR_ARM * np.cos(t2) - kinematics.FOREARM * np.sin(t3)).ravel()
+    k = np.floor((z - BOUNDS[2][0]) / RESOLUTION).astype(np.int64)
+    swept = np.zeros(shape, dtype=bool)
+    for t1 in np.radians(np.arange(limits[0][0], limits[0][1] + SWEEP_STEP / 2, SWEEP_STEP / 2)):
+        i = np.floor((radial * np.cos(t1) - BOUNDS[0][0]) / RESOLUTION).astype(np.int64)
+        j = np.floor((radial * np.sin(t1) - BOUNDS[1][0]) / RESOLUTION).astype(np.int64)
+        inGrid = (i >= 0) & (i < shape[0]) & (j >= 0) & (j < shape[1]) & (k >= 0) & (k < shape[2])
+        swept[i[inGrid], j[inGrid], k[inGrid]] = True
+    return swept
+
+
+class ReachGrid:
+    def __init__(self, cells):
+        self.cells = cells
+        self.shape = cells.shape
+        self.origin = tuple(low for low, _ in BOUNDS)
+        # Scalar lookups index a bytes copy, which is several times faster than indexing the array.
+        self.flat = cells.tobytes()
+        self.strides = (self.shape[1] * self.shape[2], self.shape[2])
+
+    @classmethod
+    def load(cls, cacheDir=None):
+        """The grid from the cache directory, built and saved there if it is missing or stale."""
+        cacheDir = cacheDir or os.environ.get("DOBOT_REACH_CACHE", DEFAULT_CACHE_DIR)
+        path = os.path.join(cacheDir, "reach-%s.npy" % gridKey())
+        try:
+            cells = np.load(path)
+            if cells.shape == cls.expectedShape():
+                return cls(cells)
+        except (OSError, ValueError, EOFError):
+            pass
+        cells = buildCells()
+        try:
+            os.makedirs(cacheDir, exist_ok=True)
+            tmp = path + ".tmp.npy"
+            np.save(tmp, cells)
+            os.replace(tmp, path)
+        except OSError as e:
+            print("Could not cache the reach grid in %s: %s" % (cacheDir, e))
+        return cls(cells)
+
+    @staticmethod
+    def expectedShape():
+        return tuple(int(round((high - low) / RESOLUTION)) for low, high in BOUNDS)
+
+    def cell(self, x, y, z):
+        """OUTSIDE, BOUNDARY or INSIDE for the cell holding (x, y, z)."""
+        i = int((x - self.origin[0]) // RESOLUTION)
+        j = int((y - self.origin[1]) // RESOLUTION)
+        k = int((z - self.origin[2]) // RESOLUTION)
+        if not (0 <= i < self.shape[0] and 0 <= j < self.shape[1] and 0 <= k < self.shape[2]):
+            return OUTSIDE
+        return self.flat[i * self.strides[0] + j * self.strides[1] + k]
+
+    def contains(self, x, y, z, r=None):
+        """True if the arm can reach (x, y, z) and, unless r is None, turn the end effector to r."""
+        state = self.cell(x, y, z)
+        if state == INSIDE:
+            if r is None:
+                return True
+            j4 = r - math.degrees(math.atan2(y, x))
+            return J4_LOW <= j4 <= J4_HIGH
+        if state == OUTSIDE:
+            return False
+        return kinematics.inverse(x, y, z, r if r is not None else math.degrees(math.atan2(y, x))) is not None
+
+    def check(self, points):
+        """
+        Bool array: which rows of an (N, 3) array of x, y, z, or (N, 4) with rHead, are reachable.
+        A NaN rHead is not checked.
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        x, y, z = points[:, 0], points[:, 1], points[:, 2]
+        r = points[:, 3] if points.shape[1] > 3 else None
+        index = [np.floor((v - origin) / RESOLUTION).astype(np.int64) for v, origin in zip((x, y, z), self.origin)]
+        inGrid = np.ones(len(points), dtype=bool)
+        for axis, size in zip(index, self.shape):
+            inGrid &= (axis >= 0) & (axis < size)
+        state = np.full(len(points), OUTSIDE, dtype=np.uint8)
+        state[inGrid] = self.cells[tuple(axis[inGrid] for axis in index)]
+        ok = state == INSIDE
+        if r is not None:
+            j4 = r - np.degrees(np.arctan2(y, x))
+            ok &= np.isnan(r) | ((j4 >= J4_LOW) & (j4 <= J4_HIGH))
+        boundary = state == BOUNDARY
+        if boundary.any():
+            ok[boundary] = reachableArray(x[boundary], y[boundary], z[boundary],
+                                          r[boundary] if r is not None else None)
+        return ok
+
+
+grid = None
+
+
+def getGrid():
+    """The ReachGrid shared by the process, loaded on first use."""
+    global grid
+    if grid is None:
+        grid = ReachGrid.load()
+    return grid
+
+
+def reachable(x, y, z, r=None):
+    return getGrid().contains(x, y, z, r)
+
+
+def toolPoint(x, y, z, bias):
+    """
+    (x, y, z) moved to where the default tool's tip is when a tool with end effector bias `bias`
+    (xBias, yBias, zBias) has its tip at (x, y, z); None if no wrist position puts it there.
+    """
+    if bias is None:
+        return x, y, z
+    xBias, yBias, zBias = bias
+    radial = math.hypot(x, y)
+    if radial < abs(yBias):
+        return None
+    # The bias turns with the base: the wrist is xBias in from the tip along the arm, yBias beside it.
+    along = math.sqrt(radial * radial - yBias * yBias)
+    base = math.atan2(y, x) - math.atan2(yBias, along)
+    radial = along - xBias + kinematics.END_OFFSET
+    return radial * math.cos(base), radial * math.sin(base), z - zBias
+
+
+def toolPoints(points, bias):
+    """toolPoint() of the rows of an (N, 3) or (N, 4) array; NaN where no wrist position fits."""
+    if bias is None:
+        return points
+    xBias, yBias, zBias = bias
+    points = np.array(points, dtype=float)
+    radial = np.hypot(points[:, 0], points[:, 1])
+    with np.errstate(invalid="ignore"):
+        along = np.sqrt(radial * radial - yBias * yBias)
+    base = np.arctan2(points[:, 1], points[:, 0]) - np.arctan2(yBias, along)
+    radial = along - xBias + kinematics.END_OFFSET
+    points[:, 0], points[:, 1] = radial * np.cos(base), radial * np.sin(base)
+    points[:, 2] -= zBias
+    return points
+
+
+def outOfReach(x, y, z, r=None, bias=None):
+    """Why (x, y, z, r) cannot be reached with end effector bias `bias`, or None if it can."""
+    point = toolPoint(x, y, z, bias)
+    base = math.degrees(math.atan2(point[1], point[0])) if point is not None else 0.0
+    if point is None or kinematics.inverse(*point, base) is None:
+        return "(%g, %g, %g) is outside the arm's workspace" % (x, y, z)
+    if r is not None and kinematics.inverse(*point, r) is None:
+        return "rHead %g needs joint 4 at %.1f degrees, beyond its limits" % (r, r - base)
+    return None
+
+
+def checkTarget(api, name, mode, x, y, z, rHead):
+    """
+    Raise DobotInvalidParamsError if the target of a motion command cannot be reached with the
+    connection's end effector. Set as the connection's targetCheck by install(); relative targets
+    depend on where the queue leaves the arm and pass.
+    """
+    bias = api.endEffectorBias
+    if name == "SetPTPCmd" or name == "SetPTPWithLCmd":
+        if mode in PTP_INC_MODES:
+            return
+        if mode in PTP_ANGLE_MODES:
+            reason = None if kinematics.withinLimits([x, y, z, rHead]) else \
+                "joint angles (%g, %g, %g, %g) are beyond the joint limits" % (x, y, z, rHead)
+        else:
+            reason = outOfReach(x, y, z, rHead, bias)
+    elif name in CP_COMMANDS:
+        if mode == dType.ContinuousPathMode.CPRelativeMode:
+            return
+        reason = outOfReach(x, y, z, None, bias)
+    else:
+        reason = outOfReach(x, y, z, rHead, bias)
+    if reason is not None:
+        raise dType.DobotInvalidParamsError(name, dType.DobotCommunicate.DobotCommunicate_InvalidParams,
+                                            "%s target out of reach: %s" % (name, reason))
+
+
+def install(api, bias=None):
+    """
+    Check the targets of motion commands sent to `api` if it is a Magician, for the end effector
+    bias `bias` or, by default, the one the arm reports. Called by ConnectDobot with DOBOT_REACH_CHECK=1.
+    """
+    api = dType.connection(api)
+    if api.masterDevType != dType.DevType.Magician:
+        return
+    api.endEffectorBias = tuple(bias) if bias is not None else tuple(dType.GetEndEffectorParams(api))
+    api.targetCheck = checkTarget
+
+
+def uninstall(api):
+    dType.connection(api).targetCheck = None
+
+
+def linePoints(a, b, r=None):
+    """Points every LINE_STEP mm along the straight line from a to b, both ends included."""
+    steps = max(1, int(math.dist(a[:3], b[:3]) / LINE_STEP))
+    t = np.linspace(0.0, 1.0, steps + 1)[:, None]
+    points = np.asarray(a[:3], dtype=float) + (np.asarray(b[:3], dtype=float) - np.asarray(a[:3], dtype=float)) * t
+    if r is None:
+        return points
+    return np.hstack([points, np.full((len(points), 1), float(r))])
+
+
+def lineReachable(a, b):
+    """True if every point of the straight move from a to b (x, y, z, rHead) is reachable."""
+    return bool(getGrid().check(linePoints(a, b, a[3])).all())
+
+
+def programPoints(commands, start=None):
+    """
+    (points, owners, reasons): the x, y, z, rHead every command of `commands` passes through, the
+    position of the command each point belongs to, and problems found without a reach check. Until
+    the first absolute move, or throughout without `start`, only targets themselves are checked.
+    """
+    pose = [float(v) for v in start[:4]] if start is not None else None
+    jumpHeight, zLimit = 20.0, 200.0
+    # Straight segments (start x, y, z, end x, y, z, rHead), expanded into points in one go at the end.
+    segments, owners, reasons = [], [], []
+
+    def add(position, a, b=None, r=None):
+        b = a if b is None else b
+        segments.append((a[0], a[1], a[2], b[0], b[1], b[2], math.nan if r is None else r))
+        owners.append(position)
+
+    for position, (name, args) in enumerate(commands):
+        if name == "SetPTPJumpParams":
+            jumpHeight, zLimit = float(args[0]), float(args[1])
+        elif name in ("SetPTPCmd", "SetPTPWithLCmd"):
+            mode, target = args[0], [float(v) for v in args[1:5]]
+            if mode in PTP_INC_MODES and pose is None:
+                continue
+            if mode == dType.PTPMode.PTPMOVJANGLEINCMode or mode in PTP_ANGLE_MODES:
+                joints = target
+                if mode == dType.PTPMode.PTPMOVJANGLEINCMode:
+                    current = kinematics.inverse(*pose)
+                    if current is None:
+                        pose = None
+                        continue
+                    joints = [c + d for c, d in zip(current, target)]
+                if not kinematics.withinLimits(joints):
+                    reasons.append((position, "joint angles %s are beyond the joint limits" %
+                                    ", ".join("%.1f" % j for j in joints)))
+                    pose = None
+                    continue
+                target = kinematics.forward(*joints)
+            elif mode in PTP_INC_MODES:
+                target = [p + d for p, d in zip(pose, target)]
+            if pose is None:
+                add(position, target, r=target[3])
+            elif mode in PTP_JUMP_MODES:
+                top = max(min(max(pose[2], target[2]) + jumpHeight, zLimit), pose[2], target[2])
+                add(position, pose, pose[:2] + [top], pose[3])
+                if mode == dType.PTPMode.PTPJUMPMOVLXYZMode:
+                    add(position, pose[:2] + [top], target[:2] + [top], target[3])
+                add(position, target[:2] + [top], target, target[3])
+            elif mode in PTP_LINE_MODES:
+                add(position, pose, target, target[3])
+            else:
+                add(position, target, r=target[3])
+            pose = list(target)
+        elif name in CP_COMMANDS:
+            target = [float(v) for v in args[1:4]]
+            if args[0] == dType.ContinuousPathMode.CPRelativeMode:
+                if pose is None:
+                    continue
+                target = [p + d for p, d in zip(pose, target)]
+            rHead = pose[3] if pose is not None else None
+            add(position, pose if pose is not None else target, target, rHead)
+            pose = target + [rHead] if rHead is not None else None
+        elif name in ("SetARCCmd", "SetCircleCmd"):
+            cir, to = [float(v) for v in args[0][:4]], [float(v) for v in args[1][:4]]
+            add(position, cir, r=cir[3])
+            add(position, to, r=to[3])
+            if name == "SetARCCmd":
+                pose = to       # a full circle returns to where it started
+        elif name == "SetHOMECmd":
+            pose = None
+    if not segments:
+        return np.zeros((0, 4)), np.zeros(0, dtype=int), reasons
+    segments = np.array(segments)
+    a, b, r = segments[:, :3], segments[:, 3:6], segments[:, 6]
+    steps = np.maximum(1, (np.linalg.norm(b - a, axis=1) // LINE_STEP).astype(np.int64))
+    steps[(a == b).all(axis=1)] = 0
+    which = np.repeat(np.arange(len(segments)), steps + 1)
+    first = np.repeat(np.cumsum(steps + 1) - (steps + 1), steps + 1)
+    t = ((np.arange(len(which)) - first) / np.maximum(steps, 1)[which])[:, None]
+    points = np.hstack([a[which] + (b[which] - a[which]) * t, r[which][:, None]])
+    return points, np.asarray(owners)[which], reasons
+
+
+def checkProgram(commands, start=None, bias=None):
+    """
+    [(position, name, args, reason)] for every command of `commands` (a motion list or a
+    DobotProgram.Program) that leaves the workspace, checked in one batch from `start`, for a tool
+    with end effector bias `bias` (the suction cup by default). The arm would stop at the first;
+    moves starting from an unreachable target are reported as well.
+    """
+    commands = list(commands)
+    points, owners, reasons = programPoints(commands, start)
+    bad = dict(reasons)
+    if len(points):
+        ok = getGrid().check(toolPoints(points, bias))
+        for position in np.unique(owners[~ok]):
+            x, y, z, r = points[(owners == position) & ~ok][0]
+            bad.setdefault(int(position), outOfReach(x, y, z, None if np.isnan(r) else r, bias) or
+                           "passes through (%g, %g, %g)" % (x, y, z))
+    return [(position, commands[position][0], commands[position][1], bad[position]) for position in sorted(bad)]
@@ -0,0 +1,222 @@
+"""----------------------------------------------------------------------------
+Order the blocks of a multi-block pick and place to minimize travel time.
+
+    from dobot_api import DobotRoute
+
+    transfers = [((250, 50), (200, -80)), ((160, 90), (200, -80, -25)), ((290, -60), (170, 0))]
+    last = DobotRoute.transferAll(api, transfers)       # planned order, queued with pick / place
+    DobotCompletion.getQueueWatcher(api).wait(last)
+
+    route = DobotRoute.planRoute(transfers)
+    route.order                 # [2, 0, 1]: positions in `transfers`, in visiting order
+    route.report()              # predicted seconds in the given and the planned order
+
+A transfer is (pick, place), each (x, y) or (x, y, z) with z defaulting to the
+pick Z. Within a transfer the arm always makes the same JUMP, so the order
+only changes the moves from one place to the next pick. Their cost is the
+JUMP time the MotionModel predicts, not the distance: the base joint turns
+faster than the arm reaches out, and the jump height depends on the target Z.
+A nearest-neighbour tour is improved with 2-opt moves until none helps.
+
+Transfers that share a spot keep their relative order, so stacks are built
+bottom-up and taken apart top-down:
+
+  - a block placed onto another (same spot, higher Z) goes after it,
+  - a block picked from under another goes after the one on top,
+  - a block placed where another is picked from goes after that pick.
+
+Other constraints can be given as Transfer(pick, place, after=(i, ...)).
+----------------------------------------------------------------------------"""
+import math
+
+try:
+    from . import DobotDllType as dType
+    from . import DobotCompletion
+    from . import DobotEstimate
+    from . import DobotPickPlace
+    from .DobotMotionModel import MotionModel
+    from .DobotPickPlace import SAFE_Z, PICK_Z
+except ImportError:
+    import DobotDllType as dType
+    import DobotCompletion
+    import DobotEstimate
+    import DobotPickPlace
+    from DobotMotionModel import MotionModel
+    from DobotPickPlace import SAFE_Z, PICK_Z
+
+SAME_SPOT = 15.0        # mm between block centres that are taken to be the same stack
+MAX_PASSES = 50         # 2-opt passes over the whole tour
+
+
+class Transfer:
+    def __init__(self, pick, place, after=()):
+        self.pick = point(pick)
+        self.place = point(place)
+        self.after = tuple(after)       # positions of transfers that must be done first
+
+    def __repr__(self):
+        return "Transfer(%r, %r)" % (self.pick, self.place)
+
+
+def point(p):
+    return (float(p[0]), float(p[1]), float(p[2]) if len(p) > 2 else PICK_Z)
+
+
+def toTransfer(transfer):
+    if isinstance(transfer, Transfer):
+        return transfer
+    return Transfer(*transfer)
+
+
+def sameSpot(a, b):
+    return math.hypot(a[0] - b[0], a[1] - b[1]) <= SAME_SPOT
+
+
+def dependencies(transfers):
+    """For each transfer, the set of positions that must be done before it."""
+    before = [set(t.after) for t in transfers]
+    for i, a in enumerate(transfers):
+        for j, b in enumerate(transfers):
+            if i == j:
+                continue
+            if sameSpot(a.place, b.place) and a.place[2] < b.place[2]:
+                before[j].add(i)        # b is stacked on a
+            if sameSpot(a.pick, b.pick) and a.pick[2] > b.pick[2]:
+                before[j].add(i)        # a is on top of b's block
+            if sameSpot(a.pick, b.place):
+                before[j].add(i)        # b goes where a's block is
+    return before
+
+
+class Route:
+    def __init__(self, transfers, order, start, model, safeZ=SAFE_Z, rHead=0.0):
+        self.transfers = transfers      # as given
+        self.order = order              # positions in `transfers`, in visiting order
+        self.start = start
+        self.model = model
+        self.safeZ = safeZ
+        self.rHead = rHead
+
+    def __iter__(self):
+        return (self.transfers[i] for i in self.order)
+
+    def commands(self, order=None):
+        """The motion list pick / place would queue for the transfers in `order` (default: planned)."""
+        order = self.order if order is None else order
+        jump = dType.PTPMode.PTPJUMPXYZMode
+        commands, jumpParams = [], None
+        for i in order:
+            transfer = self.transfers[i]
+            for (x, y, z), on in ((transfer.pick, 1), (transfer.place, 0)):
+                params = DobotPickPlace.jumpParamsFor(self.safeZ, z)
+                if params != jumpParams:
+                    commands.append(("SetPTPJumpParams", params))
+                    jumpParams = params
+                commands.append(("SetPTPCmd", (jump, x, y, z, self.rHead)))
+                commands.append(("SetEndEffectorSuctionCup", (1, on)))
+        return commands
+
+    def estimate(self, order=None):
+        model = self.model.copy()
+        model.setPose(self.start)
+        return DobotEstimate.estimate(self.commands(order), model).total
+
+    def report(self):
+        """Predicted seconds of the transfers in the given order and in the planned one."""
+        given, planned = self.estimate(list(range(len(self.transfers)))), self.estimate()
+        return {"given": given, "planned": planned,
+                "saving": (given - planned) / given if given and not math.isinf(given) else 0.0}
+
+    def send(self, api):
+        """Queue the transfers in the planned order and return the queue index of the last command."""
+        index = 0
+        for transfer in self:
+            DobotPickPlace.pick(api, *transfer.pick[:2], transfer.pick[2], self.rHead, self.safeZ)
+            index = DobotPickPlace.place(api, *transfer.place[:2], transfer.place[2], self.rHead, self.safeZ)
+        return index
+
+
+def jumpCost(model, a, b, safeZ, rHead):
+    """Seconds of the JUMP from `a` to `b` with the jump parameters pick / place would set for it."""
+    model.setPose((a[0], a[1], a[2], rHead))
+    model.execute("SetPTPJumpParams", *DobotPickPlace.jumpParamsFor(safeZ, b[2]))
+    duration = model.ptpTime(dType.PTPMode.PTPJUMPXYZMode, b[0], b[1], b[2], rHead)
+    return math.inf if duration is None else duration
+
+
+def tourCost(order, startCost, cost):
+    total = startCost[order[0]]
+    for i, j in zip(order, order[1:]):
+        total += cost[i][j]
+    return total
+
+
+def feasible(order, before):
+    done = set()
+    for i in order:
+        if not before[i] <= done:
+            return False
+        done.add(i)
+    return True
+
+
+def nearestNeighbour(startCost, cost, before):
+    n = len(startCost)
+    order, done = [], set()
+    while len(order) < n:
+        ready = [i for i in range(n) if i not in done and before[i] <= done]
+        if not ready:
+            raise ValueError("the transfers' stacking constraints form a cycle")
+        here = startCost if not order else cost[order[-1]]
+        nxt = min(ready, key=lambda i: here[i])
+        order.append(nxt)
+        done.add(nxt)
+    return order
+
+
+def twoOpt(order, startCost, cost, before):
+    # Costs are not symmetric (a jump depends on the target's Z), so each candidate is costed in full.
+    best = tourCost(order, startCost, cost)
+    for _ in range(MAX_PASSES):
+        improved = False
+        for i in range(len(order) - 1):
+            for j in range(i + 1, len(order)):
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                total = tourCost(candidate, startCost, cost)
+                if total < best - 1e-9 and feasible(candidate, before):
+                    order, best = candidate, total
+                    improved = True
+        if not improved:
+            break
+    return order
+
+
+def planRoute(transfers, start=None, model=None, safeZ=SAFE_Z, rHead=0.0):
+    """
+    Route through `transfers` from `start` (x, y, z, rHead), or from the pose in `model` (a
+    MotionModel with the arm's parameters, e.g. DobotEstimate.activeModel(api)).
+    """
+    transfers = [toTransfer(t) for t in transfers]
+    model = MotionModel(start) if model is None else model.copy()
+    start = list(start) if start is not None else list(model.pose)
+    if not transfers:
+        return Route(transfers, [], start, model, safeZ, rHead)
+    before = dependencies(transfers)
+    # Each transfer starts at its pick and ends at its place; only the moves between them depend on the order.
+    costModel = model.copy()
+    startCost = [jumpCost(costModel, start, t.pick, safeZ, rHead) for t in transfers]
+    cost = [[jumpCost(costModel, a.place, b.pick, safeZ, rHead) if a is not b else 0.0 for b in transfers]
+            for a in transfers]
+    order = twoOpt(nearestNeighbour(startCost, cost, before), startCost, cost, before)
+    return Route(transfers, order, start, model, safeZ, rHead)
+
+
+def transferAll(api, transfers, safeZ=SAFE_Z, rHead=0.0):
+    """
+    Plan the transfers from where the arm will be once its queue is done, e.g. after a queued
+    SetHOMECmd, and queue them. Returns the last queue index.
+    """
+    model = DobotCompletion.getQueueWatcher(api).model
+    if model is None:
+        model = DobotEstimate.activeModel(api)
+    return planRoute(transfers, model=model, safeZ=safeZ, rHead=rHead).send(api)
@@ -0,0 +1,660 @@
+"""----------------------------------------------------------------------------
+Pure-Python stand-in for DobotDll.
+
+SimDobotDll exposes the same entry points DobotDllType calls on the vendor
+library (api.SetPTPCmd, api.GetQueuedCmdCurrentIndex, api.GetPose, ...) with
+the same (masterId, slaveId, ...) argument convention, so it can be passed to
+every wrapper in place of the object returned by CDLL.
+
+Each simulated arm owns a command queue that is executed against a clock:
+a command starts when the previous one finishes and takes as long as the
+trapezoidal velocity model in DobotMotionModel predicts for the motion
+parameters active at that moment. The queue index therefore advances exactly
+as it would on hardware with those parameters, which makes cycle time and
+queue throughput measurable without an arm.
+
+Use timeScale > 1 to run simulated time faster than wall-clock time.
+----------------------------------------------------------------------------"""
+from ctypes import memmove
+from collections import deque
+import threading
+import time
+
+try:
+    from .DobotMotionModel import MotionModel
+    from . import DobotKinematics as kinematics
+except ImportError:
+    from DobotMotionModel import MotionModel
+    import DobotKinematics as kinematics
+
+# Mirrors DobotDllType.DobotConnect / DobotCommunicate / DevType
+CONNECT_NO_ERROR = 0
+CONNECT_NOT_FOUND = 1
+CONNECT_OCCUPIED = 2
+
+NO_ERROR = 0
+BUFFER_FULL = 1
+TIMEOUT = 2
+INVALID_PARAMS = 3
+INVALID_DEVICE = 4
+
+DEV_MAGICIAN = 2
+
+ALARM_PLAN_INV_LIMIT = 0x12
+ALARM_BYTES = 16
+
+QUEUE_CAPACITY = 32
+FIRMWARE_NAME = b"Dobot"
+FIRMWARE_VERSION = b"3.7.0"
+
+CP_COMMANDS = ("SetCPCmd", "SetCP2Cmd", "SetCPLECmd")
+
+
+def _v(arg):
+    """Plain value of a ctypes scalar or a Python number."""
+    return getattr(arg, "value", arg)
+
+
+def _ref(arg):
+    """Object behind byref(...) / pointer(...), or the argument itself."""
+    return getattr(arg, "_obj", arg)
+
+
+def _write(buffer, data):
+    data = bytes(data)[:len(buffer)]
+    memmove(buffer, data, len(data))
+
+
+class _Entry:
+    __slots__ = ("index", "name", "args", "start", "duration", "fromPose")
+
+    def __init__(self, index, name, args):
+        self.index = index
+        self.name = name
+        self.args = args
+        self.start = None
+        self.duration = None
+        self.fromPose = None
+
+
+class SimDevice:
+    def __init__(self, sim, devId, portName):
+        self.sim = sim
+        self.devId = devId
+        self.portName = portName
+        self.connected = False
+        self.deviceName = "Dobot%d" % devId
+        self.deviceSN = "SIM%08d" % devId
+        self.powerOn()
+
+    def powerOn(self):
+        """Reset the arm as if it had just been power-cycled."""
+        self.model = MotionModel()
+        self.endEffectorParams = [0.0, 0.0, 0.0]
+        self.queue = deque()
+        self.lastIndex = 0
+        self.currentIndex = 0
+        self.running = False
+        self.stopping = False
+        self.cursor = 0.0
+        self.alarms = set()
+        self.powerOnTime = self.sim.time()
+        self.downloading = None
+        self.offlineProgram = None
+        self.executed = 0
+        self.motionTime = 0.0
+        self.firstStart = None
+        self.lastFinish = None
+
+    # ---------------------------------------------------------------- queue
+
+    def enqueue(self, name, args):
+        now = self.sim.time()
+        self.advance(now)
+        if self.downloading is not None:
+            self.downloading.append((name, args))
+            self.lastIndex += 1
+            return NO_ERROR, self.lastIndex
+        if len(self.queue) >= self.sim.queueCapacity:
+            return BUFFER_FULL, 0
+        if not self.queue:
+            self.cursor = max(self.cursor, now)
+        self.lastIndex += 1
+        self.queue.append(_Entry(self.lastIndex, name, args))
+        return NO_ERROR, self.lastIndex
+
+    def advance(self, now):
+        while self.running and self.queue:
+            entry = self.queue[0]
+            if entry.duration is None:
+                if self.stopping:
+                    self.running = self.stopping = False
+                    break
+                entry.start = self.cursor
+                entry.fromPose = list(self.model.pose)
+                endAtRest = not (len(self.queue) > 1 and self.queue[1].name in CP_COMMANDS)
+                if entry.name in CP_COMMANDS:
+                    duration = self.model.execute(entry.name, *entry.args, endAtRest=endAtRest)
+                else:
+                    duration = self.model.execute(entry.name, *entry.args)
+                if duration is None:
+                    self.alarms.add(ALARM_PLAN_INV_LIMIT)
+                    self.running = False
+                    break
+                entry.duration = duration
+                if self.firstStart is None:
+                    self.firstStart = entry.start
+            finish = entry.start + entry.duration
+            if finish > now:
+                break
+            self.queue.popleft()
+            self.currentIndex = entry.index
+            self.cursor = finish
+            self.executed += 1
+            self.motionTime += entry.duration
+            self.lastFinish = finish
+            if self.stopping:
+                self.running = self.stopping = False
+
+    def activeEntry(self, now):
+        if self.queue and self.queue[0].duration is not None and self.queue[0].start <= now:
+            return self.queue[0]
+        return None
+
+    def pose(self, now):
+        entry = self.activeEntry(now)
+        if entry is None or entry.duration <= 0:
+            return list(self.model.pose)
+        fraction = min(1.0, (now - entry.start) / entry.duration)
+        return [a + (b - a) * fraction for a, b in zip(entry.fromPose, self.model.pose)]
+
+    def stats(self):
+        cycleTime = (self.lastFinish - self.firstStart) if self.lastFinish is not None else 0.0
+        return {
+            "commandsExecuted": self.executed,
+            "motionTime": self.motionTime,
+            "cycleTime": cycleTime,
+            "idleTime": max(0.0, cycleTime - self.motionTime),
+            "throughput": self.executed / cycleTime if cycleTime > 0 else 0.0,
+            "pending": len(self.queue),
+        }
+
+
+class SimDobotDll:
+    def __init__(self, arms=1, timeScale=1.0, queueCapacity=QUEUE_CAPACITY, callLatency=0.0, connectTime=0.0):
+        self.timeScale = float(timeScale)
+        self.queueCapacity = queueCapacity
+        self.callLatency = callLatency      # wall seconds every call takes, like a serial round trip
+        self.connectTime = connectTime      # wall seconds ConnectDobot takes to open the port and handshake
+        self.lock = threading.RLock()
+        self.epoch = time.monotonic()
+        self.devices = {}
+        for devId in range(1, arms + 1):
+            self.devices[devId] = SimDevice(self, devId, "SIM%d" % devId)
+
+    def time(self):
+        """Simulated seconds since the library was created."""
+        return (time.monotonic() - self.epoch) * self.timeScale
+
+    def device(self, masterId):
+        return self.devices.get(_v(masterId))
+
+    def report(self):
+        with self.lock:
+            now = self.time()
+            for device in self.devices.values():
+                device.advance(now)
+            return {device.portName: device.stats() for device in self.devices.values()}
+
+    # ------------------------------------------------------------- dispatch
+
+    def _call(self, masterId, fn):
+        if self.callLatency:
+            time.sleep(self.callLatency)
+        with self.lock:
+            device = self.device(masterId)
+            if device is None or not device.connected:
+                return INVALID_DEVICE
+            device.advance(self.time())
+            return fn(device)
+
+    def _queued(self, masterId, name, args, isQueued, queuedCmdIndex):
+        def run(device):
+            if not _v(isQueued):
+                device.model.execute(name, *args)
+                return NO_ERROR
+            result, index = device.enqueue(name, args)
+            if result == NO_ERROR and queuedCmdIndex is not None:
+                _ref(queuedCmdIndex).value = index
+            return result
+        return self._call(masterId, run)
+
+    # ----------------------------------------------------------- connection
+
+    def SetDebugEnable(self, flag):
+        return NO_ERROR
+
+    def SearchDobot(self, szPara, maxLen):
+        with self.lock:
+            names = " ".join(device.portName for device in self.devices.values())
+        _write(szPara, names.encode("utf-8")[:_v(maxLen) - 1] + b"\x00")
+        return len(self.devices)
+
+    def ConnectDobot(self, szPara, baudrate, connectInfo):
+        portName = szPara.value.decode("utf-8")
+        if self.connectTime:
+            time.sleep(self.connectTime)
+        with self.lock:
+            candidates = [device for device in self.devices.values()
+                          if portName in ("", device.portName)]
+            if not candidates:
+                return CONNECT_NOT_FOUND
+            free = [device for device in candidates if not device.connected]
+            if not free:
+                return CONNECT_OCCUPIED
+            device = free[0]
+            device.connected = True
+            info = _ref(connectInfo).masterDevInfo
+            info.devId = device.devId
+            info.type = DEV_MAGICIAN
+            _write(info.firmwareName, FIRMWARE_NAME)
+            _write(info.firwareVersion, FIRMWARE_VERSION)
+            info.runTime = self.time() - device.powerOnTime
+        return CONNECT_NO_ERROR
+
+    def DisconnectDobot(self, masterId):
+        with self.lock:
+            device = self.device(masterId)
+            if device is not None:
+                device.connected = False
+        return NO_ERROR
+
+    def SetCmdTimeout(self, masterId, times):
+        return NO_ERROR
+
+    def PeriodicTask(self):
+        return NO_ERROR
+
+    def DobotExec(self):
+        return NO_ERROR
+
+    # ---------------------------------------------------------------- queue
+
+    def GetQueuedCmdCurrentIndex(self, masterId, slaveId, queuedCmdIndex):
+        def run(device):
+            _ref(queuedCmdIndex).value = device.currentIndex
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def GetQueuedCmdMotionFinish(self, masterId, slaveId, isFinish):
+        def run(device):
+            _ref(isFinish).value = not device.queue
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetQueuedCmdStartExec(self, masterId, slaveId):
+        def run(device):
+            if not device.running:
+                device.running = True
+                device.cursor = max(device.cursor, self.time())
+            device.stopping = False
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetQueuedCmdStopExec(self, masterId, slaveId):
+        def run(device):
+            device.stopping = device.running
+            device.advance(self.time())
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetQueuedCmdForceStopExec(self, masterId, slaveId):
+        def run(device):
+            now = self.time()
+            entry = device.activeEntry(now)
+            if entry is not None:
+                device.model.setPose(device.pose(now))
+                device.queue.popleft()
+                device.currentIndex = entry.index
+            device.running = device.stopping = False
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetQueuedCmdStartDownload(self, masterId, slaveId, totalLoop, linePerLoop):
+        def run(device):
+            device.downloading = []
+            device.offlineProgram = {"totalLoop": _v(totalLoop), "linePerLoop": _v(linePerLoop), "commands": []}
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetQueuedCmdStopDownload(self, masterId, slaveId):
+        def run(device):
+            if device.downloading is not None:
+                device.offlineProgram["commands"] = device.downloading
+                device.downloading = None
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def runOfflineProgram(self, masterId):
+        """Press the arm's offline key: run the downloaded program totalLoop times from its own memory."""
+        def run(device):
+            program = device.offlineProgram
+            if program is None or not program["commands"]:
+                return INVALID_PARAMS
+            if not device.queue:
+                device.cursor = max(device.cursor, self.time())
+            # Offline execution reads from flash, so the queue capacity does not apply.
+            for _ in range(max(1, program["totalLoop"])):
+                for name, args in program["commands"]:
+                    device.lastIndex += 1
+                    device.queue.append(_Entry(device.lastIndex, name, args))
+            device.running = True
+            device.stopping = False
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetQueuedCmdClear(self, masterId, slaveId):
+        def run(device):
+            now = self.time()
+            active = device.activeEntry(now)
+            device.queue.clear()
+            if active is not None:
+                device.queue.append(active)
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    # --------------------------------------------------------------- device
+
+    def SetDeviceSN(self, masterId, slaveId, szPara):
+        def run(device):
+            device.deviceSN = szPara.value.decode("utf-8")
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def GetDeviceSN(self, masterId, slaveId, szPara, maxLen):
+        def run(device):
+            _write(szPara, device.deviceSN.encode("utf-8") + b"\x00")
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetDeviceName(self, masterId, slaveId, szPara):
+        def run(device):
+            device.deviceName = szPara.value.decode("utf-8") if hasattr(szPara, "raw") else str(_v(szPara))
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def GetDeviceName(self, masterId, slaveId, szPara, maxLen):
+        def run(device):
+            _write(szPara, device.deviceName.encode("utf-8") + b"\x00")
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def GetDeviceVersion(self, masterId, slaveId, deviceVersion):
+        def run(device):
+            version = _ref(deviceVersion)
+            version.fw_majorVersion, version.fw_minorVersion, version.fw_revision = 3, 7, 0
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def GetDeviceWithL(self, masterId, slaveId, isWithL):
+        def run(device):
+            _ref(isWithL).value = False
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def GetDeviceTime(self, masterId, slaveId, deviceTime):
+        def run(device):
+            _ref(deviceTime).value = int((self.time() - device.powerOnTime) * 1000)
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    # ----------------------------------------------------------------- pose
+
+    def GetPose(self, masterId, slaveId, pose):
+        def run(device):
+            now = self.time()
+            x, y, z, r = device.pose(now)
+            joints = kinematics.inverse(x, y, z, r) or device.model.joints
+            out = _ref(pose)
+            out.x, out.y, out.z, out.rHead = x, y, z, r
+            out.joint1Angle, out.joint2Angle, out.joint3Angle, out.joint4Angle = joints
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def GetPoseL(self, masterId, slaveId, l):
+        def run(device):
+            _ref(l).value = 0.0
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def ResetPose(self, masterId, slaveId, manual, rearArmAngle, frontArmAngle):
+        return self._call(masterId, lambda device: NO_ERROR)
+
+    def GetKinematics(self, masterId, slaveId, kinematicsOut):
+        def run(device):
+            entry = device.activeEntry(self.time())
+            out = _ref(kinematicsOut)
+            if entry is None or entry.duration <= 0:
+                out.velocity, out.acceleration = 0.0, 0.0
+            else:
+                distance = sum((a - b) ** 2 for a, b in zip(entry.fromPose[:3], device.model.pose[:3])) ** 0.5
+                out.velocity = distance / entry.duration
+                out.acceleration = device.model.xyzAcceleration * device.model.accelerationRatio / 100
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def GetAlarmsState(self, masterId, slaveId, alarmsState, length, maxLen):
+        def run(device):
+            state = bytearray(ALARM_BYTES)
+            for code in device.alarms:
+                state[code // 8] |= 1 << (code % 8)
+            _write(alarmsState, state)
+            _ref(length).value = ALARM_BYTES
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def ClearAllAlarmsState(self, masterId, slaveId):
+        def run(device):
+            if device.alarms and device.queue and device.queue[0].duration is None:
+                # The command that raised the alarm is discarded.
+                device.currentIndex = device.queue.popleft().index
+            device.alarms.clear()
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def GetUserParams(self, masterId, slaveId, param):
+        return self._call(masterId, lambda device: NO_ERROR)
+
+    # ----------------------------------------------------------- parameters
+
+    def SetHOMEParams(self, masterId, slaveId, param, isQueued, queuedCmdIndex):
+        p = _ref(param)
+        return self._queued(masterId, "SetHOMEParams", (p.x, p.y, p.z, p.r), isQueued, queuedCmdIndex)
+
+    def GetHOMEParams(self, masterId, slaveId, param):
+        def run(device):
+            p = _ref(param)
+            p.x, p.y, p.z, p.r = device.model.homePose
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetPTPJointParams(self, masterId, slaveId, param, isQueued, queuedCmdIndex):
+        p = _ref(param)
+        args = (p.joint1Velocity, p.joint1Acceleration, p.joint2Velocity, p.joint2Acceleration,
+                p.joint3Velocity, p.joint3Acceleration, p.joint4Velocity, p.joint4Acceleration)
+        return self._queued(masterId, "SetPTPJointParams", args, isQueued, queuedCmdIndex)
+
+    def GetPTPJointParams(self, masterId, slaveId, param):
+        def run(device):
+            p = _ref(param)
+            p.joint1Velocity, p.joint2Velocity, p.joint3Velocity, p.joint4Velocity = device.model.jointVelocity
+            (p.joint1Acceleration, p.joint2Acceleration,
+             p.joint3Acceleration, p.joint4Acceleration) = device.model.jointAcceleration
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetPTPCoordinateParams(self, masterId, slaveId, param, isQueued, queuedCmdIndex):
+        p = _ref(param)
+        args = (p.xyzVelocity, p.xyzAcceleration, p.rVelocity, p.rAcceleration)
+        return self._queued(masterId, "SetPTPCoordinateParams", args, isQueued, queuedCmdIndex)
+
+    def GetPTPCoordinateParams(self, masterId, slaveId, param):
+        def run(device):
+            p, m = _ref(param), device.model
+            p.xyzVelocity, p.rVelocity, p.xyzAcceleration, p.rAcceleration = \
+                m.xyzVelocity, m.rVelocity, m.xyzAcceleration, m.rAcceleration
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetPTPJumpParams(self, masterId, slaveId, param, isQueued, queuedCmdIndex):
+        p = _ref(param)
+        return self._queued(masterId, "SetPTPJumpParams", (p.jumpHeight, p.zLimit), isQueued, queuedCmdIndex)
+
+    def GetPTPJumpParams(self, masterId, slaveId, param):
+        def run(device):
+            p = _ref(param)
+            p.jumpHeight, p.zLimit = device.model.jumpHeight, device.model.zLimit
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetPTPCommonParams(self, masterId, slaveId, param, isQueued, queuedCmdIndex):
+        p = _ref(param)
+        args = (p.velocityRatio, p.accelerationRatio)
+        return self._queued(masterId, "SetPTPCommonParams", args, isQueued, queuedCmdIndex)
+
+    def GetPTPCommonParams(self, masterId, slaveId, param):
+        def run(device):
+            p = _ref(param)
+            p.velocityRatio, p.accelerationRatio = device.model.velocityRatio, device.model.accelerationRatio
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetCPParams(self, masterId, slaveId, param, isQueued, queuedCmdIndex):
+        p = _ref(param)
+        args = (p.planAcc, p.juncitionVel, p.acc, p.realTimeTrack)
+        return self._queued(masterId, "SetCPParams", args, isQueued, queuedCmdIndex)
+
+    def GetCPParams(self, masterId, slaveId, param):
+        def run(device):
+            p, m = _ref(param), device.model
+            p.planAcc, p.juncitionVel, p.acc, p.realTimeTrack = m.cpPlanAcc, m.cpJunctionVel, m.cpAcc, 0
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetCPCommonParams(self, masterId, slaveId, param, isQueued, queuedCmdIndex):
+        p = _ref(param)
+        args = (p.velocityRatio, p.accelerationRatio)
+        return self._queued(masterId, "SetCPCommonParams", args, isQueued, queuedCmdIndex)
+
+    def GetCPCommonParams(self, masterId, slaveId, param):
+        def run(device):
+            p = _ref(param)
+            p.velocityRatio, p.accelerationRatio = device.model.cpVelocityRatio, device.model.cpAccelerationRatio
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetARCParams(self, masterId, slaveId, param, isQueued, queuedCmdIndex):
+        p = _ref(param)
+        args = (p.xyzVelocity, p.rVelocity, p.xyzAcceleration, p.rAcceleration)
+        return self._queued(masterId, "SetARCParams", args, isQueued, queuedCmdIndex)
+
+    def SetEndEffectorParams(self, masterId, slaveId, param, isQueued, queuedCmdIndex):
+        p = _ref(param)
+        return self._queued(masterId, "SetEndEffectorParams", (p.xBias, p.yBias, p.zBias), isQueued, queuedCmdIndex)
+
+    def GetEndEffectorParams(self, masterId, slaveId, param):
+        def run(device):
+            p = _ref(param)
+            p.xBias, p.yBias, p.zBias = device.model.endEffectorBias
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    # -------------------------------------------------------------- motion
+
+    def SetHOMECmd(self, masterId, slaveId, cmd, isQueued, queuedCmdIndex):
+        return self._queued(masterId, "SetHOMECmd", (_ref(cmd).temp,), isQueued, queuedCmdIndex)
+
+    def SetPTPCmd(self, masterId, slaveId, cmd, isQueued, queuedCmdIndex):
+        c = _ref(cmd)
+        return self._queued(masterId, "SetPTPCmd", (c.ptpMode, c.x, c.y, c.z, c.rHead), isQueued, queuedCmdIndex)
+
+    def SetPTPWithLCmd(self, masterId, slaveId, cmd, isQueued, queuedCmdIndex):
+        c = _ref(cmd)
+        args = (c.ptpMode, c.x, c.y, c.z, c.rHead, c.l)
+        return self._queued(masterId, "SetPTPWithLCmd", args, isQueued, queuedCmdIndex)
+
+    def SetCPCmd(self, masterId, slaveId, cmd, isQueued, queuedCmdIndex):
+        c = _ref(cmd)
+        return self._queued(masterId, "SetCPCmd", (c.cpMode, c.x, c.y, c.z, c.velocity), isQueued, queuedCmdIndex)
+
+    def SetCP2Cmd(self, masterId, slaveId, cmd, isQueued, queuedCmdIndex):
+        c = _ref(cmd)
+        return self._queued(masterId, "SetCP2Cmd", (c.cpMode, c.x, c.y, c.z), isQueued, queuedCmdIndex)
+
+    def SetCPLECmd(self, masterId, slaveId, cmd, isQueued, queuedCmdIndex):
+        c = _ref(cmd)
+        return self._queued(masterId, "SetCPLECmd", (c.cpMode, c.x, c.y, c.z, c.velocity), isQueued, queuedCmdIndex)
+
+    def SetARCCmd(self, masterId, slaveId, cmd, isQueued, queuedCmdIndex):
+        c = _ref(cmd)
+        cir, to = c.cirPoint, c.toPoint
+        args = ([cir.x, cir.y, cir.z, cir.rHead], [to.x, to.y, to.z, to.rHead])
+        return self._queued(masterId, "SetARCCmd", args, isQueued, queuedCmdIndex)
+
+    def SetCircleCmd(self, masterId, slaveId, cmd, isQueued, queuedCmdIndex):
+        c = _ref(cmd)
+        cir, to = c.cirPoint, c.toPoint
+        args = ([cir.x, cir.y, cir.z, cir.rHead], [to.x, to.y, to.z, to.rHead])
+        return self._queued(masterId, "SetCircleCmd", args, isQueued, queuedCmdIndex)
+
+    def SetWAITCmd(self, masterId, slaveId, cmd, isQueued, queuedCmdIndex):
+        return self._queued(masterId, "SetWAITCmd", (_ref(cmd).waitTime,), isQueued, queuedCmdIndex)
+
+    # -------------------------------------------------------- end effectors
+
+    def SetEndEffectorSuctionCup(self, masterId, slaveId, enableCtrl, on, isQueued, queuedCmdIndex):
+        args = (_v(enableCtrl), _v(on))
+        return self._queued(masterId, "SetEndEffectorSuctionCup", args, isQueued, queuedCmdIndex)
+
+    def GetEndEffectorSuctionCup(self, masterId, slaveId, enableCtrl, isOn):
+        def run(device):
+            _ref(enableCtrl).value = 1
+            _ref(isOn).value = device.model.suctionCup
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetEndEffectorGripper(self, masterId, slaveId, enableCtrl, on, isQueued, queuedCmdIndex):
+        args = (_v(enableCtrl), _v(on))
+        return self._queued(masterId, "SetEndEffectorGripper", args, isQueued, queuedCmdIndex)
+
+    def GetEndEffectorGripper(self, masterId, slaveId, enableCtrl, isOn):
+        def run(device):
+            _ref(enableCtrl).value = 1
+            _ref(isOn).value = device.model.gripper
+            return NO_ERROR
+        return self._call(masterId, run)
+
+    def SetEndEffectorLaser(self, masterId, slaveId, enableCtrl, on, isQueued, queuedCmdIndex):
+        args = (_v(enableCtrl), _v(on))
+        return self._queued(masterId, "SetEndEffectorLaser", args, isQueued, queuedCmdIndex)
+
+    def GetEndEffectorLaser(self, masterId, slaveId, enableCtrl, isOn):
+        def run(device):
+            _ref(enableCtrl).value = 1
+            _ref(isOn).value = device.model.laser
+            return NO_ERROR
+        return self._call(masterId, run)
+
+
+def _queuedStruct(name):
+    def method(self, masterId, slaveId, param, isQueued, queuedCmdIndex):
+        return self._queued(masterId, name, (), isQueued, queuedCmdIndex)
+    method.__name__ = name
+    return method
+
+
+# Queued commands that are accepted and take no time on the simulated arm.
+for _name in ("SetJOGJointParams", "SetJOGCoordinateParams", "SetJOGCommonParams", "SetJOGCmd",
+              "SetARCCommonParams", "SetTRIGCmd", "SetIOMultiplexing", "SetIODO", "SetIOPWM",
+              "SetEMotor", "SetEMotorS", "SetAutoLevelingCmd", "SetArmOrientation", "SetLostStepParams"):
+    setattr(SimDobotDll, _name, _queuedStruct(_name))
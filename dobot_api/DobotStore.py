@@ -0,0 +1,66 @@
+"""----------------------------------------------------------------------------
+Small JSON files of what is known about each arm across scripts, keyed by
+serial number: DobotHome's home state and DobotProgram's program cache.
+
+    store = JsonStore(os.path.join(os.path.expanduser("~"), ".dobot", "example.json"), "example state")
+    store.set(serialNumber, {"seen": True})
+    store.get(serialNumber)     # {"seen": True}, also in the next script
+
+Every change rewrites the whole file through a uniquely named temporary file
+in the same directory and os.replace, so concurrent scripts never read half a
+file, and the last writer wins. A file that cannot be read or written is
+reported and the store carries on in memory: losing it only costs a home or a
+download that could have been skipped.
+----------------------------------------------------------------------------"""
+import json
+import os
+import tempfile
+import threading
+
+
+class JsonStore:
+    """Entries keyed by serial number, saved to `path` on every change; path=None keeps them in memory."""
+
+    def __init__(self, path=None, what="state"):
+        self.path = path
+        self.what = what
+        self.lock = threading.Lock()
+        self.entries = {}
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print("Ignoring %s %s: %s" % (what, path, e))
+
+    def get(self, key, default=None):
+        with self.lock:
+            return self.entries.get(key, default)
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.save()
+
+    def forget(self, key):
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self.save()
+
+    def save(self):
+        # Called with self.lock held.
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path) or "."
+        tmp = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=directory, prefix=os.path.basename(self.path) + ".",
+                                             suffix=".tmp", delete=False) as f:
+                tmp = f.name
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print("Could not save %s %s: %s" % (self.what, self.path, e))
+            if tmp is not None and os.path.exists(tmp):
+                os.unlink(tmp)
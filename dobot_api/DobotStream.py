@@ -0,0 +1,215 @@
+"""----------------------------------------------------------------------------
+Stream long command lists into the controller queue a few commands ahead.
+
+    from dobot_api import DobotStream
+
+    def drawing():
+        for x, y in points:                         # computed as the arm goes
+            yield ("SetCPCmd", (dType.ContinuousPathMode.CPAbsoluteMode, x, y, -40, 0))
+
+    feeder = DobotStream.stream(api, drawing(), depth=16)
+    ...                                             # the caller's thread is free meanwhile
+    feeder.wait()                                   # sent and executed
+    print(feeder.metrics())
+
+    feeder = DobotStream.Feeder(api)                # or push commands from anywhere
+    feeder.start()
+    feeder.put("SetPTPCmd", dType.PTPMode.PTPJUMPXYZMode, 250, 0, -50, 0)
+    feeder.close()
+
+Commands are (wrapper name, args) pairs, as in the .commands of DobotPath,
+DobotMoves and DobotRoute, taken from any iterable or generator, or put()
+one at a time. A producer thread sends each with isQueued=1 and keeps at
+most `depth` commands waiting in the controller queue. Instead of filling
+the queue and relying on FlowControl to retry through BufferFull, it sleeps
+on the arm's QueueWatcher until a quarter of them have run, then tops the
+queue up again. Execution starts as soon
+as the first command has been sent (start=False leaves that to the caller),
+so the arm moves while the rest of the program is still being generated.
+
+metrics() reports where the time went. Stall time is spent by the producer
+waiting for room, which is the normal state when the source is faster than
+the arm. Starvation time is spent by the arm with an empty queue while the
+source had not finished yet. Starvation also ends CP blending, because
+segments only blend into commands already queued behind them. A source
+that starves often needs a deeper queue or a faster generator.
+----------------------------------------------------------------------------"""
+import queue
+import threading
+import time
+
+try:
+    from . import DobotDllType as dType
+    from . import DobotCompletion
+except ImportError:
+    import DobotDllType as dType
+    import DobotCompletion
+
+DEPTH = 16          # commands kept waiting in the controller queue; the simulator holds 32
+
+_END = object()     # put by close() to end a put() stream
+
+
+class Feeder:
+    def __init__(self, api, commands=None, depth=DEPTH, start=True, slot=0):
+        # commands: iterable of (wrapper name, args); None to take them from put() until close().
+        self.api = dType.connection(api)
+        self.depth = depth
+        self.refill = max(1, depth // 4)    # once full, wait for this many free slots before sending again
+        self.startExec = start
+        self.watcher = DobotCompletion.getQueueWatcher(self.api, slot)
+        self.inbox = queue.Queue() if commands is None else None
+        self.source = iter(self.inbox.get, _END) if commands is None else iter(commands)
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stopping = False
+        self.error = None
+        self.firstIndex = None      # queue index of the first command sent
+        self.lastIndex = None       # queue index of the last command sent
+        self.drained = None         # future resolved once the queue has run dry
+        self.emptySince = None      # when the queue last ran dry
+        # Metrics, in wall seconds.
+        self.started = None
+        self.firstSent = None
+        self.finished = None
+        self.sent = 0
+        self.stallCount = 0
+        self.stallTime = 0.0
+        self.starvedCount = 0
+        self.starvedTime = 0.0
+        self.sourceTime = 0.0
+        self.blockedBefore = 0.0
+
+    # ---------------------------------------------------------------- control
+
+    def start(self):
+        if self.thread is not None:
+            raise RuntimeError("feeder already started")
+        self.started = time.monotonic()
+        self.blockedBefore = self.api.flowControl.blockedTime
+        self.thread = threading.Thread(target=self.run, name="DobotStream", daemon=True)
+        self.thread.start()
+        return self
+
+    def put(self, name, *args):
+        if self.inbox is None:
+            raise RuntimeError("this feeder streams from an iterable; put() needs Feeder(api, None)")
+        self.inbox.put((name, args))
+
+    def close(self):
+        """End a put() stream once the commands already put have been sent."""
+        if self.inbox is not None:
+            self.inbox.put(_END)
+
+    def stop(self):
+        """Stop sending; commands already in the controller queue still run."""
+        self.stopping = True
+        if self.inbox is not None:
+            self.inbox.put(_END)
+
+    def join(self, timeout=None):
+        """
+        Wait until the whole stream has been sent and return the last queue index (None if the
+        stream was empty). Re-raises the error that stopped the producer, if any.
+        """
+        self.thread.join(timeout)
+        if self.thread.is_alive():
+            raise TimeoutError("command stream still being sent")
+        if self.error is not None:
+            raise self.error
+        return self.lastIndex
+
+    def wait(self, timeout=None):
+        """join(), then wait until the arm has executed the last command."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        last = self.join(timeout)
+        if last is not None:
+            self.watcher.wait(last, None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return last
+
+    # --------------------------------------------------------------- producer
+
+    def run(self):
+        try:
+            while not self.stopping:
+                before = time.monotonic()
+                command = next(self.source, _END)
+                self.sourceTime += time.monotonic() - before
+                if command is _END:
+                    break
+                self.waitForRoom()
+                if self.stopping:
+                    break
+                self.send(*command)
+        except BaseException as e:
+            self.error = e
+        finally:
+            self.finished = time.monotonic()
+            if self.drained is not None:
+                self.drained.cancel()
+
+    def waitForRoom(self):
+        if self.lastIndex is None or self.lastIndex - self.watcher.current < self.depth:
+            return
+        start = time.monotonic()
+        room = self.watcher.future(self.lastIndex - self.depth + self.refill)
+        while not self.stopping:
+            try:
+                room.result(DobotCompletion.QUIT_CHECK)
+                break
+            except TimeoutError:
+                if not dType.QuitDobotApiFlag:
+                    self.stopping = True
+        room.cancel()
+        self.stallCount += 1
+        self.stallTime += time.monotonic() - start
+
+    def send(self, name, args):
+        index = getattr(dType, name)(self.api, *args, isQueued=1)[0]
+        now = time.monotonic()
+        self.sent += 1
+        self.lastIndex = index
+        if self.firstSent is None:
+            self.firstSent = now
+            self.firstIndex = index
+            if self.startExec:
+                dType.SetQueuedCmdStartExec(self.api)
+        drained = self.watcher.future(index)
+        with self.lock:
+            if self.drained is not None:
+                self.drained.cancel()
+            self.drained = drained
+            if self.emptySince is not None:
+                self.starvedCount += 1
+                self.starvedTime += now - self.emptySince
+                self.emptySince = None
+        drained.add_done_callback(self.onDrained)
+
+    def onDrained(self, future):
+        if future.cancelled():
+            return
+        with self.lock:
+            if future is self.drained and self.finished is None:
+                self.emptySince = time.monotonic()
+
+    # ---------------------------------------------------------------- metrics
+
+    def metrics(self):
+        end = self.finished if self.finished is not None else time.monotonic()
+        return {
+            "sent": self.sent,
+            "lastIndex": self.lastIndex,
+            "running": self.thread is not None and self.thread.is_alive(),
+            "startLatency": None if self.firstSent is None else self.firstSent - self.started,
+            "elapsed": 0.0 if self.started is None else end - self.started,
+            "sourceTime": self.sourceTime,
+            "stallCount": self.stallCount,
+            "stallTime": self.stallTime,
+            "starvedCount": self.starvedCount,
+            "starvedTime": self.starvedTime,
+            "bufferFullTime": self.api.flowControl.blockedTime - self.blockedBefore}
+
+
+def stream(api, commands, depth=DEPTH, start=True, slot=0):
+    """Start a Feeder sending `commands` to `api` and return it; see Feeder.join / Feeder.wait."""
+    return Feeder(api, commands, depth, start, slot).start()
@@ -0,0 +1,152 @@
+"""----------------------------------------------------------------------------
+Background sampling of pose, kinematics and queue progress.
+
+    from dobot_api import DobotTelemetry
+
+    telemetry = DobotTelemetry.getSampler(api, rate=50)
+    x, y, z = DobotTelemetry.latestPose(api)[:3]     # no serial round trip
+    history = telemetry.export(seconds=10)            # structured array, oldest first
+    history["z"], history["queuedIndex"]
+
+One thread per arm calls GetPose, GetKinematics and GetQueuedCmdCurrentIndex
+`rate` times a second and writes the results into a preallocated NumPy
+structured array used as a ring buffer. There is a single writer, so readers
+take no lock: they read the sample counter, copy the slot and check that the
+writer did not lap them while copying. The slot after the newest sample may
+be in the middle of a write, so at most capacity - 1 samples can be read.
+----------------------------------------------------------------------------"""
+import threading
+import time
+
+import numpy as np
+
+try:
+    from . import DobotDllType as dType
+except ImportError:
+    import DobotDllType as dType
+
+SAMPLE_DTYPE = np.dtype([
+    ("time", "f8"),             # time.monotonic() when the sample was taken
+    ("x", "f4"), ("y", "f4"), ("z", "f4"), ("rHead", "f4"),
+    ("joint1", "f4"), ("joint2", "f4"), ("joint3", "f4"), ("joint4", "f4"),
+    ("velocity", "f4"), ("acceleration", "f4"),
+    ("queuedIndex", "u8"),
+])
+
+POSE_FIELDS = ("x", "y", "z", "rHead", "joint1", "joint2", "joint3", "joint4")
+
+
+class TelemetrySampler:
+    def __init__(self, api, rate=50.0, capacity=30000):
+        self.api = api
+        self.rate = float(rate)
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=SAMPLE_DTYPE)
+        self.count = 0              # samples written so far; slot of sample n is n % capacity
+        self.overruns = 0           # periods skipped because sampling took longer than 1 / rate
+        self.errors = 0
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.run, name="DobotTelemetry", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def run(self):
+        period = 1.0 / self.rate
+        next = time.monotonic()
+        while not self.stopped.is_set():
+            try:
+                self.sample()
+            except dType.DobotError:
+                self.errors += 1
+            next += period
+            now = time.monotonic()
+            if next < now:
+                skipped = int((now - next) / period) + 1
+                self.overruns += skipped
+                next += skipped * period
+            self.stopped.wait(next - now)
+
+    def sample(self):
+        pose = dType.GetPose(self.api)
+        kinematics = dType.GetKinematics(self.api)
+        queuedIndex = max(dType.GetQueuedCmdCurrentIndex(self.api))
+        row = self.buffer[self.count % self.capacity]
+        row["time"] = time.monotonic()
+        for field, value in zip(POSE_FIELDS, pose):
+            row[field] = value
+        row["velocity"], row["acceleration"] = kinematics
+        row["queuedIndex"] = queuedIndex
+        # Publish only after the slot is complete.
+        self.count += 1
+
+    # --------------------------------------------------------------- reading
+
+    def latest(self):
+        """Copy of the newest sample (a NumPy record), or None before the first one."""
+        while True:
+            count = self.count
+            if count == 0:
+                return None
+            sample = self.buffer[(count - 1) % self.capacity].copy()
+            if self.count - count < self.capacity - 1:
+                return sample
+
+    def export(self, seconds=None, last=None):
+        """Samples oldest first: all that are buffered, the `last` N, or those from the past `seconds`."""
+        while True:
+            count = self.count
+            # The slot after the newest sample may be half written, so at most capacity - 1 are read.
+            available = min(count, self.capacity - 1)
+            n = available if last is None else min(last, available)
+            start = (count - n) % self.capacity
+            if start + n <= self.capacity:
+                samples = self.buffer[start:start + n].copy()
+            else:
+                samples = np.concatenate((self.buffer[start:], self.buffer[:start + n - self.capacity]))
+            # Retry if the writer started on a slot we copied: the (count + k)-th sample goes into
+            # the oldest slot read once k reaches capacity - n.
+            if self.count - count < self.capacity - n:
+                break
+        if seconds is not None and len(samples):
+            samples = samples[samples["time"] >= samples["time"][-1] - seconds]
+        return samples
+
+    def stats(self):
+        return {"samples": self.count, "overruns": self.overruns, "errors": self.errors,
+                "rate": self.rate, "capacity": self.capacity}
+
+
+samplers = {}
+samplersLock = threading.Lock()
+
+
+def getSampler(api, rate=50.0, capacity=30000):
+    """The running TelemetrySampler for the connection `api`, started on first use."""
+    api = dType.connection(api)
+    with samplersLock:
+        sampler = samplers.get(id(api))
+        if sampler is None:
+            sampler = samplers[id(api)] = TelemetrySampler(api, rate, capacity).start()
+    return sampler
+
+
+def latestPose(api, maxAge=None):
+    """
+    [x, y, z, rHead, joint1..joint4] from the running sampler, or from GetPose when no sampler runs
+    for `api` or its newest sample is older than `maxAge` seconds.
+    """
+    sampler = samplers.get(id(dType.connection(api)))
+    sample = sampler.latest() if sampler is not None else None
+    if sample is None or (maxAge is not None and time.monotonic() - sample["time"] > maxAge):
+        return dType.GetPose(api)
+    return [float(sample[field]) for field in POSE_FIELDS]
@@ -1,9 +1,14 @@
 """----------------------------------------------------------------------------------------
 This file moves the robot's head to the center line and four corners of the working area
 ----------------------------------------------------------------------------------------"""
-from dobot_api import DobotDllType as dType
+from dobot_api import DobotDaemon
+from dobot_api import DobotMoves
 from warnings import warn
 
+# The running arm daemon (python -m dobot_api.DobotDaemon) if there is one, else the DLL directly. Helpers that
+# take the api go through dType.helper; planMoves only plans, so it is called here.
+dType = DobotDaemon.client(fallback=True)
+
 
 def main():
     api = dType.load()
@@ -31,22 +36,18 @@ def main():
     #   Y-axis --> side to side
     #   Z-axis --> up & down
 
-    # Move to the centerline & corners of the workspace.
-    indexes = [dType.SetPTPCmd(api, dType.PTPMode.PTPMOVLXYZMode, 155, 0, -50, rHead=50, isQueued=1)[0],
-               dType.SetPTPCmd(api, dType.PTPMode.PTPMOVLXYZMode, 300, 0, -50, rHead=50, isQueued=1)[0],
-               dType.SetPTPCmd(api, dType.PTPMode.PTPMOVLXYZMode, 155, -100, -50, rHead=50, isQueued=1)[0],
-               dType.SetPTPCmd(api, dType.PTPMode.PTPMOVLXYZMode, 155, 100, -50, rHead=50, isQueued=1)[0],
-               dType.SetPTPCmd(api, dType.PTPMode.PTPMOVLXYZMode, 300, -100, -50, rHead=50, isQueued=1)[0],
-               dType.SetPTPCmd(api, dType.PTPMode.PTPMOVLXYZMode, 300, 100, -50, rHead=50, isQueued=1)[0],
-               ]
-    last_index = indexes[-1]
+    # Move to the centerline & corners of the workspace, each move with whichever of MOVJ, MOVL and JUMP
+    # is fastest (the first one, straight after homing, stays MOVL).
+    moves = DobotMoves.planMoves([(155, 0, -50, 50), (300, 0, -50, 50), (155, -100, -50, 50),
+                                  (155, 100, -50, 50), (300, -100, -50, 50), (300, 100, -50, 50)])
+    for name, args in moves:
+        last_index = getattr(dType, name)(api, *args, isQueued=1)[0]
 
     # Start executing Command Queue
     dType.SetQueuedCmdStartExec(api)
 
-    # Wait for executing last command
-    while last_index > dType.GetQueuedCmdCurrentIndex(api)[0]:
-        dType.dSleep(1000)
+    # Wait for executing last command, giving up if it takes far longer than predicted
+    dType.waitForIndex(api, last_index, timeout="auto")
 
     # Stop executing Command Queue
     dType.SetQueuedCmdStopExec(api)
@@ -138,6 +138,7 @@ def main():
     # Execute Generated Code.
     choice = input("\n\nExecute the generated code? (y/n): ")
     if choice == 'y':
+        os.environ.setdefault("DOBOT_JOURNAL", COMMAND_JOURNAL_PATH)     # what was actually sent to the arm
         runpy.run_path(GEMINI_CODE_PATH)
 
 
@@ -163,5 +164,6 @@ if __name__ == "__main__":
     MOST_RECENT_RESPONSE_PATH = f"responses/response_{TIMESTAMP}.txt"
     GEMINI_CODE_PATH = "code_by_gemini.py"
     SAVE_PICTURE_PATH = f"responses/picture_{TIMESTAMP}.png"
+    COMMAND_JOURNAL_PATH = f"responses/commands_{TIMESTAMP}.djl"
 
     main()
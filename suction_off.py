@@ -1,9 +1,12 @@
 """----------------------------------------------------
 Turn the vacuum pump off when Gemini fails to do so.
 ----------------------------------------------------"""
-from dobot_api import DobotDllType as dType
+from dobot_api import DobotDaemon
 from warnings import warn
 
+# The running arm daemon (python -m dobot_api.DobotDaemon) if there is one, else the DLL directly.
+dType = DobotDaemon.client(fallback=True)
+
 
 def main():
     api = dType.load()